@@ -0,0 +1,32 @@
+"""
+Пакет бенчмарков суммаризатора.
+
+Запускается из корня репозитория: python -m benchmarks.<модуль>.
+Модули лабораторных работ импортируются плоско (from text_summarizer import ...),
+поэтому перед импортом нужный каталог лабораторной добавляется в sys.path.
+"""
+
+import sys
+from pathlib import Path
+from typing import Dict
+
+REPO_ROOT: Path = Path(__file__).resolve().parent.parent
+LAB_DIRS: Dict[str, Path] = {
+    "lab1": REPO_ROOT / "lab1",
+    "lab12": REPO_ROOT / "lab12",
+}
+
+
+def use_lab(lab: str) -> Path:
+    """
+    Что я делаю?
+        Делаю модули лабораторной работы доступными для импорта.
+    Что я принимаю на вход?
+        lab (str): Имя каталога лабораторной ("lab1" или "lab12").
+    Что я возвращаю?
+        Path: Каталог лабораторной.
+    """
+    lab_dir: Path = LAB_DIRS[lab]
+    if str(lab_dir) not in sys.path:
+        sys.path.insert(0, str(lab_dir))
+    return lab_dir
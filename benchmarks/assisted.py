@@ -0,0 +1,167 @@
+"""
+Бенчмарк ассистированной (спекулятивной) генерации локального движка (lab1).
+
+Черновая модель предлагает несколько токенов, основная проверяет их одним
+проходом. Для каждой статьи корзины саммари генерируется жадным поиском
+обычным способом и ассистированно; сравниваются токены в секунду,
+доля принятых черновых токенов, новых токенов на проход основной модели
+и совпадение саммари (в жадном режиме оно должно быть 100%).
+
+Пример:
+    python -m benchmarks.assisted --bucket medium --count 5
+    python -m benchmarks.assisted --draft-model ai-forever/rugpt3small_based_on_gpt2 --output assisted.json
+"""
+
+import argparse
+import json
+import statistics
+import time
+from typing import Any, Dict, List
+
+from benchmarks import use_lab
+from benchmarks.corpus import LENGTH_BUCKETS, make_bucket
+
+
+def _generate(engine: Any, text: str, args: argparse.Namespace, assisted: bool) -> Dict[str, Any]:
+    """
+    Что я делаю?
+        Генерирую одно саммари и замеряю время и число новых токенов.
+    Что я принимаю на вход?
+        engine: SummarizerEngine.
+        text (str): Исходный текст.
+        args (Namespace): Аргументы командной строки.
+        assisted (bool): Ассистированная генерация.
+    Что я возвращаю?
+        dict: summary, seconds и приращения статистики ассистирования (new_tokens,
+            target_forwards, draft_tokens, accepted_tokens).
+    """
+    model, _ = engine.load()
+    forwards: List[int] = [0]
+    # В обычном жадном поиске один проход основной модели - один новый токен
+    handle = model.register_forward_hook(lambda *hook_args: forwards.__setitem__(0, forwards[0] + 1))
+    before: Dict[str, int] = dict(engine.assist_stats)
+    started: float = time.perf_counter()
+    try:
+        summary: str = engine.summarize(
+            text, max_length=args.max_length, min_length=args.min_length, num_beams=1, assisted=assisted
+        )
+    finally:
+        seconds: float = time.perf_counter() - started
+        handle.remove()
+    delta: Dict[str, int] = {key: engine.assist_stats[key] - before[key] for key in before}
+    if not assisted:
+        delta["new_tokens"] = forwards[0]
+    return {"summary": summary, "seconds": seconds, **delta}
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Что я делаю?
+        Прогоняю статьи обычной и ассистированной генерацией и сравниваю их.
+    Что я принимаю на вход?
+        args (Namespace): Аргументы командной строки.
+    Что я возвращаю?
+        dict: Конфигурация, результаты по статьям и сводка.
+    """
+    use_lab("lab1")
+    from engine import SummarizerEngine
+
+    texts: List[str] = make_bucket(args.bucket, args.count)
+    engine = SummarizerEngine(args.model, args.dtype, device="cpu", draft_model_name=args.draft_model)
+    # Прогрев: загрузка обеих моделей и первые проходы не входят в замеры
+    started: float = time.perf_counter()
+    _generate(engine, texts[0], args, assisted=False)
+    _generate(engine, texts[0], args, assisted=True)
+    warmup_seconds: float = time.perf_counter() - started
+
+    rows: List[Dict[str, Any]] = []
+    for text in texts:
+        baseline: Dict[str, Any] = _generate(engine, text, args, assisted=False)
+        assisted: Dict[str, Any] = _generate(engine, text, args, assisted=True)
+        rows.append({
+            "characters": len(text),
+            "baseline_tokens_per_second": baseline["new_tokens"] / baseline["seconds"],
+            "assisted_tokens_per_second": assisted["new_tokens"] / assisted["seconds"],
+            "acceptance_rate": (
+                assisted["accepted_tokens"] / assisted["draft_tokens"] if assisted["draft_tokens"] else 0.0
+            ),
+            "tokens_per_target_forward": (
+                assisted["new_tokens"] / assisted["target_forwards"] if assisted["target_forwards"] else 0.0
+            ),
+            "draft_tokens": assisted["draft_tokens"],
+            "accepted_tokens": assisted["accepted_tokens"],
+            "identical": baseline["summary"] == assisted["summary"],
+        })
+    engine.unload()
+
+    proposed: int = sum(row["draft_tokens"] for row in rows)
+    summary: Dict[str, float] = {
+        "baseline_tokens_per_second": statistics.median(row["baseline_tokens_per_second"] for row in rows),
+        "assisted_tokens_per_second": statistics.median(row["assisted_tokens_per_second"] for row in rows),
+        "acceptance_rate": sum(row["accepted_tokens"] for row in rows) / proposed if proposed else 0.0,
+        "tokens_per_target_forward": statistics.mean(row["tokens_per_target_forward"] for row in rows),
+        "identical": statistics.mean(float(row["identical"]) for row in rows),
+        "warmup_seconds": warmup_seconds,
+    }
+    summary["speedup"] = summary["assisted_tokens_per_second"] / summary["baseline_tokens_per_second"]
+    return {"config": vars(args), "rows": rows, "summary": summary}
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    """
+    Что я делаю?
+        Печатаю таблицу по статьям и сводку.
+    Что я принимаю на вход?
+        report (dict): Результат run().
+    Что я возвращаю?
+        Ничего.
+    """
+    print("=" * 80)
+    print("📊 АССИСТИРОВАННАЯ ГЕНЕРАЦИЯ: ТОКЕНЫ В СЕКУНДУ И ДОЛЯ ПРИНЯТЫХ")
+    print("=" * 80)
+    print(f"{'Символов':>9} {'Обычная, ток/с':>15} {'Ассист., ток/с':>15} {'Принято':>8} {'Ток/проход':>11} {'Совпадает':>10}")
+    for row in report["rows"]:
+        print(
+            f"{row['characters']:>9} {row['baseline_tokens_per_second']:>15.1f} "
+            f"{row['assisted_tokens_per_second']:>15.1f} {row['acceptance_rate'] * 100:>7.0f}% "
+            f"{row['tokens_per_target_forward']:>11.2f} {'да' if row['identical'] else 'нет':>10}"
+        )
+    summary: Dict[str, float] = report["summary"]
+    print("-" * 80)
+    print(
+        f"Медиана: {summary['baseline_tokens_per_second']:.1f} -> {summary['assisted_tokens_per_second']:.1f} ток/с "
+        f"({summary['speedup']:.2f}x), принято {summary['acceptance_rate'] * 100:.0f}% черновых токенов, "
+        f"совпадение {summary['identical'] * 100:.0f}%"
+    )
+
+
+def main() -> None:
+    """
+    Что я делаю?
+        Разбираю аргументы, запускаю бенчмарк и сохраняю JSON.
+    Что я принимаю на вход?
+        Ничего (аргументы командной строки).
+    Что я возвращаю?
+        Ничего.
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bucket", choices=list(LENGTH_BUCKETS), default="medium")
+    parser.add_argument("--count", type=int, default=5, help="Сколько статей замерить")
+    parser.add_argument("--max-length", type=int, default=150)
+    parser.add_argument("--min-length", type=int, default=50)
+    parser.add_argument("--model", default="IlyaGusev/rugpt3medium_sum_gazeta")
+    parser.add_argument("--draft-model", default="ai-forever/rugpt3small_based_on_gpt2")
+    parser.add_argument("--dtype", default="float32")
+    parser.add_argument("--output", help="Куда сохранить JSON с результатами")
+    args = parser.parse_args()
+
+    report: Dict[str, Any] = run(args)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+        print(f"\n💾 Результаты сохранены в {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Детерминированный синтетический корпус русских новостных текстов.
+
+Тексты собираются из шаблонов предложений с подстановками, поэтому корпус
+одинаков при одном и том же зерне и не требует скачивания датасетов.
+Статьи разбиты на корзины длины (LENGTH_BUCKETS) для кривых масштабирования.
+Также умеет делать "перепечатки" - тексты с мелкими правками, как в новостных лентах.
+"""
+
+import random
+from typing import Dict, List, Tuple
+
+_SOURCES: List[str] = [
+    "Росстата", "ТАСС", "РИА Новости", "Интерфакса", "пресс-службы ведомства",
+    "аналитиков рынка", "отраслевых экспертов", "городской администрации",
+]
+_ACTORS: List[str] = [
+    "Правительство", "Центральный банк", "Министерство здравоохранения",
+    "Мэрия Москвы", "Госдума", "Министерство транспорта", "Совет Федерации",
+    "Министерство образования", "Федеральная антимонопольная служба",
+]
+_TOPICS: List[str] = [
+    "объем жилищного строительства", "экспорт зерна", "число туристов",
+    "средняя зарплата", "выпуск автомобилей", "пассажиропоток аэропортов",
+    "спрос на ипотеку", "производство электроэнергии", "розничная торговля",
+]
+_PLACES: List[str] = [
+    "Москве", "Санкт-Петербурге", "Новосибирске", "Екатеринбурге", "Казани",
+    "Нижнем Новгороде", "Краснодарском крае", "Татарстане", "Приморье",
+]
+_PERIODS: List[str] = [
+    "в первом квартале", "по итогам года", "за последний месяц",
+    "в январе", "с начала года", "во втором полугодии",
+]
+_MEASURES: List[str] = [
+    "новые правила субсидирования", "программу поддержки малого бизнеса",
+    "ограничения на вывоз сырья", "план модернизации инфраструктуры",
+    "законопроект о цифровых платформах", "меры по снижению инфляции",
+]
+_TEMPLATES: List[str] = [
+    "По данным {source}, {topic} в {place} {period} вырос на {n} процентов.",
+    "{actor} утвердило {measure}, которые вступят в силу {period}.",
+    "Эксперты связывают изменения с тем, что {topic} {period} снизился на {n} процентов.",
+    "{actor} рассмотрит {measure} на ближайшем заседании.",
+    "Как сообщили представители {source}, в {place} {period} зафиксирован рекордный {topic}.",
+    "Ранее {actor} предупреждало, что {topic} может сократиться еще на {n} процентов.",
+    "В {place} уже начали применять {measure}, пишет издание со ссылкой на {source}.",
+    "Общий объем финансирования составит {n} миллиардов рублей.",
+    "Жители {place_gen} отмечают, что изменения заметны уже {period}.",
+    "Окончательное решение будет принято после консультаций с регионами.",
+    "Критики указывают, что {measure} может ударить по небольшим компаниям.",
+    "Согласно прогнозу {source}, до конца года показатель вырастет еще на {n} процентов.",
+]
+_PLACES_GEN: List[str] = [
+    "Москвы", "Петербурга", "Новосибирска", "Екатеринбурга", "Казани",
+    "Нижнего Новгорода", "Кубани", "Татарстана", "Приморья",
+]
+_ATTRIBUTIONS: List[str] = [
+    "Об этом сообщает ТАСС.", "Об этом пишет РБК.", "Информацию подтвердили в ведомстве.",
+    "Новость опубликована на сайте издания.", "Подробности уточняются.",
+]
+
+
+def make_sentence(rng: random.Random) -> str:
+    """
+    Что я делаю?
+        Собираю одно новостное предложение из случайного шаблона.
+    Что я принимаю на вход?
+        rng (Random): Генератор случайных чисел.
+    Что я возвращаю?
+        str: Предложение.
+    """
+    template: str = rng.choice(_TEMPLATES)
+    sentence: str = template.format(
+        source=rng.choice(_SOURCES),
+        actor=rng.choice(_ACTORS),
+        topic=rng.choice(_TOPICS),
+        place=rng.choice(_PLACES),
+        place_gen=rng.choice(_PLACES_GEN),
+        period=rng.choice(_PERIODS),
+        measure=rng.choice(_MEASURES),
+        n=rng.randint(2, 95),
+    )
+    return sentence[0].upper() + sentence[1:]
+
+
+def make_article(rng: random.Random, n_sentences: int) -> str:
+    """
+    Что я делаю?
+        Собираю статью из заданного числа предложений.
+    Что я принимаю на вход?
+        rng (Random): Генератор случайных чисел.
+        n_sentences (int): Число предложений.
+    Что я возвращаю?
+        str: Текст статьи.
+    """
+    return " ".join(make_sentence(rng) for _ in range(n_sentences))
+
+
+def rewrite(rng: random.Random, text: str, strength: float) -> str:
+    """
+    Что я делаю?
+        Делаю "перепечатку": меняю числа, удаляю или переставляю предложения,
+        добавляю ссылку на источник. Чем больше strength, тем сильнее правки.
+    Что я принимаю на вход?
+        rng (Random): Генератор случайных чисел.
+        text (str): Исходная статья.
+        strength (float): Доля затрагиваемых предложений (0..1).
+    Что я возвращаю?
+        str: Измененный текст.
+    """
+    sentences: List[str] = [part if part.endswith(".") else part + "." for part in text.split(". ")]
+    sentences = [sentence.replace("..", ".") for sentence in sentences]
+    edits: int = max(1, round(len(sentences) * strength)) if strength > 0 else 0
+
+    for _ in range(edits):
+        operation: int = rng.randrange(4)
+        index: int = rng.randrange(len(sentences))
+        if operation == 0 and len(sentences) > 2:
+            sentences.pop(index)
+        elif operation == 1:
+            sentences[index] = make_sentence(rng)
+        elif operation == 2 and index + 1 < len(sentences):
+            sentences[index], sentences[index + 1] = sentences[index + 1], sentences[index]
+        else:
+            words: List[str] = sentences[index].split()
+            digits: List[int] = [i for i, word in enumerate(words) if word.isdigit()]
+            if digits:
+                words[rng.choice(digits)] = str(rng.randint(2, 95))
+                sentences[index] = " ".join(words)
+            else:
+                sentences.insert(index, rng.choice(_ATTRIBUTIONS))
+
+    return " ".join(sentences)
+
+
+# Корзины длины статей: (минимум, максимум) предложений
+LENGTH_BUCKETS: Dict[str, Tuple[int, int]] = {
+    "short": (3, 5),
+    "medium": (8, 12),
+    "long": (20, 28),
+    "xlong": (40, 55),
+}
+
+
+def make_bucket(bucket: str, count: int, seed: int = 42) -> List[str]:
+    """
+    Что я делаю?
+        Генерирую детерминированный набор статей одной корзины длины.
+    Что я принимаю на вход?
+        bucket (str): Имя корзины из LENGTH_BUCKETS.
+        count (int): Число статей.
+        seed (int): Зерно генератора (корзины с одним зерном не совпадают).
+    Что я возвращаю?
+        List[str]: Статьи.
+    """
+    low, high = LENGTH_BUCKETS[bucket]
+    rng: random.Random = random.Random(f"{seed}:{bucket}")
+    return [make_article(rng, rng.randint(low, high)) for _ in range(count)]
@@ -0,0 +1,163 @@
+"""
+Бенчмарк режимов декодирования локального движка (lab1): задержка на токен.
+
+Для каждого режима (default - динамический KV-кеш, static - заранее
+выделенный кеш, compiled - static + torch.compile шага декодирования)
+генерирует саммари статей одной корзины длины ровно на 1 и на N новых
+токенов: prefill - время генерации 1 токена, задержка на токен -
+(t(N) - t(1)) / (N - 1). Прогрев (для compiled - компиляция) замеряется
+отдельно, совпадение саммари с режимом default проверяется на жадном поиске.
+
+Пример:
+    python -m benchmarks.decode_modes --modes default static compiled --tokens 64
+    python -m benchmarks.decode_modes --bucket long --count 3 --output decode.json
+"""
+
+import argparse
+import json
+import statistics
+import time
+from typing import Any, Dict, List, Optional
+
+from benchmarks import use_lab
+from benchmarks.corpus import LENGTH_BUCKETS, make_bucket
+
+
+def _timed(engine: Any, text: str, tokens: int, num_beams: int) -> Dict[str, Any]:
+    """
+    Что я делаю?
+        Генерирую саммари ровно из tokens новых токенов и замеряю время.
+    Что я принимаю на вход?
+        engine: SummarizerEngine.
+        text (str): Исходный текст.
+        tokens (int): Число новых токенов.
+        num_beams (int): Число лучей.
+    Что я возвращаю?
+        dict: summary и seconds.
+    """
+    started: float = time.perf_counter()
+    summary: str = engine.summarize(text, max_length=tokens, min_length=tokens, num_beams=num_beams)
+    return {"summary": summary, "seconds": time.perf_counter() - started}
+
+
+def run_mode(mode: str, texts: List[str], args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Что я делаю?
+        Замеряю один режим декодирования на всех текстах.
+    Что я принимаю на вход?
+        mode (str): Режим декодирования.
+        texts (List[str]): Статьи.
+        args (Namespace): Аргументы командной строки.
+    Что я возвращаю?
+        dict: warmup_seconds, prefill_ms, per_token_ms (медианы) и саммари.
+    """
+    from engine import SummarizerEngine
+
+    engine = SummarizerEngine(args.model, args.dtype, device="cpu", decode_mode=mode)
+    engine.load()
+    # Прогрев с теми же формами, что и замеры: в режиме compiled здесь же проходит компиляция
+    started: float = time.perf_counter()
+    _timed(engine, texts[0], 1, args.num_beams)
+    _timed(engine, texts[0], args.tokens, args.num_beams)
+    warmup_seconds: float = time.perf_counter() - started
+
+    prefill_ms: List[float] = []
+    per_token_ms: List[float] = []
+    summaries: List[str] = []
+    for text in texts:
+        for _ in range(args.repeats):
+            first: Dict[str, Any] = _timed(engine, text, 1, args.num_beams)
+            full: Dict[str, Any] = _timed(engine, text, args.tokens, args.num_beams)
+            prefill_ms.append(first["seconds"] * 1000.0)
+            per_token_ms.append((full["seconds"] - first["seconds"]) * 1000.0 / (args.tokens - 1))
+        summaries.append(full["summary"])
+    engine.unload()
+
+    return {
+        "mode": mode,
+        "warmup_seconds": warmup_seconds,
+        "prefill_ms": statistics.median(prefill_ms),
+        "per_token_ms": statistics.median(per_token_ms),
+        "summaries": summaries,
+    }
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Что я делаю?
+        Прогоняю все режимы и сравниваю их с default.
+    Что я принимаю на вход?
+        args (Namespace): Аргументы командной строки.
+    Что я возвращаю?
+        dict: Конфигурация и результаты по режимам.
+    """
+    use_lab("lab1")
+    texts: List[str] = make_bucket(args.bucket, args.count)
+    results: List[Dict[str, Any]] = [run_mode(mode, texts, args) for mode in args.modes]
+
+    baseline: Optional[Dict[str, Any]] = next((result for result in results if result["mode"] == "default"), None)
+    for result in results:
+        if baseline is None:
+            continue
+        result["speedup"] = baseline["per_token_ms"] / result["per_token_ms"] if result["per_token_ms"] > 0 else 0.0
+        result["agreement"] = statistics.mean(
+            float(own == reference) for own, reference in zip(result["summaries"], baseline["summaries"])
+        )
+    return {"config": vars(args), "results": results}
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    """
+    Что я делаю?
+        Печатаю таблицу "режим - prefill - задержка на токен - ускорение".
+    Что я принимаю на вход?
+        report (dict): Результат run().
+    Что я возвращаю?
+        Ничего.
+    """
+    print("=" * 80)
+    print("📊 РЕЖИМЫ ДЕКОДИРОВАНИЯ: ЗАДЕРЖКА НА ТОКЕН")
+    print("=" * 80)
+    print(f"{'Режим':<10} {'Прогрев, с':>11} {'Prefill, мс':>12} {'мс/токен':>9} {'Ускорение':>10} {'Совпадение':>11}")
+    for result in report["results"]:
+        speedup: str = f"{result['speedup']:.2f}x" if "speedup" in result else "-"
+        agreement: str = f"{result['agreement'] * 100:.0f}%" if "agreement" in result else "-"
+        print(
+            f"{result['mode']:<10} {result['warmup_seconds']:>11.2f} {result['prefill_ms']:>12.1f} "
+            f"{result['per_token_ms']:>9.2f} {speedup:>10} {agreement:>11}"
+        )
+
+
+def main() -> None:
+    """
+    Что я делаю?
+        Разбираю аргументы, запускаю бенчмарк и сохраняю JSON.
+    Что я принимаю на вход?
+        Ничего (аргументы командной строки).
+    Что я возвращаю?
+        Ничего.
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", nargs="+", default=["default", "static", "compiled"])
+    parser.add_argument("--bucket", choices=list(LENGTH_BUCKETS), default="medium")
+    parser.add_argument("--count", type=int, default=3, help="Сколько статей замерить")
+    parser.add_argument("--tokens", type=int, default=64, help="Новых токенов в длинном прогоне")
+    parser.add_argument("--repeats", type=int, default=2)
+    parser.add_argument("--num-beams", type=int, default=1)
+    parser.add_argument("--model", default="IlyaGusev/rugpt3medium_sum_gazeta")
+    parser.add_argument("--dtype", default="float32")
+    parser.add_argument("--output", help="Куда сохранить JSON с результатами")
+    args = parser.parse_args()
+    if args.tokens < 2:
+        parser.error("--tokens должно быть не меньше 2")
+
+    report: Dict[str, Any] = run(args)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+        print(f"\n💾 Результаты сохранены в {args.output}")
+
+
+if __name__ == "__main__":
+    main()
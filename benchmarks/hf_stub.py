@@ -0,0 +1,93 @@
+"""
+Локальная заглушка Hugging Face router API для бенчмарков lab12.
+
+Отвечает в том же формате, что и настоящий сервис ([{"generated_text": ...}]),
+с искусственной задержкой: постоянная часть плюс время на каждое слово входа.
+Так удаленный бэкенд можно мерить без сети и без токена, а замеры показывают
+накладные расходы клиента (кодирование, HTTP, разбор ответа).
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Tuple
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """
+    Что я делаю?
+        Обрабатываю POST-запросы суммаризации заглушки.
+    Что я принимаю на вход?
+        Ничего - создается HTTP-сервером на каждый запрос.
+    Что я возвращаю?
+        Ничего.
+    """
+
+    base_latency: float = 0.05
+    per_word_latency: float = 0.0005
+
+    def do_POST(self) -> None:
+        """
+        Что я делаю?
+            Читаю запрос, жду заданную задержку и возвращаю первые слова входа как саммари.
+        Что я принимаю на вход?
+            Ничего (тело запроса читается из сокета).
+        Что я возвращаю?
+            Ничего.
+        """
+        length: int = int(self.headers.get("Content-Length", "0"))
+        payload: Dict[str, Any] = json.loads(self.rfile.read(length) or b"{}")
+        words = str(payload.get("inputs", "")).split()
+        max_new_tokens: int = int(payload.get("parameters", {}).get("max_new_tokens", 150))
+
+        time.sleep(self.base_latency + self.per_word_latency * len(words))
+
+        body: bytes = json.dumps(
+            [{"generated_text": " ".join(words[:max(1, max_new_tokens // 2)])}],
+            ensure_ascii=False,
+        ).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """
+        Что я делаю?
+            Отключаю журнал запросов, чтобы он не мешал выводу бенчмарка.
+        Что я принимаю на вход?
+            format (str), args: Параметры журнала.
+        Что я возвращаю?
+            Ничего.
+        """
+
+
+def start_stub(
+    base_latency: float = 0.05,
+    per_word_latency: float = 0.0005,
+    host: str = "127.0.0.1",
+    port: int = 0,
+) -> Tuple[ThreadingHTTPServer, str]:
+    """
+    Что я делаю?
+        Запускаю заглушку в фоновом потоке.
+    Что я принимаю на вход?
+        base_latency (float): Постоянная задержка ответа в секундах.
+        per_word_latency (float): Дополнительная задержка на слово входа.
+        host (str): Адрес.
+        port (int): Порт (0 - любой свободный).
+    Что я возвращаю?
+        tuple: (сервер, URL для HF_ROUTER_URL). Остановка - server.shutdown().
+    """
+    handler = type(
+        "StubHandler",
+        (_StubHandler,),
+        {"base_latency": base_latency, "per_word_latency": per_word_latency},
+    )
+    server: ThreadingHTTPServer = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="hf-stub", daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}/hf-inference"
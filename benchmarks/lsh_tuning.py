@@ -0,0 +1,145 @@
+"""
+Отчет о точности и полноте индекса почти-дубликатов (MinHash LSH).
+
+Строит синтетический корпус: исходные статьи попадают в индекс, а запросами
+служат их перепечатки разной силы правок и новые несвязанные статьи.
+"Истинный" дубликат - документ индекса с точным сходством Жаккара шинглов
+не ниже порога. Для каждой пары (длина подписи, порог) печатает
+точность, полноту и время поиска.
+
+Пример:
+    python -m benchmarks.lsh_tuning --num-perm 64 128 256 --thresholds 0.7 0.8 0.9
+"""
+
+import argparse
+import json
+import random
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from benchmarks import use_lab
+from benchmarks.corpus import make_article, rewrite
+
+
+def build_queries(seed: int, bases: int, rewrites_per_base: int) -> Tuple[List[str], List[str]]:
+    """
+    Что я делаю?
+        Генерирую статьи для индекса и запросы (перепечатки и новые статьи).
+    Что я принимаю на вход?
+        seed (int): Зерно генератора.
+        bases (int): Число исходных статей.
+        rewrites_per_base (int): Перепечаток на статью.
+    Что я возвращаю?
+        tuple: (статьи индекса, запросы)
+    """
+    rng: random.Random = random.Random(seed)
+    articles: List[str] = [make_article(rng, rng.randint(6, 14)) for _ in range(bases)]
+    queries: List[str] = []
+    for article in articles:
+        for _ in range(rewrites_per_base):
+            queries.append(rewrite(rng, article, rng.choice([0.0, 0.05, 0.1, 0.2, 0.3, 0.5])))
+    queries.extend(make_article(rng, rng.randint(6, 14)) for _ in range(bases))
+    return articles, queries
+
+
+def evaluate(
+    articles: List[str],
+    queries: List[str],
+    num_perm: int,
+    threshold: float,
+) -> Dict[str, Any]:
+    """
+    Что я делаю?
+        Считаю точность и полноту индекса для одной конфигурации.
+    Что я принимаю на вход?
+        articles (List[str]): Статьи индекса.
+        queries (List[str]): Запросы.
+        num_perm (int): Длина подписи.
+        threshold (float): Порог сходства.
+    Что я возвращаю?
+        dict: precision, recall, bands, rows, lookup_ms.
+    """
+    from near_duplicates import NearDuplicateIndex, jaccard, shingles
+
+    index = NearDuplicateIndex(threshold=threshold, num_perm=num_perm, max_entries=len(articles))
+    article_shingles: List[Set[str]] = [shingles(article) for article in articles]
+    for number, article in enumerate(articles):
+        index.add(article, "params", str(number))
+
+    true_positive: int = 0
+    false_positive: int = 0
+    relevant: int = 0
+    lookup_seconds: float = 0.0
+    for query in queries:
+        query_shingles: Set[str] = shingles(query)
+        similarities: List[float] = [jaccard(query_shingles, item) for item in article_shingles]
+        is_duplicate: bool = max(similarities) >= threshold
+        relevant += int(is_duplicate)
+
+        started: float = time.perf_counter()
+        found: Optional[str] = index.lookup(query, "params")
+        lookup_seconds += time.perf_counter() - started
+
+        if found is not None:
+            if similarities[int(found)] >= threshold:
+                true_positive += 1
+            else:
+                false_positive += 1
+
+    return {
+        "num_perm": num_perm,
+        "threshold": threshold,
+        "bands": index.bands,
+        "rows": index.rows,
+        "precision": true_positive / (true_positive + false_positive) if true_positive + false_positive else 1.0,
+        "recall": true_positive / relevant if relevant else 1.0,
+        "relevant": relevant,
+        "lookup_ms": 1000.0 * lookup_seconds / len(queries),
+    }
+
+
+def main() -> None:
+    """
+    Что я делаю?
+        Прогоняю сетку конфигураций и печатаю отчет точности/полноты.
+    Что я принимаю на вход?
+        Ничего (аргументы командной строки).
+    Что я возвращаю?
+        Ничего.
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--num-perm", type=int, nargs="+", default=[64, 128, 256])
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.7, 0.8, 0.9])
+    parser.add_argument("--bases", type=int, default=200)
+    parser.add_argument("--rewrites", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Куда сохранить JSON с результатами")
+    args = parser.parse_args()
+
+    use_lab("lab12")
+    articles, queries = build_queries(args.seed, args.bases, args.rewrites)
+
+    print("=" * 80)
+    print("📊 НАСТРОЙКА ИНДЕКСА ПОЧТИ-ДУБЛИКАТОВ (MinHash LSH)")
+    print("=" * 80)
+    print(f"Статей в индексе: {len(articles)}, запросов: {len(queries)}\n")
+    print(f"{'num_perm':>8} {'порог':>6} {'b x r':>8} {'точность':>9} {'полнота':>8} {'поиск, мс':>10}")
+
+    results: List[Dict[str, Any]] = []
+    for num_perm in args.num_perm:
+        for threshold in args.thresholds:
+            result: Dict[str, Any] = evaluate(articles, queries, num_perm, threshold)
+            results.append(result)
+            print(
+                f"{num_perm:>8} {threshold:>6.2f} {result['bands']:>3} x {result['rows']:<3} "
+                f"{result['precision']:>9.3f} {result['recall']:>8.3f} {result['lookup_ms']:>10.3f}"
+            )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump({"config": vars(args), "results": results}, file, ensure_ascii=False, indent=2)
+        print(f"\n💾 Результаты сохранены в {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Бенчмарк экстрактивного предсжатия входа перед абстрактивной генерацией (lab1).
+
+Для каждого текста эталонного набора сравнивает генерацию по полному входу
+(с обрезкой на 600 токенах) и по входу, сжатому до заданных бюджетов:
+время генерации, длину входа и качество (ROUGE к эталону и к саммари полного входа).
+
+Пример:
+    python -m benchmarks.precompression --budgets 150 300 --output precompression.json
+"""
+
+import argparse
+import json
+import statistics
+import time
+from typing import Any, Dict, List, Optional
+
+from benchmarks import use_lab
+from benchmarks.reference import load_reference_set, rouge_l, rouge_scores
+
+
+def _timed_summary(engine: Any, text: str, args: argparse.Namespace, budget: Optional[int]) -> Dict[str, Any]:
+    """
+    Что я делаю?
+        Генерирую одно саммари и замеряю время.
+    Что я принимаю на вход?
+        engine: SummarizerEngine.
+        text (str): Исходный текст.
+        args (Namespace): Параметры генерации.
+        budget (int | None): Бюджет предсжатия (None - полный вход).
+    Что я возвращаю?
+        dict: summary и seconds.
+    """
+    started: float = time.perf_counter()
+    summary: str = engine.summarize(
+        text,
+        max_length=args.max_length,
+        min_length=args.min_length,
+        num_beams=args.num_beams,
+        input_token_budget=budget,
+    )
+    return {"summary": summary, "seconds": time.perf_counter() - started}
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Что я делаю?
+        Прогоняю эталонный набор без сжатия и с каждым бюджетом.
+    Что я принимаю на вход?
+        args (Namespace): Аргументы командной строки.
+    Что я возвращаю?
+        dict: Сводка по бюджетам и результаты по каждому тексту.
+    """
+    use_lab("lab1")
+    from engine import SummarizerEngine
+    from extractive import compress_to_budget
+
+    engine = SummarizerEngine(args.model)
+    _, tokenizer = engine.load()
+    items: List[Dict[str, str]] = load_reference_set(args.reference, args.limit)
+
+    def count_tokens(text: str) -> int:
+        return len(tokenizer(text, add_special_tokens=False)["input_ids"])
+
+    # Прогрев, чтобы первая генерация не исказила замеры
+    _timed_summary(engine, items[0]["text"], args, None)
+
+    rows: List[Dict[str, Any]] = []
+    for item in items:
+        full: Dict[str, Any] = _timed_summary(engine, item["text"], args, None)
+        row: Dict[str, Any] = {
+            "input_tokens": count_tokens(item["text"]),
+            "full": {**full, **rouge_scores(full["summary"], item["summary"])},
+            "budgets": {},
+        }
+        for budget in args.budgets:
+            compressed: Dict[str, Any] = _timed_summary(engine, item["text"], args, budget)
+            row["budgets"][str(budget)] = {
+                **compressed,
+                **rouge_scores(compressed["summary"], item["summary"]),
+                "input_tokens": count_tokens(compress_to_budget(item["text"], budget, count_tokens)),
+                "agreement_rougeL": rouge_l(compressed["summary"], full["summary"]),
+            }
+        rows.append(row)
+
+    full_latency: float = statistics.mean(row["full"]["seconds"] for row in rows)
+    summary: Dict[str, Any] = {
+        "full": {
+            "mean_seconds": full_latency,
+            "mean_input_tokens": statistics.mean(min(row["input_tokens"], 600) for row in rows),
+            "rougeL": statistics.mean(row["full"]["rougeL"] for row in rows),
+        }
+    }
+    for budget in args.budgets:
+        results: List[Dict[str, Any]] = [row["budgets"][str(budget)] for row in rows]
+        mean_seconds: float = statistics.mean(result["seconds"] for result in results)
+        summary[str(budget)] = {
+            "mean_seconds": mean_seconds,
+            "latency_saved_pct": 100.0 * (1.0 - mean_seconds / full_latency) if full_latency else 0.0,
+            "mean_input_tokens": statistics.mean(result["input_tokens"] for result in results),
+            "rougeL": statistics.mean(result["rougeL"] for result in results),
+            "agreement_rougeL": statistics.mean(result["agreement_rougeL"] for result in results),
+        }
+
+    return {"config": vars(args), "summary": summary, "items": rows}
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    """
+    Что я делаю?
+        Печатаю таблицу "бюджет - время - экономия - качество".
+    Что я принимаю на вход?
+        report (dict): Результат run().
+    Что я возвращаю?
+        Ничего.
+    """
+    print("=" * 80)
+    print("📊 ПРЕДСЖАТИЕ ВХОДА: ЗАДЕРЖКА И КАЧЕСТВО")
+    print("=" * 80)
+    print(f"{'Бюджет':>8} {'Вход, ток.':>11} {'Время, с':>9} {'Экономия':>9} {'ROUGE-L':>8} {'Согласие':>9}")
+    for name, stats in report["summary"].items():
+        saved: str = f"{stats['latency_saved_pct']:.1f}%" if "latency_saved_pct" in stats else "-"
+        agreement: str = f"{stats['agreement_rougeL']:.3f}" if "agreement_rougeL" in stats else "-"
+        print(
+            f"{name:>8} {stats['mean_input_tokens']:>11.0f} {stats['mean_seconds']:>9.2f} "
+            f"{saved:>9} {stats['rougeL']:>8.3f} {agreement:>9}"
+        )
+
+
+def main() -> None:
+    """
+    Что я делаю?
+        Разбираю аргументы, запускаю бенчмарк и сохраняю JSON.
+    Что я принимаю на вход?
+        Ничего (аргументы командной строки).
+    Что я возвращаю?
+        Ничего.
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reference", help="JSONL с полями text и summary (по умолчанию встроенный набор)")
+    parser.add_argument("--limit", type=int, default=None, help="Сколько текстов взять")
+    parser.add_argument("--budgets", type=int, nargs="+", default=[150, 300, 450])
+    parser.add_argument("--model", default="IlyaGusev/rugpt3medium_sum_gazeta")
+    parser.add_argument("--max-length", type=int, default=150)
+    parser.add_argument("--min-length", type=int, default=50)
+    parser.add_argument("--num-beams", type=int, default=1)
+    parser.add_argument("--output", help="Куда сохранить JSON с результатами")
+    args = parser.parse_args()
+
+    report: Dict[str, Any] = run(args)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+        print(f"\n💾 Результаты сохранены в {args.output}")
+
+
+if __name__ == "__main__":
+    main()
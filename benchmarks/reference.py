@@ -0,0 +1,183 @@
+"""
+Эталонный набор текстов и метрики качества саммари (ROUGE).
+
+Встроенный набор - несколько новостных текстов с эталонными саммари.
+Для полноценной оценки передайте JSONL-файл в формате датасета gazeta:
+по одной записи {"text": ..., "summary": ...} на строку.
+"""
+
+import json
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional
+
+BUILTIN_REFERENCE: List[Dict[str, str]] = [
+    {
+        "text": (
+            "Центральный банк России на заседании в пятницу повысил ключевую ставку "
+            "на два процентных пункта, до шестнадцати процентов годовых. "
+            "Решение совета директоров объясняется ускорением инфляции, которая по итогам "
+            "прошлого месяца превысила прогноз регулятора. "
+            "Аналитики, опрошенные агентствами, в среднем ожидали повышения на один пункт. "
+            "Председатель банка на пресс-конференции заявила, что жесткая политика "
+            "сохранится как минимум до конца года. "
+            "По ее словам, рост кредитования населения остается слишком быстрым. "
+            "Рубль после объявления решения укрепился к доллару и евро. "
+            "Индекс Московской биржи, напротив, снизился на полтора процента. "
+            "Банки уже начали пересматривать ставки по вкладам и ипотеке. "
+            "Следующее заседание совета директоров запланировано на декабрь. "
+            "Экономисты не исключают, что к тому моменту ставка может быть повышена снова."
+        ),
+        "summary": (
+            "Центробанк повысил ключевую ставку на два пункта, до 16%, "
+            "из-за ускорения инфляции и быстрого роста кредитования."
+        ),
+    },
+    {
+        "text": (
+            "В Санкт-Петербурге открылась новая станция метро на Красносельско-Калининской линии. "
+            "Строительство станции заняло почти семь лет и несколько раз откладывалось. "
+            "На церемонии открытия присутствовали губернатор города и руководители метрополитена. "
+            "Станция рассчитана на пассажиропоток до сорока тысяч человек в сутки. "
+            "Ее оформление посвящено истории судостроения и морского флота. "
+            "Жители соседних районов давно ждали открытия, так как автобусы в часы пик переполнены. "
+            "Городские власти обещают до конца следующего года открыть еще две станции. "
+            "Стоимость проезда в метро при этом не изменится. "
+            "Первые пассажиры смогли воспользоваться станцией уже в день открытия."
+        ),
+        "summary": (
+            "В Петербурге после семи лет строительства открылась новая станция метро "
+            "на Красносельско-Калининской линии."
+        ),
+    },
+    {
+        "text": (
+            "Российские ученые разработали новый метод ранней диагностики болезни Альцгеймера "
+            "по анализу крови. "
+            "Исследование провели специалисты нескольких московских институтов совместно "
+            "с клиниками региона. "
+            "Метод основан на поиске в крови особых белков, концентрация которых меняется "
+            "за несколько лет до появления симптомов. "
+            "В испытаниях участвовали более пятисот пациентов разного возраста. "
+            "Точность диагностики, по словам авторов, превысила девяносто процентов. "
+            "Сейчас для постановки диагноза чаще всего используют дорогостоящую томографию. "
+            "Новый анализ может стоить в десятки раз дешевле и проводиться в обычных поликлиниках. "
+            "Разработчики рассчитывают получить регистрационное удостоверение в течение двух лет. "
+            "Результаты работы опубликованы в международном научном журнале."
+        ),
+        "summary": (
+            "Российские ученые создали анализ крови, который с точностью более 90% "
+            "выявляет болезнь Альцгеймера на ранней стадии."
+        ),
+    },
+]
+
+_WORD_RE = re.compile(r"[а-яa-z0-9]+")
+
+
+def load_reference_set(path: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, str]]:
+    """
+    Что я делаю?
+        Загружаю эталонный набор из JSONL или возвращаю встроенный.
+    Что я принимаю на вход?
+        path (str | None): Путь к JSONL с полями text и summary.
+        limit (int | None): Сколько записей взять.
+    Что я возвращаю?
+        List[dict]: Записи {"text": ..., "summary": ...}.
+    """
+    if path is None:
+        items: List[Dict[str, str]] = list(BUILTIN_REFERENCE)
+    else:
+        items = []
+        with open(Path(path), encoding="utf-8") as file:
+            for line in file:
+                if line.strip():
+                    record: Dict[str, str] = json.loads(line)
+                    items.append({"text": record["text"], "summary": record.get("summary", "")})
+    return items[:limit] if limit else items
+
+
+def _words(text: str) -> List[str]:
+    """
+    Что я делаю?
+        Разбиваю текст на нормализованные слова для ROUGE.
+    Что я принимаю на вход?
+        text (str): Текст.
+    Что я возвращаю?
+        List[str]: Слова в нижнем регистре.
+    """
+    return _WORD_RE.findall(text.lower().replace("ё", "е"))
+
+
+def _f1(overlap: int, candidate_total: int, reference_total: int) -> float:
+    """
+    Что я делаю?
+        Считаю F1 по числу совпадений.
+    Что я принимаю на вход?
+        overlap (int): Совпадения; candidate_total, reference_total (int): Размеры.
+    Что я возвращаю?
+        float: F1 от 0 до 1.
+    """
+    if overlap == 0 or candidate_total == 0 or reference_total == 0:
+        return 0.0
+    precision: float = overlap / candidate_total
+    recall: float = overlap / reference_total
+    return 2 * precision * recall / (precision + recall)
+
+
+def rouge_n(candidate: str, reference: str, n: int = 1) -> float:
+    """
+    Что я делаю?
+        Считаю ROUGE-N (F1) по словам.
+    Что я принимаю на вход?
+        candidate (str): Проверяемое саммари.
+        reference (str): Эталон.
+        n (int): Длина n-граммы.
+    Что я возвращаю?
+        float: ROUGE-N F1.
+    """
+    cand_words: List[str] = _words(candidate)
+    ref_words: List[str] = _words(reference)
+    cand: Counter = Counter(tuple(cand_words[i:i + n]) for i in range(len(cand_words) - n + 1))
+    ref: Counter = Counter(tuple(ref_words[i:i + n]) for i in range(len(ref_words) - n + 1))
+    overlap: int = sum((cand & ref).values())
+    return _f1(overlap, sum(cand.values()), sum(ref.values()))
+
+
+def rouge_l(candidate: str, reference: str) -> float:
+    """
+    Что я делаю?
+        Считаю ROUGE-L (F1) по наибольшей общей подпоследовательности слов.
+    Что я принимаю на вход?
+        candidate (str): Проверяемое саммари.
+        reference (str): Эталон.
+    Что я возвращаю?
+        float: ROUGE-L F1.
+    """
+    cand: List[str] = _words(candidate)
+    ref: List[str] = _words(reference)
+    previous: List[int] = [0] * (len(ref) + 1)
+    for cand_word in cand:
+        current: List[int] = [0]
+        for j, ref_word in enumerate(ref):
+            current.append(previous[j] + 1 if cand_word == ref_word else max(previous[j + 1], current[j]))
+        previous = current
+    return _f1(previous[-1], len(cand), len(ref))
+
+
+def rouge_scores(candidate: str, reference: str) -> Dict[str, float]:
+    """
+    Что я делаю?
+        Считаю набор метрик ROUGE-1, ROUGE-2, ROUGE-L.
+    Что я принимаю на вход?
+        candidate (str): Проверяемое саммари.
+        reference (str): Эталон.
+    Что я возвращаю?
+        dict: rouge1, rouge2, rougeL.
+    """
+    return {
+        "rouge1": rouge_n(candidate, reference, 1),
+        "rouge2": rouge_n(candidate, reference, 2),
+        "rougeL": rouge_l(candidate, reference),
+    }
@@ -0,0 +1,425 @@
+"""
+Набор бенчмарков производительности суммаризатора с кривыми масштабирования.
+
+Для каждой конфигурации (бэкенд, число лучей, размер батча, корзина длины
+входа) замеряет перцентили задержки, пропускную способность и пиковый RSS.
+Бэкенды:
+    local      - lab1, локальная модель (SummarizerEngine, батчи через summarize_batch);
+    remote     - lab12, HTTP-клиент router API против локальной заглушки (hf_stub);
+    extractive - экстрактивный режим без модели.
+Каждая конфигурация выполняется в отдельном процессе: так пиковый RSS
+относится только к ней, а модули lab1 и lab12 с одинаковыми именами не смешиваются.
+
+Результат сохраняется в JSON и может сравниваться с сохраненной базой:
+рост задержки или памяти и падение пропускной способности больше допуска
+считаются регрессией (код выхода 1).
+
+Пример:
+    python -m benchmarks.suite --backends local extractive --batch-sizes 1 4 --output bench.json
+    python -m benchmarks.suite --baseline bench_baseline.json --tolerance 0.2
+    python -m benchmarks.suite --save-baseline bench_baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from importlib import metadata
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from benchmarks import REPO_ROOT, use_lab
+from benchmarks.corpus import LENGTH_BUCKETS, make_bucket
+from benchmarks.hf_stub import start_stub
+
+BACKENDS: List[str] = ["local", "remote", "extractive"]
+
+# Сообщения об ошибках обоих бэкендов начинаются с этих значков
+_ERROR_PREFIXES = ("❌", "⏱️", "🌐", "⚠️")
+
+# Метрики, по которым ищутся регрессии: True - чем больше, тем лучше
+_REGRESSION_METRICS: Dict[str, bool] = {
+    "latency_p50_ms": False,
+    "latency_p95_ms": False,
+    "throughput_items_per_s": True,
+    "peak_rss_mb": False,
+}
+
+
+def build_configs(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """
+    Что я делаю?
+        Составляю список конфигураций из аргументов командной строки.
+        Батчи поддерживает только локальный бэкенд, лучи - только модельные.
+    Что я принимаю на вход?
+        args (Namespace): Аргументы командной строки.
+    Что я возвращаю?
+        List[dict]: Конфигурации с уникальным id.
+    """
+    configs: List[Dict[str, Any]] = []
+    for backend in args.backends:
+        beams_list: List[int] = [1] if backend == "extractive" else args.num_beams
+        batch_list: List[int] = args.batch_sizes if backend == "local" else [1]
+        mode_list: List[str] = args.length_modes if backend == "local" else ["fixed"]
+        for num_beams in beams_list:
+            for batch_size in batch_list:
+                for length_mode in mode_list:
+                    # У режима fixed id без суффикса - старые базы остаются сравнимыми
+                    suffix: str = "" if length_mode == "fixed" else f"/{length_mode}"
+                    for bucket in args.buckets:
+                        configs.append({
+                            "id": f"{backend}/beams{num_beams}/batch{batch_size}/{bucket}{suffix}",
+                            "backend": backend,
+                            "num_beams": num_beams,
+                            "batch_size": batch_size,
+                            "length_mode": length_mode,
+                            "bucket": bucket,
+                            "requests": args.requests,
+                            "warmup": args.warmup,
+                            "seed": args.seed,
+                            "max_length": args.max_length,
+                            "min_length": args.min_length,
+                            "model": args.model,
+                            "dtype": args.dtype,
+                        })
+    return configs
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """
+    Что я делаю?
+        Узнаю пиковый объем резидентной памяти текущего процесса.
+    Что я принимаю на вход?
+        Ничего.
+    Что я возвращаю?
+        Optional[float]: Мегабайты (None, если модуль resource недоступен, например на Windows).
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux отдает килобайты, macOS - байты
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+def _make_runner(config: Dict[str, Any]) -> Callable[[List[str]], List[str]]:
+    """
+    Что я делаю?
+        Готовлю функцию, которая суммаризирует один батч текстов выбранным бэкендом.
+    Что я принимаю на вход?
+        config (dict): Конфигурация.
+    Что я возвращаю?
+        Callable: Батч текстов -> список саммари.
+    """
+    max_length: int = config["max_length"]
+    min_length: int = config["min_length"]
+    num_beams: int = config["num_beams"]
+
+    if config["backend"] == "extractive":
+        use_lab("lab1")
+        from extractive import summarize_extractive
+
+        return lambda batch: [summarize_extractive(text, max_length=max_length) for text in batch]
+
+    if config["backend"] == "local":
+        use_lab("lab1")
+        from engine import SummarizerEngine
+
+        engine = SummarizerEngine(config["model"], config["dtype"])
+        engine.load()
+        adaptive: bool = config.get("length_mode") == "adaptive"
+
+        def run_local(batch: List[str]) -> List[str]:
+            if config["batch_size"] == 1:
+                return [engine.summarize(batch[0], max_length, min_length, num_beams, adaptive_length=adaptive)]
+            return engine.summarize_batch(batch, max_length, min_length, num_beams, adaptive_length=adaptive)
+
+        # Движок нужен run_config для статистики адаптивной длины
+        run_local.engine = engine  # type: ignore[attr-defined]
+        return run_local
+
+    use_lab("lab12")
+    from text_summarizer import summarize_text, summarize_text_advanced
+
+    if num_beams == 1:
+        return lambda batch: [summarize_text(batch[0], max_length, min_length)]
+    return lambda batch: [summarize_text_advanced(batch[0], max_length, min_length, num_beams)]
+
+
+def run_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Что я делаю?
+        Выполняю одну конфигурацию в текущем процессе и собираю замеры.
+    Что я принимаю на вход?
+        config (dict): Конфигурация из build_configs.
+    Что я возвращаю?
+        dict: Конфигурация, перцентили задержки, пропускная способность, пиковый RSS.
+    """
+    batch_size: int = config["batch_size"]
+    texts: List[str] = make_bucket(
+        config["bucket"], (config["warmup"] + config["requests"]) * batch_size, config["seed"]
+    )
+    batches: List[List[str]] = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+
+    started: float = time.perf_counter()
+    runner: Callable[[List[str]], List[str]] = _make_runner(config)
+    setup_seconds: float = time.perf_counter() - started
+
+    # Прогрев не учитывается в замерах
+    for batch in batches[:config["warmup"]]:
+        runner(batch)
+    engine: Any = getattr(runner, "engine", None)
+    if engine is not None:
+        engine.length_stats.update(texts=0, stops=0, tokens_saved=0)
+
+    latencies: List[float] = []
+    errors: int = 0
+    wall_started: float = time.perf_counter()
+    for batch in batches[config["warmup"]:]:
+        batch_started: float = time.perf_counter()
+        summaries: List[str] = runner(batch)
+        elapsed: float = time.perf_counter() - batch_started
+        # Каждый элемент батча ждет окончания всего батча
+        latencies.extend([elapsed] * len(batch))
+        errors += sum(1 for summary in summaries if not summary or summary.startswith(_ERROR_PREFIXES))
+    wall_seconds: float = time.perf_counter() - wall_started
+
+    latencies_ms: np.ndarray = np.array(latencies) * 1000.0
+    measured: List[str] = texts[config["warmup"] * batch_size:]
+    return {
+        **config,
+        "items": len(latencies),
+        "errors": errors,
+        "input_words_mean": float(np.mean([len(text.split()) for text in measured])),
+        "setup_seconds": setup_seconds,
+        "latency_mean_ms": float(latencies_ms.mean()),
+        "latency_p50_ms": float(np.percentile(latencies_ms, 50)),
+        "latency_p90_ms": float(np.percentile(latencies_ms, 90)),
+        "latency_p95_ms": float(np.percentile(latencies_ms, 95)),
+        "latency_p99_ms": float(np.percentile(latencies_ms, 99)),
+        "throughput_items_per_s": len(latencies) / wall_seconds if wall_seconds > 0 else 0.0,
+        "peak_rss_mb": _peak_rss_mb(),
+        "tokens_saved_mean": engine.average_tokens_saved() if engine is not None else None,
+    }
+
+
+def spawn_config(config: Dict[str, Any], env: Dict[str, str], timeout: float) -> Dict[str, Any]:
+    """
+    Что я делаю?
+        Запускаю конфигурацию в отдельном процессе и читаю ее результат.
+    Что я принимаю на вход?
+        config (dict): Конфигурация.
+        env (dict): Переменные окружения дочернего процесса.
+        timeout (float): Предел времени на конфигурацию в секундах.
+    Что я возвращаю?
+        dict: Результат run_config или конфигурация с полем error.
+    """
+    try:
+        completed = subprocess.run(
+            [sys.executable, "-m", "benchmarks.suite", "--worker", json.dumps(config)],
+            cwd=REPO_ROOT,
+            env=env,
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+        )
+    except subprocess.TimeoutExpired:
+        return {**config, "error": f"превышено время {timeout:.0f} с"}
+
+    lines: List[str] = completed.stdout.strip().splitlines()
+    if completed.returncode != 0 or not lines:
+        tail: str = "\n".join(completed.stderr.strip().splitlines()[-5:])
+        return {**config, "error": tail or f"код выхода {completed.returncode}"}
+    return json.loads(lines[-1])
+
+
+def compare_with_baseline(
+    results: List[Dict[str, Any]],
+    baseline: List[Dict[str, Any]],
+    tolerance: float,
+) -> List[Dict[str, Any]]:
+    """
+    Что я делаю?
+        Сравниваю результаты с базой и нахожу регрессии больше допуска.
+    Что я принимаю на вход?
+        results (List[dict]): Текущие результаты.
+        baseline (List[dict]): Результаты базы.
+        tolerance (float): Допустимое относительное ухудшение (0.15 - 15%).
+    Что я возвращаю?
+        List[dict]: Регрессии: id, metric, baseline, current, change.
+    """
+    base_by_id: Dict[str, Dict[str, Any]] = {item["id"]: item for item in baseline if "error" not in item}
+    regressions: List[Dict[str, Any]] = []
+    for result in results:
+        base: Optional[Dict[str, Any]] = base_by_id.get(result["id"])
+        if base is None or "error" in result:
+            continue
+        for metric, higher_is_better in _REGRESSION_METRICS.items():
+            old, new = base.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change: float = (new - old) / old
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append({
+                    "id": result["id"],
+                    "metric": metric,
+                    "baseline": old,
+                    "current": new,
+                    "change": change,
+                })
+    return regressions
+
+
+def print_report(results: List[Dict[str, Any]]) -> None:
+    """
+    Что я делаю?
+        Печатаю таблицу результатов по конфигурациям.
+    Что я принимаю на вход?
+        results (List[dict]): Результаты.
+    Что я возвращаю?
+        Ничего.
+    """
+    print(
+        f"\n{'конфигурация':<40} {'слов':>6} {'p50, мс':>9} {'p95, мс':>9} {'p99, мс':>9} "
+        f"{'шт/с':>8} {'RSS, МБ':>8} {'ошибок':>6} {'экон. ток.':>10}"
+    )
+    for result in results:
+        if "error" in result:
+            print(f"{result['id']:<40} ❌ {result['error'].splitlines()[-1]}")
+            continue
+        rss: str = f"{result['peak_rss_mb']:.0f}" if result["peak_rss_mb"] is not None else "-"
+        # Средняя экономия токенов на текст имеет смысл только в адаптивном режиме
+        saved: str = f"{result['tokens_saved_mean']:.1f}" if result.get("length_mode") == "adaptive" else "-"
+        print(
+            f"{result['id']:<40} {result['input_words_mean']:>6.0f} {result['latency_p50_ms']:>9.1f} "
+            f"{result['latency_p95_ms']:>9.1f} {result['latency_p99_ms']:>9.1f} "
+            f"{result['throughput_items_per_s']:>8.2f} {rss:>8} {result['errors']:>6} {saved:>10}"
+        )
+
+
+def _environment() -> Dict[str, Any]:
+    """
+    Что я делаю?
+        Описываю окружение запуска, чтобы результаты можно было сопоставлять.
+    Что я принимаю на вход?
+        Ничего.
+    Что я возвращаю?
+        dict: Версии Python и библиотек, платформа, число ядер.
+    """
+    versions: Dict[str, Optional[str]] = {}
+    for package in ("torch", "transformers", "numpy", "requests"):
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "packages": versions,
+    }
+
+
+def main() -> None:
+    """
+    Что я делаю?
+        Прогоняю все конфигурации, печатаю отчет, сохраняю JSON и сравниваю с базой.
+    Что я принимаю на вход?
+        Ничего (аргументы командной строки).
+    Что я возвращаю?
+        Ничего (код выхода 1 при найденных регрессиях).
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=BACKENDS)
+    parser.add_argument("--buckets", nargs="+", choices=list(LENGTH_BUCKETS), default=["short", "medium", "long"])
+    parser.add_argument("--num-beams", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4])
+    parser.add_argument(
+        "--length-modes", nargs="+", choices=["fixed", "adaptive"], default=["fixed"],
+        help="Режим длины локального бэкенда: до max_length или до границы предложения",
+    )
+    parser.add_argument("--requests", type=int, default=8, help="Замеряемых батчей на конфигурацию")
+    parser.add_argument("--warmup", type=int, default=1, help="Батчей прогрева на конфигурацию")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--max-length", type=int, default=100)
+    parser.add_argument("--min-length", type=int, default=30)
+    parser.add_argument("--model", default="IlyaGusev/rugpt3medium_sum_gazeta")
+    parser.add_argument("--dtype", default="float32")
+    parser.add_argument("--stub-latency", type=float, default=0.05, help="Задержка заглушки, с")
+    parser.add_argument("--stub-per-word", type=float, default=0.0005, help="Задержка заглушки на слово, с")
+    parser.add_argument("--timeout", type=float, default=1800.0, help="Предел времени на конфигурацию, с")
+    parser.add_argument("--output", help="Куда сохранить JSON с результатами")
+    parser.add_argument("--baseline", help="JSON базы для поиска регрессий")
+    parser.add_argument("--save-baseline", help="Сохранить результаты как новую базу")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Допустимое ухудшение (доля)")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_config(json.loads(args.worker)), ensure_ascii=False))
+        return
+
+    configs: List[Dict[str, Any]] = build_configs(args)
+    env: Dict[str, str] = {
+        **os.environ,
+        # Замеряем сам бэкенд: без кеша перепечаток и без подмены ответа экстрактивным
+        "SUMMARIZER_DEDUP_THRESHOLD": "0",
+        "SUMMARIZER_EXTRACTIVE_FALLBACK": "0",
+    }
+    env.pop("SUMMARIZER_METRICS_PORT", None)
+
+    stub = None
+    if "remote" in args.backends:
+        stub, stub_url = start_stub(args.stub_latency, args.stub_per_word)
+        env["HF_ROUTER_URL"] = stub_url
+        env["HUGGINGFACE_API_TOKEN"] = "benchmark-stub"
+
+    print("=" * 80)
+    print("📊 БЕНЧМАРК ПРОИЗВОДИТЕЛЬНОСТИ СУММАРИЗАТОРА")
+    print("=" * 80)
+    print(f"Конфигураций: {len(configs)}, батчей на конфигурацию: {args.requests} (+{args.warmup} прогрев)")
+
+    results: List[Dict[str, Any]] = []
+    try:
+        for number, config in enumerate(configs, 1):
+            print(f"⏳ [{number}/{len(configs)}] {config['id']}...", flush=True)
+            results.append(spawn_config(config, env, args.timeout))
+    finally:
+        if stub is not None:
+            stub.shutdown()
+
+    print_report(results)
+    report: Dict[str, Any] = {
+        "config": {key: value for key, value in vars(args).items() if key != "worker"},
+        "environment": _environment(),
+        "results": results,
+    }
+
+    for path in filter(None, [args.output, args.save_baseline]):
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+        print(f"\n💾 Результаты сохранены в {path}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline: List[Dict[str, Any]] = json.load(file)["results"]
+        regressions: List[Dict[str, Any]] = compare_with_baseline(results, baseline, args.tolerance)
+        print(f"\n🔍 Сравнение с базой {args.baseline} (допуск {args.tolerance:.0%}):")
+        if not regressions:
+            print("✅ Регрессий не найдено")
+            return
+        for item in regressions:
+            print(
+                f"❌ {item['id']}: {item['metric']} {item['baseline']:.2f} -> "
+                f"{item['current']:.2f} ({item['change']:+.0%})"
+            )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,346 @@
+"""
+Модуль автонастройки потоков torch и размера батча под текущую машину.
+
+Скорость генерации на CPU сильно зависит от torch.set_num_threads,
+числа inter-op потоков и размера батча. Команда autotune прогоняет
+короткий замер на фиксированной нагрузке для каждой комбинации (каждая
+пара потоков - в отдельном процессе, потому что inter-op потоки можно
+задать только до первой параллельной работы torch) и сохраняет лучшую
+конфигурацию в профиль. Движок применяет профиль при импорте, если он
+снят на этой же машине; переменные OMP_NUM_THREADS/MKL_NUM_THREADS
+и SUMMARIZER_AUTOTUNE=0 его отключают. Профиль читается из
+SUMMARIZER_TUNING_PROFILE (по умолчанию tuning.json в каталоге кеша).
+
+Пример:
+    python autotune.py
+    python autotune.py --threads 2 4 8 --batch-sizes 1 4 8 --tokens 24
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import torch
+
+from cost_model import CACHE_DIR
+
+PROFILE_PATH: Path = Path(os.getenv("SUMMARIZER_TUNING_PROFILE", str(CACHE_DIR / "tuning.json")))
+AUTOTUNE_ENABLED: bool = os.getenv("SUMMARIZER_AUTOTUNE", "1").strip() not in ("0", "false", "no")
+
+# Фиксированная нагрузка замера: одна и та же статья и ровно TOKENS новых токенов
+WORKLOAD_TEXT: str = (
+    "Правительство утвердило новые правила субсидирования малого бизнеса, которые вступят "
+    "в силу с начала следующего года. По словам министра экономического развития, поддержку "
+    "получат около двухсот тысяч предприятий, а общий объем программы превысит сто миллиардов "
+    "рублей. Эксперты отмечают, что упрощенная процедура подачи заявок должна сократить сроки "
+    "рассмотрения с трех месяцев до трех недель. "
+) * 3
+DEFAULT_TOKENS: int = 32
+DEFAULT_BATCH_SIZES: List[int] = [1, 2, 4, 8]
+DEFAULT_INTEROP: List[int] = [1, 2]
+
+
+def host_signature() -> Dict[str, Any]:
+    """
+    Что я делаю?
+        Описываю машину и версию torch, для которых снят профиль.
+    Что я принимаю на вход?
+        Ничего.
+    Что я возвращаю?
+        dict: host, machine, cpus, torch.
+    """
+    return {
+        "host": platform.node(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count() or 1,
+        "torch": torch.__version__,
+    }
+
+
+def thread_candidates(cpus: Optional[int] = None) -> List[int]:
+    """
+    Что я делаю?
+        Составляю варианты числа потоков: степени двойки, половина ядер и все ядра.
+    Что я принимаю на вход?
+        cpus (int | None): Число логических ядер (None - текущей машины).
+    Что я возвращаю?
+        List[int]: Возрастающий список без повторов.
+    """
+    cpus = cpus or os.cpu_count() or 1
+    candidates = {cpus, max(1, cpus // 2)}
+    power: int = 1
+    while power < cpus:
+        candidates.add(power)
+        power *= 2
+    return sorted(candidates)
+
+
+def measure(
+    engine: Any,
+    batch_sizes: List[int],
+    tokens: int = DEFAULT_TOKENS,
+    repeats: int = 2,
+    text_input: str = WORKLOAD_TEXT,
+) -> Dict[int, float]:
+    """
+    Что я делаю?
+        Замеряю пропускную способность движка для каждого размера батча
+        (после одного прогревочного прогона).
+    Что я принимаю на вход?
+        engine (SummarizerEngine): Движок.
+        batch_sizes (List[int]): Размеры батча.
+        tokens (int): Ровно столько новых токенов генерируется на текст.
+        repeats (int): Повторов каждого размера.
+        text_input (str): Текст нагрузки.
+    Что я возвращаю?
+        Dict[int, float]: Размер батча -> текстов в секунду.
+    """
+    engine.summarize_batch([text_input], tokens, tokens)
+    throughput: Dict[int, float] = {}
+    for batch_size in batch_sizes:
+        started: float = time.perf_counter()
+        for _ in range(repeats):
+            engine.summarize_batch([text_input] * batch_size, tokens, tokens)
+        throughput[batch_size] = batch_size * repeats / (time.perf_counter() - started)
+    return throughput
+
+
+def choose_best(results: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Что я делаю?
+        Выбираю конфигурацию с наибольшей пропускной способностью; при почти
+        равной (в пределах 3%) - с меньшим числом потоков и батчем.
+    Что я принимаю на вход?
+        results (List[dict]): Замеры с ключами num_threads, interop_threads,
+            batch_size, texts_per_second.
+    Что я возвращаю?
+        Optional[dict]: Лучшая конфигурация или None, если замеров нет.
+    """
+    if not results:
+        return None
+    top: float = max(result["texts_per_second"] for result in results)
+    close = [result for result in results if result["texts_per_second"] >= top * 0.97]
+    return min(close, key=lambda result: (result["num_threads"], result["batch_size"], result["interop_threads"]))
+
+
+def save_profile(best: Dict[str, Any], results: List[Dict[str, Any]], path: Path = PROFILE_PATH) -> Path:
+    """
+    Что я делаю?
+        Сохраняю лучшую конфигурацию и все замеры в профиль машины.
+    Что я принимаю на вход?
+        best (dict): Лучшая конфигурация.
+        results (List[dict]): Все замеры.
+        path (Path): Файл профиля.
+    Что я возвращаю?
+        Path: Путь к сохраненному профилю.
+    """
+    profile: Dict[str, Any] = {
+        **host_signature(),
+        "num_threads": best["num_threads"],
+        "interop_threads": best["interop_threads"],
+        "batch_size": best["batch_size"],
+        "texts_per_second": best["texts_per_second"],
+        "results": results,
+    }
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(profile, indent=2, ensure_ascii=False), encoding="utf-8")
+    return path
+
+
+def load_profile(path: Path = PROFILE_PATH) -> Optional[Dict[str, Any]]:
+    """
+    Что я делаю?
+        Читаю профиль, если он снят на этой машине с этой версией torch.
+    Что я принимаю на вход?
+        path (Path): Файл профиля.
+    Что я возвращаю?
+        Optional[dict]: Профиль или None (нет файла или он от другой машины).
+    """
+    try:
+        profile: Dict[str, Any] = json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if any(profile.get(key) != value for key, value in host_signature().items()):
+        return None
+    return profile
+
+
+def apply_profile(profile: Dict[str, Any]) -> bool:
+    """
+    Что я делаю?
+        Применяю число потоков из профиля (inter-op потоки - только если torch
+        еще не начинал параллельную работу).
+    Что я принимаю на вход?
+        profile (dict): Профиль с num_threads и interop_threads.
+    Что я возвращаю?
+        bool: True если удалось задать и inter-op потоки.
+    """
+    torch.set_num_threads(int(profile["num_threads"]))
+    try:
+        if torch.get_num_interop_threads() != int(profile["interop_threads"]):
+            torch.set_num_interop_threads(int(profile["interop_threads"]))
+    except RuntimeError:
+        return False
+    return True
+
+
+def apply_saved_profile(path: Path = PROFILE_PATH) -> Optional[Dict[str, Any]]:
+    """
+    Что я делаю?
+        Загружаю и применяю профиль при старте, если автонастройка не отключена
+        и потоки не заданы явно переменными окружения.
+    Что я принимаю на вход?
+        path (Path): Файл профиля.
+    Что я возвращаю?
+        Optional[dict]: Примененный профиль или None.
+    """
+    if not AUTOTUNE_ENABLED or os.getenv("OMP_NUM_THREADS") or os.getenv("MKL_NUM_THREADS"):
+        return None
+    profile: Optional[Dict[str, Any]] = load_profile(path)
+    if profile is not None:
+        apply_profile(profile)
+    return profile
+
+
+def tuned_batch_size(default: int) -> int:
+    """
+    Что я делаю?
+        Возвращаю размер батча из профиля машины.
+    Что я принимаю на вход?
+        default (int): Значение, если профиля нет.
+    Что я возвращаю?
+        int: Размер батча.
+    """
+    profile: Optional[Dict[str, Any]] = load_profile() if AUTOTUNE_ENABLED else None
+    return int(profile["batch_size"]) if profile else default
+
+
+def _run_worker(args: argparse.Namespace) -> None:
+    """
+    Что я делаю?
+        В отдельном процессе задаю потоки, замеряю все размеры батча и печатаю JSON.
+    Что я принимаю на вход?
+        args (argparse.Namespace): Аргументы командной строки.
+    Что я возвращаю?
+        Ничего.
+    """
+    torch.set_num_interop_threads(args.worker_interop)
+    torch.set_num_threads(args.worker_threads)
+    from engine import SummarizerEngine
+
+    engine = SummarizerEngine(args.model, args.dtype, device="cpu")
+    engine.load()
+    throughput: Dict[int, float] = measure(engine, args.batch_sizes, args.tokens, args.repeats)
+    print(json.dumps({str(size): value for size, value in throughput.items()}))
+
+
+def autotune(
+    model_name: str,
+    dtype: str = "float32",
+    threads: Optional[List[int]] = None,
+    interop: Optional[List[int]] = None,
+    batch_sizes: Optional[List[int]] = None,
+    tokens: int = DEFAULT_TOKENS,
+    repeats: int = 2,
+) -> List[Dict[str, Any]]:
+    """
+    Что я делаю?
+        Прогоняю замеры для всех сочетаний потоков (каждое - в своем процессе).
+    Что я принимаю на вход?
+        model_name (str), dtype (str): Модель и тип весов.
+        threads, interop, batch_sizes (List[int] | None): Варианты; None - по умолчанию.
+        tokens (int): Новых токенов на текст.
+        repeats (int): Повторов каждого размера батча.
+    Что я возвращаю?
+        List[dict]: Замеры (num_threads, interop_threads, batch_size, texts_per_second).
+    """
+    batch_sizes = batch_sizes or DEFAULT_BATCH_SIZES
+    results: List[Dict[str, Any]] = []
+    for num_threads in threads or thread_candidates():
+        for interop_threads in interop or DEFAULT_INTEROP:
+            command: List[str] = [
+                sys.executable, str(Path(__file__).resolve()), "--model", model_name, "--dtype", dtype,
+                "--tokens", str(tokens), "--repeats", str(repeats),
+                "--batch-sizes", *map(str, batch_sizes),
+                "--worker-threads", str(num_threads), "--worker-interop", str(interop_threads),
+            ]
+            # Заданные в окружении потоки перекрыли бы настройки замера
+            env: Dict[str, str] = {
+                key: value for key, value in os.environ.items() if key not in ("OMP_NUM_THREADS", "MKL_NUM_THREADS")
+            }
+            env["SUMMARIZER_AUTOTUNE"] = "0"
+            completed = subprocess.run(command, capture_output=True, text=True, env=env)
+            if completed.returncode != 0:
+                print(f"⚠️ {num_threads}/{interop_threads} потоков: замер не удался\n{completed.stderr[-500:]}")
+                continue
+            throughput: Dict[str, float] = json.loads(completed.stdout.strip().splitlines()[-1])
+            for batch_size, texts_per_second in throughput.items():
+                results.append({
+                    "num_threads": num_threads,
+                    "interop_threads": interop_threads,
+                    "batch_size": int(batch_size),
+                    "texts_per_second": texts_per_second,
+                })
+                print(f"   потоков {num_threads:>3}, inter-op {interop_threads}, батч {batch_size:>2}: "
+                      f"{texts_per_second:.2f} текст/с")
+    return results
+
+
+def main() -> None:
+    """
+    Что я делаю?
+        Запускаю автонастройку из командной строки и сохраняю профиль.
+    Что я принимаю на вход?
+        Ничего (аргументы командной строки).
+    Что я возвращаю?
+        Ничего.
+    """
+    from model_store import DEFAULT_MODEL_NAME
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=DEFAULT_MODEL_NAME)
+    parser.add_argument("--dtype", default="float32")
+    parser.add_argument("--threads", type=int, nargs="+", help="Варианты числа потоков")
+    parser.add_argument("--interop", type=int, nargs="+", help="Варианты числа inter-op потоков")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=DEFAULT_BATCH_SIZES)
+    parser.add_argument("--tokens", type=int, default=DEFAULT_TOKENS)
+    parser.add_argument("--repeats", type=int, default=2)
+    parser.add_argument(
+        "--profile", type=Path, default=PROFILE_PATH,
+        help="Куда сохранить профиль (движок читает его из SUMMARIZER_TUNING_PROFILE)",
+    )
+    parser.add_argument("--worker-threads", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--worker-interop", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker_threads:
+        _run_worker(args)
+        return
+
+    print(f"⏳ Автонастройка на {os.cpu_count()} ядрах ({args.model}, {args.dtype})...")
+    results: List[Dict[str, Any]] = autotune(
+        args.model, args.dtype, args.threads, args.interop, args.batch_sizes, args.tokens, args.repeats
+    )
+    best: Optional[Dict[str, Any]] = choose_best(results)
+    if best is None:
+        print("❌ Ни один замер не удался, профиль не сохранен")
+        return
+    path: Path = save_profile(best, results, args.profile)
+    print(f"✅ Лучшее: потоков {best['num_threads']}, inter-op {best['interop_threads']}, "
+          f"батч {best['batch_size']} - {best['texts_per_second']:.2f} текст/с")
+    print(f"💾 Профиль сохранен в {path}")
+    if path.resolve() != PROFILE_PATH.resolve():
+        # Движок читает профиль только по пути из окружения
+        print(f"⚠️ Движок читает профиль из {PROFILE_PATH}; чтобы применить этот, задайте "
+              f"SUMMARIZER_TUNING_PROFILE={path}")
+
+
+if __name__ == "__main__":
+    main()
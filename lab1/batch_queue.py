@@ -0,0 +1,340 @@
+"""
+Модуль очереди пакетной суммаризации файлов.
+
+Берет список текстовых файлов (или папок), суммаризирует их порциями
+в фоновом потоке и дописывает каждый результат строкой JSONL в один файл
+сразу по готовности - результаты не копятся в памяти. Очередь можно
+приостановить и продолжить; прогресс и пропускная способность доступны
+в любой момент (для GUI через обратный вызов on_update).
+"""
+
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# Какие файлы берутся из папок
+TEXT_EXTENSIONS = (".txt", ".md")
+
+# Статусы элемента очереди
+PENDING: str = "pending"
+RUNNING: str = "running"
+DONE: str = "done"
+ERROR: str = "error"
+
+_ERROR_PREFIXES = ("❌", "⚠️", "⏱️", "🌐")
+
+
+def collect_files(paths: Iterable[str]) -> List[str]:
+    """
+    Что я делаю?
+        Разворачиваю папки в списки текстовых файлов (рекурсивно, по алфавиту).
+    Что я принимаю на вход?
+        paths (Iterable[str]): Пути к файлам и папкам.
+    Что я возвращаю?
+        List[str]: Пути к файлам без повторов.
+    """
+    files: List[str] = []
+    for raw in paths:
+        path: Path = Path(raw)
+        if path.is_dir():
+            files.extend(
+                str(child) for child in sorted(path.rglob("*"))
+                if child.is_file() and child.suffix.lower() in TEXT_EXTENSIONS
+            )
+        elif path.is_file():
+            files.append(str(path))
+    return list(dict.fromkeys(files))
+
+
+class BatchItem:
+    """
+    Что я делаю?
+        Храню состояние одного файла в очереди (без текста и саммари).
+    Что я принимаю на вход?
+        path (str): Путь к файлу.
+    Что я возвращаю?
+        Ничего - объект элемента очереди.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        self.status: str = PENDING
+        self.error: Optional[str] = None
+        self.seconds: float = 0.0
+
+
+class BatchQueue:
+    """
+    Что я делаю?
+        Суммаризирую файлы порциями в фоновом потоке с паузой и экспортом в JSONL.
+    Что я принимаю на вход?
+        summarize_many (Callable): Список текстов -> список саммари (пакетный путь движка).
+        output_path (str): Файл JSONL, куда дописываются результаты.
+        chunk_size (int): Сколько файлов отдавать в summarize_many за раз.
+        on_update (Callable | None): Вызывается из фонового потока с номером
+            изменившегося элемента (-1 - очередь завершена).
+    Что я возвращаю?
+        Ничего - объект очереди.
+    """
+
+    def __init__(
+        self,
+        summarize_many: Callable[[List[str]], List[str]],
+        output_path: str,
+        chunk_size: int = 4,
+        on_update: Optional[Callable[[int], None]] = None,
+    ) -> None:
+        self.summarize_many: Callable[[List[str]], List[str]] = summarize_many
+        self.output_path: str = output_path
+        self.chunk_size: int = max(1, chunk_size)
+        self.on_update: Optional[Callable[[int], None]] = on_update
+        self.items: List[BatchItem] = []
+        self._lock: threading.Lock = threading.Lock()
+        self._resumed: threading.Event = threading.Event()
+        self._resumed.set()
+        self._stopping: bool = False
+        self._thread: Optional[threading.Thread] = None
+        # Время работы без учета пауз - для пропускной способности
+        self._active_seconds: float = 0.0
+        self._active_since: Optional[float] = None
+
+    def add_files(self, paths: Iterable[str]) -> int:
+        """
+        Что я делаю?
+            Добавляю файлы (и содержимое папок) в очередь, в том числе во время работы.
+        Что я принимаю на вход?
+            paths (Iterable[str]): Пути к файлам и папкам.
+        Что я возвращаю?
+            int: Сколько файлов добавлено.
+        """
+        with self._lock:
+            known = {item.path for item in self.items}
+            new_items: List[BatchItem] = [BatchItem(path) for path in collect_files(paths) if path not in known]
+            self.items.extend(new_items)
+        return len(new_items)
+
+    @property
+    def running(self) -> bool:
+        """
+        Что я делаю?
+            Сообщаю, работает ли фоновый поток.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            bool: True если очередь обрабатывается.
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def paused(self) -> bool:
+        """
+        Что я делаю?
+            Сообщаю, стоит ли очередь на паузе.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            bool: True если на паузе.
+        """
+        return not self._resumed.is_set()
+
+    def start(self) -> None:
+        """
+        Что я делаю?
+            Запускаю обработку оставшихся файлов в фоновом потоке.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            Ничего.
+        """
+        if self.running:
+            return
+        self._stopping = False
+        self._resumed.set()
+        self._thread = threading.Thread(target=self._run, name="batch-queue", daemon=True)
+        self._thread.start()
+
+    def pause(self) -> None:
+        """
+        Что я делаю?
+            Приостанавливаю очередь после текущей порции.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            Ничего.
+        """
+        self._resumed.clear()
+
+    def resume(self) -> None:
+        """
+        Что я делаю?
+            Продолжаю очередь после паузы.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            Ничего.
+        """
+        self._resumed.set()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Что я делаю?
+            Останавливаю очередь после текущей порции (необработанные файлы остаются в ней).
+        Что я принимаю на вход?
+            timeout (float | None): Сколько ждать завершения потока.
+        Что я возвращаю?
+            Ничего.
+        """
+        self._stopping = True
+        self._resumed.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Что я делаю?
+            Жду окончания обработки.
+        Что я принимаю на вход?
+            timeout (float | None): Предел ожидания в секундах.
+        Что я возвращаю?
+            bool: True если очередь завершилась.
+        """
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return not self.running
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Что я делаю?
+            Считаю прогресс и пропускную способность очереди.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            dict: total, done, errors, pending, active_seconds, items_per_second.
+        """
+        with self._lock:
+            statuses: List[str] = [item.status for item in self.items]
+            active: float = self._active_seconds
+            if self._active_since is not None:
+                active += time.monotonic() - self._active_since
+        finished: int = statuses.count(DONE) + statuses.count(ERROR)
+        return {
+            "total": len(statuses),
+            "done": statuses.count(DONE),
+            "errors": statuses.count(ERROR),
+            "pending": statuses.count(PENDING) + statuses.count(RUNNING),
+            "active_seconds": active,
+            "items_per_second": finished / active if active > 0 else 0.0,
+        }
+
+    def _notify(self, index: int) -> None:
+        """
+        Что я делаю?
+            Сообщаю подписчику об изменении элемента.
+        Что я принимаю на вход?
+            index (int): Номер элемента (-1 - очередь завершена).
+        Что я возвращаю?
+            Ничего.
+        """
+        if self.on_update is not None:
+            self.on_update(index)
+
+    def _next_chunk(self) -> List[int]:
+        """
+        Что я делаю?
+            Беру следующую порцию ожидающих файлов и помечаю их как выполняемые.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            List[int]: Номера элементов порции (пустой список - файлов не осталось).
+        """
+        with self._lock:
+            chunk: List[int] = [index for index, item in enumerate(self.items) if item.status == PENDING]
+            chunk = chunk[:self.chunk_size]
+            for index in chunk:
+                self.items[index].status = RUNNING
+        return chunk
+
+    def _set_active(self, active: bool) -> None:
+        """
+        Что я делаю?
+            Отмечаю начало или конец активной работы (паузы не считаются).
+        Что я принимаю на вход?
+            active (bool): Начинается ли работа.
+        Что я возвращаю?
+            Ничего.
+        """
+        with self._lock:
+            if active and self._active_since is None:
+                self._active_since = time.monotonic()
+            elif not active and self._active_since is not None:
+                self._active_seconds += time.monotonic() - self._active_since
+                self._active_since = None
+
+    def _process(self, chunk: List[int], output: Any) -> None:
+        """
+        Что я делаю?
+            Суммаризирую одну порцию и дописываю результаты в JSONL.
+        Что я принимаю на вход?
+            chunk (List[int]): Номера элементов.
+            output: Открытый файл результатов.
+        Что я возвращаю?
+            Ничего.
+        """
+        texts: Dict[int, str] = {}
+        for index in chunk:
+            self._notify(index)
+            try:
+                texts[index] = Path(self.items[index].path).read_text(encoding="utf-8", errors="replace")
+            except OSError as error:
+                self.items[index].error = str(error)
+
+        started: float = time.perf_counter()
+        readable: List[int] = list(texts)
+        try:
+            summaries: List[str] = self.summarize_many([texts[index] for index in readable]) if readable else []
+        except Exception as error:
+            summaries = [f"❌ {error}"] * len(readable)
+        seconds: float = (time.perf_counter() - started) / max(1, len(readable))
+        by_index: Dict[int, str] = dict(zip(readable, summaries))
+
+        for index in chunk:
+            item: BatchItem = self.items[index]
+            summary: Optional[str] = by_index.get(index)
+            if item.error is None and (not summary or summary.startswith(_ERROR_PREFIXES)):
+                item.error = summary or "пустой ответ"
+            item.seconds = seconds if index in by_index else 0.0
+            record: Dict[str, Any] = {"file": item.path, "seconds": round(item.seconds, 3)}
+            if item.error is None:
+                record["summary"] = summary
+            else:
+                record["error"] = item.error
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            output.flush()
+            item.status = DONE if item.error is None else ERROR
+            self._notify(index)
+
+    def _run(self) -> None:
+        """
+        Что я делаю?
+            Обрабатываю порции, пока есть файлы и очередь не остановлена.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            Ничего.
+        """
+        Path(self.output_path).parent.mkdir(parents=True, exist_ok=True)
+        with open(self.output_path, "a", encoding="utf-8") as output:
+            while not self._stopping:
+                if not self._resumed.is_set():
+                    self._set_active(False)
+                    self._resumed.wait()
+                    continue
+                chunk: List[int] = self._next_chunk()
+                if not chunk:
+                    break
+                self._set_active(True)
+                self._process(chunk, output)
+        self._set_active(False)
+        self._notify(-1)
@@ -0,0 +1,419 @@
+"""
+Модуль микро-батчинга запросов к движку суммаризации.
+
+Запросы копятся в ограниченной очереди и выполняются батчами через
+SummarizerEngine.summarize_batch: фоновый поток ждет до max_wait_ms, чтобы
+набрать до max_batch_size текстов с одинаковыми параметрами генерации.
+Если очередь полна или ожидаемое ожидание больше дедлайна клиента,
+запрос сразу отклоняется (OverloadedError) вместо долгого ожидания.
+
+У каждого класса приоритета (interactive, bulk) своя очередь; класс
+следующего батча выбирает FairScheduler (см. scheduling.py), а свободные
+места в батче добираются текстами других классов с теми же параметрами.
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from metrics import metrics
+from scheduling import PRIORITIES, FairScheduler, check_priority
+from tracing import Span, tracer
+
+# Параметры генерации, при которых тексты можно объединить в батч
+GenerationParams = Tuple[int, int, int]
+
+
+class OverloadedError(RuntimeError):
+    """
+    Что я делаю?
+        Сообщаю, что запрос отклонен: очередь полна или он не успеет к дедлайну.
+    Что я принимаю на вход?
+        message (str): Описание причины.
+        retry_after (float): Через сколько секунд имеет смысл повторить запрос.
+    Что я возвращаю?
+        Ничего - исключение.
+    """
+
+    def __init__(self, message: str, retry_after: float = 1.0) -> None:
+        super().__init__(message)
+        self.retry_after: float = retry_after
+
+
+class PendingSummary:
+    """
+    Что я делаю?
+        Представляю один текст в очереди: его параметры, дедлайн и будущий результат.
+    Что я принимаю на вход?
+        text (str): Текст статьи.
+        params (GenerationParams): (max_length, min_length, num_beams).
+        deadline (float | None): Момент time.monotonic(), после которого ответ не нужен.
+        on_done (Callable | None): Вызывается из потока батчера по готовности.
+        priority (str): Класс приоритета.
+    Что я возвращаю?
+        Ничего - объект ожидания результата.
+    """
+
+    def __init__(
+        self,
+        text: str,
+        params: GenerationParams,
+        deadline: Optional[float] = None,
+        on_done: Optional[Callable[["PendingSummary"], None]] = None,
+        priority: str = "interactive",
+    ) -> None:
+        self.text: str = text
+        self.priority: str = priority
+        self.params: GenerationParams = params
+        self.deadline: Optional[float] = deadline
+        self.enqueued: float = time.monotonic()
+        self.summary: Optional[str] = None
+        self.error: Optional[BaseException] = None
+        self.latency: float = 0.0
+        # Интервал трассы запроса: батчер добавляет в него ожидание в очереди и батч
+        self.span: Optional[Span] = tracer.current()
+        self._on_done: Optional[Callable[[PendingSummary], None]] = on_done
+        self._done: threading.Event = threading.Event()
+
+    def _resolve(self, summary: Optional[str], error: Optional[BaseException]) -> None:
+        """
+        Что я делаю?
+            Сохраняю результат или ошибку и бужу ожидающих.
+        Что я принимаю на вход?
+            summary (str | None): Саммари.
+            error (BaseException | None): Ошибка.
+        Что я возвращаю?
+            Ничего.
+        """
+        self.summary, self.error = summary, error
+        self.latency = time.monotonic() - self.enqueued
+        self._done.set()
+        if self._on_done is not None:
+            self._on_done(self)
+
+    def done(self) -> bool:
+        """
+        Что я делаю?
+            Сообщаю, готов ли результат.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            bool: True если саммари или ошибка уже есть.
+        """
+        return self._done.is_set()
+
+    def result(self, timeout: Optional[float] = None) -> str:
+        """
+        Что я делаю?
+            Жду результат.
+        Что я принимаю на вход?
+            timeout (float | None): Сколько ждать (None - без ограничения).
+        Что я возвращаю?
+            str: Саммари.
+
+        Raises:
+            TimeoutError: Если результат не готов за timeout или истек дедлайн.
+            Exception: Ошибка генерации.
+        """
+        if not self._done.wait(timeout):
+            raise TimeoutError("Саммари не готово за отведенное время")
+        if self.error is not None:
+            raise self.error
+        return self.summary or ""
+
+
+class MicroBatcher:
+    """
+    Что я делаю?
+        Собираю запросы в батчи и выполняю их на движке в фоновом потоке.
+    Что я принимаю на вход?
+        engine: Движок с методом summarize_batch (SummarizerEngine).
+        max_batch_size (int): Максимум текстов в батче.
+        max_wait_ms (float): Сколько ждать наполнения батча после первого запроса.
+        max_queue (int): Предельная длина очереди каждого класса приоритета (сверх нее - отказ).
+        scheduler (FairScheduler | None): Планировщик классов приоритета.
+        adaptive_length (bool): Останавливать генерацию на границе предложения.
+    Что я возвращаю?
+        Ничего - объект батчера.
+    """
+
+    def __init__(
+        self,
+        engine: Any,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 10.0,
+        max_queue: int = 64,
+        scheduler: Optional[FairScheduler] = None,
+        adaptive_length: bool = False,
+    ) -> None:
+        self.engine: Any = engine
+        self.adaptive_length: bool = adaptive_length
+        self.max_batch_size: int = max_batch_size
+        self.max_wait: float = max_wait_ms / 1000.0
+        self.max_queue: int = max_queue
+        # Сглаженная длительность батча - основа оценки ожидания
+        self.batch_seconds: Optional[float] = None
+        self._queues: Dict[str, Deque[PendingSummary]] = {priority: deque() for priority in PRIORITIES}
+        self._scheduler: FairScheduler = scheduler or FairScheduler()
+        self._cond: threading.Condition = threading.Condition()
+        self._in_flight: int = 0
+        self._batch_started: float = 0.0
+        self._batch_ids: int = 0
+        self._stopping: bool = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "MicroBatcher":
+        """
+        Что я делаю?
+            Запускаю фоновый поток батчера.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            MicroBatcher: Этот же батчер.
+        """
+        if self._thread is None:
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Что я делаю?
+            Останавливаю поток и отклоняю запросы, оставшиеся в очереди.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            Ничего.
+        """
+        with self._cond:
+            self._stopping = True
+            pending: List[PendingSummary] = [item for queue in self._queues.values() for item in queue]
+            for queue in self._queues.values():
+                queue.clear()
+            self._cond.notify_all()
+        for item in pending:
+            item._resolve(None, OverloadedError("Сервис останавливается"))
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+            self._thread = None
+
+    @property
+    def queue_depth(self) -> int:
+        """
+        Что я делаю?
+            Сообщаю число текстов в очереди.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            int: Длина очереди (все классы приоритета).
+        """
+        return sum(len(queue) for queue in self._queues.values())
+
+    def expected_wait(self, count: int = 1, priority: str = "interactive") -> float:
+        """
+        Что я делаю?
+            Оцениваю, через сколько секунд будут готовы count новых текстов:
+            очередь впереди плюс остаток текущего батча, в батчах по max_batch_size.
+            Для interactive впереди только своя очередь - bulk она обгоняет.
+        Что я принимаю на вход?
+            count (int): Сколько текстов ставится в очередь.
+            priority (str): Класс приоритета.
+        Что я возвращаю?
+            float: Оценка в секундах (0, пока нет ни одного замера).
+        """
+        if self.batch_seconds is None:
+            return 0.0
+        ahead: int = len(self._queues["interactive"]) if priority == "interactive" else self.queue_depth
+        batches: int = math.ceil((ahead + count) / self.max_batch_size)
+        remaining: float = 0.0
+        if self._in_flight:
+            remaining = max(0.0, self.batch_seconds - (time.monotonic() - self._batch_started))
+        return self.max_wait + remaining + batches * self.batch_seconds
+
+    def submit(
+        self,
+        texts: List[str],
+        max_length: int,
+        min_length: int,
+        num_beams: int = 1,
+        deadline: Optional[float] = None,
+        on_done: Optional[Callable[[PendingSummary], None]] = None,
+        priority: str = "interactive",
+    ) -> List[PendingSummary]:
+        """
+        Что я делаю?
+            Ставлю тексты в очередь целиком или отклоняю их все сразу.
+        Что я принимаю на вход?
+            texts (List[str]): Тексты статей.
+            max_length (int): Максимальное число новых токенов.
+            min_length (int): Минимальное число новых токенов.
+            num_beams (int): Число лучей.
+            deadline (float | None): Дедлайн по time.monotonic() (None - без дедлайна).
+            on_done (Callable | None): Вызывается по готовности каждого текста.
+            priority (str): Класс приоритета: interactive или bulk.
+        Что я возвращаю?
+            List[PendingSummary]: Объекты ожидания в порядке текстов.
+
+        Raises:
+            OverloadedError: Очередь полна или ожидание превысит дедлайн.
+            ValueError: Неизвестный класс приоритета.
+        """
+        params: GenerationParams = (max_length, min_length, num_beams)
+        queue: Deque[PendingSummary] = self._queues[check_priority(priority)]
+        with self._cond:
+            if self._stopping:
+                raise OverloadedError("Сервис останавливается")
+            if len(queue) + len(texts) > self.max_queue:
+                metrics.inc("shed_total", reason="queue_full", priority=priority)
+                raise OverloadedError(
+                    f"Очередь {priority} заполнена ({len(queue)}/{self.max_queue})",
+                    retry_after=self.expected_wait(0, priority) or 1.0,
+                )
+            expected: float = self.expected_wait(len(texts), priority)
+            if deadline is not None and time.monotonic() + expected > deadline:
+                metrics.inc("shed_total", reason="deadline", priority=priority)
+                raise OverloadedError(
+                    f"Ожидаемое ожидание {expected * 1000.0:.0f} мс превышает дедлайн",
+                    retry_after=expected,
+                )
+
+            if not queue:
+                self._scheduler.activate(priority, [other for other, rest in self._queues.items() if rest])
+            items: List[PendingSummary] = [
+                PendingSummary(text, params, deadline, on_done, priority) for text in texts
+            ]
+            queue.extend(items)
+            metrics.set_gauge("queue_depth", len(queue), priority=priority)
+            self._cond.notify_all()
+        return items
+
+    def _next_batch(self) -> List[PendingSummary]:
+        """
+        Что я делаю?
+            Жду запросы, выбираю класс приоритета через FairScheduler и забираю
+            батч текстов с параметрами старейшего запроса этого класса.
+            Свободные места добираю текстами других классов с теми же параметрами.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            List[PendingSummary]: Батч (пустой при остановке).
+        """
+        with self._cond:
+            while not self.queue_depth and not self._stopping:
+                self._cond.wait()
+            if self._stopping:
+                return []
+
+            # Даем батчу наполниться, но не дольше max_wait после появления первого запроса
+            fill_until: float = time.monotonic() + self.max_wait
+            while self.queue_depth < self.max_batch_size and not self._stopping:
+                remaining: float = fill_until - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            heads: Dict[str, float] = {
+                priority: queue[0].enqueued for priority, queue in self._queues.items() if queue
+            }
+            chosen: str = self._scheduler.pick(heads)
+            params: GenerationParams = self._queues[chosen][0].params
+            batch: List[PendingSummary] = []
+            for priority in (chosen,) + tuple(other for other in PRIORITIES if other != chosen):
+                rest: Deque[PendingSummary] = deque()
+                for item in self._queues[priority]:
+                    if item.params == params and len(batch) < self.max_batch_size:
+                        batch.append(item)
+                    else:
+                        rest.append(item)
+                self._queues[priority] = rest
+                metrics.set_gauge("queue_depth", len(rest), priority=priority)
+
+            for priority in PRIORITIES:
+                served: int = sum(1 for item in batch if item.priority == priority)
+                if served:
+                    self._scheduler.charge(priority, served)
+            self._in_flight = len(batch)
+            self._batch_started = time.monotonic()
+            return batch
+
+    def _execute(self, batch: List[PendingSummary]) -> None:
+        """
+        Что я делаю?
+            Выполняю батч на движке; просроченные тексты отклоняю, не тратя на них генерацию.
+        Что я принимаю на вход?
+            batch (List[PendingSummary]): Батч с одинаковыми параметрами.
+        Что я возвращаю?
+            Ничего.
+        """
+        now: float = time.monotonic()
+        live: List[PendingSummary] = []
+        for item in batch:
+            waited: float = now - item.enqueued
+            metrics.observe("queue_wait_seconds", waited, priority=item.priority)
+            if item.span is not None:
+                item.span.child("queue_wait", seconds=waited)
+            if item.deadline is not None and now >= item.deadline:
+                metrics.inc("shed_total", reason="expired")
+                item._resolve(None, TimeoutError("Дедлайн истек в очереди"))
+            else:
+                live.append(item)
+        if not live:
+            return
+
+        self._batch_ids += 1
+        max_length, min_length, num_beams = live[0].params
+        # Батч с хотя бы одним interactive-запросом идет к движку как interactive
+        priority: str = min((item.priority for item in live), key=PRIORITIES.index)
+        # Движок ждем не дольше самого раннего дедлайна в батче
+        deadlines: List[float] = [item.deadline for item in live if item.deadline is not None]
+        wait_timeout: Optional[float] = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+        started: float = time.perf_counter()
+        try:
+            summaries: List[str] = self.engine.summarize_batch(
+                [item.text for item in live], max_length, min_length, num_beams,
+                wait_timeout=wait_timeout, priority=priority, adaptive_length=self.adaptive_length,
+            )
+        except TimeoutError as error:
+            # Движок так и не освободился до дедлайна - запросы сброшены (сервер ответит 503)
+            metrics.inc("shed_total", len(live), reason="engine_busy")
+            for item in live:
+                item._resolve(None, error)
+            return
+        except Exception as error:
+            metrics.record_error(error)
+            for item in live:
+                item._resolve(None, error)
+            return
+        finally:
+            elapsed: float = time.perf_counter() - started
+            # Экспоненциальное сглаживание: оценка быстро подстраивается под нагрузку
+            self.batch_seconds = elapsed if self.batch_seconds is None else 0.8 * self.batch_seconds + 0.2 * elapsed
+            metrics.inc("batches_total")
+            metrics.inc("batched_items_total", len(live))
+            for item in live:
+                if item.span is not None:
+                    item.span.child("batch", seconds=elapsed, batch_id=self._batch_ids, batch_size=len(live))
+
+        for item, summary in zip(live, summaries):
+            item._resolve(summary, None)
+
+    def _run(self) -> None:
+        """
+        Что я делаю?
+            Цикл фонового потока: беру батч и выполняю его.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            Ничего.
+        """
+        while True:
+            batch: List[PendingSummary] = self._next_batch()
+            if not batch:
+                return
+            try:
+                self._execute(batch)
+            finally:
+                self._in_flight = 0
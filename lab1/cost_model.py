@@ -0,0 +1,211 @@
+"""
+Модуль модели стоимости генерации: оценка времени до запуска модели.
+
+Время генерации приближается линейной моделью
+    seconds = c0 + c1 * input_tokens * beams * batch + c2 * output_tokens * beams * batch,
+где c1 - стоимость обработки входа (prefill), c2 - стоимость шага декодирования.
+Коэффициенты калибруются по реальным генерациям: движок сообщает каждое
+наблюдение, модель периодически переобучается методом наименьших квадратов,
+а калибровку можно сохранить в файл (SUMMARIZER_COST_MODEL).
+"""
+
+import json
+import os
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Куда сохраняется калибровка (общий каталог кеша суммаризатора)
+CACHE_DIR: Path = Path(os.getenv("SUMMARIZER_CACHE_DIR", str(Path.home() / ".cache" / "text_summarizer")))
+COST_MODEL_PATH: Path = Path(os.getenv("SUMMARIZER_COST_MODEL", str(CACHE_DIR / "cost_model.json")))
+
+# Грубые коэффициенты для rugpt3medium на CPU до первой калибровки
+DEFAULT_COEFFICIENTS: Tuple[float, float, float] = (0.05, 0.0004, 0.03)
+
+Observation = Tuple[int, int, int, int, float]
+
+
+def _features(input_tokens: float, output_tokens: float, num_beams: int, batch_size: int) -> List[float]:
+    """
+    Что я делаю?
+        Строю вектор признаков модели стоимости.
+    Что я принимаю на вход?
+        input_tokens (float): Входных токенов на текст.
+        output_tokens (float): Новых токенов на текст.
+        num_beams (int): Число лучей.
+        batch_size (int): Текстов в батче.
+    Что я возвращаю?
+        List[float]: [1, вход * лучи * батч, выход * лучи * батч].
+    """
+    scale: int = num_beams * batch_size
+    return [1.0, input_tokens * scale, output_tokens * scale]
+
+
+class CostModel:
+    """
+    Что я делаю?
+        Оцениваю время генерации и подстраиваю коэффициенты по наблюдениям.
+    Что я принимаю на вход?
+        coefficients (tuple): (c0, c1, c2) в секундах.
+        output_ratio (float): Типичная доля max_length, которую занимает саммари.
+        max_observations (int): Сколько последних наблюдений хранить.
+        refit_every (int): Через сколько новых наблюдений переобучаться.
+    Что я возвращаю?
+        Ничего - объект модели стоимости.
+    """
+
+    def __init__(
+        self,
+        coefficients: Tuple[float, float, float] = DEFAULT_COEFFICIENTS,
+        output_ratio: float = 0.7,
+        max_observations: int = 512,
+        refit_every: int = 16,
+    ) -> None:
+        self.coefficients: Tuple[float, float, float] = tuple(coefficients)  # type: ignore[assignment]
+        self.output_ratio: float = output_ratio
+        self.calibrated: bool = False
+        self.refit_every: int = refit_every
+        self._observations: Deque[Observation] = deque(maxlen=max_observations)
+        self._since_fit: int = 0
+        self._lock: threading.Lock = threading.Lock()
+
+    def predict(self, input_tokens: float, output_tokens: float, num_beams: int = 1, batch_size: int = 1) -> float:
+        """
+        Что я делаю?
+            Оцениваю время генерации.
+        Что я принимаю на вход?
+            input_tokens (float): Входных токенов на текст.
+            output_tokens (float): Новых токенов на текст.
+            num_beams (int): Число лучей.
+            batch_size (int): Текстов в батче.
+        Что я возвращаю?
+            float: Секунды.
+        """
+        features: List[float] = _features(input_tokens, output_tokens, num_beams, batch_size)
+        return float(sum(weight * value for weight, value in zip(self.coefficients, features)))
+
+    def expected_output_tokens(self, max_length: int, min_length: int = 0) -> int:
+        """
+        Что я делаю?
+            Оцениваю типичную длину саммари по наблюдаемой доле от max_length.
+        Что я принимаю на вход?
+            max_length (int): Максимум новых токенов.
+            min_length (int): Минимум новых токенов.
+        Что я возвращаю?
+            int: Ожидаемое число новых токенов.
+        """
+        return int(min(max_length, max(min_length, round(max_length * self.output_ratio))))
+
+    def observe(
+        self,
+        input_tokens: int,
+        output_tokens: int,
+        num_beams: int,
+        seconds: float,
+        batch_size: int = 1,
+        max_length: Optional[int] = None,
+    ) -> None:
+        """
+        Что я делаю?
+            Запоминаю реальную генерацию и время от времени переобучаюсь.
+        Что я принимаю на вход?
+            input_tokens (int): Входных токенов на текст.
+            output_tokens (int): Новых токенов на текст.
+            num_beams (int): Число лучей.
+            seconds (float): Фактическое время генерации.
+            batch_size (int): Текстов в батче.
+            max_length (int | None): Запрошенный максимум (для доли output_ratio).
+        Что я возвращаю?
+            Ничего.
+        """
+        with self._lock:
+            self._observations.append((input_tokens, output_tokens, num_beams, batch_size, seconds))
+            if max_length:
+                self.output_ratio = 0.9 * self.output_ratio + 0.1 * min(1.0, output_tokens / max_length)
+            self._since_fit += 1
+            due: bool = self._since_fit >= self.refit_every
+        if due:
+            self.fit()
+
+    def fit(self, observations: Optional[List[Observation]] = None) -> bool:
+        """
+        Что я делаю?
+            Подбираю коэффициенты методом наименьших квадратов (неотрицательные).
+        Что я принимаю на вход?
+            observations (List | None): Наблюдения; None - накопленные.
+        Что я возвращаю?
+            bool: True если коэффициенты обновлены (данных достаточно и они разнообразны).
+        """
+        with self._lock:
+            data: List[Observation] = list(observations if observations is not None else self._observations)
+            self._since_fit = 0
+        if len(data) < 6:
+            return False
+
+        matrix: np.ndarray = np.array([_features(i, o, beams, batch) for i, o, beams, batch, _ in data])
+        target: np.ndarray = np.array([seconds for *_, seconds in data])
+        if np.linalg.matrix_rank(matrix) < matrix.shape[1]:
+            return False
+        solution, *_ = np.linalg.lstsq(matrix, target, rcond=None)
+        # Отрицательная стоимость токена физически невозможна - это шум измерений
+        solution = np.maximum(solution, 0.0)
+        with self._lock:
+            self.coefficients = (float(solution[0]), float(solution[1]), float(solution[2]))
+            self.calibrated = True
+        return True
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Что я делаю?
+            Описываю модель для сохранения в JSON.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            dict: Коэффициенты, доля выхода, признак калибровки.
+        """
+        return {
+            "coefficients": list(self.coefficients),
+            "output_ratio": self.output_ratio,
+            "calibrated": self.calibrated,
+        }
+
+    def save(self, path: Path = COST_MODEL_PATH) -> Path:
+        """
+        Что я делаю?
+            Сохраняю калибровку в файл.
+        Что я принимаю на вход?
+            path (Path): Путь к JSON.
+        Что я возвращаю?
+            Path: Путь к сохраненному файлу.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
+        return path
+
+    @classmethod
+    def load(cls, path: Path = COST_MODEL_PATH) -> "CostModel":
+        """
+        Что я делаю?
+            Загружаю калибровку из файла (если файла нет - коэффициенты по умолчанию).
+        Что я принимаю на вход?
+            path (Path): Путь к JSON.
+        Что я возвращаю?
+            CostModel: Модель стоимости.
+        """
+        model: CostModel = cls()
+        try:
+            data: Dict[str, Any] = json.loads(Path(path).read_text(encoding="utf-8"))
+            model.coefficients = tuple(float(value) for value in data["coefficients"])  # type: ignore[assignment]
+            model.output_ratio = float(data.get("output_ratio", model.output_ratio))
+            model.calibrated = bool(data.get("calibrated", True))
+        except (OSError, ValueError, KeyError):
+            pass
+        return model
+
+
+# Общая модель стоимости процесса (движок сообщает ей каждую генерацию)
+cost_model: CostModel = CostModel.load()
@@ -0,0 +1,154 @@
+"""
+Модуль выбора стратегии декодирования под бюджет задержки.
+
+Перед генерацией политика оценивает по модели стоимости (cost_model.py),
+сколько запрос прождет в очереди движка и сколько займет сама генерация,
+и выбирает самый качественный план, который укладывается в бюджет:
+    1. запрошенное число лучей и max_length;
+    2. меньше лучей (вдвое за шаг, до жадного поиска);
+    3. жадный поиск с более коротким max_length (до MIN_SUMMARY_TOKENS);
+    4. экстрактивное саммари без модели, если не успевает даже это.
+Так при перегрузке ответ становится проще, а не приходит по таймауту.
+Политика включается явно: бюджетом в вызове или переменной
+SUMMARIZER_LATENCY_BUDGET (по умолчанию 0 - выключено). Оценки верны только
+для откалиброванной модели стоимости (python preflight.py --calibrate);
+упрощенный план печатается в журнал и записывается в трассу запроса.
+"""
+
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from cost_model import CostModel, cost_model
+from metrics import metrics
+from tracing import tracer
+
+# Бюджет задержки запроса по умолчанию в секундах (0 - политика выключена)
+LATENCY_BUDGET: float = float(os.getenv("SUMMARIZER_LATENCY_BUDGET", "0"))
+# Запас на ошибку модели стоимости
+SAFETY_FACTOR: float = float(os.getenv("SUMMARIZER_POLICY_SAFETY", "1.2"))
+# Короче этого саммари не сокращается - дальше только экстрактивный ответ
+MIN_SUMMARY_TOKENS: int = 24
+# Во сколько раз сокращается max_length за шаг
+LENGTH_STEP: float = 0.75
+
+
+def beam_candidates(num_beams: int) -> List[int]:
+    """
+    Что я делаю?
+        Перечисляю допустимые числа лучей от запрошенного до жадного поиска.
+    Что я принимаю на вход?
+        num_beams (int): Запрошенное число лучей.
+    Что я возвращаю?
+        List[int]: Например, [4, 2, 1].
+    """
+    beams: List[int] = [max(1, num_beams)]
+    while beams[-1] > 1:
+        beams.append(beams[-1] // 2)
+    return beams
+
+
+def length_candidates(max_length: int) -> List[int]:
+    """
+    Что я делаю?
+        Перечисляю max_length от запрошенного до MIN_SUMMARY_TOKENS с шагом LENGTH_STEP.
+    Что я принимаю на вход?
+        max_length (int): Запрошенный максимум новых токенов.
+    Что я возвращаю?
+        List[int]: Убывающие длины, первая - запрошенная.
+    """
+    floor: int = min(max_length, MIN_SUMMARY_TOKENS)
+    lengths: List[int] = [max_length]
+    while lengths[-1] > floor:
+        lengths.append(max(floor, int(lengths[-1] * LENGTH_STEP)))
+    return lengths
+
+
+def plan_decoding(
+    input_tokens: int,
+    max_length: int,
+    min_length: int,
+    num_beams: int,
+    budget_seconds: float,
+    queue_depth: int = 0,
+    queue_seconds: Optional[float] = None,
+    model: Optional[CostModel] = None,
+) -> Dict[str, Any]:
+    """
+    Что я делаю?
+        Выбираю число лучей и длину саммари, при которых запрос с учетом
+        очереди укладывается в бюджет.
+    Что я принимаю на вход?
+        input_tokens (int): Входных токенов (после обрезки и предсжатия).
+        max_length (int): Запрошенный максимум новых токенов.
+        min_length (int): Запрошенный минимум новых токенов.
+        num_beams (int): Запрошенное число лучей (верхняя граница).
+        budget_seconds (float): Бюджет задержки всего запроса.
+        queue_depth (int): Генераций впереди (выполняемая и ожидающие).
+        queue_seconds (float | None): Измеренная оценка ожидания (SummarizerEngine.expected_wait);
+            None - каждая генерация впереди считается такой же, как этот запрос.
+        model (CostModel | None): Модель стоимости; None - общая модель процесса.
+    Что я возвращаю?
+        dict:
+            strategy - beam, greedy или extractive;
+            num_beams, max_length, min_length - параметры генерации;
+            queue_seconds, predicted_seconds - оценки ожидания и генерации;
+            degraded - план проще запрошенного;
+            calibrated - оценки получены откалиброванной моделью стоимости.
+    """
+    model = model or cost_model
+
+    def generation_seconds(beams: int, length: int) -> float:
+        output_tokens: int = model.expected_output_tokens(length, min(min_length, length))
+        return model.predict(input_tokens, output_tokens, beams) * SAFETY_FACTOR
+
+    if queue_seconds is None:
+        queue_seconds = queue_depth * generation_seconds(num_beams, max_length)
+    remaining: float = budget_seconds - queue_seconds
+
+    # Сначала жертвую лучами (качество падает мягко), потом длиной саммари
+    candidates: List[Tuple[int, int]] = [(beams, max_length) for beams in beam_candidates(num_beams)]
+    candidates += [(1, length) for length in length_candidates(max_length)[1:]]
+
+    plan: Dict[str, Any] = {
+        "strategy": "extractive",
+        "num_beams": 1,
+        "max_length": max_length,
+        "min_length": min_length,
+        "queue_seconds": queue_seconds,
+        "predicted_seconds": 0.0,
+        "degraded": True,
+        "calibrated": model.calibrated,
+    }
+    for beams, length in candidates:
+        seconds: float = generation_seconds(beams, length)
+        if seconds <= remaining:
+            plan.update(
+                strategy="beam" if beams > 1 else "greedy",
+                num_beams=beams,
+                max_length=length,
+                min_length=min(min_length, length),
+                predicted_seconds=seconds,
+                degraded=(beams, length) != (num_beams, max_length),
+            )
+            break
+
+    metrics.inc("decoding_plans_total", strategy=plan["strategy"], degraded=str(plan["degraded"]).lower())
+    tracer.annotate(
+        decoding_strategy=plan["strategy"],
+        decoding_num_beams=plan["num_beams"],
+        decoding_max_length=plan["max_length"],
+        decoding_degraded=plan["degraded"],
+    )
+    if plan["degraded"]:
+        # Вызывающий код получает только строку - об упрощении сообщаем в журнал
+        if plan["strategy"] == "extractive":
+            print(f"⚙️ Бюджет {budget_seconds:g} с (очередь {queue_seconds:.1f} с) не вмещает генерацию: экстрактивное саммари")
+        else:
+            print(
+                f"⚙️ Бюджет {budget_seconds:g} с: {plan['strategy']}, лучей {num_beams} -> {plan['num_beams']}, "
+                f"max_length {max_length} -> {plan['max_length']} (очередь {queue_seconds:.1f} с, "
+                f"генерация ~{plan['predicted_seconds']:.1f} с)"
+            )
+        if not model.calibrated:
+            print("⚠️ Модель стоимости не откалибрована: оценки по коэффициентам по умолчанию")
+    return plan
@@ -0,0 +1,1060 @@
+"""
+Модуль движка суммаризации: модель, токенизатор и устройство в одном объекте.
+
+Загрузка модели выполняется один раз даже при одновременных обращениях
+из нескольких потоков (single-flight под блокировкой), а генерация на одной
+модели сериализуется, чтобы потоки не мешали друг другу.
+При импорте применяется профиль потоков torch, снятый командой autotune.py.
+
+Режимы декодирования (SUMMARIZER_DECODE_MODE):
+    default  - generate с растущим динамическим KV-кешем;
+    static   - KV-кеш заранее выделен под (батч * лучи, корзина длины)
+               и переиспользуется между запросами без новых аллокаций;
+    compiled - static + шаг декодирования, скомпилированный torch.compile
+               (артефакты inductor кешируются на диске в SUMMARIZER_CACHE_DIR);
+               transformers компилирует только жадный поиск (num_beams=1),
+               лучевой поиск в этом режиме идет со статическим кешем без компиляции.
+Задержку на токен в каждом режиме сравнивает python -m benchmarks.decode_modes.
+
+Ассистированная (спекулятивная) генерация включается на запрос (assisted=True):
+маленькая черновая модель (SUMMARIZER_DRAFT_MODEL) предлагает несколько токенов,
+основная проверяет их одним проходом. Работает только для жадного поиска,
+результат совпадает с обычной генерацией; скорость и долю принятых токенов
+замеряет python -m benchmarks.assisted.
+"""
+
+import copy
+import gc
+import itertools
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import torch
+
+from autotune import apply_saved_profile
+from cost_model import CACHE_DIR, cost_model
+from extractive import compress_to_budget
+from metrics import metrics
+from model_store import DEFAULT_MODEL_NAME, load_pretrained, record_load_timing
+from scheduling import PriorityLock
+from tracing import tracer
+from transformers import CompileConfig, StaticCache, StoppingCriteria, StoppingCriteriaList
+
+# Ограничение длины входа в токенах, чтобы не ломалась память
+MAX_INPUT_TOKENS: int = 600
+
+# Поддерживаемые варианты весов и число байт на параметр
+DTYPE_BYTES: Dict[str, int] = {
+    "float32": 4,
+    "float16": 2,
+    "bfloat16": 2,
+    "int8": 1,
+}
+
+# Профиль автонастройки этой машины (потоки применяются до первой работы torch)
+TUNING_PROFILE: Optional[Dict[str, Any]] = apply_saved_profile()
+
+# Режимы декодирования (см. описание модуля)
+DECODE_MODES: Tuple[str, ...] = ("default", "static", "compiled")
+DECODE_MODE: str = os.getenv("SUMMARIZER_DECODE_MODE", "default").strip() or "default"
+# Длина статического кеша округляется вверх до корзины: меньше аллокаций и перекомпиляций
+STATIC_CACHE_BUCKET: int = 128
+# Черновая модель ассистированной генерации (тот же токенизатор, что у основной)
+DRAFT_MODEL_NAME: str = os.getenv("SUMMARIZER_DRAFT_MODEL", "ai-forever/rugpt3small_based_on_gpt2").strip()
+
+# Номера батчей для трассы запросов
+_batch_ids = itertools.count(1)
+
+# Граница предложения в конце сгенерированного текста: знак конца, закрывающие
+# кавычки, пробел и начало следующего предложения с заглавной буквы или цифры
+# (так "2.5" и "млн. рублей" не считаются концом предложения)
+_SENTENCE_BOUNDARY = re.compile(r'[.!?…]["»)]*\s+["«(]?[A-ZА-ЯЁ0-9]\S*$')
+_SENTENCE_END = re.compile(r'[.!?…]["»)]*')
+# Сколько последних токенов декодировать при проверке границы
+_BOUNDARY_WINDOW: int = 6
+
+
+def _model_size_bytes(model: Any) -> int:
+    """
+    Что я делаю?
+        Считаю объем памяти, занятый параметрами и буферами модели.
+    Что я принимаю на вход?
+        model: Модель torch.
+    Что я возвращаю?
+        int: Размер в байтах.
+    """
+    tensors = list(model.parameters()) + list(model.buffers())
+    return sum(tensor.numel() * tensor.element_size() for tensor in tensors)
+
+
+def _same_vocabulary(tokenizer: Any, draft_tokenizer: Any) -> bool:
+    """
+    Что я делаю?
+        Проверяю, что у основной и черновой модели один словарь: тогда черновые
+        токены проверяются напрямую, без перекодирования текста.
+    Что я принимаю на вход?
+        tokenizer: Токенизатор основной модели.
+        draft_tokenizer: Токенизатор черновой модели.
+    Что я возвращаю?
+        bool: True если словари совпадают.
+    """
+    if tokenizer is draft_tokenizer:
+        return True
+    if type(tokenizer) is not type(draft_tokenizer):
+        return False
+    if not hasattr(tokenizer, "get_vocab"):
+        return True
+    return tokenizer.get_vocab() == draft_tokenizer.get_vocab()
+
+
+def _load_with_dtype(
+    loader: Callable[..., Tuple[Any, Any]],
+    model_name: str,
+    dtype: str,
+) -> Tuple[Any, Any]:
+    """
+    Что я делаю?
+        Загружаю модель в нужном типе данных; int8 - динамическая квантизация на CPU.
+    Что я принимаю на вход?
+        loader (Callable): Функция загрузки (model, tokenizer) по идентификатору.
+        model_name (str): Идентификатор модели.
+        dtype (str): Один из ключей DTYPE_BYTES.
+    Что я возвращаю?
+        tuple: (model, tokenizer)
+    """
+    if dtype == "int8":
+        model, tokenizer = loader(model_name)
+        # Квантизуются только слои nn.Linear; остальное остается во float32
+        model = torch.ao.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+        return model, tokenizer
+    if dtype == "float32":
+        return loader(model_name)
+    return loader(model_name, dtype=getattr(torch, dtype))
+
+
+class GenerationCancelled(RuntimeError):
+    """
+    Что я делаю?
+        Сообщаю, что генерация отменена: ее результат больше не нужен.
+    Что я принимаю на вход?
+        message (str): Описание причины.
+    Что я возвращаю?
+        Ничего - исключение.
+    """
+
+
+class _CancelCriteria(StoppingCriteria):
+    """
+    Что я делаю?
+        Останавливаю генерацию на ближайшем шаге, как только выставлено событие отмены.
+    Что я принимаю на вход?
+        event (threading.Event): Событие отмены.
+    Что я возвращаю?
+        Ничего - критерий остановки для generate.
+    """
+
+    def __init__(self, event: threading.Event) -> None:
+        self.event: threading.Event = event
+
+    def __call__(self, input_ids: torch.LongTensor, scores: Any, **kwargs: Any) -> torch.BoolTensor:
+        return torch.full((input_ids.shape[0],), self.event.is_set(), dtype=torch.bool, device=input_ids.device)
+
+
+class _StepTimer(StoppingCriteria):
+    """
+    Что я делаю?
+        Отмечаю время каждого шага генерации (для трассы запроса); генерацию не останавливаю.
+    Что я принимаю на вход?
+        Ничего.
+    Что я возвращаю?
+        Ничего - критерий остановки для generate.
+    """
+
+    def __init__(self) -> None:
+        self.started: float = time.perf_counter()
+        self.marks: List[float] = []
+
+    def __call__(self, input_ids: torch.LongTensor, scores: Any, **kwargs: Any) -> torch.BoolTensor:
+        self.marks.append(time.perf_counter())
+        return torch.zeros(input_ids.shape[0], dtype=torch.bool, device=input_ids.device)
+
+    def annotate(self) -> None:
+        """
+        Что я делаю?
+            Записываю длительности шагов в текущий интервал трассы.
+            Первый шаг включает обработку всего входа (prefill).
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            Ничего.
+        """
+        bounds: List[float] = [self.started] + self.marks
+        step_ms: List[float] = [round((end - start) * 1000.0, 3) for start, end in zip(bounds, bounds[1:])]
+        tracer.annotate(
+            steps=len(step_ms),
+            first_step_ms=step_ms[0] if step_ms else 0.0,
+            step_ms=step_ms,
+        )
+
+
+class SentenceBoundaryStoppingCriteria(StoppingCriteria):
+    """
+    Что я делаю?
+        Останавливаю генерацию последовательности на первой границе предложения
+        после мягкой целевой длины. Граница видна на шаг позже: по первому токену
+        следующего предложения, который затем отрезается (см. trim_to_sentence).
+    Что я принимаю на вход?
+        tokenizer: Токенизатор модели.
+        prompt_length (int): Длина входа (с паддингом), новые токены идут после нее.
+        target_length (int): Мягкая цель - раньше стольких новых токенов не останавливаюсь.
+    Что я возвращаю?
+        Ничего - критерий остановки для generate.
+    """
+
+    def __init__(self, tokenizer: Any, prompt_length: int, target_length: int) -> None:
+        self.tokenizer: Any = tokenizer
+        self.prompt_length: int = prompt_length
+        self.target_length: int = target_length
+
+    def __call__(self, input_ids: torch.LongTensor, scores: Any, **kwargs: Any) -> torch.BoolTensor:
+        done = torch.zeros(input_ids.shape[0], dtype=torch.bool, device=input_ids.device)
+        generated: int = input_ids.shape[1] - self.prompt_length
+        if generated <= self.target_length:
+            return done
+        start: int = max(self.prompt_length, input_ids.shape[1] - _BOUNDARY_WINDOW)
+        tails: List[str] = self.tokenizer.batch_decode(input_ids[:, start:], skip_special_tokens=True)
+        for row, tail in enumerate(tails):
+            if _SENTENCE_BOUNDARY.search(tail):
+                done[row] = True
+        return done
+
+
+def trim_to_sentence(summary: str) -> str:
+    """
+    Что я делаю?
+        Обрезаю текст после последнего знака конца предложения
+        (убираю начало следующего предложения, по которому сработала остановка).
+    Что я принимаю на вход?
+        summary (str): Сгенерированный текст.
+    Что я возвращаю?
+        str: Текст из целых предложений (или исходный, если конца предложения нет).
+    """
+    ends: List[Any] = list(_SENTENCE_END.finditer(summary))
+    return summary[:ends[-1].end()] if ends else summary
+
+
+def _step_timer() -> Optional[_StepTimer]:
+    """
+    Что я делаю?
+        Создаю таймер шагов, только если текущий запрос трассируется.
+    Что я принимаю на вход?
+        Ничего.
+    Что я возвращаю?
+        _StepTimer | None: Таймер или None.
+    """
+    return _StepTimer() if tracer.enabled and tracer.current() is not None else None
+
+
+class SummarizerEngine:
+    """
+    Что я делаю?
+        Владею моделью, токенизатором и устройством; безопасно загружаю
+        модель и выполняю генерацию из нескольких потоков.
+    Что я принимаю на вход?
+        model_name (str): Идентификатор модели.
+        dtype (str): Тип весов: float32, float16, bfloat16 или int8.
+        device (str | None): Устройство; None - cuda если доступна.
+        loader (Callable): Функция загрузки модели и токенизатора.
+        decode_mode (str): default, static или compiled (см. описание модуля).
+        draft_model_name (str): Черновая модель ассистированной генерации
+            (загружается при первом запросе с assisted=True).
+    Что я возвращаю?
+        Ничего - объект движка.
+    """
+
+    def __init__(
+        self,
+        model_name: str = DEFAULT_MODEL_NAME,
+        dtype: str = "float32",
+        device: Optional[str] = None,
+        loader: Callable[..., Tuple[Any, Any]] = load_pretrained,
+        decode_mode: str = DECODE_MODE,
+        draft_model_name: str = DRAFT_MODEL_NAME,
+    ) -> None:
+        if dtype not in DTYPE_BYTES:
+            raise ValueError(
+                f"❌ Неподдерживаемый тип весов: {dtype}. "
+                f"Доступны: {', '.join(DTYPE_BYTES)}"
+            )
+        if decode_mode not in DECODE_MODES:
+            raise ValueError(
+                f"❌ Неизвестный режим декодирования: {decode_mode}. "
+                f"Доступны: {', '.join(DECODE_MODES)}"
+            )
+        self.decode_mode: str = decode_mode
+        self.model_name: str = model_name
+        self.dtype: str = dtype
+        # Квантизованные int8-слои работают только на CPU
+        self.device: str = "cpu" if dtype == "int8" else (
+            device or ("cuda" if torch.cuda.is_available() else "cpu")
+        )
+        self.size_bytes: int = 0
+        self.last_used: float = time.monotonic()
+        # Скользящее среднее времени, на которое запрос занимает движок (None - запросов еще не было)
+        self.average_session_seconds: Optional[float] = None
+        self._loader: Callable[..., Tuple[Any, Any]] = loader
+        self._model: Any = None
+        self._tokenizer: Any = None
+        self._load_lock: threading.Lock = threading.Lock()
+        self._loading: bool = False
+        # Вызывается после каждой загрузки модели (реестр учитывает ее в бюджете памяти)
+        self.on_load: Optional[Callable[["SummarizerEngine"], None]] = None
+        # Генерации выполняются по очереди; interactive обгоняет bulk (см. scheduling.py)
+        self._infer_lock: PriorityLock = PriorityLock()
+        # Статистика адаптивной длины: тексты, остановки на границе, сэкономленные токены
+        self.length_stats: Dict[str, int] = {"texts": 0, "stops": 0, "tokens_saved": 0}
+        # Заранее выделенные KV-кеши: (строк батча, длина) -> StaticCache
+        self._static_caches: Dict[Tuple[int, int], Any] = {}
+        self.draft_model_name: str = draft_model_name
+        self._draft: Optional[Tuple[Any, Any]] = None
+        # Статистика ассистированной генерации: проходы основной модели, черновые и принятые токены
+        self.assist_stats: Dict[str, int] = {
+            "generations": 0, "new_tokens": 0, "target_forwards": 0, "draft_tokens": 0, "accepted_tokens": 0,
+        }
+
+    @property
+    def is_loaded(self) -> bool:
+        """
+        Что я делаю?
+            Сообщаю, загружена ли модель в память.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            bool: True если модель и токенизатор загружены.
+        """
+        return self._model is not None and self._tokenizer is not None
+
+    @property
+    def is_loading(self) -> bool:
+        """
+        Что я делаю?
+            Сообщаю, загружается ли модель прямо сейчас.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            bool: True если идет загрузка.
+        """
+        return self._loading
+
+    def load(self) -> Tuple[Any, Any]:
+        """
+        Что я делаю?
+            Загружаю модель один раз: параллельные вызовы ждут первую загрузку,
+            а не запускают свою.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            tuple: (model, tokenizer)
+        """
+        if self.is_loaded:
+            return self._model, self._tokenizer
+
+        loaded: bool = False
+        with self._load_lock:
+            # Повторная проверка: пока мы ждали блокировку, модель мог загрузить другой поток
+            if not self.is_loaded:
+                loaded = True
+                print(f"⏳ Загрузка модели {self.model_name} ({self.dtype})...")
+                self._loading = True
+                try:
+                    with metrics.stage("model_load"):
+                        model, tokenizer = _load_with_dtype(self._loader, self.model_name, self.dtype)
+
+                    started: float = time.perf_counter()
+                    model.to(self.device)
+                    model.eval()
+                    record_load_timing(self.model_name, "to_device", time.perf_counter() - started)
+                finally:
+                    self._loading = False
+
+                self.size_bytes = _model_size_bytes(model)
+                self._tokenizer = tokenizer
+                self._model = model
+                print(
+                    f"✅ Модель {self.model_name} загружена на {self.device} "
+                    f"({self.size_bytes / 2**20:.0f} МБ)"
+                )
+                if TUNING_PROFILE is not None:
+                    print(
+                        f"⚙️ Профиль автонастройки: {torch.get_num_threads()} потоков, "
+                        f"inter-op {torch.get_num_interop_threads()}, батч {TUNING_PROFILE['batch_size']}"
+                    )
+
+        self.last_used = time.monotonic()
+        if loaded and self.on_load is not None:
+            self.on_load(self)
+        return self._model, self._tokenizer
+
+    @property
+    def is_busy(self) -> bool:
+        """
+        Что я делаю?
+            Сообщаю, выполняется ли сейчас генерация.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            bool: True если движок занят.
+        """
+        return self._infer_lock.locked()
+
+    def queue_depth(self, priority: str = "interactive") -> int:
+        """
+        Что я делаю?
+            Считаю генерации, которые пройдут раньше нового запроса этого класса:
+            выполняемую и ожидающие того же класса (bulk interactive почти не задерживает).
+        Что я принимаю на вход?
+            priority (str): Класс приоритета нового запроса.
+        Что я возвращаю?
+            int: Число генераций впереди.
+        """
+        return self._infer_lock.waiting().get(priority, 0) + int(self.is_busy)
+
+    def expected_wait(self, priority: str = "interactive") -> Optional[float]:
+        """
+        Что я делаю?
+            Оцениваю ожидание нового запроса в очереди по среднему времени
+            прошлых генераций.
+        Что я принимаю на вход?
+            priority (str): Класс приоритета нового запроса.
+        Что я возвращаю?
+            Optional[float]: Секунды или None, если генераций еще не было.
+        """
+        if self.average_session_seconds is None:
+            return None
+        return self.queue_depth(priority) * self.average_session_seconds
+
+    def unload(self) -> bool:
+        """
+        Что я делаю?
+            Выгружаю модель из памяти, дождавшись окончания текущей генерации.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            bool: True если модель была загружена.
+        """
+        with self._load_lock, self._infer_lock:
+            if not self.is_loaded:
+                return False
+            self._model = None
+            self._tokenizer = None
+            self._static_caches.clear()
+            self._draft = None
+
+        gc.collect()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        print(f"♻️ Модель {self.model_name} ({self.dtype}) выгружена из памяти")
+        return True
+
+    @staticmethod
+    def _compress_input(tokenizer: Any, text_input: str, token_budget: int) -> str:
+        """
+        Что я делаю?
+            Оставляю самые важные предложения входа, чтобы он уложился
+            в бюджет токенов, сохраняя исходный порядок предложений.
+        Что я принимаю на вход?
+            tokenizer: Токенизатор модели.
+            text_input (str): Исходный текст.
+            token_budget (int): Бюджет входных токенов.
+        Что я возвращаю?
+            str: Сжатый текст.
+        """
+        token_budget = min(token_budget, MAX_INPUT_TOKENS)
+
+        def count_tokens(sentence: str) -> int:
+            return len(tokenizer(sentence, add_special_tokens=False)["input_ids"])
+
+        return compress_to_budget(text_input, token_budget, count_tokens)
+
+    @contextmanager
+    def _session(
+        self, wait_timeout: Optional[float], priority: str = "interactive", cost: int = 1, draft: bool = False
+    ) -> Iterator[Tuple[Any, Any]]:
+        """
+        Что я делаю?
+            Захватываю движок для одной генерации: загружаю модель и жду,
+            пока закончится чужая генерация. Модели загружаются до захвата
+            _infer_lock: unload() берет _load_lock, затем _infer_lock, и обратный
+            порядок привел бы к взаимной блокировке.
+        Что я принимаю на вход?
+            wait_timeout (float | None): Сколько ждать занятый движок (None - без ограничения).
+            priority (str): Класс приоритета: interactive или bulk.
+            cost (int): Число текстов или генераций в сессии (доля класса в PriorityLock).
+            draft (bool): Загрузить и черновую модель (ассистированная генерация).
+        Что я возвращаю?
+            Iterator[tuple]: (model, tokenizer) на время блока with.
+
+        Raises:
+            TimeoutError: Если движок занят дольше wait_timeout.
+        """
+        while True:
+            self.load()
+            if draft:
+                self._load_draft()
+            with metrics.stage("engine_wait", priority=priority):
+                acquired: bool = self._infer_lock.acquire(priority, timeout=wait_timeout, cost=cost)
+            if not acquired:
+                raise TimeoutError(f"Движок {self.model_name} занят дольше {wait_timeout} с")
+            # Модель могли выгрузить, пока мы ждали блокировку - загружаем заново
+            # (через load(), поэтому реестр учитывает и повторную загрузку)
+            if self._model is not None and (not draft or self._draft is not None):
+                break
+            self._infer_lock.release()
+
+        try:
+            self.last_used = time.monotonic()
+            yield self._model, self._tokenizer
+            held: float = time.monotonic() - self.last_used
+            average: Optional[float] = self.average_session_seconds
+            self.average_session_seconds = held if average is None else 0.8 * average + 0.2 * held
+            self.last_used = time.monotonic()
+        finally:
+            self._infer_lock.release()
+
+    def _decode_kwargs(self, model: Any, rows: int, total_length: int) -> Dict[str, Any]:
+        """
+        Что я делаю?
+            Готовлю аргументы generate для режима декодирования: в режимах static
+            и compiled выдаю заранее выделенный KV-кеш (обнуленный, без новых
+            аллокаций), в compiled - еще и настройки компиляции шага декодирования.
+        Что я принимаю на вход?
+            model: Модель.
+            rows (int): Строк в батче генерации (тексты * лучи).
+            total_length (int): Вход плюс максимум новых токенов.
+        Что я возвращаю?
+            dict: Дополнительные аргументы generate (пустой для default).
+        """
+        if self.decode_mode == "default":
+            return {}
+
+        length: int = -(-total_length // STATIC_CACHE_BUCKET) * STATIC_CACHE_BUCKET
+        cache: Any = self._static_caches.get((rows, length))
+        if cache is None:
+            cache = self._static_caches[(rows, length)] = StaticCache(config=model.config, max_cache_len=length)
+            metrics.inc("static_cache_allocations_total")
+        else:
+            # Тензоры кеша созданы внутри generate, то есть в inference_mode
+            with torch.inference_mode():
+                cache.reset()
+        kwargs: Dict[str, Any] = {"past_key_values": cache}
+
+        if self.decode_mode == "compiled":
+            # Скомпилированные графы переживают перезапуск процесса
+            os.environ.setdefault("TORCHINDUCTOR_CACHE_DIR", str(CACHE_DIR / "inductor"))
+            compile_config: CompileConfig = CompileConfig(fullgraph=False, dynamic=False, mode="default")
+            # По умолчанию transformers компилирует только на GPU
+            compile_config._compile_all_devices = True
+            kwargs["compile_config"] = compile_config
+        return kwargs
+
+    def _load_draft(self) -> None:
+        """
+        Что я делаю?
+            Загружаю черновую модель один раз (в том же типе весов и на том же
+            устройстве). Вызывается только без _infer_lock (см. _session).
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            Ничего.
+        """
+        if self._draft is not None:
+            return
+        with self._load_lock:
+            if self._draft is None:
+                print(f"⏳ Загрузка черновой модели {self.draft_model_name} ({self.dtype})...")
+                with metrics.stage("model_load", model="draft"):
+                    draft, draft_tokenizer = _load_with_dtype(self._loader, self.draft_model_name, self.dtype)
+                draft.to(self.device)
+                draft.eval()
+                self.size_bytes += _model_size_bytes(draft)
+                self._draft = (draft, draft_tokenizer)
+                print(f"✅ Черновая модель {self.draft_model_name} загружена ({_model_size_bytes(draft) / 2**20:.0f} МБ)")
+
+    def _draft_kwargs(self, tokenizer: Any) -> Tuple[Any, Dict[str, Any]]:
+        """
+        Что я делаю?
+            Готовлю аргументы generate для ассистированной генерации с уже
+            загруженной черновой моделью (внутри _session(draft=True)).
+        Что я принимаю на вход?
+            tokenizer: Токенизатор основной модели.
+        Что я возвращаю?
+            tuple: (черновая модель, аргументы generate)
+        """
+        draft, draft_tokenizer = self._draft
+        kwargs: Dict[str, Any] = {"assistant_model": draft}
+        if not _same_vocabulary(tokenizer, draft_tokenizer):
+            # Разные словари: transformers перекодирует черновые токены через текст
+            kwargs.update(tokenizer=tokenizer, assistant_tokenizer=draft_tokenizer)
+        return draft, kwargs
+
+    @contextmanager
+    def _count_forwards(self, *models: Any) -> Iterator[List[int]]:
+        """
+        Что я делаю?
+            Считаю прямые проходы каждой модели через forward-хуки на время блока with.
+        Что я принимаю на вход?
+            models: Модели.
+        Что я возвращаю?
+            Iterator[List[int]]: Счетчики проходов в порядке моделей.
+        """
+        counts: List[int] = [0] * len(models)
+
+        def hook(index: int) -> Callable[..., None]:
+            def count(*args: Any) -> None:
+                counts[index] += 1
+            return count
+
+        handles = [model.register_forward_hook(hook(index)) for index, model in enumerate(models)]
+        try:
+            yield counts
+        finally:
+            for handle in handles:
+                handle.remove()
+
+    def _record_assist(self, new_tokens: int, target_forwards: int, draft_tokens: int) -> None:
+        """
+        Что я делаю?
+            Учитываю одну ассистированную генерацию. Каждый проход основной модели
+            принимает часть черновых токенов и добавляет один свой, поэтому
+            принято черновых токенов = новых токенов - проходов основной модели.
+        Что я принимаю на вход?
+            new_tokens (int): Сгенерировано новых токенов.
+            target_forwards (int): Проходов основной модели.
+            draft_tokens (int): Предложено черновых токенов (проходов черновой модели).
+        Что я возвращаю?
+            Ничего.
+        """
+        accepted: int = min(draft_tokens, max(0, new_tokens - target_forwards))
+        self.assist_stats["generations"] += 1
+        self.assist_stats["new_tokens"] += new_tokens
+        self.assist_stats["target_forwards"] += target_forwards
+        self.assist_stats["draft_tokens"] += draft_tokens
+        self.assist_stats["accepted_tokens"] += accepted
+        metrics.inc("assisted_draft_tokens_total", draft_tokens)
+        metrics.inc("assisted_accepted_tokens_total", accepted)
+        tracer.annotate(target_forwards=target_forwards, draft_tokens=draft_tokens, accepted_tokens=accepted)
+
+    def acceptance_rate(self) -> float:
+        """
+        Что я делаю?
+            Считаю долю черновых токенов, принятых основной моделью.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            float: Доля от 0 до 1 (0.0, если ассистированных генераций не было).
+        """
+        proposed: int = self.assist_stats["draft_tokens"]
+        return self.assist_stats["accepted_tokens"] / proposed if proposed else 0.0
+
+    def _stopping_criteria(
+        self,
+        tokenizer: Any,
+        prompt_length: int,
+        min_length: int,
+        adaptive_length: bool,
+        target_length: Optional[int],
+        cancel_event: Optional[threading.Event] = None,
+    ) -> Tuple[Optional[StoppingCriteriaList], Optional[_StepTimer]]:
+        """
+        Что я делаю?
+            Собираю критерии остановки генерации: таймер шагов (если запрос
+            трассируется), границу предложения (в адаптивном режиме) и отмену.
+        Что я принимаю на вход?
+            tokenizer: Токенизатор модели.
+            prompt_length (int): Длина входа.
+            min_length (int): Минимальное число новых токенов.
+            adaptive_length (bool): Включен ли адаптивный режим.
+            target_length (int | None): Мягкая цель; None - min_length.
+            cancel_event (threading.Event | None): Событие отмены.
+        Что я возвращаю?
+            tuple: (список критериев или None, таймер шагов или None)
+        """
+        step_timer: Optional[_StepTimer] = _step_timer()
+        criteria: List[StoppingCriteria] = [step_timer] if step_timer else []
+        if cancel_event is not None:
+            criteria.append(_CancelCriteria(cancel_event))
+        if adaptive_length:
+            target: int = max(min_length, target_length or 0)
+            criteria.append(SentenceBoundaryStoppingCriteria(tokenizer, prompt_length, target))
+        return (StoppingCriteriaList(criteria) if criteria else None), step_timer
+
+    def _finish_adaptive(self, summary: str, new_tokens: int, max_length: int) -> str:
+        """
+        Что я делаю?
+            Если генерация остановлена на границе предложения - отрезаю начало
+            следующего предложения и учитываю сэкономленные токены.
+        Что я принимаю на вход?
+            summary (str): Декодированные новые токены.
+            new_tokens (int): Сколько токенов сгенерировано.
+            max_length (int): Максимум новых токенов.
+        Что я возвращаю?
+            str: Саммари из целых предложений.
+        """
+        self.length_stats["texts"] += 1
+        if new_tokens >= max_length or not _SENTENCE_BOUNDARY.search(summary):
+            return summary
+        saved: int = max_length - new_tokens
+        self.length_stats["stops"] += 1
+        self.length_stats["tokens_saved"] += saved
+        metrics.inc("sentence_stops_total")
+        metrics.inc("tokens_saved_total", saved)
+        return trim_to_sentence(summary)
+
+    def average_tokens_saved(self) -> float:
+        """
+        Что я делаю?
+            Считаю, сколько токенов в среднем экономит адаптивный режим на запрос
+            (относительно генерации до max_length).
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            float: Сэкономленных токенов на текст (0.0, если адаптивных запросов не было).
+        """
+        texts: int = self.length_stats["texts"]
+        return self.length_stats["tokens_saved"] / texts if texts else 0.0
+
+    def _decode_summary(self, tokenizer: Any, new_ids: List[int], max_length: int, adaptive_length: bool) -> str:
+        """
+        Что я делаю?
+            Декодирую новые токены в саммари. Модель decoder-only продолжает вход,
+            поэтому вход не декодируется, а повторный sep_token означает конец саммари.
+        Что я принимаю на вход?
+            tokenizer: Токенизатор модели.
+            new_ids (List[int]): Сгенерированные токены (без входа).
+            max_length (int): Максимум новых токенов.
+            adaptive_length (bool): Включен ли адаптивный режим.
+        Что я возвращаю?
+            str: Саммари.
+        """
+        new_tokens: int = len(new_ids)
+        if tokenizer.sep_token_id in new_ids:
+            new_ids = new_ids[:new_ids.index(tokenizer.sep_token_id)]
+        with metrics.stage("decode"):
+            summary: str = tokenizer.decode(new_ids, skip_special_tokens=True)
+
+        with metrics.stage("postprocess"):
+            if adaptive_length:
+                summary = self._finish_adaptive(summary, new_tokens, max_length)
+        return summary.strip()
+
+    def _encode(self, tokenizer: Any, text_input: str, input_token_budget: Optional[int]) -> List[int]:
+        """
+        Что я делаю?
+            Превращаю текст во входные токены модели с sep_token в конце
+            (при необходимости сначала сжимаю текст до бюджета).
+        Что я принимаю на вход?
+            tokenizer: Токенизатор модели.
+            text_input (str): Текст статьи.
+            input_token_budget (int | None): Бюджет предсжатия.
+        Что я возвращаю?
+            List[int]: Идентификаторы токенов.
+        """
+        if input_token_budget:
+            with metrics.stage("precompress"):
+                text_input = self._compress_input(tokenizer, text_input, input_token_budget)
+
+        with metrics.stage("tokenize"):
+            tokens: List[int] = tokenizer(
+                text_input,
+                max_length=MAX_INPUT_TOKENS,
+                add_special_tokens=False,
+                truncation=True
+            )["input_ids"]
+        return tokens + [tokenizer.sep_token_id]
+
+    def summarize(
+        self,
+        text_input: str,
+        max_length: int,
+        min_length: int,
+        num_beams: int = 1,
+        wait_timeout: Optional[float] = None,
+        input_token_budget: Optional[int] = None,
+        priority: str = "interactive",
+        adaptive_length: bool = False,
+        target_length: Optional[int] = None,
+        cancel_event: Optional[threading.Event] = None,
+        assisted: bool = False,
+    ) -> str:
+        """
+        Что я делаю?
+            Генерирую саммари; одновременные вызовы выполняются по очереди.
+        Что я принимаю на вход?
+            text_input (str): Текст статьи.
+            max_length (int): Максимальное число новых токенов.
+            min_length (int): Минимальное число новых токенов.
+            num_beams (int): Число лучей.
+            wait_timeout (float | None): Сколько ждать занятый движок (None - без ограничения).
+            input_token_budget (int | None): Если задан и вход длиннее - сначала
+                экстрактивно сжимаю текст до этого числа токенов.
+            priority (str): Класс приоритета: interactive (GUI, сервис) или bulk.
+            adaptive_length (bool): Остановиться на первой границе предложения
+                после target_length новых токенов, а не генерировать до max_length.
+            target_length (int | None): Мягкая цель адаптивного режима; None - min_length.
+            cancel_event (threading.Event | None): Если событие выставлено - генерация
+                прерывается на ближайшем шаге.
+            assisted (bool): Ассистированная генерация с черновой моделью
+                (только при num_beams=1, с лучами игнорируется).
+        Что я возвращаю?
+            str: Результат суммаризации.
+
+        Raises:
+            TimeoutError: Если движок занят дольше wait_timeout.
+            GenerationCancelled: Если генерация отменена через cancel_event.
+        """
+        assisted = assisted and num_beams == 1
+        with self._session(wait_timeout, priority, draft=assisted) as (model, tokenizer):
+            # Запрос мог устареть, пока ждал своей очереди
+            if cancel_event is not None and cancel_event.is_set():
+                raise GenerationCancelled("Генерация отменена до начала")
+            # Подготовка входных данных
+            tokens: List[int] = self._encode(tokenizer, text_input, input_token_budget)
+            input_ids = torch.tensor([tokens]).to(self.device)
+
+            # Генерация
+            with metrics.stage("generate", num_beams=str(num_beams)):
+                stopping_criteria, step_timer = self._stopping_criteria(
+                    tokenizer, input_ids.shape[1], min_length, adaptive_length, target_length, cancel_event
+                )
+                if assisted:
+                    # Черновая модель ведет свой динамический кеш, статический тут не нужен
+                    draft, decode_kwargs = self._draft_kwargs(tokenizer)
+                else:
+                    draft, decode_kwargs = None, self._decode_kwargs(model, num_beams, max_length + input_ids.shape[1])
+                generate_started: float = time.perf_counter()
+                with torch.inference_mode(), self._count_forwards(model, *([draft] if draft else [])) as forwards:
+                    output_ids = model.generate(
+                        input_ids=input_ids,
+                        max_length=max_length + input_ids.shape[1],  # max_length тут - это общая длина
+                        min_length=min_length + input_ids.shape[1],
+                        num_beams=num_beams,
+                        no_repeat_ngram_size=4,
+                        early_stopping=(num_beams > 1),
+                        stopping_criteria=stopping_criteria,
+                        **decode_kwargs,
+                    )
+                generate_seconds: float = time.perf_counter() - generate_started
+                if step_timer is not None:
+                    step_timer.annotate()
+            if cancel_event is not None and cancel_event.is_set():
+                metrics.inc("cancelled_total")
+                raise GenerationCancelled("Генерация отменена")
+            new_tokens: int = output_ids.shape[1] - input_ids.shape[1]
+            metrics.record_tokens(input_ids.shape[1], new_tokens, generate_seconds)
+            if assisted:
+                self._record_assist(new_tokens, forwards[0], forwards[1])
+            else:
+                # Модель стоимости описывает обычную генерацию
+                cost_model.observe(input_ids.shape[1], new_tokens, num_beams, generate_seconds, max_length=max_length)
+
+            return self._decode_summary(
+                tokenizer, output_ids[0, input_ids.shape[1]:].tolist(), max_length, adaptive_length
+            )
+
+
+    def summarize_batch(
+        self,
+        texts: List[str],
+        max_length: int,
+        min_length: int,
+        num_beams: int = 1,
+        wait_timeout: Optional[float] = None,
+        input_token_budget: Optional[int] = None,
+        priority: str = "interactive",
+        adaptive_length: bool = False,
+        target_length: Optional[int] = None,
+    ) -> List[str]:
+        """
+        Что я делаю?
+            Генерирую саммари для нескольких текстов одним вызовом generate.
+            Входы дополняются слева, чтобы новые токены у всех шли с одной позиции.
+        Что я принимаю на вход?
+            texts (List[str]): Тексты статей.
+            max_length (int): Максимальное число новых токенов.
+            min_length (int): Минимальное число новых токенов.
+            num_beams (int): Число лучей.
+            wait_timeout (float | None): Сколько ждать занятый движок (None - без ограничения).
+            input_token_budget (int | None): Бюджет предсжатия каждого входа.
+            priority (str): Класс приоритета батча.
+            adaptive_length (bool): Останавливать каждый текст на границе предложения.
+            target_length (int | None): Мягкая цель адаптивного режима; None - min_length.
+        Что я возвращаю?
+            List[str]: Саммари в порядке текстов.
+
+        Raises:
+            TimeoutError: Если движок занят дольше wait_timeout.
+        """
+        if not texts:
+            return []
+
+        tracer.annotate(batch_id=next(_batch_ids), batch_size=len(texts))
+        with self._session(wait_timeout, priority, cost=len(texts)) as (model, tokenizer):
+            encoded: List[List[int]] = [
+                self._encode(tokenizer, text_input, input_token_budget) for text_input in texts
+            ]
+            pad_id: int = tokenizer.pad_token_id
+            if pad_id is None:
+                pad_id = tokenizer.eos_token_id
+            width: int = max(len(tokens) for tokens in encoded)
+            input_ids = torch.tensor(
+                [[pad_id] * (width - len(tokens)) + tokens for tokens in encoded]
+            ).to(self.device)
+            attention_mask = torch.tensor(
+                [[0] * (width - len(tokens)) + [1] * len(tokens) for tokens in encoded]
+            ).to(self.device)
+
+            with metrics.stage("generate", num_beams=str(num_beams)):
+                stopping_criteria, step_timer = self._stopping_criteria(
+                    tokenizer, width, min_length, adaptive_length, target_length
+                )
+                decode_kwargs: Dict[str, Any] = self._decode_kwargs(
+                    model, len(texts) * num_beams, max_length + width
+                )
+                generate_started = time.perf_counter()
+                with torch.inference_mode():
+                    output_ids = model.generate(
+                        input_ids=input_ids,
+                        attention_mask=attention_mask,
+                        pad_token_id=pad_id,
+                        max_length=max_length + width,
+                        min_length=min_length + width,
+                        num_beams=num_beams,
+                        no_repeat_ngram_size=4,
+                        early_stopping=(num_beams > 1),
+                        stopping_criteria=stopping_criteria,
+                        **decode_kwargs,
+                    )
+                generate_seconds = time.perf_counter() - generate_started
+                if step_timer is not None:
+                    step_timer.annotate()
+            new_ids = output_ids[:, width:]
+            metrics.record_tokens(
+                sum(len(tokens) for tokens in encoded),
+                int((new_ids != pad_id).sum()),
+                generate_seconds,
+            )
+            # Для модели стоимости важна длина батча: короткие входы дополнены до width
+            cost_model.observe(width, new_ids.shape[1], num_beams, generate_seconds, len(texts), max_length)
+
+            # Каждая строка декодируется как одиночное саммари (обрезка по sep_token),
+            # чтобы результат батча не отличался от того же текста, обработанного отдельно
+            summaries: List[str] = []
+            for row in new_ids.tolist():
+                # Строки, закончившиеся раньше других, дополнены pad_id - в ответ он не попадает
+                while row and row[-1] == pad_id:
+                    row.pop()
+                summaries.append(self._decode_summary(tokenizer, row, max_length, adaptive_length))
+
+        return summaries
+
+    def sweep(
+        self,
+        text_input: str,
+        configs: List[Tuple[int, int, int]],
+        wait_timeout: Optional[float] = None,
+        input_token_budget: Optional[int] = None,
+        priority: str = "interactive",
+        adaptive_length: bool = False,
+    ) -> List[str]:
+        """
+        Что я делаю?
+            Генерирую саммари одного текста с несколькими наборами параметров.
+            Вход токенизируется и прогоняется через модель один раз, а декодирование
+            каждого набора начинается с копии KV-кеша входа (динамического в любом
+            режиме декодирования).
+        Что я принимаю на вход?
+            text_input (str): Текст статьи.
+            configs (List[tuple]): Наборы (max_length, min_length, num_beams).
+            wait_timeout (float | None): Сколько ждать занятый движок (None - без ограничения).
+            input_token_budget (int | None): Бюджет предсжатия входа.
+            priority (str): Класс приоритета.
+            adaptive_length (bool): Останавливать генерацию на границе предложения.
+        Что я возвращаю?
+            List[str]: Саммари в порядке наборов параметров.
+
+        Raises:
+            TimeoutError: Если движок занят дольше wait_timeout.
+        """
+        if not configs:
+            return []
+
+        summaries: List[str] = []
+        with self._session(wait_timeout, priority, cost=len(configs)) as (model, tokenizer):
+            tokens: List[int] = self._encode(tokenizer, text_input, input_token_budget)
+            input_ids = torch.tensor([tokens]).to(self.device)
+            attention_mask = torch.ones_like(input_ids)
+
+            # Последний токен входа не кешируется: generate должен обработать хотя бы один токен
+            with metrics.stage("prefill"):
+                with torch.inference_mode():
+                    prompt_cache: Any = model(input_ids[:, :-1], use_cache=True).past_key_values
+
+            for max_length, min_length, num_beams in configs:
+                with metrics.stage("generate", num_beams=str(num_beams)):
+                    # generate дописывает кеш - каждому набору нужна своя копия
+                    cache: Any = copy.deepcopy(prompt_cache)
+                    if num_beams > 1:
+                        # Лучи декодируются батчем: кеш входа повторяется для каждого луча
+                        cache.batch_repeat_interleave(num_beams)
+                    stopping_criteria, step_timer = self._stopping_criteria(
+                        tokenizer, input_ids.shape[1], min_length, adaptive_length, None
+                    )
+                    generate_started: float = time.perf_counter()
+                    with torch.inference_mode():
+                        output_ids = model.generate(
+                            input_ids=input_ids,
+                            attention_mask=attention_mask,
+                            past_key_values=cache,
+                            max_length=max_length + input_ids.shape[1],
+                            min_length=min_length + input_ids.shape[1],
+                            num_beams=num_beams,
+                            no_repeat_ngram_size=4,
+                            early_stopping=(num_beams > 1),
+                            stopping_criteria=stopping_criteria,
+                        )
+                    generate_seconds: float = time.perf_counter() - generate_started
+                    if step_timer is not None:
+                        step_timer.annotate()
+                # Вход учитывается один раз; модель стоимости не обучается на ветках
+                # без prefill, иначе она занизит стоимость входа
+                new_tokens: int = output_ids.shape[1] - input_ids.shape[1]
+                metrics.record_tokens(0 if summaries else input_ids.shape[1], new_tokens, generate_seconds)
+                summaries.append(self._decode_summary(
+                    tokenizer, output_ids[0, input_ids.shape[1]:].tolist(), max_length, adaptive_length
+                ))
+
+        return summaries
+
+
+def get_default_engine(
+    model_name: str = DEFAULT_MODEL_NAME, dtype: str = "float32", load: bool = True
+) -> SummarizerEngine:
+    """
+    Что я делаю?
+        Возвращаю движок из общего реестра моделей процесса.
+    Что я принимаю на вход?
+        model_name (str): Идентификатор модели.
+        dtype (str): Тип весов.
+        load (bool): Загрузить модель сразу (False - при первом использовании).
+    Что я возвращаю?
+        SummarizerEngine: Движок.
+    """
+    from model_registry import get_default_registry
+
+    return get_default_registry().get_engine(model_name, dtype, load=load)
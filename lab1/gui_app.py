@@ -6,9 +6,19 @@ GUI приложение для суммаризации текста с исп
 """
 
 import sys
-from typing import Optional
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from PyQt6.QtWidgets import (
     QApplication,
+    QCheckBox,
+    QDialog,
+    QDockWidget,
+    QFileDialog,
+    QLineEdit,
+    QListWidget,
+    QListWidgetItem,
     QMainWindow,
     QWidget,
     QVBoxLayout,
@@ -19,13 +29,571 @@ from PyQt6.QtWidgets import (
     QSpinBox,
     QGroupBox,
     QMessageBox,
+    QProgressBar,
     QScrollArea,
-    QStatusBar
+    QStatusBar,
+    QTableWidget,
+    QTableWidgetItem,
+    QTabWidget,
 )
-from PyQt6.QtCore import Qt, pyqtSlot
-from PyQt6.QtGui import QFont, QColor
+from PyQt6.QtCore import QObject, Qt, QTimer, pyqtSignal, pyqtSlot
+from PyQt6.QtGui import QCloseEvent, QDragEnterEvent, QDropEvent, QFont, QColor
 
-from text_summarizer import summarize_text, summarize_text_advanced, load_api_token
+from batch_queue import DONE, ERROR, RUNNING, BatchQueue
+from large_file import LARGE_FILE_BYTES, LargeTextFile, summarize_long
+from result_store import ResultStore, hash_text
+from text_summarizer import (
+    FallbackSummary,
+    load_api_token,
+    summarize_text,
+    summarize_text_advanced,
+    summarize_text_batch,
+    summarize_text_preview,
+    summarize_text_sweep,
+    validate_text,
+)
+
+# Сколько вариантов параметров можно сравнить за один запуск
+MAX_SWEEP_VARIANTS: int = 6
+# Пауза после последней правки, после которой запускается живая суммаризация
+LIVE_DEBOUNCE_MS: int = 700
+# Сколько записей истории показывать в боковой панели
+HISTORY_LIMIT: int = 200
+
+
+class _LiveSignals(QObject):
+    """
+    Что я делаю?
+        Передаю результаты фоновой задачи живого режима в поток интерфейса.
+    Что я принимаю на вход?
+        Ничего.
+    Что я возвращаю?
+        Ничего - объект сигналов (номер задачи, текст; у саммари еще
+        признак экстрактивной замены - тип FallbackSummary сигнал не передает).
+    """
+
+    preview_ready = pyqtSignal(int, str)
+    summary_ready = pyqtSignal(int, str, bool)
+
+
+class _DocumentSignals(QObject):
+    """
+    Что я делаю?
+        Передаю прогресс и результат суммаризации большого документа в поток интерфейса.
+    Что я принимаю на вход?
+        Ничего.
+    Что я возвращаю?
+        Ничего - объект сигналов.
+    """
+
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal(str, bool)
+
+
+def _run_document_job(
+    document: LargeTextFile,
+    whole_document: bool,
+    max_length: int,
+    min_length: int,
+    store: ResultStore,
+    signals: _DocumentSignals,
+) -> None:
+    """
+    Что я делаю?
+        В фоновом потоке суммаризирую большой документ: только его начало
+        или весь документ через экстрактивный map-reduce. Документ, уже
+        обработанный с теми же параметрами, берется из истории.
+    Что я принимаю на вход?
+        document (LargeTextFile): Открытый документ.
+        whole_document (bool): Режим map-reduce по всему документу.
+        max_length (int), min_length (int): Параметры длины.
+        store (ResultStore): Хранилище результатов.
+        signals (_DocumentSignals): Сигналы для окна.
+    Что я возвращаю?
+        Ничего.
+    """
+    fallbacks: List[str] = []
+
+    def summarize(text_input: str) -> Optional[str]:
+        summary: Optional[str] = summarize_text_advanced(text_input, max_length, min_length, num_beams=4)
+        if isinstance(summary, FallbackSummary):
+            fallbacks.append(summary)
+        return summary
+
+    params: Dict[str, Any] = {
+        "max_length": max_length, "min_length": min_length, "num_beams": 4,
+        "document": "whole" if whole_document else "head",
+    }
+    started: float = time.perf_counter()
+    try:
+        fingerprint: str = document.fingerprint()
+        record: Optional[Dict[str, Any]] = store.get(fingerprint, params)
+        if record is not None:
+            signals.finished.emit(record["summary"], True)
+            return
+        head: str = document.head()
+        if whole_document:
+            summary: Optional[str] = summarize_long(document, summarize, signals.progress.emit)
+        else:
+            summary = summarize(head)
+    except (OSError, ValueError) as error:
+        signals.finished.emit(f"❌ Ошибка чтения файла: {error}", False)
+        return
+    # Хотя бы одна часть - экстрактивная замена: такой результат в историю не сохраняем
+    if summary and not fallbacks:
+        store.put(
+            head, params, summary, time.perf_counter() - started, text_hash=fingerprint,
+            title=f"📄 {Path(document.path).name}", keep_text=False,
+        )
+    signals.finished.emit(summary or "", False)
+
+
+def _run_live_job(
+    job_id: int,
+    text_input: str,
+    max_length: int,
+    min_length: int,
+    cancel_event: threading.Event,
+    signals: _LiveSignals,
+) -> None:
+    """
+    Что я делаю?
+        В фоновом потоке отдаю мгновенный предпросмотр, затем уточняю его
+        абстрактивным саммари. Отмененная задача ничего не отправляет.
+    Что я принимаю на вход?
+        job_id (int): Номер задачи.
+        text_input (str): Текст на момент запуска.
+        max_length (int), min_length (int): Параметры длины.
+        cancel_event (threading.Event): Событие отмены (текст снова изменился).
+        signals (_LiveSignals): Сигналы для окна.
+    Что я возвращаю?
+        Ничего.
+    """
+    preview: Optional[str] = summarize_text_preview(text_input, max_length, min_length)
+    if cancel_event.is_set():
+        return
+    signals.preview_ready.emit(job_id, preview or "")
+
+    summary: Optional[str] = summarize_text_advanced(
+        text_input, max_length, min_length, num_beams=4, cancel_event=cancel_event
+    )
+    if summary is None or cancel_event.is_set():
+        return
+    signals.summary_ready.emit(job_id, summary, isinstance(summary, FallbackSummary))
+
+
+class SweepDialog(QDialog):
+    """
+    Что я делаю?
+        Показываю саммари одного текста с разными параметрами бок о бок,
+        чтобы подобрать max_length, min_length и число лучей за один запуск.
+    Что я принимаю на вход?
+        text_input (str): Исходный текст.
+        max_length (int), min_length (int): Текущие значения из главного окна.
+        parent (QWidget | None): Родительское окно.
+    Что я возвращаю?
+        Ничего - класс диалога.
+    """
+
+    def __init__(self, text_input: str, max_length: int, min_length: int, parent: Optional[QWidget] = None) -> None:
+        super().__init__(parent)
+        self.setWindowTitle("🔬 Сравнение параметров")
+        self.resize(1100, 600)
+        self.text_input: str = text_input
+
+        layout: QVBoxLayout = QVBoxLayout(self)
+        layout.addWidget(QLabel("Варианты параметров (ячейки можно редактировать):"))
+
+        self.table: QTableWidget = QTableWidget(0, 3)
+        self.table.setHorizontalHeaderLabels(["Макс. длина", "Мин. длина", "Лучей"])
+        self.table.setMaximumHeight(180)
+        short_max: int = max(30, max_length // 2)
+        for config in (
+            (max_length, min_length, 1),
+            (max_length, min_length, 4),
+            (short_max, min(min_length, short_max), 4),
+        ):
+            self._add_row(config)
+        layout.addWidget(self.table)
+
+        controls: QHBoxLayout = QHBoxLayout()
+        add_button: QPushButton = QPushButton("➕ Добавить вариант")
+        add_button.clicked.connect(lambda: self._add_row((max_length, min_length, 2)))
+        controls.addWidget(add_button)
+        remove_button: QPushButton = QPushButton("➖ Удалить вариант")
+        remove_button.clicked.connect(lambda: self.table.removeRow(max(0, self.table.currentRow())))
+        controls.addWidget(remove_button)
+        controls.addStretch()
+        self.run_button: QPushButton = QPushButton("🚀 Сравнить")
+        self.run_button.setMinimumHeight(32)
+        self.run_button.clicked.connect(self.on_run_clicked)
+        controls.addWidget(self.run_button)
+        layout.addLayout(controls)
+
+        self.status_label: QLabel = QLabel("Нажмите «Сравнить», чтобы получить варианты")
+        layout.addWidget(self.status_label)
+
+        # Результаты - колонки бок о бок с горизонтальной прокруткой
+        self.results_widget: QWidget = QWidget()
+        self.results_layout: QHBoxLayout = QHBoxLayout(self.results_widget)
+        scroll: QScrollArea = QScrollArea()
+        scroll.setWidgetResizable(True)
+        scroll.setWidget(self.results_widget)
+        layout.addWidget(scroll, 1)
+
+    def _add_row(self, config: Tuple[int, int, int]) -> None:
+        """
+        Что я делаю?
+            Добавляю строку с вариантом параметров в таблицу.
+        Что я принимаю на вход?
+            config (tuple): (max_length, min_length, num_beams).
+        Что я возвращаю?
+            Ничего.
+        """
+        if self.table.rowCount() >= MAX_SWEEP_VARIANTS:
+            return
+        row: int = self.table.rowCount()
+        self.table.insertRow(row)
+        for column, value in enumerate(config):
+            self.table.setItem(row, column, QTableWidgetItem(str(value)))
+
+    def _read_configs(self) -> List[Tuple[int, int, int]]:
+        """
+        Что я делаю?
+            Читаю и проверяю варианты параметров из таблицы.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            List[tuple]: Наборы (max_length, min_length, num_beams).
+
+        Raises:
+            ValueError: Если ячейка не число или параметры противоречат друг другу.
+        """
+        configs: List[Tuple[int, int, int]] = []
+        for row in range(self.table.rowCount()):
+            cells: List[Optional[QTableWidgetItem]] = [self.table.item(row, column) for column in range(3)]
+            try:
+                max_len, min_len, beams = (int(cell.text()) if cell else 0 for cell in cells)
+            except ValueError:
+                raise ValueError(f"Строка {row + 1}: нужны целые числа")
+            if not (1 <= min_len <= max_len and 1 <= beams <= 8):
+                raise ValueError(f"Строка {row + 1}: нужно 1 ≤ мин. ≤ макс. длины и от 1 до 8 лучей")
+            configs.append((max_len, min_len, beams))
+        if not configs:
+            raise ValueError("Добавьте хотя бы один вариант")
+        return configs
+
+    @pyqtSlot()
+    def on_run_clicked(self) -> None:
+        """
+        Что я делаю?
+            Суммаризирую текст со всеми вариантами и показываю результаты бок о бок.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            Ничего.
+        """
+        try:
+            configs: List[Tuple[int, int, int]] = self._read_configs()
+        except ValueError as err:
+            QMessageBox.warning(self, "⚠️ Ошибка параметров", str(err))
+            return
+
+        self.status_label.setText(f"⏳ Генерация вариантов: {len(configs)}...")
+        self.run_button.setEnabled(False)
+        QApplication.processEvents()
+        started: float = time.perf_counter()
+        summaries: List[str] = summarize_text_sweep(self.text_input, configs)
+        elapsed: float = time.perf_counter() - started
+        self.run_button.setEnabled(True)
+
+        while self.results_layout.count():
+            widget: Optional[QWidget] = self.results_layout.takeAt(0).widget()
+            if widget is not None:
+                widget.deleteLater()
+        for (max_len, min_len, beams), summary in zip(configs, summaries):
+            column: QWidget = QWidget()
+            column_layout: QVBoxLayout = QVBoxLayout(column)
+            header: QLabel = QLabel(f"макс. {max_len} / мин. {min_len} / лучей {beams}")
+            header.setStyleSheet("font-weight: bold;")
+            column_layout.addWidget(header)
+            output: QTextEdit = QTextEdit()
+            output.setReadOnly(True)
+            output.setPlainText(summary)
+            output.setMinimumWidth(250)
+            column_layout.addWidget(output)
+            self.results_layout.addWidget(column)
+        self.status_label.setText(f"✅ Вариантов: {len(configs)}, время: {elapsed:.1f} с")
+
+
+# Сколько файлов отдается движку одним батчем в пакетном режиме
+BATCH_CHUNK_SIZE: int = 4
+
+_STATUS_LABELS = {
+    "pending": "⏳ в очереди",
+    RUNNING: "⚙️ обработка",
+    DONE: "✅ готово",
+    ERROR: "❌ ошибка",
+}
+
+
+class _BatchSignals(QObject):
+    """
+    Что я делаю?
+        Передаю обновления очереди из фонового потока в поток интерфейса.
+    Что я принимаю на вход?
+        Ничего.
+    Что я возвращаю?
+        Ничего - объект сигналов (номер элемента, -1 - очередь завершена).
+    """
+
+    item_updated = pyqtSignal(int)
+
+
+class BatchPanel(QWidget):
+    """
+    Что я делаю?
+        Вкладка пакетной обработки: принимаю файлы и папки (кнопками или
+        перетаскиванием), суммаризирую их в фоне с приоритетом bulk, показываю
+        статус каждого файла и скорость, дописываю результаты в JSONL.
+    Что я принимаю на вход?
+        lengths (Callable): Возвращает (max_length, min_length) из главного окна.
+        parent (QWidget | None): Родительский виджет.
+    Что я возвращаю?
+        Ничего - класс виджета.
+    """
+
+    def __init__(self, lengths: Callable[[], Tuple[int, int]], parent: Optional[QWidget] = None) -> None:
+        super().__init__(parent)
+        self.setAcceptDrops(True)
+        self._lengths: Callable[[], Tuple[int, int]] = lengths
+        self._signals: _BatchSignals = _BatchSignals()
+        self._signals.item_updated.connect(self.on_item_updated)
+        self.queue: BatchQueue = self._new_queue(str(Path.cwd() / "summaries.jsonl"))
+
+        layout: QVBoxLayout = QVBoxLayout(self)
+        layout.addWidget(QLabel("📦 Перетащите сюда файлы .txt/.md или папки, либо добавьте их кнопками:"))
+
+        files_layout: QHBoxLayout = QHBoxLayout()
+        add_folder_button: QPushButton = QPushButton("📂 Добавить папку")
+        add_folder_button.clicked.connect(self.on_add_folder_clicked)
+        files_layout.addWidget(add_folder_button)
+        add_files_button: QPushButton = QPushButton("📄 Добавить файлы")
+        add_files_button.clicked.connect(self.on_add_files_clicked)
+        files_layout.addWidget(add_files_button)
+        output_button: QPushButton = QPushButton("💾 Файл результатов")
+        output_button.clicked.connect(self.on_output_clicked)
+        files_layout.addWidget(output_button)
+        self.output_label: QLabel = QLabel(self.queue.output_path)
+        files_layout.addWidget(self.output_label, 1)
+        layout.addLayout(files_layout)
+
+        self.table: QTableWidget = QTableWidget(0, 3)
+        self.table.setHorizontalHeaderLabels(["Файл", "Статус", "Время, с"])
+        self.table.horizontalHeader().setStretchLastSection(False)
+        self.table.setColumnWidth(0, 600)
+        self.table.setColumnWidth(1, 140)
+        layout.addWidget(self.table, 1)
+
+        self.progress: QProgressBar = QProgressBar()
+        layout.addWidget(self.progress)
+        self.stats_label: QLabel = QLabel("Очередь пуста")
+        layout.addWidget(self.stats_label)
+
+        controls: QHBoxLayout = QHBoxLayout()
+        self.start_button: QPushButton = QPushButton("▶️ Старт")
+        self.start_button.clicked.connect(self.on_start_clicked)
+        controls.addWidget(self.start_button)
+        self.pause_button: QPushButton = QPushButton("⏸️ Пауза")
+        self.pause_button.setEnabled(False)
+        self.pause_button.clicked.connect(self.on_pause_clicked)
+        controls.addWidget(self.pause_button)
+        self.stop_button: QPushButton = QPushButton("⏹️ Стоп")
+        self.stop_button.setEnabled(False)
+        self.stop_button.clicked.connect(self.on_stop_clicked)
+        controls.addWidget(self.stop_button)
+        controls.addStretch()
+        layout.addLayout(controls)
+
+    def _new_queue(self, output_path: str) -> BatchQueue:
+        """
+        Что я делаю?
+            Создаю очередь с текущими параметрами длины.
+        Что я принимаю на вход?
+            output_path (str): Файл результатов JSONL.
+        Что я возвращаю?
+            BatchQueue: Очередь.
+        """
+        def summarize_many(texts: List[str]) -> List[str]:
+            max_len, min_len = self._lengths()
+            return summarize_text_batch(texts, max_len, min_len, priority="bulk")
+
+        return BatchQueue(summarize_many, output_path, BATCH_CHUNK_SIZE, self._signals.item_updated.emit)
+
+    def add_paths(self, paths: List[str]) -> None:
+        """
+        Что я делаю?
+            Добавляю файлы и папки в очередь и в таблицу.
+        Что я принимаю на вход?
+            paths (List[str]): Пути.
+        Что я возвращаю?
+            Ничего.
+        """
+        first_new: int = len(self.queue.items)
+        added: int = self.queue.add_files(paths)
+        for index in range(first_new, first_new + added):
+            self.table.insertRow(index)
+            self.table.setItem(index, 0, QTableWidgetItem(self.queue.items[index].path))
+            self.table.setItem(index, 1, QTableWidgetItem(_STATUS_LABELS["pending"]))
+            self.table.setItem(index, 2, QTableWidgetItem(""))
+        self._refresh_stats()
+
+    def _refresh_stats(self) -> None:
+        """
+        Что я делаю?
+            Обновляю прогресс и пропускную способность.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            Ничего.
+        """
+        stats = self.queue.stats()
+        finished: int = stats["done"] + stats["errors"]
+        self.progress.setMaximum(max(1, stats["total"]))
+        self.progress.setValue(finished)
+        per_minute: float = stats["items_per_second"] * 60.0
+        self.stats_label.setText(
+            f"Готово {stats['done']} из {stats['total']}, ошибок {stats['errors']}, "
+            f"📈 {per_minute:.1f} файлов/мин"
+        )
+
+    @pyqtSlot()
+    def on_add_folder_clicked(self) -> None:
+        """
+        Что я делаю?
+            Добавляю все текстовые файлы выбранной папки.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            Ничего.
+        """
+        folder: str = QFileDialog.getExistingDirectory(self, "Папка со статьями")
+        if folder:
+            self.add_paths([folder])
+
+    @pyqtSlot()
+    def on_add_files_clicked(self) -> None:
+        """
+        Что я делаю?
+            Добавляю выбранные файлы.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            Ничего.
+        """
+        files, _ = QFileDialog.getOpenFileNames(self, "Статьи", "", "Тексты (*.txt *.md);;Все файлы (*)")
+        if files:
+            self.add_paths(files)
+
+    @pyqtSlot()
+    def on_output_clicked(self) -> None:
+        """
+        Что я делаю?
+            Выбираю файл JSONL для результатов (до запуска очереди).
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            Ничего.
+        """
+        if self.queue.running:
+            QMessageBox.warning(self, "⚠️ Очередь работает", "Файл результатов можно сменить после остановки.")
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "Файл результатов", self.queue.output_path, "JSON Lines (*.jsonl)")
+        if path:
+            self.queue.output_path = path
+            self.output_label.setText(path)
+
+    @pyqtSlot()
+    def on_start_clicked(self) -> None:
+        """
+        Что я делаю?
+            Запускаю обработку очереди.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            Ничего.
+        """
+        if not self.queue.stats()["pending"]:
+            QMessageBox.information(self, "📦 Очередь пуста", "Добавьте файлы или папку для обработки.")
+            return
+        self.queue.start()
+        self.start_button.setEnabled(False)
+        self.pause_button.setEnabled(True)
+        self.stop_button.setEnabled(True)
+
+    @pyqtSlot()
+    def on_pause_clicked(self) -> None:
+        """
+        Что я делаю?
+            Приостанавливаю или продолжаю очередь.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            Ничего.
+        """
+        if self.queue.paused:
+            self.queue.resume()
+            self.pause_button.setText("⏸️ Пауза")
+        else:
+            self.queue.pause()
+            self.pause_button.setText("▶️ Продолжить")
+
+    @pyqtSlot()
+    def on_stop_clicked(self) -> None:
+        """
+        Что я делаю?
+            Останавливаю очередь после текущей порции (не блокируя интерфейс).
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            Ничего.
+        """
+        self.queue.stop(timeout=0)
+        self.stop_button.setEnabled(False)
+        self.pause_button.setEnabled(False)
+
+    @pyqtSlot(int)
+    def on_item_updated(self, index: int) -> None:
+        """
+        Что я делаю?
+            Обновляю строку файла или, если очередь завершилась, кнопки.
+        Что я принимаю на вход?
+            index (int): Номер элемента (-1 - очередь завершена).
+        Что я возвращаю?
+            Ничего.
+        """
+        if index < 0:
+            self.start_button.setEnabled(True)
+            self.pause_button.setEnabled(False)
+            self.pause_button.setText("⏸️ Пауза")
+            self.stop_button.setEnabled(False)
+        else:
+            item = self.queue.items[index]
+            self.table.item(index, 1).setText(_STATUS_LABELS[item.status])
+            if item.status in (DONE, ERROR):
+                self.table.item(index, 2).setText(f"{item.seconds:.2f}")
+                if item.error:
+                    self.table.item(index, 1).setToolTip(item.error)
+        self._refresh_stats()
+
+    def dragEnterEvent(self, event: QDragEnterEvent) -> None:
+        if event.mimeData().hasUrls():
+            event.acceptProposedAction()
+
+    def dropEvent(self, event: QDropEvent) -> None:
+        paths: List[str] = [url.toLocalFile() for url in event.mimeData().urls() if url.isLocalFile()]
+        self.add_paths(paths)
+        event.acceptProposedAction()
 
 
 class TextSummarizerApp(QMainWindow):
@@ -58,9 +626,13 @@ class TextSummarizerApp(QMainWindow):
         except ValueError as err:
             api_status: str = str(err)
         
+        # Вкладки: один текст и пакетная обработка
+        tabs: QTabWidget = QTabWidget()
+        self.setCentralWidget(tabs)
+        
         # Главный виджет
         central_widget: QWidget = QWidget()
-        self.setCentralWidget(central_widget)
+        tabs.addTab(central_widget, "📝 Текст")
         
         # Главный макет
         main_layout: QVBoxLayout = QVBoxLayout(central_widget)
@@ -88,8 +660,29 @@ class TextSummarizerApp(QMainWindow):
         
         # Левая часть - Исходный текст
         left_layout: QVBoxLayout = QVBoxLayout()
+        input_header: QHBoxLayout = QHBoxLayout()
         input_label: QLabel = QLabel("📌 Исходный текст:")
-        left_layout.addWidget(input_label)
+        input_header.addWidget(input_label)
+        input_header.addStretch()
+        
+        # Большие файлы не загружаются в поле целиком: видна одна страница
+        self.document_label: QLabel = QLabel()
+        input_header.addWidget(self.document_label)
+        self.page_spinbox: QSpinBox = QSpinBox()
+        self.page_spinbox.setPrefix("Стр. ")
+        self.page_spinbox.setMinimum(1)
+        self.page_spinbox.valueChanged.connect(self.on_page_changed)
+        input_header.addWidget(self.page_spinbox)
+        self.whole_document_checkbox: QCheckBox = QCheckBox("📚 Весь документ")
+        self.whole_document_checkbox.setToolTip(
+            "Сжать весь файл по фрагментам (map-reduce); иначе суммаризируется только начало"
+        )
+        input_header.addWidget(self.whole_document_checkbox)
+        
+        open_button: QPushButton = QPushButton("📂 Открыть файл")
+        open_button.clicked.connect(self.on_open_clicked)
+        input_header.addWidget(open_button)
+        left_layout.addLayout(input_header)
         
         self.input_text: QTextEdit = QTextEdit()
         self.input_text.setPlaceholderText(
@@ -141,6 +734,14 @@ class TextSummarizerApp(QMainWindow):
         self.min_length_spinbox.setValue(50)
         params_layout.addWidget(self.min_length_spinbox)
         
+        # Живой режим: саммари обновляется само, пока пользователь печатает
+        self.live_checkbox: QCheckBox = QCheckBox("⚡ Живой режим")
+        self.live_checkbox.setToolTip(
+            "Сразу показывать предпросмотр и уточнять его после паузы в наборе"
+        )
+        self.live_checkbox.toggled.connect(self.on_live_toggled)
+        params_layout.addWidget(self.live_checkbox)
+        
         params_layout.addStretch()
         params_group.setLayout(params_layout)
         main_layout.addWidget(params_group)
@@ -202,6 +803,24 @@ class TextSummarizerApp(QMainWindow):
         self.copy_button.clicked.connect(self.on_copy_clicked)
         button_layout.addWidget(self.copy_button)
         
+        self.sweep_button: QPushButton = QPushButton("🔬 Сравнить параметры")
+        self.sweep_button.setMinimumHeight(40)
+        self.sweep_button.setStyleSheet(
+            """
+            QPushButton {
+                background-color: #9C27B0;
+                color: white;
+                font-weight: bold;
+                border-radius: 5px;
+            }
+            QPushButton:hover {
+                background-color: #7B1FA2;
+            }
+            """
+        )
+        self.sweep_button.clicked.connect(self.on_sweep_clicked)
+        button_layout.addWidget(self.sweep_button)
+        
         self.exit_button: QPushButton = QPushButton("❌ Выход")
         self.exit_button.setMinimumHeight(40)
         self.exit_button.setStyleSheet(
@@ -222,8 +841,458 @@ class TextSummarizerApp(QMainWindow):
         
         main_layout.addLayout(button_layout)
         
+        # Пакетная обработка берет параметры длины из главной вкладки
+        self.batch_panel: BatchPanel = BatchPanel(
+            lambda: (self.max_length_spinbox.value(), self.min_length_spinbox.value())
+        )
+        tabs.addTab(self.batch_panel, "📦 Пакетная обработка")
+        
+        # История: все саммари хранятся в базе и восстанавливаются без модели
+        self.store: ResultStore = ResultStore()
+        history_widget: QWidget = QWidget()
+        history_layout: QVBoxLayout = QVBoxLayout(history_widget)
+        self.history_search: QLineEdit = QLineEdit()
+        self.history_search.setPlaceholderText("🔍 Поиск по истории...")
+        self.history_search.textChanged.connect(self.refresh_history)
+        history_layout.addWidget(self.history_search)
+        self.history_list: QListWidget = QListWidget()
+        self.history_list.itemClicked.connect(self.on_history_selected)
+        history_layout.addWidget(self.history_list)
+        delete_button: QPushButton = QPushButton("🗑️ Удалить запись")
+        delete_button.clicked.connect(self.on_history_delete_clicked)
+        history_layout.addWidget(delete_button)
+        history_dock: QDockWidget = QDockWidget("🕘 История", self)
+        history_dock.setWidget(history_widget)
+        self.addDockWidget(Qt.DockWidgetArea.LeftDockWidgetArea, history_dock)
+        self.refresh_history()
+        
         # Статус бар
         self.statusBar().showMessage("Готов к работе")
+        
+        # Живой режим: правки откладываются таймером, устаревшие задачи отменяются
+        self._live_timer: QTimer = QTimer(self)
+        self._live_timer.setSingleShot(True)
+        self._live_timer.setInterval(LIVE_DEBOUNCE_MS)
+        self._live_timer.timeout.connect(self.on_live_timeout)
+        self._live_job_id: int = 0
+        self._live_cancel: Optional[threading.Event] = None
+        self._live_text: str = ""
+        self._live_started: float = 0.0
+        self._live_signals: _LiveSignals = _LiveSignals()
+        self._live_signals.preview_ready.connect(self.on_live_preview)
+        self._live_signals.summary_ready.connect(self.on_live_summary)
+        self.input_text.textChanged.connect(self.on_input_changed)
+        self.max_length_spinbox.valueChanged.connect(self.on_input_changed)
+        self.min_length_spinbox.valueChanged.connect(self.on_input_changed)
+        
+        # Открытый большой документ (None - текст редактируется в поле)
+        self.document: Optional[LargeTextFile] = None
+        self._document_started: float = 0.0
+        self._document_signals: _DocumentSignals = _DocumentSignals()
+        self._document_signals.progress.connect(self.on_document_progress)
+        self._document_signals.finished.connect(self.on_document_finished)
+        self._set_document(None)
+    
+    def _set_document(self, document: Optional[LargeTextFile]) -> None:
+        """
+        Что я делаю?
+            Переключаю поле ввода между обычным текстом и постраничным
+            просмотром большого документа (предыдущий документ закрывается).
+        Что я принимаю на вход?
+            document (LargeTextFile | None): Новый документ или None.
+        Что я возвращаю?
+            Ничего.
+        """
+        if self.document is not None:
+            self.document.close()
+        self.document = document
+        large: bool = document is not None
+        for widget in (self.document_label, self.page_spinbox, self.whole_document_checkbox):
+            widget.setVisible(large)
+        self.input_text.setReadOnly(large)
+        if document is None:
+            return
+        
+        self.live_checkbox.setChecked(False)
+        self.document_label.setText(f"📄 {Path(document.path).name} ({document.size / 1024 / 1024:.1f} МБ)")
+        self.page_spinbox.blockSignals(True)
+        self.page_spinbox.setMaximum(document.page_count)
+        self.page_spinbox.setSuffix(f" из {document.page_count}")
+        self.page_spinbox.setValue(1)
+        self.page_spinbox.blockSignals(False)
+        self.on_page_changed(1)
+    
+    def _current_text(self) -> str:
+        """
+        Что я делаю?
+            Возвращаю текст для суммаризации: содержимое поля или начало большого документа.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            str: Текст.
+        """
+        if self.document is not None:
+            return self.document.head()
+        return self.input_text.toPlainText()
+    
+    def _params(self) -> Dict[str, Any]:
+        """
+        Что я делаю?
+            Собираю параметры генерации, под которыми саммари хранится в истории.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            dict: max_length, min_length, num_beams.
+        """
+        return {
+            "max_length": self.max_length_spinbox.value(),
+            "min_length": self.min_length_spinbox.value(),
+            "num_beams": 4,
+        }
+    
+    def _recall(self, text_input: str) -> bool:
+        """
+        Что я делаю?
+            Ищу саммари текста с текущими параметрами в истории и, если оно есть,
+            сразу показываю его.
+        Что я принимаю на вход?
+            text_input (str): Текст.
+        Что я возвращаю?
+            bool: True если саммари восстановлено из истории.
+        """
+        record: Optional[Dict[str, Any]] = self.store.get(hash_text(text_input), self._params())
+        if record is None:
+            return False
+        self.output_text.setPlainText(record["summary"])
+        created: str = time.strftime("%d.%m.%Y %H:%M", time.localtime(record["created"]))
+        self.statusBar().showMessage(
+            f"🕘 Саммари из истории ({created}, генерация заняла {record['seconds']:.1f} с)"
+        )
+        return True
+    
+    def _remember(self, text_input: str, summary: str, seconds: float) -> None:
+        """
+        Что я делаю?
+            Сохраняю саммари в историю и обновляю боковую панель
+            (экстрактивную замену FallbackSummary не сохраняю).
+        Что я принимаю на вход?
+            text_input (str): Исходный текст.
+            summary (str): Саммари.
+            seconds (float): Время генерации.
+        Что я возвращаю?
+            Ничего.
+        """
+        if isinstance(summary, FallbackSummary):
+            return
+        if self.store.put(text_input, self._params(), summary, seconds) is not None:
+            self.refresh_history()
+    
+    @pyqtSlot()
+    def refresh_history(self) -> None:
+        """
+        Что я делаю?
+            Перечитываю историю из базы с учетом строки поиска.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            Ничего.
+        """
+        self.history_list.clear()
+        for record in self.store.search(self.history_search.text(), HISTORY_LIMIT):
+            created: str = time.strftime("%d.%m %H:%M", time.localtime(record["created"]))
+            item: QListWidgetItem = QListWidgetItem(f"{created} · {record['title'][:60]}")
+            params: Dict[str, Any] = record["params"]
+            item.setToolTip(
+                f"{record['summary']}\n\n"
+                f"Длина {params.get('min_length')}–{params.get('max_length')} токенов, "
+                f"{record['characters']} символов, генерация {record['seconds']:.1f} с"
+            )
+            item.setData(Qt.ItemDataRole.UserRole, record)
+            self.history_list.addItem(item)
+    
+    @pyqtSlot(QListWidgetItem)
+    def on_history_selected(self, item: QListWidgetItem) -> None:
+        """
+        Что я делаю?
+            Восстанавливаю выбранную запись истории: текст, параметры и саммари.
+        Что я принимаю на вход?
+            item (QListWidgetItem): Элемент списка истории.
+        Что я возвращаю?
+            Ничего.
+        """
+        record: Dict[str, Any] = item.data(Qt.ItemDataRole.UserRole)
+        text_input: Optional[str] = self.store.text(record["id"])
+        if text_input is not None:
+            self._live_timer.stop()
+            self._cancel_live_job()
+            self._set_document(None)
+            # Поля заполняются без сигналов, чтобы не запускать живой режим
+            for widget, value in (
+                (self.input_text, text_input),
+                (self.max_length_spinbox, record["params"].get("max_length")),
+                (self.min_length_spinbox, record["params"].get("min_length")),
+            ):
+                widget.blockSignals(True)
+                if isinstance(widget, QTextEdit):
+                    widget.setPlainText(value)
+                elif value is not None:
+                    widget.setValue(value)
+                widget.blockSignals(False)
+        self.output_text.setPlainText(record["summary"])
+        self.statusBar().showMessage(f"🕘 Восстановлено из истории: {record['title'][:60]}")
+    
+    @pyqtSlot()
+    def on_history_delete_clicked(self) -> None:
+        """
+        Что я делаю?
+            Удаляю выбранную запись из истории.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            Ничего.
+        """
+        item: Optional[QListWidgetItem] = self.history_list.currentItem()
+        if item is None:
+            return
+        self.store.delete(item.data(Qt.ItemDataRole.UserRole)["id"])
+        self.refresh_history()
+    
+    @pyqtSlot()
+    def on_open_clicked(self) -> None:
+        """
+        Что я делаю?
+            Открываю текстовый файл: небольшой загружаю в поле, большой -
+            отображаю в память и показываю постранично.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            Ничего.
+        """
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Открыть текст", "", "Текстовые файлы (*.txt *.md);;Все файлы (*)"
+        )
+        if path:
+            self.open_file(path)
+    
+    def open_file(self, path: str) -> None:
+        """
+        Что я делаю?
+            Загружаю файл в поле ввода или в режим большого документа.
+        Что я принимаю на вход?
+            path (str): Путь к файлу.
+        Что я возвращаю?
+            Ничего.
+        """
+        try:
+            if Path(path).stat().st_size <= LARGE_FILE_BYTES:
+                text_input: str = Path(path).read_text(encoding="utf-8", errors="replace")
+                self._set_document(None)
+                self.input_text.setPlainText(text_input)
+                self.statusBar().showMessage(f"📂 Загружен {Path(path).name}")
+                return
+            document: LargeTextFile = LargeTextFile(path)
+        except OSError as error:
+            QMessageBox.critical(self, "❌ Ошибка", f"Не удалось открыть файл: {error}")
+            return
+        self._set_document(document)
+        self.statusBar().showMessage(
+            f"📂 Большой документ: {document.page_count} стр., в поле только просматриваемая страница"
+        )
+    
+    @pyqtSlot(int)
+    def on_page_changed(self, page: int) -> None:
+        """
+        Что я делаю?
+            Показываю выбранную страницу большого документа.
+        Что я принимаю на вход?
+            page (int): Номер страницы с единицы.
+        Что я возвращаю?
+            Ничего.
+        """
+        if self.document is not None:
+            self.input_text.setPlainText(self.document.page(page - 1))
+    
+    @pyqtSlot(int, int)
+    def on_document_progress(self, done: int, total: int) -> None:
+        """
+        Что я делаю?
+            Показываю прогресс сжатия большого документа.
+        Что я принимаю на вход?
+            done (int): Обработано фрагментов.
+            total (int): Примерно всего фрагментов.
+        Что я возвращаю?
+            Ничего.
+        """
+        self.statusBar().showMessage(f"⏳ Сжимаю документ: фрагмент {done} из ~{total}")
+    
+    @pyqtSlot(str, bool)
+    def on_document_finished(self, summary: str, from_history: bool) -> None:
+        """
+        Что я делаю?
+            Показываю саммари большого документа и снова разрешаю запуск.
+        Что я принимаю на вход?
+            summary (str): Саммари (пустая строка - ошибка).
+            from_history (bool): Взято ли саммари из истории.
+        Что я возвращаю?
+            Ничего.
+        """
+        self.summarize_button.setEnabled(True)
+        if summary and not summary.startswith("❌"):
+            self.output_text.setPlainText(summary)
+            if from_history:
+                self.statusBar().showMessage("🕘 Саммари документа из истории")
+                return
+            elapsed: float = time.perf_counter() - self._document_started
+            self.statusBar().showMessage(f"✅ Суммаризация документа завершена за {elapsed:.1f} с")
+            self.refresh_history()
+            return
+        QMessageBox.critical(
+            self,
+            "❌ Ошибка",
+            summary or "Не удалось выполнить суммаризацию. Попробуйте позже."
+        )
+        self.statusBar().showMessage("Готов к работе")
+    
+    def _cancel_live_job(self) -> None:
+        """
+        Что я делаю?
+            Отменяю текущую задачу живого режима: генерация прерывается,
+            а ее запоздавшие результаты игнорируются.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            Ничего.
+        """
+        if self._live_cancel is not None:
+            self._live_cancel.set()
+            self._live_cancel = None
+        self._live_job_id += 1
+    
+    @pyqtSlot(bool)
+    def on_live_toggled(self, enabled: bool) -> None:
+        """
+        Что я делаю?
+            Включаю или выключаю живой режим.
+        Что я принимаю на вход?
+            enabled (bool): Состояние флажка.
+        Что я возвращаю?
+            Ничего.
+        """
+        self._live_timer.stop()
+        self._cancel_live_job()
+        if enabled:
+            self._live_timer.start()
+        else:
+            self.statusBar().showMessage("Готов к работе")
+    
+    @pyqtSlot()
+    def on_input_changed(self) -> None:
+        """
+        Что я делаю?
+            Откладываю живую суммаризацию до паузы в наборе и отменяю устаревшую задачу.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            Ничего.
+        """
+        if self.document is not None:
+            return
+        # Уже обработанный текст восстанавливается сразу, без модели и API
+        input_text: str = self.input_text.toPlainText()
+        if validate_text(input_text) and self._recall(input_text):
+            self._live_timer.stop()
+            self._cancel_live_job()
+            return
+        if not self.live_checkbox.isChecked():
+            return
+        self._cancel_live_job()
+        self._live_timer.start()
+    
+    @pyqtSlot()
+    def on_live_timeout(self) -> None:
+        """
+        Что я делаю?
+            Запускаю фоновую задачу живого режима для текущего текста.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            Ничего.
+        """
+        input_text: str = self.input_text.toPlainText()
+        max_len: int = self.max_length_spinbox.value()
+        min_len: int = self.min_length_spinbox.value()
+        if not validate_text(input_text) or min_len > max_len:
+            self.statusBar().showMessage("⚡ Живой режим: нужно минимум 50 символов и мин. ≤ макс. длины")
+            return
+        
+        self._cancel_live_job()
+        cancel_event: threading.Event = threading.Event()
+        self._live_cancel = cancel_event
+        self._live_text = input_text
+        self._live_started = time.perf_counter()
+        threading.Thread(
+            target=_run_live_job,
+            args=(self._live_job_id, input_text, max_len, min_len, cancel_event, self._live_signals),
+            daemon=True,
+        ).start()
+        self.statusBar().showMessage("⚡ Живой режим: готовлю предпросмотр...")
+    
+    @pyqtSlot(int, str)
+    def on_live_preview(self, job_id: int, preview: str) -> None:
+        """
+        Что я делаю?
+            Показываю мгновенный предпросмотр, если задача еще актуальна.
+        Что я принимаю на вход?
+            job_id (int): Номер задачи.
+            preview (str): Предварительное саммари.
+        Что я возвращаю?
+            Ничего.
+        """
+        if job_id != self._live_job_id:
+            return
+        self.output_text.setPlainText(preview)
+        self.statusBar().showMessage("👀 Предпросмотр готов, уточняю саммари моделью...")
+    
+    @pyqtSlot(int, str, bool)
+    def on_live_summary(self, job_id: int, summary: str, fallback: bool) -> None:
+        """
+        Что я делаю?
+            Заменяю предпросмотр уточненным саммари, если задача еще актуальна.
+        Что я принимаю на вход?
+            job_id (int): Номер задачи.
+            summary (str): Абстрактивное саммари.
+            fallback (bool): Это экстрактивная замена (модель была недоступна).
+        Что я возвращаю?
+            Ничего.
+        """
+        if job_id != self._live_job_id:
+            return
+        self._live_cancel = None
+        if fallback:
+            summary = FallbackSummary(summary)
+        self.output_text.setPlainText(summary)
+        self._remember(self._live_text, summary, time.perf_counter() - self._live_started)
+        if fallback:
+            self.statusBar().showMessage("⚠️ Живой режим: модель недоступна, показано экстрактивное саммари")
+        else:
+            self.statusBar().showMessage("✅ Живой режим: саммари обновлено")
+    
+    def closeEvent(self, event: QCloseEvent) -> None:
+        """
+        Что я делаю?
+            Прерываю фоновую генерацию живого режима и пакетную очередь,
+            закрываю большой документ и базу истории при закрытии окна.
+        Что я принимаю на вход?
+            event (QCloseEvent): Событие закрытия.
+        Что я возвращаю?
+            Ничего.
+        """
+        self._live_timer.stop()
+        self._cancel_live_job()
+        self.batch_panel.queue.stop(timeout=0)
+        self._set_document(None)
+        self.store.close()
+        super().closeEvent(event)
     
     @pyqtSlot()
     def on_summarize_clicked(self) -> None:
@@ -245,6 +1314,10 @@ class TextSummarizerApp(QMainWindow):
             )
             return
         
+        if self.document is not None:
+            self.summarize_document()
+            return
+        
         self.statusBar().showMessage("⏳ Суммаризация в процессе...")
         QApplication.processEvents()
         
@@ -260,6 +1333,10 @@ class TextSummarizerApp(QMainWindow):
             self.statusBar().showMessage("Готов к работе")
             return
         
+        if self._recall(input_text):
+            return
+        
+        started: float = time.perf_counter()
         summary: Optional[str] = summarize_text_advanced(
             input_text,
             max_length=max_len,
@@ -269,7 +1346,11 @@ class TextSummarizerApp(QMainWindow):
         
         if summary:
             self.output_text.setPlainText(summary)
-            self.statusBar().showMessage("✅ Суммаризация завершена успешно!")
+            self._remember(input_text, summary, time.perf_counter() - started)
+            if isinstance(summary, FallbackSummary):
+                self.statusBar().showMessage("⚠️ Модель недоступна: показано экстрактивное саммари (в историю не сохранено)")
+            else:
+                self.statusBar().showMessage("✅ Суммаризация завершена успешно!")
         else:
             QMessageBox.critical(
                 self,
@@ -278,6 +1359,67 @@ class TextSummarizerApp(QMainWindow):
             )
             self.statusBar().showMessage("Готов к работе")
     
+    def summarize_document(self) -> None:
+        """
+        Что я делаю?
+            Запускаю суммаризацию большого документа в фоновом потоке,
+            чтобы интерфейс оставался отзывчивым.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            Ничего.
+        """
+        max_len: int = self.max_length_spinbox.value()
+        min_len: int = self.min_length_spinbox.value()
+        if min_len > max_len:
+            QMessageBox.warning(
+                self,
+                "⚠️ Ошибка параметров",
+                "Минимальная длина не может быть больше максимальной!"
+            )
+            return
+        
+        whole_document: bool = self.whole_document_checkbox.isChecked()
+        self.summarize_button.setEnabled(False)
+        self._document_started = time.perf_counter()
+        threading.Thread(
+            target=_run_document_job,
+            args=(self.document, whole_document, max_len, min_len, self.store, self._document_signals),
+            daemon=True,
+        ).start()
+        self.statusBar().showMessage(
+            "⏳ Сжимаю весь документ по фрагментам..." if whole_document
+            else "⏳ Суммаризирую начало документа..."
+        )
+    
+    @pyqtSlot()
+    def on_sweep_clicked(self) -> None:
+        """
+        Что я делаю?
+            Открываю окно сравнения вариантов параметров для текущего текста.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            Ничего.
+        """
+        input_text: str = self._current_text()
+        
+        if not input_text.strip():
+            QMessageBox.warning(
+                self,
+                "⚠️ Ошибка",
+                "Пожалуйста, введите текст для суммаризации!"
+            )
+            return
+        
+        dialog: SweepDialog = SweepDialog(
+            input_text,
+            self.max_length_spinbox.value(),
+            self.min_length_spinbox.value(),
+            self,
+        )
+        dialog.exec()
+    
     @pyqtSlot()
     def on_clear_clicked(self) -> None:
         """
@@ -288,6 +1430,7 @@ class TextSummarizerApp(QMainWindow):
         Что я возвращаю?
             Ничего.
         """
+        self._set_document(None)
         self.input_text.clear()
         self.output_text.clear()
         self.statusBar().showMessage("Готов к работе")
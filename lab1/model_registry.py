@@ -0,0 +1,374 @@
+"""
+Модуль реестра моделей суммаризации с ограничением по памяти.
+
+Держит в памяти несколько моделей одновременно (ключ - идентификатор модели
+и тип данных/квантизация), вытесняет давно не использованную модель (LRU),
+когда новая не помещается в бюджет RAM, и выгружает модели после простоя (TTL).
+Движки остаются в реестре и после выгрузки - выгружаются только веса. Поэтому
+тот, кто держит ссылку на движок, загружает модель заново через тот же
+объект, и реестр учитывает эту загрузку в бюджете и TTL, а не получает вторую
+копию модели. Движки долгоживущих владельцев (сервис) закрепляются (pin)
+и не вытесняются.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from engine import DTYPE_BYTES, SummarizerEngine
+from model_store import DEFAULT_MODEL_NAME, load_pretrained, resolve_model_path
+
+# Бюджет памяти под веса моделей (МБ) и время простоя до выгрузки (секунды)
+DEFAULT_BUDGET_MB: int = int(os.getenv("SUMMARIZER_RAM_BUDGET_MB", "4096"))
+DEFAULT_IDLE_TTL: float = float(os.getenv("SUMMARIZER_MODEL_IDLE_TTL", "900"))
+
+ModelKey = Tuple[str, str]
+
+
+class ModelRegistry:
+    """
+    Что я делаю?
+        Управляю набором загруженных моделей под общим бюджетом памяти.
+    Что я принимаю на вход?
+        budget_mb (int): Бюджет RAM под веса в мегабайтах (0 - без ограничения).
+        idle_ttl (float): Через сколько секунд простоя выгружать модель (0 - никогда).
+        loader (Callable): Функция загрузки модели и токенизатора.
+        device (str | None): Устройство для моделей; None - cuda если доступна.
+    Что я возвращаю?
+        Ничего - объект реестра.
+    """
+
+    def __init__(
+        self,
+        budget_mb: int = DEFAULT_BUDGET_MB,
+        idle_ttl: float = DEFAULT_IDLE_TTL,
+        loader: Callable[..., Tuple[Any, Any]] = load_pretrained,
+        device: Optional[str] = None,
+    ) -> None:
+        self.budget_bytes: int = budget_mb * 1024 * 1024
+        self.idle_ttl: float = idle_ttl
+        self.device: Optional[str] = device
+        self._loader: Callable[..., Tuple[Any, Any]] = loader
+        self._engines: "OrderedDict[ModelKey, SummarizerEngine]" = OrderedDict()
+        # Размеры уже загружавшихся моделей - точная оценка для следующей загрузки
+        self._known_sizes: Dict[ModelKey, int] = {}
+        self._lock: threading.RLock = threading.RLock()
+        # Закрепленные движки: ключ -> число владельцев
+        self._pins: Dict[ModelKey, int] = {}
+        self._reaper: Optional[threading.Thread] = None
+
+    def get_engine(
+        self, model_id: str = DEFAULT_MODEL_NAME, dtype: str = "float32", load: bool = True
+    ) -> SummarizerEngine:
+        """
+        Что я делаю?
+            Возвращаю движок модели и загружаю ее, освобождая место по LRU.
+            Блокировка реестра не удерживается во время загрузки, поэтому
+            разные модели грузятся параллельно, а одна и та же - один раз.
+        Что я принимаю на вход?
+            model_id (str): Идентификатор модели.
+            dtype (str): Тип весов: float32, float16, bfloat16 или int8.
+            load (bool): Загрузить модель сейчас (False - только создать движок,
+                модель загрузится при первой генерации или явном load()).
+        Что я возвращаю?
+            SummarizerEngine: Движок (с загруженной моделью, если load=True).
+
+        Raises:
+            ValueError: Если тип данных не поддерживается.
+        """
+        key: ModelKey = (model_id, dtype)
+        self.evict_idle()
+
+        victims: List[SummarizerEngine] = []
+        with self._lock:
+            engine: Optional[SummarizerEngine] = self._engines.get(key)
+            if engine is None:
+                engine = SummarizerEngine(model_id, dtype, device=self.device, loader=self._loader)
+                # Любая загрузка модели этого движка, в том числе повторная, проходит через реестр
+                engine.on_load = self._loaded
+                self._engines[key] = engine
+            if load and not engine.is_loaded:
+                victims = self._make_room(self._estimate_size(key), keep=key)
+            engine.last_used = time.monotonic()
+            self._engines.move_to_end(key)
+        self._unload_engines(victims)
+
+        if load:
+            engine.load()
+        return engine
+
+    def _loaded(self, engine: SummarizerEngine) -> None:
+        """
+        Что я делаю?
+            Учитываю загрузку модели движка реестра: запоминаю ее размер
+            и вытесняю другие модели, если бюджет превышен.
+        Что я принимаю на вход?
+            engine (SummarizerEngine): Движок, только что загрузивший модель.
+        Что я возвращаю?
+            Ничего.
+        """
+        key: ModelKey = (engine.model_name, engine.dtype)
+        with self._lock:
+            self._known_sizes[key] = engine.size_bytes
+            if key in self._engines:
+                self._engines.move_to_end(key)
+            victims: List[SummarizerEngine] = self._make_room(0, keep=key)
+        self._unload_engines(victims)
+
+    def pin(self, model_id: str = DEFAULT_MODEL_NAME, dtype: str = "float32") -> SummarizerEngine:
+        """
+        Что я делаю?
+            Закрепляю движок за долгоживущим владельцем (сервис, батчер): его модель
+            не вытесняется ни по LRU, ни по простою. Модель не загружается.
+        Что я принимаю на вход?
+            model_id (str): Идентификатор модели.
+            dtype (str): Тип весов.
+        Что я возвращаю?
+            SummarizerEngine: Закрепленный движок.
+        """
+        # Движки не удаляются из реестра, поэтому закрепить можно после get_engine
+        engine: SummarizerEngine = self.get_engine(model_id, dtype, load=False)
+        key: ModelKey = (model_id, dtype)
+        with self._lock:
+            self._pins[key] = self._pins.get(key, 0) + 1
+        return engine
+
+    def unpin(self, model_id: str = DEFAULT_MODEL_NAME, dtype: str = "float32") -> None:
+        """
+        Что я делаю?
+            Снимаю одно закрепление движка.
+        Что я принимаю на вход?
+            model_id (str): Идентификатор модели.
+            dtype (str): Тип весов.
+        Что я возвращаю?
+            Ничего.
+        """
+        key: ModelKey = (model_id, dtype)
+        with self._lock:
+            if self._pins.get(key, 0) <= 1:
+                self._pins.pop(key, None)
+            else:
+                self._pins[key] -= 1
+
+    def get(self, model_id: str = DEFAULT_MODEL_NAME, dtype: str = "float32") -> Tuple[Any, Any]:
+        """
+        Что я делаю?
+            Возвращаю модель и токенизатор (загружаю при необходимости).
+        Что я принимаю на вход?
+            model_id (str): Идентификатор модели.
+            dtype (str): Тип весов.
+        Что я возвращаю?
+            tuple: (model, tokenizer)
+        """
+        return self.get_engine(model_id, dtype).load()
+
+    def peek_engine(self, model_id: str = DEFAULT_MODEL_NAME, dtype: str = "float32") -> Optional[SummarizerEngine]:
+        """
+        Что я делаю?
+            Возвращаю уже созданный движок, ничего не загружая (для оценки очереди).
+        Что я принимаю на вход?
+            model_id (str): Идентификатор модели.
+            dtype (str): Тип весов.
+        Что я возвращаю?
+            Optional[SummarizerEngine]: Движок или None, если модель еще не запрашивали.
+        """
+        with self._lock:
+            return self._engines.get((model_id, dtype))
+
+    def _estimate_size(self, key: ModelKey) -> int:
+        """
+        Что я делаю?
+            Оцениваю размер модели до загрузки: по прошлому замеру
+            или по размеру файлов весов на диске.
+        Что я принимаю на вход?
+            key (ModelKey): (model_id, dtype).
+        Что я возвращаю?
+            int: Оценка в байтах (0 если оценить нельзя).
+        """
+        if key in self._known_sizes:
+            return self._known_sizes[key]
+
+        model_id, dtype = key
+        try:
+            model_path: Path = Path(resolve_model_path(model_id))
+        except Exception:
+            return 0
+        if not model_path.is_dir():
+            return 0
+
+        weights_bytes: int = sum(
+            path.stat().st_size for path in model_path.iterdir()
+            if path.suffix in (".safetensors", ".bin")
+        )
+        # Чекпоинты хранятся во float32
+        return weights_bytes * DTYPE_BYTES[dtype] // DTYPE_BYTES["float32"]
+
+    def _used_bytes(self) -> int:
+        """
+        Что я делаю?
+            Считаю суммарную память всех загруженных моделей.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            int: Байты.
+        """
+        return sum(engine.size_bytes for engine in self._engines.values() if engine.is_loaded)
+
+    def _make_room(self, incoming_bytes: int, keep: Optional[ModelKey] = None) -> List[SummarizerEngine]:
+        """
+        Что я делаю?
+            Выбираю давно не использованные модели, которые нужно вытеснить, чтобы
+            новая поместилась в бюджет. Вызывается под блокировкой реестра; сама
+            выгрузка ждет текущую генерацию, поэтому выполняется уже без
+            блокировки (_unload_engines).
+        Что я принимаю на вход?
+            incoming_bytes (int): Сколько памяти нужно дополнительно.
+            keep (ModelKey | None): Модель, которую вытеснять нельзя.
+        Что я возвращаю?
+            List[SummarizerEngine]: Движки для выгрузки.
+        """
+        if self.budget_bytes <= 0:
+            return []
+
+        used: int = self._used_bytes()
+        victims: List[ModelKey] = []
+        for key, engine in self._engines.items():
+            if used + incoming_bytes <= self.budget_bytes:
+                break
+            # Загружающуюся модель не трогаем: ее размер станет известен после загрузки
+            if key == keep or key in self._pins or not engine.is_loaded or engine.is_loading:
+                continue
+            victims.append(key)
+            used -= engine.size_bytes
+
+        if used + incoming_bytes > self.budget_bytes:
+            print(
+                f"⚠️ Модель не помещается в бюджет "
+                f"{self.budget_bytes / 2**20:.0f} МБ, загружаю сверх лимита"
+            )
+        return [self._engines[key] for key in victims]
+
+    @staticmethod
+    def _unload_engines(engines: List[SummarizerEngine]) -> None:
+        """
+        Что я делаю?
+            Выгружаю вытесненные движки (без блокировки реестра).
+        Что я принимаю на вход?
+            engines (List[SummarizerEngine]): Движки.
+        Что я возвращаю?
+            Ничего.
+        """
+        for engine in engines:
+            engine.unload()
+
+    def unload(self, model_id: str, dtype: str = "float32") -> bool:
+        """
+        Что я делаю?
+            Выгружаю модель из памяти; движок остается в реестре.
+        Что я принимаю на вход?
+            model_id (str): Идентификатор модели.
+            dtype (str): Тип весов.
+        Что я возвращаю?
+            bool: True если модель была загружена.
+        """
+        with self._lock:
+            engine: Optional[SummarizerEngine] = self._engines.get((model_id, dtype))
+        if engine is None:
+            return False
+        return engine.unload()
+
+    def evict_idle(self) -> List[ModelKey]:
+        """
+        Что я делаю?
+            Выгружаю модели, которые не использовались дольше idle_ttl
+            (кроме закрепленных и загружающихся).
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            List[ModelKey]: Ключи выгруженных моделей.
+        """
+        if self.idle_ttl <= 0:
+            return []
+
+        now: float = time.monotonic()
+        with self._lock:
+            expired: List[ModelKey] = [
+                key for key, engine in self._engines.items()
+                if now - engine.last_used > self.idle_ttl
+                and engine.is_loaded and not engine.is_loading and key not in self._pins
+            ]
+            victims: List[SummarizerEngine] = [self._engines[key] for key in expired]
+        # Выгрузка ждет текущую генерацию - без блокировки, чтобы не задерживать get_engine()
+        self._unload_engines(victims)
+        return expired
+
+    def start_idle_reaper(self, interval: float = 60.0) -> None:
+        """
+        Что я делаю?
+            Запускаю фоновый поток, который периодически выгружает простаивающие модели.
+        Что я принимаю на вход?
+            interval (float): Период проверки в секундах.
+        Что я возвращаю?
+            Ничего.
+        """
+        if self._reaper is not None or self.idle_ttl <= 0:
+            return
+
+        def _reap() -> None:
+            while True:
+                time.sleep(interval)
+                self.evict_idle()
+
+        self._reaper = threading.Thread(target=_reap, name="model-idle-reaper", daemon=True)
+        self._reaper.start()
+
+    def resident(self) -> List[Dict[str, Any]]:
+        """
+        Что я делаю?
+            Описываю загруженные модели в порядке от давно использованной к свежей.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            List[dict]: model_id, dtype, size_mb, idle_seconds.
+        """
+        now: float = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "model_id": model_id,
+                    "dtype": dtype,
+                    "size_mb": engine.size_bytes / 2**20,
+                    "idle_seconds": now - engine.last_used,
+                }
+                for (model_id, dtype), engine in self._engines.items()
+                if engine.is_loaded
+            ]
+
+
+_default_registry: Optional[ModelRegistry] = None
+_default_registry_lock: threading.Lock = threading.Lock()
+
+
+def get_default_registry() -> ModelRegistry:
+    """
+    Что я делаю?
+        Возвращаю общий реестр моделей процесса (создаю при первом обращении).
+    Что я принимаю на вход?
+        Ничего.
+    Что я возвращаю?
+        ModelRegistry: Реестр по умолчанию с фоновой выгрузкой простаивающих моделей.
+    """
+    global _default_registry
+    registry: Optional[ModelRegistry] = _default_registry
+    if registry is None:
+        with _default_registry_lock:
+            registry = _default_registry
+            if registry is None:
+                # Публикую реестр только с запущенной выгрузкой, чтобы второй поток не создал свой
+                registry = ModelRegistry()
+                registry.start_idle_reaper()
+                _default_registry = registry
+    return registry
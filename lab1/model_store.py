@@ -0,0 +1,279 @@
+"""
+Модуль для разрешения и загрузки локальной модели без обращений к Hugging Face Hub.
+
+Позволяет указать локальный каталог с моделью (переменная SUMMARIZER_MODEL_DIR)
+или включить офлайн-режим (SUMMARIZER_OFFLINE=1). В обоих случаях transformers
+читает файлы только с диска, без сетевых таймаутов при старте.
+Контрольные суммы файлов модели проверяются один раз, время загрузки записывается.
+
+Важно: модуль нужно импортировать раньше transformers, чтобы переменные
+HF_HUB_OFFLINE / TRANSFORMERS_OFFLINE вступили в силу.
+"""
+
+import hashlib
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+DEFAULT_MODEL_NAME: str = "IlyaGusev/rugpt3medium_sum_gazeta"
+
+# Каталог с локальной копией модели (или корень с подкаталогами моделей)
+MODEL_DIR: str = os.getenv("SUMMARIZER_MODEL_DIR", "").strip()
+# Офлайн-режим включается явно или автоматически, если задан MODEL_DIR
+OFFLINE_MODE: bool = (
+    os.getenv("SUMMARIZER_OFFLINE", "").strip().lower() in ("1", "true", "yes")
+    or bool(MODEL_DIR)
+)
+
+CHECKSUM_MANIFEST: str = "checksums.sha256"
+_CHECKSUM_STAMP: str = ".checksums.ok"
+_WEIGHT_SUFFIXES: Tuple[str, ...] = (".safetensors", ".bin", ".json", ".txt", ".model")
+
+if OFFLINE_MODE:
+    # Запрещаем huggingface_hub любые сетевые запросы
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+    os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+
+# Пути, которые уже прошли проверку в этом процессе
+_verified_paths: Set[str] = set()
+# Тайминги последней загрузки для каждой модели
+_load_timings: Dict[str, Dict[str, float]] = {}
+
+
+def resolve_model_path(model_name: str = DEFAULT_MODEL_NAME) -> str:
+    """
+    Что я делаю?
+        Определяю, откуда грузить модель: из локального каталога, из снимка
+        в кеше Hugging Face (офлайн-режим) или по имени через Hub.
+    Что я принимаю на вход?
+        model_name (str): Идентификатор модели на Hugging Face.
+    Что я возвращаю?
+        str: Путь к каталогу модели или исходный идентификатор.
+
+    Raises:
+        ValueError: Если задан SUMMARIZER_MODEL_DIR, но модель в нем не найдена.
+    """
+    if not MODEL_DIR:
+        if OFFLINE_MODE:
+            # Берем снимок из локального кеша Hugging Face без сетевых запросов
+            from huggingface_hub import snapshot_download
+            return snapshot_download(model_name, local_files_only=True)
+        return model_name
+
+    root: Path = Path(MODEL_DIR).expanduser()
+    short_name: str = model_name.split("/")[-1]
+    candidates: List[Path] = [
+        root / short_name,
+        root / model_name.replace("/", "--"),
+        root / model_name,
+        root,
+    ]
+    for candidate in candidates:
+        if (candidate / "config.json").is_file():
+            return str(candidate)
+
+    raise ValueError(
+        f"❌ Модель {model_name} не найдена в каталоге {root}! "
+        f"Ожидается подкаталог {short_name} с файлом config.json"
+    )
+
+
+def _model_files(model_dir: Path) -> List[Path]:
+    """
+    Что я делаю?
+        Собираю список файлов модели, которые нужно контролировать.
+    Что я принимаю на вход?
+        model_dir (Path): Каталог модели.
+    Что я возвращаю?
+        List[Path]: Отсортированный список файлов.
+    """
+    return sorted(
+        path for path in model_dir.iterdir()
+        if path.is_file() and path.suffix in _WEIGHT_SUFFIXES
+    )
+
+
+def _sha256(path: Path) -> str:
+    """
+    Что я делаю?
+        Считаю SHA-256 файла блоками, чтобы не читать веса целиком в память.
+    Что я принимаю на вход?
+        path (Path): Путь к файлу.
+    Что я возвращаю?
+        str: Хеш в шестнадцатеричном виде.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _files_fingerprint(files: List[Path]) -> str:
+    """
+    Что я делаю?
+        Строю дешевый отпечаток файлов по размеру и времени изменения.
+    Что я принимаю на вход?
+        files (List[Path]): Файлы модели.
+    Что я возвращаю?
+        str: Отпечаток, по которому видно, что файлы не менялись.
+    """
+    parts: List[str] = []
+    for path in files:
+        stat = path.stat()
+        parts.append(f"{path.name}:{stat.st_size}:{stat.st_mtime_ns}")
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+
+def verify_checksums(model_path: str) -> bool:
+    """
+    Что я делаю?
+        Проверяю SHA-256 файлов модели по манифесту checksums.sha256 (формат sha256sum).
+        Если манифеста нет - создаю его (доверие при первом использовании).
+        Полный пересчет хешей выполняется один раз: результат запоминается
+        в процессе и в файле-отметке, пока размер и время изменения файлов те же.
+    Что я принимаю на вход?
+        model_path (str): Каталог модели.
+    Что я возвращаю?
+        bool: True если проверка выполнялась (False - путь не является каталогом).
+
+    Raises:
+        ValueError: Если хеш какого-либо файла не совпадает с манифестом.
+    """
+    model_dir: Path = Path(model_path)
+    if not model_dir.is_dir():
+        return False
+    if str(model_dir) in _verified_paths:
+        return True
+
+    manifest_path: Path = model_dir / CHECKSUM_MANIFEST
+    stamp_path: Path = model_dir / _CHECKSUM_STAMP
+    files: List[Path] = _model_files(model_dir)
+    fingerprint: str = _files_fingerprint(files)
+
+    if manifest_path.exists() and stamp_path.exists():
+        if stamp_path.read_text(encoding="utf-8").strip() == fingerprint:
+            _verified_paths.add(str(model_dir))
+            return True
+
+    actual: Dict[str, str] = {path.name: _sha256(path) for path in files}
+
+    if manifest_path.exists():
+        expected: Dict[str, str] = {}
+        for line in manifest_path.read_text(encoding="utf-8").splitlines():
+            if line.strip():
+                digest, name = line.split(maxsplit=1)
+                expected[name.lstrip("*")] = digest
+        for name, digest in expected.items():
+            if actual.get(name) != digest:
+                raise ValueError(
+                    f"❌ Контрольная сумма не совпадает для {name} в {model_dir}! "
+                    "Файлы модели повреждены или подменены."
+                )
+    else:
+        try:
+            manifest_path.write_text(
+                "".join(f"{digest}  {name}\n" for name, digest in actual.items()),
+                encoding="utf-8",
+            )
+        except OSError:
+            # Каталог только для чтения - проверка останется в пределах процесса
+            pass
+
+    try:
+        stamp_path.write_text(fingerprint, encoding="utf-8")
+    except OSError:
+        pass
+
+    _verified_paths.add(str(model_dir))
+    return True
+
+
+def load_pretrained(
+    model_name: str = DEFAULT_MODEL_NAME,
+    **model_kwargs: Any,
+) -> Tuple[Any, Any]:
+    """
+    Что я делаю?
+        Загружаю токенизатор и модель строго с диска (в офлайн-режиме),
+        проверяю контрольные суммы и записываю время каждого этапа.
+    Что я принимаю на вход?
+        model_name (str): Идентификатор модели.
+        **model_kwargs: Дополнительные аргументы для from_pretrained модели.
+    Что я возвращаю?
+        tuple: (model, tokenizer)
+    """
+    from transformers import AutoTokenizer, AutoModelForCausalLM
+
+    timings: Dict[str, float] = {}
+    started: float = time.perf_counter()
+
+    stage_start: float = time.perf_counter()
+    model_path: str = resolve_model_path(model_name)
+    timings["resolve"] = time.perf_counter() - stage_start
+
+    stage_start = time.perf_counter()
+    verify_checksums(model_path)
+    timings["verify"] = time.perf_counter() - stage_start
+
+    stage_start = time.perf_counter()
+    tokenizer = AutoTokenizer.from_pretrained(model_path, local_files_only=OFFLINE_MODE)
+    timings["tokenizer"] = time.perf_counter() - stage_start
+
+    stage_start = time.perf_counter()
+    model = AutoModelForCausalLM.from_pretrained(
+        model_path,
+        local_files_only=OFFLINE_MODE,
+        **model_kwargs,
+    )
+    timings["model"] = time.perf_counter() - stage_start
+
+    timings["total"] = time.perf_counter() - started
+    _load_timings[model_name] = timings
+    return model, tokenizer
+
+
+def load_tokenizer(model_name: str = DEFAULT_MODEL_NAME) -> Any:
+    """
+    Что я делаю?
+        Загружаю только токенизатор - без весов модели и без проверки
+        контрольных сумм (она выполняется при загрузке самой модели).
+    Что я принимаю на вход?
+        model_name (str): Идентификатор модели.
+    Что я возвращаю?
+        Токенизатор модели.
+    """
+    from transformers import AutoTokenizer
+
+    return AutoTokenizer.from_pretrained(resolve_model_path(model_name), local_files_only=OFFLINE_MODE)
+
+
+def record_load_timing(model_name: str, stage: str, seconds: float) -> None:
+    """
+    Что я делаю?
+        Добавляю время дополнительного этапа загрузки (например, переноса на устройство).
+    Что я принимаю на вход?
+        model_name (str): Идентификатор модели.
+        stage (str): Название этапа.
+        seconds (float): Длительность в секундах.
+    Что я возвращаю?
+        Ничего.
+    """
+    timings: Dict[str, float] = _load_timings.setdefault(model_name, {})
+    timings[stage] = seconds
+    timings["total"] = timings.get("total", 0.0) + seconds
+
+
+def get_load_timings(model_name: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Что я делаю?
+        Возвращаю записанные тайминги загрузки моделей.
+    Что я принимаю на вход?
+        model_name (str | None): Модель; если None - тайминги всех моделей.
+    Что я возвращаю?
+        dict: Копия таймингов в секундах по этапам.
+    """
+    if model_name is not None:
+        return dict(_load_timings.get(model_name, {}))
+    return {name: dict(timings) for name, timings in _load_timings.items()}
@@ -0,0 +1,234 @@
+"""
+Модуль повторного использования саммари для почти одинаковых текстов.
+
+Новостные ленты содержат много перепечаток одной заметки с мелкими правками.
+Точный хеш текста их не находит, поэтому индекс строит MinHash-подписи
+по шинглам нормализованного текста и ищет похожие документы через LSH
+(разбиение подписи на полосы). Если найден документ с оценкой сходства
+Жаккара не ниже порога и с теми же параметрами генерации - возвращается
+его саммари без новой генерации.
+"""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+
+import numpy as np
+
+# Простое число больше 2^32 для универсального хеширования
+_MERSENNE_PRIME: int = 4294967311
+_WORD_RE = re.compile(r"[а-яa-z0-9]+")
+
+
+def normalize_text(text: str) -> List[str]:
+    """
+    Что я делаю?
+        Привожу текст к списку слов: нижний регистр, ё -> е, без пунктуации.
+    Что я принимаю на вход?
+        text (str): Исходный текст.
+    Что я возвращаю?
+        List[str]: Нормализованные слова.
+    """
+    return _WORD_RE.findall(text.lower().replace("ё", "е"))
+
+
+def shingles(text: str, size: int = 3) -> Set[str]:
+    """
+    Что я делаю?
+        Строю множество словесных шинглов (n-грамм) нормализованного текста.
+    Что я принимаю на вход?
+        text (str): Исходный текст.
+        size (int): Число слов в шингле.
+    Что я возвращаю?
+        Set[str]: Шинглы.
+    """
+    words: List[str] = normalize_text(text)
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def jaccard(first: Set[str], second: Set[str]) -> float:
+    """
+    Что я делаю?
+        Считаю точный коэффициент Жаккара двух множеств шинглов.
+    Что я принимаю на вход?
+        first, second (Set[str]): Множества.
+    Что я возвращаю?
+        float: Сходство от 0 до 1.
+    """
+    if not first and not second:
+        return 1.0
+    return len(first & second) / len(first | second)
+
+
+def choose_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """
+    Что я делаю?
+        Подбираю число полос b и строк r (b * r = num_perm), чтобы порог
+        срабатывания LSH (1/b)^(1/r) был чуть ниже заданного: так кандидатов
+        больше (выше полнота), а лишние отсекает проверка по подписи.
+    Что я принимаю на вход?
+        num_perm (int): Длина MinHash-подписи.
+        threshold (float): Целевой порог сходства Жаккара.
+    Что я возвращаю?
+        tuple: (bands, rows)
+    """
+    best: Tuple[int, int] = (num_perm, 1)
+    best_gap: float = float("inf")
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands: int = num_perm // rows
+        lsh_threshold: float = (1.0 / bands) ** (1.0 / rows)
+        gap: float = threshold - lsh_threshold
+        if 0.0 <= gap < best_gap:
+            best, best_gap = (bands, rows), gap
+    return best
+
+
+class NearDuplicateIndex:
+    """
+    Что я делаю?
+        Храню саммари уже обработанных текстов и нахожу почти одинаковые тексты.
+    Что я принимаю на вход?
+        threshold (float): Минимальное сходство Жаккара для повторного использования.
+        num_perm (int): Длина MinHash-подписи.
+        max_entries (int): Предельный размер индекса (старые записи вытесняются).
+        shingle_size (int): Число слов в шингле.
+        seed (int): Зерно для хеш-функций (подписи стабильны между запусками).
+    Что я возвращаю?
+        Ничего - объект индекса.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.9,
+        num_perm: int = 128,
+        max_entries: int = 10000,
+        shingle_size: int = 3,
+        seed: int = 1,
+    ) -> None:
+        self.threshold: float = threshold
+        self.num_perm: int = num_perm
+        self.max_entries: int = max_entries
+        self.shingle_size: int = shingle_size
+        self.bands, self.rows = choose_bands(num_perm, threshold)
+        self.hits: int = 0
+        self.misses: int = 0
+
+        rng: np.random.Generator = np.random.default_rng(seed)
+        # a < 2^31 и x < 2^32, поэтому a * x + b помещается в uint64 без переполнения
+        self._a: np.ndarray = rng.integers(1, 2**31, size=num_perm, dtype=np.uint64)
+        self._b: np.ndarray = rng.integers(0, 2**32, size=num_perm, dtype=np.uint64)
+
+        self._entries: "OrderedDict[int, Tuple[Hashable, np.ndarray, str]]" = OrderedDict()
+        self._buckets: Dict[Tuple[Hashable, int, bytes], Set[int]] = {}
+        self._next_id: int = 0
+        self._lock: threading.Lock = threading.Lock()
+
+    def signature(self, text: str) -> np.ndarray:
+        """
+        Что я делаю?
+            Считаю MinHash-подпись текста (векторно по всем хеш-функциям сразу).
+        Что я принимаю на вход?
+            text (str): Исходный текст.
+        Что я возвращаю?
+            np.ndarray: Подпись длины num_perm.
+        """
+        hashed: np.ndarray = np.array(
+            [
+                int.from_bytes(hashlib.blake2b(item.encode("utf-8"), digest_size=4).digest(), "little")
+                for item in shingles(text, self.shingle_size)
+            ] or [0],
+            dtype=np.uint64,
+        )
+        permuted: np.ndarray = (self._a[:, None] * hashed[None, :] + self._b[:, None]) % _MERSENNE_PRIME
+        return permuted.min(axis=1)
+
+    def _band_keys(self, params_key: Hashable, signature: np.ndarray) -> List[Tuple[Hashable, int, bytes]]:
+        """
+        Что я делаю?
+            Режу подпись на полосы и строю ключи корзин LSH.
+        Что я принимаю на вход?
+            params_key (Hashable): Параметры генерации (разные параметры не смешиваются).
+            signature (np.ndarray): MinHash-подпись.
+        Что я возвращаю?
+            List[tuple]: Ключи корзин.
+        """
+        return [
+            (params_key, band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+            for band in range(self.bands)
+        ]
+
+    def lookup(self, text: str, params_key: Hashable) -> Optional[str]:
+        """
+        Что я делаю?
+            Ищу саммари почти такого же текста с теми же параметрами.
+        Что я принимаю на вход?
+            text (str): Новый текст.
+            params_key (Hashable): Параметры генерации.
+        Что я возвращаю?
+            Optional[str]: Сохраненное саммари или None.
+        """
+        signature: np.ndarray = self.signature(text)
+        with self._lock:
+            candidates: Set[int] = set()
+            for key in self._band_keys(params_key, signature):
+                candidates |= self._buckets.get(key, set())
+
+            best_id: Optional[int] = None
+            best_similarity: float = self.threshold
+            for entry_id in candidates:
+                _, stored_signature, _ = self._entries[entry_id]
+                similarity: float = float(np.mean(stored_signature == signature))
+                if similarity >= best_similarity:
+                    best_id, best_similarity = entry_id, similarity
+
+            if best_id is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._entries.move_to_end(best_id)
+            return self._entries[best_id][2]
+
+    def add(self, text: str, params_key: Hashable, summary: str) -> None:
+        """
+        Что я делаю?
+            Добавляю саммари текста в индекс, вытесняя самые старые записи.
+        Что я принимаю на вход?
+            text (str): Исходный текст.
+            params_key (Hashable): Параметры генерации.
+            summary (str): Готовое саммари.
+        Что я возвращаю?
+            Ничего.
+        """
+        signature: np.ndarray = self.signature(text)
+        with self._lock:
+            entry_id: int = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (params_key, signature, summary)
+            for key in self._band_keys(params_key, signature):
+                self._buckets.setdefault(key, set()).add(entry_id)
+
+            while len(self._entries) > self.max_entries:
+                old_id, (old_params, old_signature, _) = self._entries.popitem(last=False)
+                for key in self._band_keys(old_params, old_signature):
+                    bucket: Set[int] = self._buckets.get(key, set())
+                    bucket.discard(old_id)
+                    if not bucket:
+                        self._buckets.pop(key, None)
+
+    def __len__(self) -> int:
+        """
+        Что я делаю?
+            Сообщаю число записей в индексе.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            int: Число записей.
+        """
+        return len(self._entries)
@@ -0,0 +1,189 @@
+"""
+Модуль предварительной проверки текста без загрузки модели.
+
+Использует только токенизатор (загружается лениво и кешируется отдельно
+от модели), поэтому ответ приходит за миллисекунды: точное число токенов,
+будет ли вход обрезан на MAX_INPUT_TOKENS и сколько примерно займет
+генерация по откалиброванной модели стоимости (cost_model.py).
+Планировщики и GUI могут решать до того, как тратить время на генерацию.
+
+Пример:
+    python preflight.py "Текст статьи..." --num-beams 4
+    python preflight.py --calibrate
+"""
+
+import argparse
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from model_store import DEFAULT_MODEL_NAME, load_tokenizer
+from cost_model import COST_MODEL_PATH, CostModel, cost_model
+from engine import MAX_INPUT_TOKENS
+
+# Минимальная длина текста в символах (как в validate_text)
+MINIMUM_CHARACTERS: int = 50
+
+_tokenizers: Dict[str, Any] = {}
+_tokenizers_lock: threading.Lock = threading.Lock()
+
+
+def get_tokenizer(model_name: str = DEFAULT_MODEL_NAME) -> Any:
+    """
+    Что я делаю?
+        Возвращаю токенизатор модели, загружая его один раз на процесс.
+    Что я принимаю на вход?
+        model_name (str): Идентификатор модели.
+    Что я возвращаю?
+        Токенизатор.
+    """
+    tokenizer: Any = _tokenizers.get(model_name)
+    if tokenizer is None:
+        with _tokenizers_lock:
+            tokenizer = _tokenizers.get(model_name)
+            if tokenizer is None:
+                tokenizer = _tokenizers[model_name] = load_tokenizer(model_name)
+    return tokenizer
+
+
+def preflight(
+    text_input: str,
+    max_length: int = 150,
+    min_length: int = 50,
+    num_beams: int = 1,
+    input_token_budget: Optional[int] = None,
+    model_name: str = DEFAULT_MODEL_NAME,
+    model: Optional[CostModel] = None,
+) -> Dict[str, Any]:
+    """
+    Что я делаю?
+        Считаю токены входа, проверяю обрезку и оцениваю время генерации.
+    Что я принимаю на вход?
+        text_input (str): Исходный текст.
+        max_length (int): Максимум новых токенов.
+        min_length (int): Минимум новых токенов.
+        num_beams (int): Число лучей.
+        input_token_budget (int | None): Бюджет экстрактивного предсжатия.
+        model_name (str): Идентификатор модели (чей токенизатор использовать).
+        model (CostModel | None): Модель стоимости; None - общая модель процесса.
+    Что я возвращаю?
+        dict:
+            valid - текст не короче минимума;
+            characters, input_tokens - длина текста (токены - вместе с sep_token);
+            model_input_tokens - сколько токенов реально получит модель (с sep_token);
+            truncated, dropped_tokens - обрежется ли вход и насколько;
+            expected_output_tokens - типичная длина саммари;
+            estimated_seconds, worst_case_seconds - оценка времени генерации
+                (типичная и при max_length новых токенов);
+            calibrated - откалибрована ли модель стоимости.
+    """
+    model = model or cost_model
+    tokenizer: Any = get_tokenizer(model_name)
+    # Движок обрезает до MAX_INPUT_TOKENS сам текст, а sep_token добавляет уже после обрезки
+    text_tokens: int = len(tokenizer(text_input, add_special_tokens=False)["input_ids"])
+
+    budget: int = min(input_token_budget, MAX_INPUT_TOKENS) if input_token_budget else MAX_INPUT_TOKENS
+    # +1 - sep_token, который движок добавляет после текста
+    model_input_tokens: int = min(text_tokens, budget) + 1
+    # Предсжатие убирает предложения целиком, обрезается только то, что не влезло в лимит
+    truncated: bool = text_tokens > MAX_INPUT_TOKENS and not input_token_budget
+    expected_output: int = model.expected_output_tokens(max_length, min_length)
+
+    return {
+        "valid": len(text_input.strip()) >= MINIMUM_CHARACTERS,
+        "characters": len(text_input),
+        "input_tokens": text_tokens + 1,
+        "model_input_tokens": model_input_tokens,
+        "truncated": truncated,
+        "dropped_tokens": text_tokens - MAX_INPUT_TOKENS if truncated else 0,
+        "precompressed": bool(input_token_budget) and text_tokens > budget,
+        "expected_output_tokens": expected_output,
+        "estimated_seconds": model.predict(model_input_tokens, expected_output, num_beams),
+        "worst_case_seconds": model.predict(model_input_tokens, max_length, num_beams),
+        "calibrated": model.calibrated,
+    }
+
+
+def calibrate(
+    model_name: str = DEFAULT_MODEL_NAME,
+    dtype: str = "float32",
+    repeats: int = 1,
+) -> CostModel:
+    """
+    Что я делаю?
+        Калибрую модель стоимости: прогоняю генерации с разной длиной входа,
+        выхода и числом лучей и подбираю коэффициенты.
+    Что я принимаю на вход?
+        model_name (str): Идентификатор модели.
+        dtype (str): Тип весов.
+        repeats (int): Повторов каждой точки сетки.
+    Что я возвращаю?
+        CostModel: Откалиброванная модель (общая модель процесса тоже обновляется).
+    """
+    from engine import get_default_engine
+
+    engine = get_default_engine(model_name, dtype)
+    tokenizer: Any = engine.load()[1]
+    sentence: str = (
+        "Правительство утвердило новые правила субсидирования, которые вступят в силу с начала года. "
+    )
+    base_ids: List[int] = tokenizer(sentence * 60, add_special_tokens=False)["input_ids"]
+
+    observations: List[Any] = []
+    for input_tokens in (32, 128, 384):
+        text: str = tokenizer.decode(base_ids[:input_tokens])
+        for output_tokens in (8, 32):
+            for num_beams in (1, 2):
+                for _ in range(repeats):
+                    started: float = time.perf_counter()
+                    engine.summarize(text, max_length=output_tokens, min_length=output_tokens, num_beams=num_beams)
+                    observations.append((input_tokens + 1, output_tokens, num_beams, 1, time.perf_counter() - started))
+                    print(f"   вход {input_tokens:>4}, выход {output_tokens:>3}, лучей {num_beams}: "
+                          f"{observations[-1][-1]:.3f} с")
+
+    if not cost_model.fit(observations):
+        print("⚠️ Недостаточно разнообразных замеров, коэффициенты не изменены")
+    return cost_model
+
+
+def main() -> None:
+    """
+    Что я делаю?
+        Печатаю предварительную оценку текста или калибрую модель стоимости.
+    Что я принимаю на вход?
+        Ничего (аргументы командной строки).
+    Что я возвращаю?
+        Ничего.
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("text", nargs="?", help="Текст для оценки")
+    parser.add_argument("--max-length", type=int, default=150)
+    parser.add_argument("--min-length", type=int, default=50)
+    parser.add_argument("--num-beams", type=int, default=1)
+    parser.add_argument("--model", default=DEFAULT_MODEL_NAME)
+    parser.add_argument("--dtype", default="float32")
+    parser.add_argument("--calibrate", action="store_true", help="Откалибровать и сохранить модель стоимости")
+    args = parser.parse_args()
+
+    if args.calibrate:
+        print("⏳ Калибровка модели стоимости...")
+        model: CostModel = calibrate(args.model, args.dtype)
+        path = model.save(COST_MODEL_PATH)
+        c0, c1, c2 = model.coefficients
+        print(f"✅ Коэффициенты: {c0:.4f} с + {c1 * 1000:.3f} мс/токен входа + {c2 * 1000:.2f} мс/токен выхода")
+        print(f"💾 Сохранено в {path}")
+        return
+
+    if not args.text:
+        parser.error("Нужен текст или --calibrate")
+
+    started: float = time.perf_counter()
+    report: Dict[str, Any] = preflight(args.text, args.max_length, args.min_length, args.num_beams, model_name=args.model)
+    elapsed_ms: float = (time.perf_counter() - started) * 1000.0
+    for key, value in report.items():
+        print(f"   {key}: {value:.2f}" if isinstance(value, float) else f"   {key}: {value}")
+    print(f"⚡ Оценка получена за {elapsed_ms:.1f} мс без загрузки модели")
+
+
+if __name__ == "__main__":
+    main()
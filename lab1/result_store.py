@@ -0,0 +1,226 @@
+"""
+Модуль постоянного хранилища результатов суммаризации (SQLite).
+
+Каждое саммари сохраняется с хешем нормализованного текста, параметрами
+генерации и временем работы, поэтому уже обработанный текст (в том числе
+вчерашний) восстанавливается мгновенно - без модели и без запроса к API.
+Поиск по истории идет по заголовку (началу текста) и саммари.
+Путь к базе задается переменной SUMMARIZER_RESULTS_DB.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+RESULTS_PATH: Path = Path(os.getenv(
+    "SUMMARIZER_RESULTS_DB",
+    str(Path(os.getenv("SUMMARIZER_CACHE_DIR", str(Path.home() / ".cache" / "text_summarizer"))) / "results.sqlite3"),
+))
+
+# Длина заголовка записи (начало текста) в символах
+TITLE_CHARS: int = 120
+
+# Ответы-ошибки не сохраняются, чтобы не восстанавливать их вместо саммари
+_ERROR_PREFIXES = ("❌", "⚠️", "⏱️", "🌐")
+
+_SCHEMA: str = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    text_hash TEXT NOT NULL,
+    params TEXT NOT NULL,
+    title TEXT NOT NULL,
+    text TEXT,
+    characters INTEGER NOT NULL,
+    summary TEXT NOT NULL,
+    seconds REAL NOT NULL,
+    created REAL NOT NULL,
+    UNIQUE (text_hash, params)
+);
+CREATE INDEX IF NOT EXISTS results_created ON results (created);
+"""
+
+_COLUMNS: str = "id, text_hash, params, title, characters, summary, seconds, created"
+
+
+def hash_text(text_input: str) -> str:
+    """
+    Что я делаю?
+        Считаю хеш текста без учета пробельных различий (повторная вставка того же текста
+        с другими переносами строк дает тот же хеш).
+    Что я принимаю на вход?
+        text_input (str): Текст.
+    Что я возвращаю?
+        str: SHA-256 в шестнадцатеричном виде.
+    """
+    normalized: str = re.sub(r"\s+", " ", text_input).strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def _params_key(params: Dict[str, Any]) -> str:
+    """
+    Что я делаю?
+        Составляю канонический ключ параметров генерации.
+    Что я принимаю на вход?
+        params (dict): Параметры.
+    Что я возвращаю?
+        str: JSON с отсортированными ключами.
+    """
+    return json.dumps(params, sort_keys=True, ensure_ascii=False)
+
+
+class ResultStore:
+    """
+    Что я делаю?
+        Храню саммари в SQLite с поиском по хешу текста и параметрам.
+    Что я принимаю на вход?
+        path (Path | str): Файл базы (":memory:" - база в памяти).
+    Что я возвращаю?
+        Ничего - объект хранилища.
+    """
+
+    def __init__(self, path: "Path | str" = RESULTS_PATH) -> None:
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock: threading.Lock = threading.Lock()
+        self._connection: sqlite3.Connection = sqlite3.connect(str(path), check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.executescript(_SCHEMA)
+
+    def get(self, text_hash: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Что я делаю?
+            Ищу сохраненное саммари текста с такими же параметрами.
+        Что я принимаю на вход?
+            text_hash (str): Хеш текста (hash_text).
+            params (dict): Параметры генерации.
+        Что я возвращаю?
+            Optional[dict]: Запись или None.
+        """
+        with self._lock:
+            row: Optional[sqlite3.Row] = self._connection.execute(
+                f"SELECT {_COLUMNS} FROM results WHERE text_hash = ? AND params = ?",
+                (text_hash, _params_key(params)),
+            ).fetchone()
+        return self._to_record(row) if row is not None else None
+
+    def put(
+        self,
+        text_input: str,
+        params: Dict[str, Any],
+        summary: str,
+        seconds: float,
+        text_hash: Optional[str] = None,
+        title: Optional[str] = None,
+        keep_text: bool = True,
+    ) -> Optional[int]:
+        """
+        Что я делаю?
+            Сохраняю саммари (повторное сохранение того же текста и параметров
+            заменяет запись и поднимает ее наверх истории).
+        Что я принимаю на вход?
+            text_input (str): Исходный текст (или его начало для больших документов).
+            params (dict): Параметры генерации.
+            summary (str): Саммари.
+            seconds (float): Время генерации.
+            text_hash (str | None): Готовый хеш (None - посчитать по text_input).
+            title (str | None): Заголовок записи (None - начало текста).
+            keep_text (bool): Сохранять ли сам текст (для восстановления в поле ввода).
+        Что я возвращаю?
+            Optional[int]: Номер записи или None, если саммари пустое или ошибка.
+        """
+        if not summary or not summary.strip() or summary.startswith(_ERROR_PREFIXES):
+            return None
+        if title is None:
+            title = re.sub(r"\s+", " ", text_input).strip()[:TITLE_CHARS]
+        with self._lock, self._connection:
+            cursor: sqlite3.Cursor = self._connection.execute(
+                "INSERT OR REPLACE INTO results "
+                "(text_hash, params, title, text, characters, summary, seconds, created) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    text_hash or hash_text(text_input), _params_key(params), title,
+                    text_input if keep_text else None, len(text_input), summary, seconds, time.time(),
+                ),
+            )
+        return cursor.lastrowid
+
+    def search(self, query: str = "", limit: int = 200) -> List[Dict[str, Any]]:
+        """
+        Что я делаю?
+            Ищу записи по подстроке в заголовке или саммари, новые сверху.
+        Что я принимаю на вход?
+            query (str): Строка поиска (пустая - вся история).
+            limit (int): Максимум записей.
+        Что я возвращаю?
+            List[dict]: Записи без полного текста.
+        """
+        pattern: str = "%" + query.strip().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        with self._lock:
+            rows: List[sqlite3.Row] = self._connection.execute(
+                f"SELECT {_COLUMNS} FROM results "
+                "WHERE title LIKE ? ESCAPE '\\' OR summary LIKE ? ESCAPE '\\' "
+                "ORDER BY created DESC LIMIT ?",
+                (pattern, pattern, limit),
+            ).fetchall()
+        return [self._to_record(row) for row in rows]
+
+    def text(self, record_id: int) -> Optional[str]:
+        """
+        Что я делаю?
+            Читаю сохраненный исходный текст записи.
+        Что я принимаю на вход?
+            record_id (int): Номер записи.
+        Что я возвращаю?
+            Optional[str]: Текст или None (не сохранялся или записи нет).
+        """
+        with self._lock:
+            row: Optional[sqlite3.Row] = self._connection.execute(
+                "SELECT text FROM results WHERE id = ?", (record_id,)
+            ).fetchone()
+        return row["text"] if row is not None else None
+
+    def delete(self, record_id: int) -> None:
+        """
+        Что я делаю?
+            Удаляю запись из истории.
+        Что я принимаю на вход?
+            record_id (int): Номер записи.
+        Что я возвращаю?
+            Ничего.
+        """
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM results WHERE id = ?", (record_id,))
+
+    def close(self) -> None:
+        """
+        Что я делаю?
+            Закрываю соединение с базой.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            Ничего.
+        """
+        with self._lock:
+            self._connection.close()
+
+    @staticmethod
+    def _to_record(row: sqlite3.Row) -> Dict[str, Any]:
+        """
+        Что я делаю?
+            Превращаю строку выборки в словарь с разобранными параметрами.
+        Что я принимаю на вход?
+            row (sqlite3.Row): Строка выборки.
+        Что я возвращаю?
+            dict: id, text_hash, params, title, characters, summary, seconds, created.
+        """
+        record: Dict[str, Any] = dict(row)
+        record["params"] = json.loads(record["params"])
+        return record
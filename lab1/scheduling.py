@@ -0,0 +1,221 @@
+"""
+Модуль приоритетного планирования доступа к движку суммаризации.
+
+Два класса запросов: interactive (клик аналитика в GUI, запрос сервиса)
+и bulk (пакетная обработка). Между классами действует взвешенное
+справедливое разделение (weighted fair queueing): interactive получает
+большую долю генераций и обгоняет очередь на ближайшей границе батча,
+но bulk не простаивает полностью. Запрос, ждущий дольше порога
+голодания, обслуживается вне очереди (aging).
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+PRIORITIES: Tuple[str, ...] = ("interactive", "bulk")
+# Доли генераций при одновременной нагрузке: 8 interactive на 1 bulk
+PRIORITY_WEIGHTS: Dict[str, float] = {"interactive": 8.0, "bulk": 1.0}
+# Через сколько секунд ожидания запрос обслуживается вне очереди
+STARVATION_SECONDS: float = float(os.getenv("SUMMARIZER_STARVATION_SECONDS", "10"))
+
+
+def check_priority(priority: str) -> str:
+    """
+    Что я делаю?
+        Проверяю, что класс приоритета известен.
+    Что я принимаю на вход?
+        priority (str): Класс приоритета.
+    Что я возвращаю?
+        str: Тот же класс.
+
+    Raises:
+        ValueError: Если класс неизвестен.
+    """
+    if priority not in PRIORITIES:
+        raise ValueError(f"❌ Неизвестный приоритет: {priority}. Доступны: {', '.join(PRIORITIES)}")
+    return priority
+
+
+class FairScheduler:
+    """
+    Что я делаю?
+        Выбираю, какой класс приоритета обслужить следующим, по виртуальному
+        времени классов (обслуженные элементы / вес) с защитой от голодания.
+        Потокобезопасность обеспечивает вызывающий код (под своей блокировкой).
+    Что я принимаю на вход?
+        weights (dict): Вес каждого класса.
+        starvation_after (float): Порог голодания в секундах.
+    Что я возвращаю?
+        Ничего - объект планировщика.
+    """
+
+    def __init__(
+        self,
+        weights: Optional[Dict[str, float]] = None,
+        starvation_after: float = STARVATION_SECONDS,
+    ) -> None:
+        self.weights: Dict[str, float] = dict(weights or PRIORITY_WEIGHTS)
+        self.starvation_after: float = starvation_after
+        self._virtual: Dict[str, float] = {priority: 0.0 for priority in self.weights}
+
+    def activate(self, priority: str, backlogged: Iterable[str]) -> None:
+        """
+        Что я делаю?
+            Отмечаю, что у класса снова появились запросы. Простой не копит
+            "кредит": виртуальное время класса подтягивается к минимуму
+            среди классов, у которых уже есть очередь.
+        Что я принимаю на вход?
+            priority (str): Класс, у которого появился первый запрос.
+            backlogged (Iterable[str]): Классы, у которых запросы уже были.
+        Что я возвращаю?
+            Ничего.
+        """
+        others: List[float] = [self._virtual[other] for other in backlogged if other != priority]
+        if others:
+            self._virtual[priority] = max(self._virtual[priority], min(others))
+
+    def pick(self, heads: Dict[str, float], now: Optional[float] = None) -> str:
+        """
+        Что я делаю?
+            Выбираю класс для следующего обслуживания.
+        Что я принимаю на вход?
+            heads (dict): Класс -> время постановки в очередь его самого старого запроса
+                (только непустые классы).
+            now (float | None): Текущее time.monotonic().
+        Что я возвращаю?
+            str: Выбранный класс.
+        """
+        now = time.monotonic() if now is None else now
+        starving: List[str] = [priority for priority, since in heads.items() if now - since >= self.starvation_after]
+        if starving:
+            return min(starving, key=lambda priority: heads[priority])
+        # При равном виртуальном времени выигрывает более срочный класс
+        return min(heads, key=lambda priority: (self._virtual[priority], PRIORITIES.index(priority)))
+
+    def charge(self, priority: str, items: int = 1) -> None:
+        """
+        Что я делаю?
+            Учитываю обслуженные элементы класса.
+        Что я принимаю на вход?
+            priority (str): Класс.
+            items (int): Сколько элементов обслужено.
+        Что я возвращаю?
+            Ничего.
+        """
+        self._virtual[priority] += items / self.weights[priority]
+
+
+class PriorityLock:
+    """
+    Что я делаю?
+        Работаю как блокировка движка, но при освобождении передаю ее
+        ожидающему в порядке FairScheduler, а не случайному потоку.
+    Что я принимаю на вход?
+        scheduler (FairScheduler | None): Планировщик классов.
+    Что я возвращаю?
+        Ничего - объект блокировки (with берет ее с приоритетом interactive).
+    """
+
+    def __init__(self, scheduler: Optional[FairScheduler] = None) -> None:
+        self._scheduler: FairScheduler = scheduler or FairScheduler()
+        self._cond: threading.Condition = threading.Condition()
+        self._held: bool = False
+        self._waiting: Dict[str, Deque[Tuple[float, object]]] = {priority: deque() for priority in PRIORITIES}
+
+    def _next_ticket(self) -> Optional[object]:
+        """
+        Что я делаю?
+            Определяю, чья очередь взять блокировку.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            object | None: Билет ожидающего или None, если никто не ждет.
+        """
+        heads: Dict[str, float] = {priority: queue[0][0] for priority, queue in self._waiting.items() if queue}
+        if not heads:
+            return None
+        return self._waiting[self._scheduler.pick(heads)][0][1]
+
+    def acquire(self, priority: str = "interactive", timeout: Optional[float] = None, cost: int = 1) -> bool:
+        """
+        Что я делаю?
+            Беру блокировку, дождавшись своей очереди.
+        Что я принимаю на вход?
+            priority (str): Класс приоритета.
+            timeout (float | None): Сколько ждать (None или -1 - без ограничения).
+            cost (int): Сколько элементов (текстов) обработает владелец - столько
+                списывается с доли класса, а не одна генерация за захват.
+        Что я возвращаю?
+            bool: True если блокировка взята, False по таймауту.
+        """
+        waiting: Deque[Tuple[float, object]] = self._waiting[check_priority(priority)]
+        with self._cond:
+            if not self._held and self._next_ticket() is None:
+                self._held = True
+                self._scheduler.charge(priority, cost)
+                return True
+
+            if not waiting:
+                self._scheduler.activate(priority, [other for other, queue in self._waiting.items() if queue])
+            ticket: object = object()
+            waiting.append((time.monotonic(), ticket))
+            deadline: Optional[float] = None if timeout is None or timeout < 0 else time.monotonic() + timeout
+            while True:
+                if not self._held and self._next_ticket() is ticket:
+                    waiting.popleft()
+                    self._held = True
+                    self._scheduler.charge(priority, cost)
+                    return True
+                remaining: Optional[float] = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    waiting.remove(next(entry for entry in waiting if entry[1] is ticket))
+                    # Возможно, теперь очередь следующего ожидающего
+                    self._cond.notify_all()
+                    return False
+                self._cond.wait(remaining)
+
+    def release(self) -> None:
+        """
+        Что я делаю?
+            Освобождаю блокировку и бужу ожидающих.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            Ничего.
+        """
+        with self._cond:
+            self._held = False
+            self._cond.notify_all()
+
+    def locked(self) -> bool:
+        """
+        Что я делаю?
+            Сообщаю, взята ли блокировка.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            bool: True если взята.
+        """
+        return self._held
+
+    def waiting(self) -> Dict[str, int]:
+        """
+        Что я делаю?
+            Считаю ожидающих по классам приоритета.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            dict: Класс -> число ожидающих.
+        """
+        with self._cond:
+            return {priority: len(queue) for priority, queue in self._waiting.items()}
+
+    def __enter__(self) -> "PriorityLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.release()
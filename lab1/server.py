@@ -0,0 +1,455 @@
+"""
+HTTP-сервис локальной суммаризации.
+
+Оборачивает движок SummarizerEngine и микро-батчер (batcher.py), чтобы
+суммаризатором могли пользоваться другие сервисы. Эндпоинты:
+    POST /summarize - {"text": ...} или {"texts": [...]}, параметры генерации,
+                      deadline_ms и priority (interactive или bulk); ответ -
+                      поток NDJSON (по строке на текст по мере готовности)
+                      или обычный JSON при "stream": false;
+    POST /preflight - {"text": ...} и параметры генерации: число токенов,
+                      обрезка и оценка времени без генерации (preflight.py);
+    GET /healthz    - процесс жив;
+    GET /readyz     - модель загружена и прогрета (иначе 503);
+    GET /metrics    - метрики в формате Prometheus.
+Если ожидаемое ожидание в очереди больше дедлайна клиента или очередь
+полна, сервис сразу отвечает 503 с заголовком Retry-After.
+
+Пример:
+    python server.py --port 8000 --max-batch-size 8 --max-wait-ms 10
+"""
+
+import argparse
+import json
+import math
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+from autotune import tuned_batch_size
+from batcher import MicroBatcher, OverloadedError, PendingSummary
+from metrics import metrics
+from model_registry import get_default_registry
+from model_store import DEFAULT_MODEL_NAME
+from preflight import preflight
+from scheduling import check_priority
+from text_summarizer import ADAPTIVE_LENGTH, validate_text
+from tracing import tracer
+
+# Дедлайн по умолчанию, если клиент его не передал (миллисекунды)
+DEFAULT_DEADLINE_MS: float = 60000.0
+MAX_BODY_BYTES: int = 4 * 1024 * 1024
+# Размер батча из профиля автонастройки машины (autotune.py), иначе 8
+DEFAULT_BATCH_SIZE: int = tuned_batch_size(8)
+_WARMUP_TEXT: str = "Правительство утвердило новые правила. Изменения вступят в силу с начала года."
+
+
+class SummarizerService:
+    """
+    Что я делаю?
+        Связываю движок и батчер и слежу за готовностью модели.
+    Что я принимаю на вход?
+        model_name (str): Идентификатор модели.
+        dtype (str): Тип весов.
+        max_batch_size (int): Максимум текстов в батче.
+        max_wait_ms (float): Ожидание наполнения батча.
+        max_queue (int): Предельная длина очереди.
+        engine (SummarizerEngine | None): Движок; None - закрепленный движок общего
+            реестра (модель не загружается здесь, ее загружает warm_up в фоне).
+    Что я возвращаю?
+        Ничего - объект сервиса.
+    """
+
+    def __init__(
+        self,
+        model_name: str = DEFAULT_MODEL_NAME,
+        dtype: str = "float32",
+        max_batch_size: int = DEFAULT_BATCH_SIZE,
+        max_wait_ms: float = 10.0,
+        max_queue: int = 64,
+        engine: Optional[Any] = None,
+    ) -> None:
+        self.model_name: str = model_name
+        # Только движок без загрузки: порт открывается сразу, /healthz отвечает во время загрузки.
+        # Сервис и батчер держат движок все время работы - закрепляем, чтобы реестр его не выгружал
+        self.engine: Any = engine if engine is not None else get_default_registry().pin(model_name, dtype)
+        self.batcher: MicroBatcher = MicroBatcher(
+            self.engine, max_batch_size, max_wait_ms, max_queue, adaptive_length=ADAPTIVE_LENGTH
+        )
+        self.warmed: bool = False
+        self.warmup_error: Optional[str] = None
+
+    def warm_up(self) -> None:
+        """
+        Что я делаю?
+            Загружаю модель и прогоняю короткую генерацию; ее длительность
+            становится первой оценкой батча для отказа по дедлайну.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            Ничего.
+        """
+        try:
+            self.engine.load()
+            started: float = time.perf_counter()
+            self.engine.summarize_batch([_WARMUP_TEXT], max_length=16, min_length=1)
+            self.batcher.batch_seconds = time.perf_counter() - started
+            self.warmed = True
+            print(f"🔥 Модель прогрета за {self.batcher.batch_seconds:.2f} с, сервис готов")
+        except Exception as error:
+            self.warmup_error = str(error)
+            print(f"❌ Ошибка прогрева модели: {error}")
+
+    @property
+    def ready(self) -> bool:
+        """
+        Что я делаю?
+            Сообщаю, готов ли сервис принимать запросы без холодного старта.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            bool: True если модель прогрета и сейчас загружена.
+        """
+        return self.warmed and self.engine.is_loaded
+
+
+class _SummarizeHandler(BaseHTTPRequestHandler):
+    """
+    Что я делаю?
+        Обрабатываю HTTP-запросы сервиса суммаризации.
+    Что я принимаю на вход?
+        Стандартные аргументы BaseHTTPRequestHandler.
+    Что я возвращаю?
+        Ничего.
+    """
+
+    # HTTP/1.1 нужен для потоковой передачи ответа (Transfer-Encoding: chunked)
+    protocol_version: str = "HTTP/1.1"
+    service: SummarizerService
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        """
+        Что я делаю?
+            Отправляю JSON-ответ целиком.
+        Что я принимаю на вход?
+            status (int): HTTP-статус.
+            payload (dict): Тело ответа.
+            headers (dict | None): Дополнительные заголовки.
+        Что я возвращаю?
+            Ничего.
+        """
+        body: bytes = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _write_chunk(self, payload: Dict[str, Any]) -> None:
+        """
+        Что я делаю?
+            Отправляю одну строку NDJSON отдельным чанком.
+        Что я принимаю на вход?
+            payload (dict): Событие.
+        Что я возвращаю?
+            Ничего.
+        """
+        line: bytes = (json.dumps(payload, ensure_ascii=False) + "\n").encode("utf-8")
+        self.wfile.write(f"{len(line):X}\r\n".encode("ascii") + line + b"\r\n")
+        self.wfile.flush()
+
+    def do_GET(self) -> None:
+        service: SummarizerService = self.service
+        if self.path == "/healthz":
+            self._send_json(200, {"status": "ok"})
+        elif self.path == "/readyz":
+            self._send_json(200 if service.ready else 503, {
+                "ready": service.ready,
+                "model": service.model_name,
+                "model_loaded": service.engine.is_loaded,
+                "warmed": service.warmed,
+                "warmup_error": service.warmup_error,
+                "queue_depth": service.batcher.queue_depth,
+                "expected_wait_ms": round(service.batcher.expected_wait() * 1000.0, 1),
+            })
+        elif self.path == "/metrics":
+            body: bytes = metrics.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def _read_json(self) -> Dict[str, Any]:
+        """
+        Что я делаю?
+            Читаю тело запроса как JSON-объект.
+        Что я принимаю на вход?
+            Ничего (тело читается из сокета).
+        Что я возвращаю?
+            dict: Тело запроса.
+
+        Raises:
+            ValueError: Если тело некорректно.
+        """
+        length: int = int(self.headers.get("Content-Length", "0"))
+        if length <= 0 or length > MAX_BODY_BYTES:
+            raise ValueError(f"Тело запроса должно быть от 1 до {MAX_BODY_BYTES} байт")
+        request: Any = json.loads(self.rfile.read(length))
+        if not isinstance(request, dict):
+            raise ValueError("Ожидается JSON-объект")
+        return request
+
+    def _read_request(self) -> Dict[str, Any]:
+        """
+        Что я делаю?
+            Читаю и проверяю тело запроса /summarize.
+        Что я принимаю на вход?
+            Ничего (тело читается из сокета).
+        Что я возвращаю?
+            dict: Тело запроса.
+
+        Raises:
+            ValueError: Если тело некорректно.
+        """
+        request: Dict[str, Any] = self._read_json()
+        texts: Any = request.get("texts", [request["text"]] if "text" in request else None)
+        if not isinstance(texts, list) or not texts or not all(isinstance(text, str) for text in texts):
+            raise ValueError("Нужно поле text (строка) или texts (непустой список строк)")
+        short: List[int] = [index for index, text in enumerate(texts) if not validate_text(text)]
+        if short:
+            raise ValueError(f"Текст слишком короткий (минимум 50 символов): индексы {short}")
+        request["texts"] = texts
+        return request
+
+    def _preflight(self) -> None:
+        """
+        Что я делаю?
+            Отвечаю на POST /preflight: оценка текста только по токенизатору.
+        Что я принимаю на вход?
+            Ничего (тело читается из сокета).
+        Что я возвращаю?
+            Ничего.
+        """
+        try:
+            request: Dict[str, Any] = self._read_json()
+            if not isinstance(request.get("text"), str):
+                raise ValueError("Нужно поле text (строка)")
+            report: Dict[str, Any] = preflight(
+                request["text"],
+                int(request.get("max_length", 150)),
+                int(request.get("min_length", 50)),
+                int(request.get("num_beams", 1)),
+                request.get("input_token_budget"),
+                model_name=self.service.model_name,
+            )
+        except (ValueError, TypeError) as error:
+            self._send_json(400, {"error": str(error)})
+            return
+        self._send_json(200, report)
+
+    def do_POST(self) -> None:
+        if self.path == "/preflight":
+            self._preflight()
+            return
+        if self.path != "/summarize":
+            self._send_json(404, {"error": "not found"})
+            return
+
+        received: float = time.monotonic()
+        try:
+            request: Dict[str, Any] = self._read_request()
+            max_length: int = int(request.get("max_length", 150))
+            min_length: int = int(request.get("min_length", 50))
+            num_beams: int = int(request.get("num_beams", 1))
+            deadline_ms: float = float(request.get("deadline_ms", self.headers.get("X-Deadline-Ms", DEFAULT_DEADLINE_MS)))
+            priority: str = check_priority(str(request.get("priority", "interactive")))
+        except (ValueError, KeyError, TypeError) as error:
+            self._send_json(400, {"error": str(error)})
+            return
+
+        texts: List[str] = request["texts"]
+        metrics.inc("requests_total", backend="server")
+        with tracer.request("server_summarize", texts=len(texts), num_beams=num_beams, priority=priority):
+            done: "queue.Queue[PendingSummary]" = queue.Queue()
+            try:
+                pending: List[PendingSummary] = self.service.batcher.submit(
+                    texts, max_length, min_length, num_beams,
+                    deadline=received + deadline_ms / 1000.0,
+                    on_done=done.put,
+                    priority=priority,
+                )
+            except OverloadedError as error:
+                metrics.record_error(error)
+                self._send_json(
+                    503,
+                    {"error": str(error), "retry_after_s": round(error.retry_after, 2)},
+                    {"Retry-After": str(max(1, math.ceil(error.retry_after)))},
+                )
+                return
+
+            index_of: Dict[int, int] = {id(item): index for index, item in enumerate(pending)}
+            if request.get("stream", True):
+                self._stream(pending, done, index_of)
+            else:
+                self._respond_whole(pending)
+
+    def _event(self, item: PendingSummary, index: int) -> Dict[str, Any]:
+        """
+        Что я делаю?
+            Превращаю готовый текст в событие ответа.
+        Что я принимаю на вход?
+            item (PendingSummary): Готовый текст.
+            index (int): Номер текста в запросе.
+        Что я возвращаю?
+            dict: Событие result или error.
+        """
+        if item.error is not None:
+            return {"event": "error", "index": index, "error": str(item.error) or type(item.error).__name__}
+        return {
+            "event": "result",
+            "index": index,
+            "summary": item.summary,
+            "latency_ms": round(item.latency * 1000.0, 1),
+        }
+
+    def _stream(
+        self,
+        pending: List[PendingSummary],
+        done: "queue.Queue[PendingSummary]",
+        index_of: Dict[int, int],
+    ) -> None:
+        """
+        Что я делаю?
+            Отдаю результаты потоком NDJSON в порядке готовности.
+        Что я принимаю на вход?
+            pending (List[PendingSummary]): Тексты запроса.
+            done (Queue): Очередь готовых текстов.
+            index_of (dict): id(текста) -> номер в запросе.
+        Что я возвращаю?
+            Ничего.
+        """
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        self._write_chunk({
+            "event": "accepted",
+            "count": len(pending),
+            "queue_depth": self.service.batcher.queue_depth,
+        })
+        for _ in pending:
+            item: PendingSummary = done.get()
+            self._write_chunk(self._event(item, index_of[id(item)]))
+        self._write_chunk({"event": "done"})
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _respond_whole(self, pending: List[PendingSummary]) -> None:
+        """
+        Что я делаю?
+            Жду все тексты и отдаю один JSON-ответ: 200, если готовы все;
+            503 с Retry-After, если часть текстов отклонена из-за перегрузки
+            (дедлайн истек в очереди или в ожидании движка); 500 при настоящих ошибках.
+        Что я принимаю на вход?
+            pending (List[PendingSummary]): Тексты запроса.
+        Что я возвращаю?
+            Ничего.
+        """
+        results: List[Dict[str, Any]] = []
+        for index, item in enumerate(pending):
+            item._done.wait()
+            results.append(self._event(item, index))
+
+        errors: List[BaseException] = [item.error for item in pending if item.error is not None]
+        if not errors:
+            self._send_json(200, {"results": results})
+        elif all(isinstance(error, (TimeoutError, OverloadedError)) for error in errors):
+            retry_after: float = self.service.batcher.expected_wait()
+            self._send_json(
+                503,
+                {"results": results, "retry_after_s": round(retry_after, 2)},
+                {"Retry-After": str(max(1, math.ceil(retry_after)))},
+            )
+        else:
+            self._send_json(500, {"results": results})
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # Журнал запросов не печатаем: статистика доступна через /metrics
+        return
+
+
+def serve(
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    model_name: str = DEFAULT_MODEL_NAME,
+    dtype: str = "float32",
+    max_batch_size: int = DEFAULT_BATCH_SIZE,
+    max_wait_ms: float = 10.0,
+    max_queue: int = 64,
+    engine: Optional[Any] = None,
+) -> ThreadingHTTPServer:
+    """
+    Что я делаю?
+        Создаю сервис, запускаю батчер и прогрев модели в фоне и возвращаю HTTP-сервер.
+    Что я принимаю на вход?
+        host (str), port (int): Адрес сервера (port=0 - любой свободный).
+        model_name (str), dtype (str): Модель и тип весов.
+        max_batch_size (int), max_wait_ms (float), max_queue (int): Настройки батчера.
+        engine (SummarizerEngine | None): Движок; None - движок общего реестра.
+    Что я возвращаю?
+        ThreadingHTTPServer: Сервер (запуск - serve_forever()); сервис в атрибуте service.
+    """
+    # Сервису метрики нужны всегда: /metrics входит в его интерфейс
+    metrics.enabled = True
+    service: SummarizerService = SummarizerService(model_name, dtype, max_batch_size, max_wait_ms, max_queue, engine)
+    service.batcher.start()
+    threading.Thread(target=service.warm_up, name="model-warmup", daemon=True).start()
+
+    handler = type("SummarizeHandler", (_SummarizeHandler,), {"service": service})
+    server: ThreadingHTTPServer = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.service = service  # type: ignore[attr-defined]
+    return server
+
+
+def main() -> None:
+    """
+    Что я делаю?
+        Запускаю HTTP-сервис из командной строки.
+    Что я принимаю на вход?
+        Ничего (аргументы командной строки).
+    Что я возвращаю?
+        Ничего.
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--model", default=DEFAULT_MODEL_NAME)
+    parser.add_argument("--dtype", default="float32")
+    parser.add_argument("--max-batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--max-wait-ms", type=float, default=10.0)
+    parser.add_argument("--max-queue", type=int, default=64)
+    args = parser.parse_args()
+
+    server: ThreadingHTTPServer = serve(
+        args.host, args.port, args.model, args.dtype,
+        args.max_batch_size, args.max_wait_ms, args.max_queue,
+    )
+    print(f"🚀 Сервис суммаризации слушает http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Остановка сервиса...")
+    finally:
+        server.server_close()
+        server.service.batcher.stop()  # type: ignore[attr-defined]
+
+
+if __name__ == "__main__":
+    main()
@@ -2,158 +2,297 @@
 Стартовый скрипт для быстрого запуска приложения.
 
 Проверяет наличие зависимостей и запускает GUI приложение.
+Зависимости проверяются через importlib.util.find_spec и метаданные пакетов,
+без импорта torch/transformers, а все проверки выполняются параллельно.
+Успешный результат запоминается по отпечатку окружения (интерпретатор,
+каталоги sys.path, файлы проекта, кеш модели), поэтому следующие запуски
+сразу открывают GUI. Повторить проверки принудительно: python start.py --recheck
 """
 
+import argparse
+import hashlib
+import importlib.util
+import json
+import os
 import sys
-import subprocess
-from typing import List, Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from importlib import metadata
 from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
 
+# Каталог проекта (проверки не зависят от текущего каталога)
+PROJECT_DIR: Path = Path(__file__).resolve().parent
+CACHE_DIR: Path = Path(os.getenv("SUMMARIZER_CACHE_DIR", str(Path.home() / ".cache" / "text_summarizer")))
+# Отпечатки окружений, в которых проверки уже прошли
+PREFLIGHT_CACHE: Path = CACHE_DIR / "start_preflight.json"
 
-def check_python_version() -> bool:
+# Имя модуля -> имя дистрибутива (для версии из метаданных)
+REQUIRED_PACKAGES: Dict[str, str] = {
+    "PyQt6": "PyQt6",
+    "numpy": "numpy",
+    "torch": "torch",
+    "transformers": "transformers",
+}
+REQUIRED_FILES: List[str] = [
+    "text_summarizer.py",
+    "gui_app.py",
+    "engine.py",
+    "model_store.py",
+    "examples.py",
+]
+# Переменные окружения, от которых зависит результат проверок
+FINGERPRINT_ENV: List[str] = ["SUMMARIZER_MODEL_DIR", "SUMMARIZER_OFFLINE", "HF_HOME", "HF_HUB_CACHE"]
+
+CheckResult = Tuple[bool, List[str]]
+
+
+def check_python_version() -> CheckResult:
     """
     Что я делаю?
         Проверяю версию Python.
     Что я принимаю на вход?
         Ничего.
     Что я возвращаю?
-        bool: True если версия >= 3.9, False иначе.
+        tuple: (True если версия >= 3.9, строки отчета).
     """
+    version: str = sys.version.split()[0]
     if sys.version_info >= (3, 9):
-        print(f"✅ Python версия: {sys.version.split()[0]} - OK")
-        return True
-    else:
-        print(f"❌ Python версия: {sys.version.split()[0]}")
-        print("   Требуется Python 3.9 или выше")
-        return False
+        return True, [f"✅ Python версия: {version} - OK"]
+    return False, [f"❌ Python версия: {version}", "   Требуется Python 3.9 или выше"]
 
 
-def check_env_file() -> bool:
+def check_requirements() -> CheckResult:
     """
     Что я делаю?
-        Проверяю наличие файла .env.
+        Проверяю установленные зависимости, не импортируя их.
     Что я принимаю на вход?
         Ничего.
     Что я возвращаю?
-        bool: True если файл существует, False иначе.
+        tuple: (True если все зависимости установлены, строки отчета).
     """
-    env_path: Path = Path(".env")
-    
-    if env_path.exists():
-        print("✅ Файл .env найден")
-        return True
-    else:
-        print("❌ Файл .env не найден!")
-        print("   Инструкции:")
-        print("   1. Скопируйте .env.example в .env")
-        print("   2. Откройте .env")
-        print("   3. Вставьте ваш API токен вместо your_hf_token_here")
-        print("   4. Сохраните файл")
-        return False
+    lines: List[str] = []
+    missing_packages: List[str] = []
+
+    for module, distribution in REQUIRED_PACKAGES.items():
+        if importlib.util.find_spec(module) is None:
+            lines.append(f"❌ {module} не установлен")
+            missing_packages.append(module)
+            continue
+        try:
+            lines.append(f"✅ {module} {metadata.version(distribution)} установлен")
+        except metadata.PackageNotFoundError:
+            lines.append(f"✅ {module} установлен")
+
+    if missing_packages:
+        lines += [
+            "",
+            "❌ Отсутствуют зависимости!",
+            "   Установите их:",
+            "   pip install -r requirements.txt",
+        ]
+        return False, lines
+    return True, lines
 
 
-def check_requirements() -> bool:
+def check_required_files() -> CheckResult:
     """
     Что я делаю?
-        Проверяю установленные зависимости.
+        Проверяю наличие всех необходимых файлов проекта.
     Что я принимаю на вход?
         Ничего.
     Что я возвращаю?
-        bool: True если все зависимости установлены, False иначе.
+        tuple: (True если все файлы найдены, строки отчета).
     """
-    required_packages: List[str] = ["requests", "dotenv", "PyQt6"]
-    missing_packages: List[str] = []
-    
-    for package in required_packages:
+    lines: List[str] = []
+    all_found: bool = True
+
+    for file in REQUIRED_FILES:
+        if (PROJECT_DIR / file).exists():
+            lines.append(f"✅ {file} найден")
+        else:
+            lines.append(f"❌ {file} не найден")
+            all_found = False
+
+    return all_found, lines
+
+
+def _hub_cache_dir() -> Path:
+    """
+    Что я делаю?
+        Определяю каталог кеша Hugging Face Hub (как huggingface_hub, без его импорта).
+    Что я принимаю на вход?
+        Ничего.
+    Что я возвращаю?
+        Path: Каталог кеша.
+    """
+    if os.getenv("HF_HUB_CACHE"):
+        return Path(os.environ["HF_HUB_CACHE"]).expanduser()
+    return Path(os.getenv("HF_HOME", str(Path.home() / ".cache" / "huggingface"))).expanduser() / "hub"
+
+
+def check_model_cache() -> CheckResult:
+    """
+    Что я делаю?
+        Проверяю, что модель есть на диске: в SUMMARIZER_MODEL_DIR или в кеше Hugging Face.
+    Что я принимаю на вход?
+        Ничего.
+    Что я возвращаю?
+        tuple: (False только если модели нет, а загрузка из сети запрещена; строки отчета).
+    """
+    # model_store на уровне модуля использует только стандартную библиотеку
+    from model_store import DEFAULT_MODEL_NAME, MODEL_DIR, OFFLINE_MODE, resolve_model_path
+
+    if MODEL_DIR:
         try:
-            __import__(package.lower())
-            print(f"✅ {package} установлен")
-        except ImportError:
-            print(f"❌ {package} не установлен")
-            missing_packages.append(package)
-    
-    if missing_packages:
-        print("\n❌ Отсутствуют зависимости!")
-        print("   Установите их:")
-        print("   pip install -r requirements.txt")
-        return False
-    
-    return True
+            return True, [f"✅ Модель найдена: {resolve_model_path(DEFAULT_MODEL_NAME)}"]
+        except ValueError as err:
+            return False, [str(err)]
+
+    snapshots: Path = _hub_cache_dir() / f"models--{DEFAULT_MODEL_NAME.replace('/', '--')}" / "snapshots"
+    if snapshots.is_dir() and any(snapshots.iterdir()):
+        return True, [f"✅ Модель {DEFAULT_MODEL_NAME} есть в кеше Hugging Face"]
+    if OFFLINE_MODE:
+        return False, [
+            f"❌ Модели {DEFAULT_MODEL_NAME} нет в кеше, а офлайн-режим запрещает загрузку",
+            "   Укажите каталог модели в SUMMARIZER_MODEL_DIR",
+        ]
+    return True, [f"⚠️ Модели {DEFAULT_MODEL_NAME} нет в кеше - она будет скачана при первом запуске"]
+
 
+CHECKS: List[Tuple[str, Callable[[], CheckResult]]] = [
+    ("Python версия", check_python_version),
+    ("Файлы проекта", check_required_files),
+    ("Зависимости", check_requirements),
+    ("Кеш модели", check_model_cache),
+]
 
-def check_required_files() -> bool:
+
+def environment_fingerprint() -> str:
     """
     Что я делаю?
-        Проверяю наличие всех необходимых файлов проекта.
+        Считаю отпечаток окружения: интерпретатор, время изменения каталогов
+        sys.path (установка пакета меняет site-packages), файлов проекта,
+        кеша модели и значимые переменные окружения. Только вызовы stat.
     Что я принимаю на вход?
         Ничего.
     Что я возвращаю?
-        bool: True если все файлы найдены, False иначе.
-    """
-    required_files: List[str] = [
-        "text_summarizer.py",
-        "gui_app.py",
-        "examples.py",
-        "requirements.txt",
-        "README.md"
-    ]
-    
-    missing_files: List[str] = []
-    
-    for file in required_files:
-        file_path: Path = Path(file)
-        if file_path.exists():
-            print(f"✅ {file} найден")
-        else:
-            print(f"❌ {file} не найден")
-            missing_files.append(file)
-    
-    return len(missing_files) == 0
+        str: SHA-256 отпечатка.
+    """
+    def mtime(path: Path) -> int:
+        try:
+            return path.stat().st_mtime_ns
+        except OSError:
+            return -1
 
+    parts: List[str] = [sys.executable, sys.version, str(PROJECT_DIR)]
+    parts += [f"{entry}:{mtime(Path(entry))}" for entry in sys.path if entry]
+    parts += [f"{file}:{mtime(PROJECT_DIR / file)}" for file in REQUIRED_FILES]
+    parts.append(f"hub:{mtime(_hub_cache_dir())}")
+    parts += [f"{name}={os.getenv(name, '')}" for name in FINGERPRINT_ENV]
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
 
-def main() -> None:
+
+def load_passed_fingerprint(path: Path = PREFLIGHT_CACHE) -> Optional[str]:
+    """
+    Что я делаю?
+        Читаю отпечаток окружения, в котором проверки этого проекта прошли в прошлый раз.
+    Что я принимаю на вход?
+        path (Path): Файл кеша.
+    Что я возвращаю?
+        Optional[str]: Отпечаток или None.
+    """
+    try:
+        return json.loads(path.read_text(encoding="utf-8")).get(str(PROJECT_DIR))
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def save_passed_fingerprint(fingerprint: str, path: Path = PREFLIGHT_CACHE) -> None:
+    """
+    Что я делаю?
+        Запоминаю отпечаток окружения, в котором все проверки прошли.
+    Что я принимаю на вход?
+        fingerprint (str): Отпечаток.
+        path (Path): Файл кеша.
+    Что я возвращаю?
+        Ничего.
+    """
+    try:
+        data: Dict[str, str] = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        data = {}
+    data[str(PROJECT_DIR)] = fingerprint
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    except OSError:
+        pass
+
+
+def run_checks() -> bool:
     """
     Что я делаю?
-        Проверяю систему и запускаю приложение.
+        Выполняю все проверки параллельно и печатаю отчеты в исходном порядке.
     Что я принимаю на вход?
         Ничего.
+    Что я возвращаю?
+        bool: True если все проверки пройдены.
+    """
+    all_passed: bool = True
+
+    with ThreadPoolExecutor(max_workers=len(CHECKS)) as executor:
+        futures = [(check_name, executor.submit(check_func)) for check_name, check_func in CHECKS]
+        for check_name, future in futures:
+            try:
+                result, lines = future.result()
+            except Exception as err:
+                result, lines = False, [f"❌ Ошибка при проверке {check_name}: {str(err)}"]
+            print("\n".join(lines))
+            print()
+            all_passed = all_passed and result
+
+    return all_passed
+
+
+def main() -> None:
+    """
+    Что я делаю?
+        Проверяю систему (или беру прошлый успешный результат) и запускаю приложение.
+    Что я принимаю на вход?
+        Ничего (аргументы командной строки).
     Что я возвращаю?
         Ничего.
     """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recheck", action="store_true", help="Выполнить проверки, даже если окружение не менялось")
+    args = parser.parse_args()
+
     print("=" * 80)
     print("🚀 СТАРТЕР ПРИЛОЖЕНИЯ СУММАРИЗАТОРА ТЕКСТА")
     print("=" * 80)
-    
-    print("\n🔍 ПРОВЕРКА СИСТЕМЫ:\n")
-    
-    # Проверки
-    checks: List[tuple[str, callable]] = [
-        ("Python версия", check_python_version),
-        ("Файлы проекта", check_required_files),
-        ("Зависимости", check_requirements),
-        ("Конфигурация", check_env_file)
-    ]
-    
-    all_passed: bool = True
-    
-    for check_name, check_func in checks:
-        try:
-            result: bool = check_func()
-            if not result:
-                all_passed = False
-        except Exception as err:
-            print(f"❌ Ошибка при проверке {check_name}: {str(err)}")
-            all_passed = False
-        
-        print()
-    
+
+    started: float = time.perf_counter()
+    fingerprint: str = environment_fingerprint()
+    cached: bool = not args.recheck and load_passed_fingerprint() == fingerprint
+
+    if cached:
+        all_passed: bool = True
+        print(f"\n⚡ Окружение не менялось - проверки пропущены ({(time.perf_counter() - started) * 1000:.0f} мс)\n")
+    else:
+        print("\n🔍 ПРОВЕРКА СИСТЕМЫ:\n")
+        all_passed = run_checks()
+        if all_passed:
+            save_passed_fingerprint(fingerprint)
+
     # Результат
     print("=" * 80)
-    
+
     if all_passed:
-        print("✅ ВСЕ ПРОВЕРКИ ПРОЙДЕНЫ!")
+        if not cached:
+            print(f"✅ ВСЕ ПРОВЕРКИ ПРОЙДЕНЫ за {time.perf_counter() - started:.2f} с!")
         print("\n🚀 Запуск приложения...\n")
-        
+
         try:
             # Импортируем и запускаем приложение
             from gui_app import main as run_gui
@@ -169,7 +308,7 @@ def main() -> None:
         print("   - README.md (основная документация)")
         print("   - INSTALLATION.md (инструкции установки)")
         print("   - CHEATSHEET.md (краткая шпаргалка)")
-    
+
     print("=" * 80)
 
 
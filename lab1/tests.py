@@ -102,6 +102,7 @@ def test_type_annotations() -> None:
         validate_text,
         summarize_text,
         summarize_text_advanced,
+        summarize_text_extractive,
         load_api_token
     )
     
@@ -110,6 +111,7 @@ def test_type_annotations() -> None:
         "validate_text": validate_text,
         "summarize_text": summarize_text,
         "summarize_text_advanced": summarize_text_advanced,
+        "summarize_text_extractive": summarize_text_extractive,
         "load_api_token": load_api_token
     }
     
@@ -128,6 +130,1563 @@ def test_type_annotations() -> None:
         print()
 
 
+def test_verify_checksums() -> None:
+    """
+    Что я делаю?
+        Тестирую проверку контрольных сумм локального каталога модели.
+    Что я принимаю на вход?
+        Ничего.
+    Что я возвращаю?
+        Ничего.
+    """
+    import tempfile
+    from pathlib import Path
+    import model_store
+
+    print("=" * 80)
+    print("ТЕСТИРОВАНИЕ ФУНКЦИИ verify_checksums()")
+    print("=" * 80)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        weights: Path = Path(tmp_dir) / "model.safetensors"
+        weights.write_bytes(b"weights-v1")
+        (Path(tmp_dir) / "config.json").write_text("{}", encoding="utf-8")
+
+        # Тест 1: Первый запуск создает манифест
+        model_store.verify_checksums(tmp_dir)
+        manifest_created: bool = (Path(tmp_dir) / model_store.CHECKSUM_MANIFEST).exists()
+        status1: str = "✅ PASSED" if manifest_created else "❌ FAILED"
+        print(f"\n[Тест 1] Создание манифеста: {status1}")
+
+        # Тест 2: Подмена весов обнаруживается
+        model_store._verified_paths.clear()
+        weights.write_bytes(b"weights-v2-tampered")
+        try:
+            model_store.verify_checksums(tmp_dir)
+            tamper_detected: bool = False
+        except ValueError:
+            tamper_detected = True
+        status2: str = "✅ PASSED" if tamper_detected else "❌ FAILED"
+        print(f"\n[Тест 2] Обнаружение подмены файла: {status2}")
+        model_store._verified_paths.clear()
+
+    passed: int = sum([status1 == "✅ PASSED", status2 == "✅ PASSED"])
+    print(f"\n📊 Результаты: {passed}/2 тестов пройдено\n")
+    assert passed == 2
+
+
+def test_model_registry_lru() -> None:
+    """
+    Что я делаю?
+        Тестирую вытеснение моделей из реестра по бюджету памяти (LRU).
+    Что я принимаю на вход?
+        Ничего.
+    Что я возвращаю?
+        Ничего.
+    """
+    from typing import List
+
+    import torch
+    from model_registry import ModelRegistry
+
+    print("=" * 80)
+    print("ТЕСТИРОВАНИЕ КЛАССА ModelRegistry")
+    print("=" * 80)
+
+    def fake_loader(model_id: str, **kwargs: any) -> tuple:
+        # Модель размером ровно 1 МБ float32
+        return torch.nn.Linear(512, 512, bias=False), f"tokenizer-{model_id}"
+
+    # Бюджет 2 МБ: помещаются только две модели
+    registry: ModelRegistry = ModelRegistry(budget_mb=2, idle_ttl=0, loader=fake_loader, device="cpu")
+    registry.get("model-a")
+    registry.get("model-b")
+    registry.get("model-a")  # model-b становится самой давней
+    registry.get("model-c")
+
+    resident: list = [item["model_id"] for item in registry.resident()]
+    status1: str = "✅ PASSED" if resident == ["model-a", "model-c"] else "❌ FAILED"
+    print(f"\n[Тест 1] Вытеснение LRU: {status1}")
+    print(f"  В памяти: {resident} (ожидается ['model-a', 'model-c'])")
+
+    # TTL: модели, не использованные дольше idle_ttl, выгружаются
+    registry.idle_ttl = 1e-9
+    registry.evict_idle()
+    status2: str = "✅ PASSED" if not registry.resident() else "❌ FAILED"
+    print(f"\n[Тест 2] Выгрузка по простою: {status2}")
+
+    # Тест 3: Выгрузка модели с идущей генерацией не блокирует реестр для других моделей
+    import threading
+    import time
+
+    registry = ModelRegistry(budget_mb=0, idle_ttl=0, loader=fake_loader, device="cpu")
+    busy_engine = registry.get_engine("model-a")
+    busy_engine._infer_lock.acquire("bulk")  # генерация модели A еще идет
+    registry.idle_ttl = 1e-9
+    reaper: threading.Thread = threading.Thread(target=registry.evict_idle, daemon=True)
+    reaper.start()
+    time.sleep(0.1)
+    started: float = time.perf_counter()
+    registry.idle_ttl = 0
+    registry.get("model-b")
+    waited: float = time.perf_counter() - started
+    unloading: bool = reaper.is_alive()
+    busy_engine._infer_lock.release()
+    reaper.join(timeout=5.0)
+    ok3: bool = waited < 1.0 and unloading and not busy_engine.is_loaded
+    status3: str = "✅ PASSED" if ok3 else "❌ FAILED"
+    print(f"\n[Тест 3] get_engine не ждет выгрузку занятой модели ({waited * 1000:.0f} мс): {status3}")
+
+    # Тест 4: Выгруженную модель держатель ссылки загружает через тот же движок и реестр
+    # учитывает ее в бюджете; закрепленная модель не выгружается ни по простою, ни по LRU
+    registry = ModelRegistry(budget_mb=2, idle_ttl=0, loader=fake_loader, device="cpu")
+    held = registry.get_engine("model-a")
+    pinned = registry.pin("model-p")
+    pinned.load()
+    registry.idle_ttl = 1e-9
+    time.sleep(0.01)
+    registry.evict_idle()
+    registry.idle_ttl = 0
+    idle_unloaded: bool = not held.is_loaded and pinned.is_loaded
+    held.load()
+    registry.get("model-b")
+    resident = sorted(item["model_id"] for item in registry.resident())
+    ok4: bool = (
+        idle_unloaded
+        and registry.get_engine("model-a", load=False) is held
+        and not held.is_loaded
+        and resident == ["model-b", "model-p"]
+    )
+    status4: str = "✅ PASSED" if ok4 else "❌ FAILED"
+    print(f"\n[Тест 4] Повторная загрузка учтена реестром, в памяти {resident}: {status4}")
+
+    # Тест 5: Потоки, одновременно запросившие общий реестр, получают один и тот же
+    import threading
+    import time
+
+    import model_registry
+
+    created: List[ModelRegistry] = []
+
+    class SlowRegistry(ModelRegistry):
+        def __init__(self) -> None:
+            time.sleep(0.05)
+            super().__init__(idle_ttl=0, loader=fake_loader, device="cpu")
+            created.append(self)
+
+    default_registry, default_class = model_registry._default_registry, model_registry.ModelRegistry
+    model_registry._default_registry, model_registry.ModelRegistry = None, SlowRegistry
+    try:
+        seen: List[ModelRegistry] = []
+        workers = [
+            threading.Thread(target=lambda: seen.append(model_registry.get_default_registry())) for _ in range(8)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(timeout=5)
+    finally:
+        model_registry._default_registry, model_registry.ModelRegistry = default_registry, default_class
+    ok5: bool = len(created) == 1 and len(seen) == 8 and all(registry is created[0] for registry in seen)
+    status5: str = "✅ PASSED" if ok5 else "❌ FAILED"
+    print(f"\n[Тест 5] Один общий реестр на {len(seen)} потоков (создано {len(created)}): {status5}")
+
+    passed: int = sum([
+        status1 == "✅ PASSED", status2 == "✅ PASSED", status3 == "✅ PASSED", status4 == "✅ PASSED",
+        status5 == "✅ PASSED",
+    ])
+    print(f"\n📊 Результаты: {passed}/5 тестов пройдено\n")
+    assert passed == 5
+
+
+def test_engine_single_flight() -> None:
+    """
+    Что я делаю?
+        Тестирую, что одновременная загрузка движка из нескольких потоков
+        загружает модель ровно один раз.
+    Что я принимаю на вход?
+        Ничего.
+    Что я возвращаю?
+        Ничего.
+    """
+    import threading
+    import time
+    import torch
+    from engine import SummarizerEngine
+
+    print("=" * 80)
+    print("ТЕСТИРОВАНИЕ КЛАССА SummarizerEngine")
+    print("=" * 80)
+
+    load_calls: list = []
+
+    def slow_loader(model_id: str, **kwargs: any) -> tuple:
+        load_calls.append(model_id)
+        time.sleep(0.2)
+        return torch.nn.Linear(4, 4), "tokenizer"
+
+    engine: SummarizerEngine = SummarizerEngine("model-a", loader=slow_loader, device="cpu")
+    threads: list = [threading.Thread(target=engine.load) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    status1: str = "✅ PASSED" if len(load_calls) == 1 and engine.is_loaded else "❌ FAILED"
+    print(f"\n[Тест 1] Однократная загрузка из 4 потоков: {status1}")
+    print(f"  Вызовов загрузчика: {len(load_calls)} (ожидается 1)")
+
+    passed: int = sum([status1 == "✅ PASSED"])
+    print(f"\n📊 Результаты: {passed}/1 тестов пройдено\n")
+    assert passed == 1
+
+
+def test_summarize_extractive() -> None:
+    """
+    Что я делаю?
+        Тестирую разбиение на предложения и экстрактивную суммаризацию.
+    Что я принимаю на вход?
+        Ничего.
+    Что я возвращаю?
+        Ничего.
+    """
+    from extractive import split_sentences, summarize_extractive, estimate_tokens, compress_to_budget
+
+    print("=" * 80)
+    print("ТЕСТИРОВАНИЕ ФУНКЦИИ summarize_extractive()")
+    print("=" * 80)
+
+    # Тест 1: Сокращения и инициалы не разрывают предложение
+    text1: str = "Профессор А. С. Петров, т.е. автор книги, выступил в 2020 г. в Москве. Зал был полон!"
+    sentences: list = split_sentences(text1)
+    status1: str = "✅ PASSED" if len(sentences) == 2 else "❌ FAILED"
+    print(f"\n[Тест 1] Разбиение на предложения: {status1}")
+    print(f"  Предложений: {len(sentences)} (ожидается 2)")
+
+    # Тест 2: Результат укладывается в бюджет и сохраняет порядок предложений
+    article: str = (
+        "Центральный банк повысил ключевую ставку до шестнадцати процентов. "
+        "Решение совета директоров банка объясняется ростом инфляции. "
+        "Погода в Москве в выходные будет солнечной. "
+        "Аналитики ожидали, что банк повысит ставку меньше. "
+        "Повышение ставки банк связал с ускорением инфляции и кредитования."
+    )
+    summary: str = summarize_extractive(article, max_length=40)
+    chosen: list = split_sentences(summary)
+    in_order: bool = [article.index(item) for item in chosen] == sorted(article.index(item) for item in chosen)
+    fits: bool = estimate_tokens(summary) <= 40 and bool(summary)
+    status2: str = "✅ PASSED" if fits and in_order and "Погода" not in summary else "❌ FAILED"
+    print(f"\n[Тест 2] Бюджет, порядок и отбор предложений: {status2}")
+    print(f"  Саммари: {summary}")
+
+    # Тест 3: Предсжатие укладывает вход в бюджет, короткий текст не трогает
+    compressed: str = compress_to_budget(article, token_budget=60)
+    short_kept: bool = compress_to_budget(text1, token_budget=1000) == text1
+    status3: str = "✅ PASSED" if estimate_tokens(compressed) <= 60 and short_kept else "❌ FAILED"
+    print(f"\n[Тест 3] Предсжатие до бюджета: {status3}")
+    print(f"  Токенов после сжатия: {estimate_tokens(compressed)} (бюджет 60)")
+
+    passed: int = sum([status1 == "✅ PASSED", status2 == "✅ PASSED", status3 == "✅ PASSED"])
+    print(f"\n📊 Результаты: {passed}/3 тестов пройдено\n")
+    assert passed == 3
+
+
+def test_near_duplicate_index() -> None:
+    """
+    Что я делаю?
+        Тестирую поиск саммари для перепечатки уже обработанного текста.
+    Что я принимаю на вход?
+        Ничего.
+    Что я возвращаю?
+        Ничего.
+    """
+    from near_duplicates import NearDuplicateIndex
+
+    print("=" * 80)
+    print("ТЕСТИРОВАНИЕ КЛАССА NearDuplicateIndex")
+    print("=" * 80)
+
+    original: str = (
+        "Центральный банк России повысил ключевую ставку на два процентных пункта, "
+        "до шестнадцати процентов годовых. Решение объясняется ускорением инфляции, "
+        "которая по итогам прошлого месяца превысила прогноз регулятора. Аналитики "
+        "в среднем ожидали повышения на один пункт. Рубль после решения укрепился."
+    )
+    reprint: str = "МОСКВА, 15 сентября. " + original + " Об этом сообщает ТАСС."
+    unrelated: str = (
+        "В Санкт-Петербурге открылась новая станция метро. Строительство заняло почти "
+        "семь лет и несколько раз откладывалось. Станция рассчитана на сорок тысяч человек."
+    )
+
+    index: NearDuplicateIndex = NearDuplicateIndex(threshold=0.8, max_entries=2)
+    index.add(original, ("params", 150), "Ставка повышена до 16%.")
+
+    # Тест 1: Перепечатка находит сохраненное саммари
+    status1: str = "✅ PASSED" if index.lookup(reprint, ("params", 150)) else "❌ FAILED"
+    print(f"\n[Тест 1] Перепечатка найдена: {status1}")
+
+    # Тест 2: Другие параметры генерации и другой текст не совпадают
+    other_params: bool = index.lookup(reprint, ("params", 60)) is None
+    other_text: bool = index.lookup(unrelated, ("params", 150)) is None
+    status2: str = "✅ PASSED" if other_params and other_text else "❌ FAILED"
+    print(f"\n[Тест 2] Нет ложных совпадений: {status2}")
+
+    # Тест 3: Размер индекса ограничен
+    index.add(unrelated, ("params", 150), "Открыта станция метро.")
+    index.add(reprint, ("params", 60), "Ставка 16%.")
+    status3: str = "✅ PASSED" if len(index) == 2 else "❌ FAILED"
+    print(f"\n[Тест 3] Ограничение размера индекса: {status3}")
+
+    passed: int = sum([status1 == "✅ PASSED", status2 == "✅ PASSED", status3 == "✅ PASSED"])
+    print(f"\n📊 Результаты: {passed}/3 тестов пройдено\n")
+    assert passed == 3
+
+
+def test_metrics() -> None:
+    """
+    Что я делаю?
+        Тестирую сбор метрик этапов и их вывод в формате Prometheus.
+    Что я принимаю на вход?
+        Ничего.
+    Что я возвращаю?
+        Ничего.
+    """
+    from metrics import Metrics
+
+    print("=" * 80)
+    print("ТЕСТИРОВАНИЕ КЛАССА Metrics")
+    print("=" * 80)
+
+    # Тест 1: Выключенные метрики ничего не записывают
+    disabled: Metrics = Metrics(enabled=False)
+    with disabled.stage("generate"):
+        pass
+    disabled.inc("requests_total")
+    status1: str = "✅ PASSED" if not disabled.snapshot()["counters"] else "❌ FAILED"
+    print(f"\n[Тест 1] Выключенные метрики: {status1}")
+
+    # Тест 2: Этапы, токены и ошибки попадают в снимок и в текст Prometheus
+    enabled: Metrics = Metrics(enabled=True)
+    with enabled.stage("generate") as timer:
+        pass
+    enabled.record_tokens(100, 20, 0.5)
+    enabled.record_error(TimeoutError())
+    snapshot: dict = enabled.snapshot()
+    text: str = enabled.render_prometheus()
+    recorded: bool = (
+        snapshot["histograms"]["stage_seconds"]["stage=generate"]["count"] == 1
+        and snapshot["gauges"]["tokens_per_second"][""] == 40.0
+        and 'summarizer_errors_total{error_class="TimeoutError"} 1.0' in text
+        and timer.seconds >= 0.0
+    )
+    status2: str = "✅ PASSED" if recorded else "❌ FAILED"
+    print(f"\n[Тест 2] Запись этапов, токенов и ошибок: {status2}")
+
+    passed: int = sum([status1 == "✅ PASSED", status2 == "✅ PASSED"])
+    print(f"\n📊 Результаты: {passed}/2 тестов пройдено\n")
+    assert passed == 2
+
+
+def test_tracing() -> None:
+    """
+    Что я делаю?
+        Тестирую запись дерева интервалов запроса и отбор самых медленных профилей.
+    Что я принимаю на вход?
+        Ничего.
+    Что я возвращаю?
+        Ничего.
+    """
+    import json
+    import tempfile
+    from collections import Counter
+    from pathlib import Path
+
+    from tracing import StackSampler, Tracer
+
+    print("=" * 80)
+    print("ТЕСТИРОВАНИЕ ТРАССИРОВКИ ЗАПРОСОВ")
+    print("=" * 80)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Тест 1: Одна строка JSONL с вложенными интервалами и атрибутами
+        trace_path: Path = Path(tmp) / "trace.jsonl"
+        local_tracer: Tracer = Tracer(str(trace_path))
+        with local_tracer.request("summarize", input_chars=120):
+            with local_tracer.span("tokenize"):
+                pass
+            with local_tracer.span("generate"):
+                local_tracer.annotate(steps=3)
+        outside = local_tracer.span("decode")
+        lines = trace_path.read_text(encoding="utf-8").splitlines()
+        record: dict = json.loads(lines[0]) if lines else {}
+        children = record.get("children", [])
+        ok1: bool = (
+            len(lines) == 1
+            and [child["name"] for child in children] == ["tokenize", "generate"]
+            and children[1].get("attributes") == {"steps": 3}
+            and outside is None
+        )
+        status1: str = "✅ PASSED" if ok1 else "❌ FAILED"
+        print(f"\n[Тест 1] Дерево интервалов в JSONL: {status1}")
+
+        # Тест 2: Профилировщик хранит стеки только N самых медленных запросов
+        sampler: StackSampler = StackSampler(slowest=2, output_dir=tmp)
+        for trace_id, seconds in (("a", 1.0), ("b", 3.0), ("c", 2.0), ("d", 0.5)):
+            sampler.offer(trace_id, seconds, Counter({"main;summarize;generate": 5}))
+        kept = sorted(path.stem for path in Path(tmp).glob("*.folded"))
+        status2: str = "✅ PASSED" if kept == ["b", "c"] else "❌ FAILED"
+        print(f"\n[Тест 2] Хранятся только самые медленные профили {kept}: {status2}")
+
+    passed: int = sum([status1 == "✅ PASSED", status2 == "✅ PASSED"])
+    print(f"\n📊 Результаты: {passed}/2 тестов пройдено\n")
+    assert passed == 2
+
+
+def test_micro_batcher() -> None:
+    """
+    Что я делаю?
+        Тестирую объединение запросов в батчи и отказ по дедлайну и длине очереди.
+    Что я принимаю на вход?
+        Ничего.
+    Что я возвращаю?
+        Ничего.
+    """
+    import time
+    from typing import List
+
+    from batcher import MicroBatcher, OverloadedError
+
+    print("=" * 80)
+    print("ТЕСТИРОВАНИЕ МИКРО-БАТЧЕРА")
+    print("=" * 80)
+
+    class FakeEngine:
+        def __init__(self, busy: bool = False) -> None:
+            self.batch_sizes: List[int] = []
+            self.wait_timeouts: List[Optional[float]] = []
+            self.busy: bool = busy
+
+        def summarize_batch(
+            self, texts: List[str], max_length: int, min_length: int, num_beams: int = 1,
+            wait_timeout: Optional[float] = None, priority: str = "interactive", adaptive_length: bool = False,
+        ) -> List[str]:
+            self.wait_timeouts.append(wait_timeout)
+            if self.busy and wait_timeout is not None:
+                # Движок занят чужой генерацией дольше, чем готов ждать батч
+                time.sleep(wait_timeout)
+                raise TimeoutError("Движок занят")
+            self.batch_sizes.append(len(texts))
+            time.sleep(0.05)
+            return [text.upper() for text in texts]
+
+    # Тест 1: Запросы, пришедшие почти одновременно, выполняются одним батчем
+    engine = FakeEngine()
+    batcher: MicroBatcher = MicroBatcher(engine, max_batch_size=4, max_wait_ms=50, max_queue=8).start()
+    pending = batcher.submit(["а", "б", "в"], 20, 5) + batcher.submit(["г", "д"], 20, 5)
+    results: List[str] = [item.result(timeout=5) for item in pending]
+    ok1: bool = results == ["А", "Б", "В", "Г", "Д"] and engine.batch_sizes == [4, 1]
+    status1: str = "✅ PASSED" if ok1 else "❌ FAILED"
+    print(f"\n[Тест 1] Батчи {engine.batch_sizes}: {status1}")
+
+    # Тест 2: Отказ, если ожидание больше дедлайна или очередь переполнена
+    batcher.batch_seconds = 10.0
+    rejected: List[str] = []
+    try:
+        batcher.submit(["е"], 20, 5, deadline=time.monotonic() + 1.0)
+    except OverloadedError:
+        rejected.append("deadline")
+    try:
+        batcher.submit(["ж"] * 9, 20, 5)
+    except OverloadedError:
+        rejected.append("queue_full")
+    batcher.stop()
+    status2: str = "✅ PASSED" if rejected == ["deadline", "queue_full"] else "❌ FAILED"
+    print(f"\n[Тест 2] Отказ при перегрузке {rejected}: {status2}")
+
+    # Тест 3: Занятый движок ждут не дольше дедлайна батча, без дедлайна - без ограничения
+    busy_engine = FakeEngine(busy=True)
+    batcher = MicroBatcher(busy_engine, max_batch_size=4, max_wait_ms=10, max_queue=8).start()
+    started: float = time.monotonic()
+    expired = batcher.submit(["з"], 20, 5, deadline=started + 0.3)[0]
+    try:
+        expired.result(timeout=5)
+        timed_out: bool = False
+    except TimeoutError:
+        timed_out = True
+    elapsed: float = time.monotonic() - started
+    busy_engine.busy = False
+    free: str = batcher.submit(["и"], 20, 5)[0].result(timeout=5)
+    batcher.stop()
+    ok3: bool = (
+        timed_out and elapsed < 1.0 and free == "И"
+        and busy_engine.wait_timeouts[0] is not None and 0.0 < busy_engine.wait_timeouts[0] <= 0.3
+        and busy_engine.wait_timeouts[1] is None
+    )
+    status3: str = "✅ PASSED" if ok3 else "❌ FAILED"
+    print(f"\n[Тест 3] Ожидание движка ограничено дедлайном ({elapsed:.2f} с): {status3}")
+
+    passed: int = sum([status1 == "✅ PASSED", status2 == "✅ PASSED", status3 == "✅ PASSED"])
+    print(f"\n📊 Результаты: {passed}/3 тестов пройдено\n")
+    assert passed == 3
+
+
+def test_priority_scheduling() -> None:
+    """
+    Что я делаю?
+        Тестирую, что interactive обгоняет bulk, а bulk не голодает.
+    Что я принимаю на вход?
+        Ничего.
+    Что я возвращаю?
+        Ничего.
+    """
+    import threading
+    import time
+    from typing import List
+
+    from scheduling import FairScheduler, PriorityLock
+
+    print("=" * 80)
+    print("ТЕСТИРОВАНИЕ ПРИОРИТЕТНОГО ПЛАНИРОВАНИЯ")
+    print("=" * 80)
+
+    # Тест 1: Пока блокировка занята, встают в очередь bulk, затем interactive;
+    # после освобождения первым идет interactive
+    lock: PriorityLock = PriorityLock()
+    order: List[str] = []
+    lock.acquire("bulk")
+
+    def worker(priority: str) -> None:
+        lock.acquire(priority)
+        order.append(priority)
+        lock.release()
+
+    threads: List[threading.Thread] = []
+    for priority in ("bulk", "bulk", "interactive"):
+        thread = threading.Thread(target=worker, args=(priority,))
+        thread.start()
+        threads.append(thread)
+        while sum(lock.waiting().values()) < len(threads):
+            time.sleep(0.001)
+    lock.release()
+    for thread in threads:
+        thread.join(timeout=5)
+    status1: str = "✅ PASSED" if order == ["interactive", "bulk", "bulk"] else "❌ FAILED"
+    print(f"\n[Тест 1] Порядок обслуживания {order}: {status1}")
+
+    # Тест 2: При постоянной нагрузке обоих классов bulk получает свою долю,
+    # а запрос, ждущий дольше порога, обслуживается вне очереди
+    scheduler: FairScheduler = FairScheduler({"interactive": 4.0, "bulk": 1.0}, starvation_after=10.0)
+    picks: List[str] = []
+    for _ in range(10):
+        chosen: str = scheduler.pick({"interactive": 100.0, "bulk": 100.0}, now=100.0)
+        scheduler.charge(chosen)
+        picks.append(chosen)
+    starving: str = scheduler.pick({"interactive": 100.0, "bulk": 80.0}, now=100.0)
+    ok2: bool = picks.count("bulk") == 2 and picks[0] == "interactive" and starving == "bulk"
+    status2: str = "✅ PASSED" if ok2 else "❌ FAILED"
+    print(f"\n[Тест 2] Доли {picks.count('interactive')}:{picks.count('bulk')}, защита от голодания: {status2}")
+
+    # Тест 3: Доля списывается по числу текстов: после пакета из 3 текстов bulk
+    # пропускает вперед три одиночных interactive-запроса (при равных весах)
+    lock = PriorityLock(FairScheduler({"interactive": 1.0, "bulk": 1.0}))
+    lock.acquire("bulk", cost=3)
+    lock.release()
+    lock.acquire("interactive")
+    order = []
+    threads = []
+    for priority in ("interactive", "interactive", "interactive", "bulk"):
+        thread = threading.Thread(target=worker, args=(priority,))
+        thread.start()
+        threads.append(thread)
+        while sum(lock.waiting().values()) < len(threads):
+            time.sleep(0.001)
+    lock.release()
+    for thread in threads:
+        thread.join(timeout=5)
+    expected: List[str] = ["interactive", "interactive", "interactive", "bulk"]
+    status3: str = "✅ PASSED" if order == expected else "❌ FAILED"
+    print(f"\n[Тест 3] Порядок после пакета из 3 текстов {order}: {status3}")
+
+    passed: int = sum([status1 == "✅ PASSED", status2 == "✅ PASSED", status3 == "✅ PASSED"])
+    print(f"\n📊 Результаты: {passed}/3 тестов пройдено\n")
+    assert passed == 3
+
+
+def test_preflight() -> None:
+    """
+    Что я делаю?
+        Тестирую модель стоимости и предварительную проверку текста.
+    Что я принимаю на вход?
+        Ничего.
+    Что я возвращаю?
+        Ничего.
+    """
+    from typing import Any, Dict, List
+
+    import preflight
+    from cost_model import CostModel
+    from engine import MAX_INPUT_TOKENS
+
+    print("=" * 80)
+    print("ТЕСТИРОВАНИЕ ПРЕДВАРИТЕЛЬНОЙ ПРОВЕРКИ")
+    print("=" * 80)
+
+    # Тест 1: Модель стоимости восстанавливает коэффициенты по наблюдениям
+    true_model: CostModel = CostModel((0.1, 0.001, 0.02))
+    observations: List[Any] = [
+        (inputs, outputs, beams, 1, true_model.predict(inputs, outputs, beams))
+        for inputs in (50, 200, 600) for outputs in (10, 60) for beams in (1, 4)
+    ]
+    fitted: CostModel = CostModel()
+    ok1: bool = fitted.fit(observations) and all(
+        abs(got - want) < 1e-6 for got, want in zip(fitted.coefficients, true_model.coefficients)
+    )
+    status1: str = "✅ PASSED" if ok1 else "❌ FAILED"
+    print(f"\n[Тест 1] Калибровка коэффициентов: {status1}")
+
+    # Тест 2: Длинный текст помечается как обрезаемый (токенизатор подменен: слово = токен)
+    class WordTokenizer:
+        def __call__(self, text: str, add_special_tokens: bool = True) -> Dict[str, List[int]]:
+            return {"input_ids": list(range(len(text.split())))}
+
+    preflight._tokenizers["fake-model"] = WordTokenizer()
+    try:
+        long_report: Dict[str, Any] = preflight.preflight(
+            "слово " * (MAX_INPUT_TOKENS + 100), model_name="fake-model", model=true_model
+        )
+        short_report: Dict[str, Any] = preflight.preflight(
+            "слово " * 20, max_length=40, model_name="fake-model", model=true_model
+        )
+        exact_report: Dict[str, Any] = preflight.preflight(
+            "слово " * MAX_INPUT_TOKENS, model_name="fake-model", model=true_model
+        )
+    finally:
+        del preflight._tokenizers["fake-model"]
+    ok2: bool = (
+        long_report["truncated"]
+        and long_report["dropped_tokens"] == 100
+        and long_report["model_input_tokens"] == MAX_INPUT_TOKENS + 1
+        and not short_report["truncated"]
+        and short_report["input_tokens"] == 21
+        and short_report["estimated_seconds"] <= short_report["worst_case_seconds"]
+    )
+    status2: str = "✅ PASSED" if ok2 else "❌ FAILED"
+    print(f"\n[Тест 2] Подсчет токенов и обрезка: {status2}")
+
+    # Тест 3: Ровно MAX_INPUT_TOKENS токенов текста не обрезаются (sep_token добавляется после лимита)
+    ok3: bool = (
+        not exact_report["truncated"]
+        and exact_report["dropped_tokens"] == 0
+        and exact_report["model_input_tokens"] == MAX_INPUT_TOKENS + 1
+    )
+    status3: str = "✅ PASSED" if ok3 else "❌ FAILED"
+    print(f"\n[Тест 3] Текст ровно в {MAX_INPUT_TOKENS} токенов не обрезается: {status3}")
+
+    passed: int = sum([status1 == "✅ PASSED", status2 == "✅ PASSED", status3 == "✅ PASSED"])
+    print(f"\n📊 Результаты: {passed}/3 тестов пройдено\n")
+    assert passed == 3
+
+
+def test_sentence_boundary_stop() -> None:
+    """
+    Что я делаю?
+        Тестирую остановку генерации на границе предложения и учет экономии токенов.
+    Что я принимаю на вход?
+        Ничего.
+    Что я возвращаю?
+        Ничего.
+    """
+    from typing import Dict, List
+
+    import torch
+
+    from engine import SentenceBoundaryStoppingCriteria, SummarizerEngine, trim_to_sentence
+
+    print("=" * 80)
+    print("ТЕСТИРОВАНИЕ ОСТАНОВКИ НА ГРАНИЦЕ ПРЕДЛОЖЕНИЯ")
+    print("=" * 80)
+
+    pieces: Dict[int, str] = {
+        0: "<вход>", 1: " Цены", 2: " выросли", 3: " на", 4: " 2", 5: ".", 6: "5", 7: " млн", 8: " рублей", 9: " Банк",
+    }
+
+    class PieceTokenizer:
+        def batch_decode(self, rows: torch.Tensor, skip_special_tokens: bool = True) -> List[str]:
+            return ["".join(pieces[int(token)] for token in row) for row in rows]
+
+    criteria = SentenceBoundaryStoppingCriteria(PieceTokenizer(), prompt_length=1, target_length=2)
+
+    def stops(new_tokens: List[int]) -> bool:
+        return bool(criteria(torch.tensor([[0] + new_tokens]), None)[0])
+
+    # Тест 1: "2.5" и "млн." не граница; до мягкой цели не останавливаюсь;
+    # граница - знак конца и начало нового предложения с заглавной буквы
+    ok1: bool = (
+        not stops([1, 2, 3, 4, 5, 6])
+        and not stops([5, 9])
+        and not stops([1, 2, 3, 4, 5, 6, 7, 5, 8])
+        and stops([1, 2, 3, 4, 5, 6, 7, 8, 5, 9])
+    )
+    status1: str = "✅ PASSED" if ok1 else "❌ FAILED"
+    print(f"\n[Тест 1] Распознавание границы предложения: {status1}")
+
+    # Тест 2: Начало следующего предложения отрезается, экономия считается от max_length
+    engine: SummarizerEngine = SummarizerEngine(loader=lambda name: (None, None))
+    stopped: str = engine._finish_adaptive("Цены выросли на 2.5 млн рублей. Банк", new_tokens=10, max_length=60)
+    natural: str = engine._finish_adaptive("Цены выросли на 2.5 млн рублей", new_tokens=60, max_length=60)
+    ok2: bool = (
+        stopped == "Цены выросли на 2.5 млн рублей."
+        and natural == "Цены выросли на 2.5 млн рублей"
+        and engine.length_stats == {"texts": 2, "stops": 1, "tokens_saved": 50}
+        and engine.average_tokens_saved() == 25.0
+        and trim_to_sentence("Без конца") == "Без конца"
+    )
+    status2: str = "✅ PASSED" if ok2 else "❌ FAILED"
+    print(f"\n[Тест 2] Обрезка и учет сэкономленных токенов: {status2}")
+
+    passed: int = sum([status1 == "✅ PASSED", status2 == "✅ PASSED"])
+    print(f"\n📊 Результаты: {passed}/2 тестов пройдено\n")
+    assert passed == 2
+
+
+def _tiny_engine() -> "SummarizerEngine":
+    """
+    Что я делаю?
+        Создаю движок с крошечной случайной GPT-2 и побайтовым токенизатором,
+        чтобы проверять генерацию без загрузки настоящей модели.
+    Что я принимаю на вход?
+        Ничего.
+    Что я возвращаю?
+        SummarizerEngine: Движок.
+    """
+    from typing import Any, Dict, List
+
+    import torch
+    from transformers import GPT2Config, GPT2LMHeadModel
+
+    from engine import SummarizerEngine
+
+    class ByteTokenizer:
+        sep_token_id: int = 255
+        pad_token_id: int = 0
+
+        def __call__(self, text: str, max_length: int = 600, **kwargs: Any) -> Dict[str, List[int]]:
+            return {"input_ids": [2 + byte % 250 for byte in text.encode("utf-8")][:max_length]}
+
+        def decode(self, ids: List[int], skip_special_tokens: bool = True) -> str:
+            return " ".join(str(token) for token in ids)
+
+    torch.manual_seed(0)
+    # Крупная инициализация весов, чтобы случайная модель не повторяла один токен
+    config = GPT2Config(
+        vocab_size=256, n_positions=512, n_embd=32, n_layer=2, n_head=2,
+        bos_token_id=0, eos_token_id=0, initializer_range=0.5,
+    )
+    model = GPT2LMHeadModel(config).eval()
+    return SummarizerEngine(loader=lambda name: (model, ByteTokenizer()), device="cpu")
+
+
+def test_batch_decode() -> None:
+    """
+    Что я делаю?
+        Тестирую, что саммари из батча совпадают с саммари тех же текстов,
+        обработанных по одному, и обрезаются на sep_token.
+    Что я принимаю на вход?
+        Ничего.
+    Что я возвращаю?
+        Ничего.
+    """
+    print("=" * 80)
+    print("ТЕСТИРОВАНИЕ ДЕКОДИРОВАНИЯ БАТЧА")
+    print("=" * 80)
+
+    engine = _tiny_engine()
+    # Входы разной длины: короткие дополняются слева, строки заканчиваются в разное время
+    texts = [
+        "Центробанк сохранил ключевую ставку на прежнем уровне.",
+        "Сборная выиграла финал чемпионата мира по хоккею в овертайме.",
+        "Правительство утвердило новые правила. Изменения вступят в силу с начала года.",
+    ]
+    batch = engine.summarize_batch(texts, 40, 1)
+    single = [engine.summarize(text, 40, 1) for text in texts]
+
+    # Тест 1: Батч дает те же саммари, что и одиночная генерация
+    status1: str = "✅ PASSED" if batch == single else "❌ FAILED"
+    print(f"\n[Тест 1] Саммари батча совпадают с одиночными: {status1}")
+
+    # Тест 2: Случайная модель выдает sep_token (255) на 15-м токене первого текста -
+    # все после него отброшено, а в остальных строках нет ни sep_token, ни паддинга
+    lengths = [len(summary.split()) for summary in batch]
+    ok2: bool = lengths == [14, 40, 40] and not any(" 255 " in f" {summary} " for summary in batch)
+    status2: str = "✅ PASSED" if ok2 else "❌ FAILED"
+    print(f"\n[Тест 2] Обрезка по sep_token, токенов в саммари {lengths}: {status2}")
+
+    passed: int = sum([status1 == "✅ PASSED", status2 == "✅ PASSED"])
+    print(f"\n📊 Результаты: {passed}/2 тестов пройдено\n")
+    assert passed == 2
+
+
+def test_engine_sweep() -> None:
+    """
+    Что я делаю?
+        Тестирую, что сравнение параметров с общим KV-кешем входа дает те же
+        саммари, что и отдельные генерации.
+    Что я принимаю на вход?
+        Ничего.
+    Что я возвращаю?
+        Ничего.
+    """
+    from typing import List, Tuple
+
+    print("=" * 80)
+    print("ТЕСТИРОВАНИЕ СРАВНЕНИЯ ПАРАМЕТРОВ")
+    print("=" * 80)
+
+    engine = _tiny_engine()
+    text: str = "Правительство утвердило новые правила субсидирования. Изменения вступят в силу с начала года."
+    configs: List[Tuple[int, int, int]] = [(12, 4, 1), (12, 4, 3), (6, 2, 2)]
+    separate: List[str] = [engine.summarize(text, *params) for params in configs]
+    swept: List[str] = engine.sweep(text, configs)
+    status1: str = "✅ PASSED" if swept == separate and len(set(swept)) > 1 else "❌ FAILED"
+    print(f"\n[Тест 1] Общий KV-кеш входа не меняет результат: {status1}")
+
+    passed: int = sum([status1 == "✅ PASSED"])
+    print(f"\n📊 Результаты: {passed}/1 тестов пройдено\n")
+    assert passed == 1
+
+
+def test_generation_cancel() -> None:
+    """
+    Что я делаю?
+        Тестирую отмену устаревшей генерации (живой режим GUI).
+    Что я принимаю на вход?
+        Ничего.
+    Что я возвращаю?
+        Ничего.
+    """
+    import threading
+    from typing import List
+
+    from engine import GenerationCancelled
+
+    print("=" * 80)
+    print("ТЕСТИРОВАНИЕ ОТМЕНЫ ГЕНЕРАЦИИ")
+    print("=" * 80)
+
+    engine = _tiny_engine()
+    text: str = "Правительство утвердило новые правила субсидирования. Изменения вступят в силу с начала года."
+
+    # Тест 1: Отмена посреди генерации останавливает ее на ближайшем шаге
+    cancel_event: threading.Event = threading.Event()
+    model, _ = engine.load()
+    steps: List[int] = []
+
+    def cancel_after_three_steps(module: object, args: object, output: object) -> None:
+        steps.append(1)
+        if len(steps) == 3:
+            cancel_event.set()
+
+    hook = model.register_forward_hook(cancel_after_three_steps)
+    try:
+        engine.summarize(text, max_length=200, min_length=200, cancel_event=cancel_event)
+        ok1: bool = False
+    except GenerationCancelled:
+        ok1 = len(steps) == 3
+    finally:
+        hook.remove()
+    status1: str = "✅ PASSED" if ok1 else "❌ FAILED"
+    print(f"\n[Тест 1] Генерация прервана после {len(steps)} шагов из 200: {status1}")
+
+    # Тест 2: Запрос, отмененный до начала, не запускает генерацию,
+    # а без отмены генерация проходит как обычно
+    try:
+        engine.summarize(text, 10, 5, cancel_event=cancel_event)
+        ok2: bool = False
+    except GenerationCancelled:
+        ok2 = bool(engine.summarize(text, 10, 5, cancel_event=threading.Event()))
+    status2: str = "✅ PASSED" if ok2 else "❌ FAILED"
+    print(f"\n[Тест 2] Отмена до начала генерации: {status2}")
+
+    passed: int = sum([status1 == "✅ PASSED", status2 == "✅ PASSED"])
+    print(f"\n📊 Результаты: {passed}/2 тестов пройдено\n")
+    assert passed == 2
+
+
+def test_batch_queue() -> None:
+    """
+    Что я делаю?
+        Тестирую пакетную очередь: порции, экспорт в JSONL, паузу и продолжение.
+    Что я принимаю на вход?
+        Ничего.
+    Что я возвращаю?
+        Ничего.
+    """
+    import json
+    import tempfile
+    import threading
+    import time
+    from pathlib import Path
+    from typing import List
+
+    from batch_queue import BatchQueue
+
+    print("=" * 80)
+    print("ТЕСТИРОВАНИЕ ПАКЕТНОЙ ОЧЕРЕДИ")
+    print("=" * 80)
+
+    with tempfile.TemporaryDirectory() as folder:
+        root: Path = Path(folder)
+        (root / "nested").mkdir()
+        for index in range(5):
+            (root / f"article{index}.txt").write_text(f"Статья номер {index}", encoding="utf-8")
+        (root / "nested" / "broken.md").write_text("сломать", encoding="utf-8")
+        (root / "image.png").write_bytes(b"not a text")
+
+        chunks: List[int] = []
+        release: threading.Event = threading.Event()
+
+        def summarize_many(texts: List[str]) -> List[str]:
+            chunks.append(len(texts))
+            release.wait(5)
+            return ["❌ сбой" if text == "сломать" else text.upper() for text in texts]
+
+        output: Path = root / "out" / "summaries.jsonl"
+        queue: BatchQueue = BatchQueue(summarize_many, str(output), chunk_size=2)
+        added: int = queue.add_files([folder])
+
+        # Тест 1: Пауза останавливает очередь на границе порции, продолжение доводит до конца
+        queue.start()
+        while not chunks:
+            time.sleep(0.001)
+        queue.pause()
+        release.set()
+        time.sleep(0.1)
+        paused_chunks: int = len(chunks)
+        paused_pending: int = queue.stats()["pending"]
+        queue.resume()
+        finished: bool = queue.wait(5)
+        ok1: bool = added == 6 and paused_chunks == 1 and paused_pending == 4 and finished and chunks == [2, 2, 2]
+        status1: str = "✅ PASSED" if ok1 else "❌ FAILED"
+        print(f"\n[Тест 1] Порции {chunks}, пауза после {paused_chunks}-й: {status1}")
+
+        # Тест 2: Каждый результат - строка JSONL, ошибки помечены
+        records = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+        stats = queue.stats()
+        ok2: bool = (
+            len(records) == 6
+            and sum("summary" in record for record in records) == 5
+            and any(record.get("error") == "❌ сбой" for record in records)
+            and stats["done"] == 5 and stats["errors"] == 1 and stats["items_per_second"] > 0
+        )
+        status2: str = "✅ PASSED" if ok2 else "❌ FAILED"
+        print(f"\n[Тест 2] Экспорт в JSONL по мере готовности: {status2}")
+
+    passed: int = sum([status1 == "✅ PASSED", status2 == "✅ PASSED"])
+    print(f"\n📊 Результаты: {passed}/2 тестов пройдено\n")
+    assert passed == 2
+
+
+def test_large_file() -> None:
+    """
+    Что я делаю?
+        Тестирую большой файл: страницы и фрагменты без потерь, начало документа и map-reduce.
+    Что я принимаю на вход?
+        Ничего.
+    Что я возвращаю?
+        Ничего.
+    """
+    import tempfile
+    from pathlib import Path
+    from typing import List, Tuple
+
+    import large_file
+    from extractive import estimate_tokens
+    from large_file import LargeTextFile, summarize_long
+
+    print("=" * 80)
+    print("ТЕСТИРОВАНИЕ БОЛЬШИХ ФАЙЛОВ")
+    print("=" * 80)
+
+    paragraph: str = (
+        "Регулятор сохранил ключевую ставку на прежнем уровне. Аналитики ожидали такого решения. "
+        "Инфляция замедлилась третий месяц подряд, сообщила пресс-служба.\n\n"
+    )
+    text_input: str = "".join(f"Раздел {index}. {paragraph}" for index in range(1500))
+
+    with tempfile.TemporaryDirectory() as folder:
+        path: Path = Path(folder) / "big.txt"
+        path.write_text(text_input, encoding="utf-8")
+
+        with LargeTextFile(str(path)) as document:
+            # Тест 1: Страницы и фрагменты вместе дают исходный текст (UTF-8 не рвется)
+            pages: List[str] = [document.page(index) for index in range(document.page_count)]
+            chunks: List[str] = list(document.iter_chunks(chunk_chars=5000))
+            ok1: bool = (
+                document.page_count > 1 and "".join(pages) == text_input
+                and len(chunks) > 1 and "".join(chunks) == text_input
+                and all(chunk.endswith((". ", "\n\n")) for chunk in chunks[:-1])
+            )
+            status1: str = "✅ PASSED" if ok1 else "❌ FAILED"
+            print(f"\n[Тест 1] {document.page_count} стр., {len(chunks)} фрагментов без потерь: {status1}")
+
+            # Тест 2: Начало документа ограничено и обрезано по предложению
+            head: str = document.head(max_chars=1000)
+            ok2: bool = 0 < len(head) <= 1000 and text_input.startswith(head) and head.endswith(".")
+            status2: str = "✅ PASSED" if ok2 else "❌ FAILED"
+            print(f"\n[Тест 2] Начало документа: {len(head)} символов: {status2}")
+
+            # Тест 3: Map-reduce отдает суммаризатору выжимку в пределах бюджета
+            received: List[str] = []
+            progress: List[Tuple[int, int]] = []
+            summary = summarize_long(
+                document,
+                lambda digest: received.append(digest) or "итог",
+                lambda done, total: progress.append((done, total)),
+            )
+            ok3: bool = (
+                summary == "итог" and len(received) == 1
+                and 0 < estimate_tokens(received[0]) <= large_file.DIGEST_TOKENS
+                and len(progress) > 1 and progress[-1][0] == progress[-1][1]
+            )
+            status3: str = "✅ PASSED" if ok3 else "❌ FAILED"
+            print(f"\n[Тест 3] Выжимка {estimate_tokens(received[0]) if received else 0} токенов "
+                  f"после {len(progress)} фрагментов: {status3}")
+
+        # Тест 4: Пустой файл открывается без ошибок
+        empty: Path = Path(folder) / "empty.txt"
+        empty.write_bytes(b"")
+        with LargeTextFile(str(empty)) as document:
+            ok4: bool = document.page(0) == "" and list(document.iter_chunks()) == [] and document.head() == ""
+        status4: str = "✅ PASSED" if ok4 else "❌ FAILED"
+        print(f"\n[Тест 4] Пустой файл: {status4}")
+
+    passed: int = sum([status1 == "✅ PASSED", status2 == "✅ PASSED",
+                       status3 == "✅ PASSED", status4 == "✅ PASSED"])
+    print(f"\n📊 Результаты: {passed}/4 тестов пройдено\n")
+    assert passed == 4
+
+
+def test_result_store() -> None:
+    """
+    Что я делаю?
+        Тестирую хранилище результатов: восстановление после перезапуска, ключ параметров и поиск.
+    Что я принимаю на вход?
+        Ничего.
+    Что я возвращаю?
+        Ничего.
+    """
+    import tempfile
+    from pathlib import Path
+
+    from result_store import ResultStore, hash_text
+
+    print("=" * 80)
+    print("ТЕСТИРОВАНИЕ ХРАНИЛИЩА РЕЗУЛЬТАТОВ")
+    print("=" * 80)
+
+    article: str = "Центробанк сохранил ключевую ставку.\nАналитики ожидали такого решения."
+    params = {"max_length": 150, "min_length": 50, "num_beams": 4}
+
+    with tempfile.TemporaryDirectory() as folder:
+        path: Path = Path(folder) / "history" / "results.sqlite3"
+        store: ResultStore = ResultStore(path)
+        store.put(article, params, "Ставка сохранена.", 2.5)
+        store.put("Сборная выиграла финал чемпионата мира по хоккею.", params, "Сборная победила.", 1.0)
+        skipped = store.put("Текст с ошибкой сервиса при суммаризации.", params, "❌ Ошибка API: 500", 0.1)
+        store.close()
+
+        # Тест 1: После перезапуска тот же текст (с другими пробелами) находится мгновенно
+        store = ResultStore(path)
+        record = store.get(hash_text("  Центробанк сохранил ключевую ставку. Аналитики ожидали такого решения. "), params)
+        ok1: bool = (
+            record is not None and record["summary"] == "Ставка сохранена." and record["seconds"] == 2.5
+            and store.text(record["id"]) == article and skipped is None
+        )
+        status1: str = "✅ PASSED" if ok1 else "❌ FAILED"
+        print(f"\n[Тест 1] Восстановление после перезапуска: {status1}")
+
+        # Тест 2: Другие параметры - другой результат, повторное сохранение заменяет запись
+        other = store.get(hash_text(article), {**params, "max_length": 60})
+        store.put(article, params, "Ставка не изменилась.", 2.0)
+        ok2: bool = (
+            other is None
+            and store.get(hash_text(article), params)["summary"] == "Ставка не изменилась."
+            and len(store.search()) == 2
+        )
+        status2: str = "✅ PASSED" if ok2 else "❌ FAILED"
+        print(f"\n[Тест 2] Ключ параметров и замена записи: {status2}")
+
+        # Тест 3: Поиск по заголовку и саммари, новые сверху, удаление
+        newest_first: bool = [entry["summary"] for entry in store.search()][0] == "Ставка не изменилась."
+        found = store.search("победила")
+        literal = store.search("100%")
+        store.delete(found[0]["id"])
+        ok3: bool = newest_first and len(found) == 1 and literal == [] and len(store.search()) == 1
+        status3: str = "✅ PASSED" if ok3 else "❌ FAILED"
+        print(f"\n[Тест 3] Поиск и удаление: {status3}")
+        store.close()
+
+    passed: int = sum([status1 == "✅ PASSED", status2 == "✅ PASSED", status3 == "✅ PASSED"])
+    print(f"\n📊 Результаты: {passed}/3 тестов пройдено\n")
+    assert passed == 3
+
+
+def test_start_preflight() -> None:
+    """
+    Что я делаю?
+        Тестирую проверки стартера: без импорта тяжелых пакетов и с кешем по отпечатку окружения.
+    Что я принимаю на вход?
+        Ничего.
+    Что я возвращаю?
+        Ничего.
+    """
+    import os
+    import subprocess
+    import sys
+    import tempfile
+    from pathlib import Path
+
+    import start
+
+    print("=" * 80)
+    print("ТЕСТИРОВАНИЕ ПРОВЕРОК СТАРТЕРА")
+    print("=" * 80)
+
+    # Тест 1: Все проверки в отдельном процессе не импортируют проверяемые пакеты
+    code: str = (
+        "import sys, start; start.run_checks(); "
+        "print('IMPORTED', sorted(name for name in start.REQUIRED_PACKAGES if name in sys.modules))"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", code], cwd=str(start.PROJECT_DIR), capture_output=True, text=True, timeout=120
+    )
+    ok1: bool = "IMPORTED []" in completed.stdout
+    status1: str = "✅ PASSED" if ok1 else "❌ FAILED"
+    print(f"\n[Тест 1] Проверки без импорта зависимостей: {status1}")
+
+    # Тест 2: Отпечаток стабилен, меняется вместе с окружением, кеш хранит прошедший отпечаток
+    fingerprint: str = start.environment_fingerprint()
+    variable: str = start.FINGERPRINT_ENV[0]
+    previous = os.environ.get(variable)
+    os.environ[variable] = "changed-for-test"
+    try:
+        changed: str = start.environment_fingerprint()
+    finally:
+        if previous is None:
+            del os.environ[variable]
+        else:
+            os.environ[variable] = previous
+    with tempfile.TemporaryDirectory() as folder:
+        cache: Path = Path(folder) / "start.json"
+        missing = start.load_passed_fingerprint(cache)
+        start.save_passed_fingerprint(fingerprint, cache)
+        ok2: bool = (
+            fingerprint == start.environment_fingerprint() and changed != fingerprint
+            and missing is None and start.load_passed_fingerprint(cache) == fingerprint
+        )
+    status2: str = "✅ PASSED" if ok2 else "❌ FAILED"
+    print(f"\n[Тест 2] Отпечаток окружения и кеш: {status2}")
+
+    passed: int = sum([status1 == "✅ PASSED", status2 == "✅ PASSED"])
+    print(f"\n📊 Результаты: {passed}/2 тестов пройдено\n")
+    assert passed == 2
+
+
+def test_autotune() -> None:
+    """
+    Что я делаю?
+        Тестирую автонастройку: замер батчей, выбор лучшей конфигурации и профиль машины.
+    Что я принимаю на вход?
+        Ничего.
+    Что я возвращаю?
+        Ничего.
+    """
+    import json
+    import tempfile
+    from pathlib import Path
+
+    import torch
+
+    import autotune
+
+    print("=" * 80)
+    print("ТЕСТИРОВАНИЕ АВТОНАСТРОЙКИ")
+    print("=" * 80)
+
+    # Тест 1: Замер дает пропускную способность для каждого размера батча
+    engine = _tiny_engine()
+    tokenizer = engine.load()[1]
+    tokenizer.pad_token_id = 0
+    tokenizer.batch_decode = lambda rows, skip_special_tokens=True: [tokenizer.decode(row.tolist()) for row in rows]
+    throughput = autotune.measure(engine, [1, 2], tokens=4, repeats=1, text_input="Короткая статья для замера.")
+    ok1: bool = sorted(throughput) == [1, 2] and all(value > 0 for value in throughput.values())
+    status1: str = "✅ PASSED" if ok1 else "❌ FAILED"
+    print(f"\n[Тест 1] Замер батчей {sorted(throughput)}: {status1}")
+
+    # Тест 2: Почти равные конфигурации решаются в пользу меньшего числа потоков
+    results = [
+        {"num_threads": 8, "interop_threads": 1, "batch_size": 4, "texts_per_second": 10.0},
+        {"num_threads": 4, "interop_threads": 1, "batch_size": 4, "texts_per_second": 9.8},
+        {"num_threads": 4, "interop_threads": 2, "batch_size": 8, "texts_per_second": 6.0},
+    ]
+    best = autotune.choose_best(results)
+    ok2: bool = (
+        best is results[1] and autotune.choose_best([]) is None
+        and autotune.thread_candidates(12) == [1, 2, 4, 6, 8, 12]
+    )
+    status2: str = "✅ PASSED" if ok2 else "❌ FAILED"
+    print(f"\n[Тест 2] Выбор конфигурации: {status2}")
+
+    # Тест 3: Профиль применяется только на той же машине
+    threads: int = torch.get_num_threads()
+    with tempfile.TemporaryDirectory() as folder:
+        path: Path = Path(folder) / "tuning.json"
+        autotune.save_profile({**results[1], "num_threads": threads}, results, path)
+        own = autotune.load_profile(path)
+        foreign: Path = Path(folder) / "foreign.json"
+        foreign.write_text(json.dumps({**json.loads(path.read_text(encoding="utf-8")), "cpus": -1}), encoding="utf-8")
+        ok3: bool = (
+            own is not None and own["batch_size"] == 4 and autotune.load_profile(foreign) is None
+            and autotune.load_profile(Path(folder) / "missing.json") is None
+        )
+        autotune.apply_profile(own)
+        ok3 = ok3 and torch.get_num_threads() == threads
+    status3: str = "✅ PASSED" if ok3 else "❌ FAILED"
+    print(f"\n[Тест 3] Профиль машины: {status3}")
+
+    # Тест 4: Профиль, сохраненный по своему пути (--profile), читается через SUMMARIZER_TUNING_PROFILE
+    import os
+    import subprocess
+    import sys
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = Path(folder) / "custom.json"
+        autotune.save_profile({**results[2], "num_threads": threads}, results, path)
+        completed = subprocess.run(
+            [sys.executable, "-c", "import autotune; print(autotune.PROFILE_PATH); print(autotune.tuned_batch_size(1))"],
+            cwd=str(Path(__file__).parent), capture_output=True, text=True, timeout=120,
+            env={**os.environ, "SUMMARIZER_TUNING_PROFILE": str(path), "SUMMARIZER_AUTOTUNE": "1"},
+        )
+    lines = completed.stdout.splitlines()
+    ok4: bool = completed.returncode == 0 and lines[-2:] == [str(path), "8"]
+    status4: str = "✅ PASSED" if ok4 else "❌ FAILED"
+    print(f"\n[Тест 4] Профиль из SUMMARIZER_TUNING_PROFILE: {status4}")
+
+    passed: int = sum([status1 == "✅ PASSED", status2 == "✅ PASSED", status3 == "✅ PASSED", status4 == "✅ PASSED"])
+    print(f"\n📊 Результаты: {passed}/4 тестов пройдено\n")
+    assert passed == 4
+
+
+def test_static_decode_mode() -> None:
+    """
+    Что я делаю?
+        Тестирую режим static: те же саммари, что и с динамическим кешем,
+        и переиспользование заранее выделенного KV-кеша между запросами.
+    Что я принимаю на вход?
+        Ничего.
+    Что я возвращаю?
+        Ничего.
+    """
+    print("=" * 80)
+    print("ТЕСТИРОВАНИЕ СТАТИЧЕСКОГО KV-КЕША")
+    print("=" * 80)
+
+    texts = [
+        "Центробанк сохранил ключевую ставку на прежнем уровне.",
+        "Сборная выиграла финал чемпионата мира по хоккею в овертайме.",
+    ]
+    default_engine = _tiny_engine()
+    static_engine = _tiny_engine()
+    static_engine.decode_mode = "static"
+
+    # Тест 1: Жадный поиск и лучи дают те же саммари, что и режим default
+    same: bool = all(
+        static_engine.summarize(text, 12, 12, num_beams=beams) == default_engine.summarize(text, 12, 12, num_beams=beams)
+        for text in texts for beams in (1, 2)
+    )
+    status1: str = "✅ PASSED" if same else "❌ FAILED"
+    print(f"\n[Тест 1] Саммари совпадают с динамическим кешем: {status1}")
+
+    # Тест 2: Кеш выделяется один раз на (строк батча, корзину длины) и переиспользуется
+    keys = sorted(static_engine._static_caches)
+    ok2: bool = keys == [(1, 128), (2, 128)] and default_engine._static_caches == {}
+    status2: str = "✅ PASSED" if ok2 else "❌ FAILED"
+    print(f"\n[Тест 2] Выделено кешей: {len(keys)} на {len(texts) * 2} генераций: {status2}")
+
+    passed: int = sum([status1 == "✅ PASSED", status2 == "✅ PASSED"])
+    print(f"\n📊 Результаты: {passed}/2 тестов пройдено\n")
+    assert passed == 2
+
+
+def test_assisted_generation() -> None:
+    """
+    Что я делаю?
+        Тестирую ассистированную генерацию: жадный результат совпадает с обычным,
+        а проходы моделей и принятые черновые токены учитываются.
+    Что я принимаю на вход?
+        Ничего.
+    Что я возвращаю?
+        Ничего.
+    """
+    import threading
+    import time
+    from typing import Any, List, Tuple
+
+    import torch
+    from transformers import GPT2Config, GPT2LMHeadModel
+
+    print("=" * 80)
+    print("ТЕСТИРОВАНИЕ АССИСТИРОВАННОЙ ГЕНЕРАЦИИ")
+    print("=" * 80)
+
+    engine = _tiny_engine()
+    model, tokenizer = engine.load()
+    # Черновая модель - первый слой основной: часть токенов она угадывает
+    draft = GPT2LMHeadModel(GPT2Config(
+        vocab_size=256, n_positions=512, n_embd=32, n_layer=1, n_head=2, bos_token_id=0, eos_token_id=0,
+    )).eval()
+    draft.load_state_dict({key: value for key, value in model.state_dict().items() if key in draft.state_dict()})
+    engine._loader = lambda name, **kwargs: (draft, tokenizer)
+
+    texts = [
+        "Центробанк сохранил ключевую ставку на прежнем уровне.",
+        "Сборная выиграла финал чемпионата мира по хоккею в овертайме.",
+    ]
+
+    # Тест 1: Жадный поиск дает те же саммари, что и без черновой модели
+    same: bool = all(
+        engine.summarize(text, 20, 5, assisted=True) == engine.summarize(text, 20, 5) for text in texts
+    )
+    status1: str = "✅ PASSED" if same else "❌ FAILED"
+    print(f"\n[Тест 1] Результат совпадает с обычной генерацией: {status1}")
+
+    # Тест 2: Статистика согласована: принятые <= предложенных, проходов основной модели меньше токенов
+    stats = engine.assist_stats
+    ok2: bool = (
+        stats["generations"] == 2 and stats["new_tokens"] == 40
+        and stats["accepted_tokens"] == stats["new_tokens"] - stats["target_forwards"]
+        and 0 < stats["accepted_tokens"] <= stats["draft_tokens"]
+        and 0.0 < engine.acceptance_rate() <= 1.0
+    )
+    status2: str = "✅ PASSED" if ok2 else "❌ FAILED"
+    print(f"\n[Тест 2] Принято {engine.acceptance_rate() * 100:.0f}% черновых токенов: {status2}")
+
+    # Тест 3: С лучами ассистирование не применяется
+    engine.summarize(texts[0], 20, 5, num_beams=2, assisted=True)
+    status3: str = "✅ PASSED" if engine.assist_stats["generations"] == 2 else "❌ FAILED"
+    print(f"\n[Тест 3] Лучевой поиск идет без черновой модели: {status3}")
+
+    # Тест 4: Ассистированная генерация и параллельная выгрузка не блокируют друг друга
+    def slow_loader(name: str, **kwargs: Any) -> Tuple[Any, Any]:
+        time.sleep(0.05)
+        return (draft if name == engine.draft_model_name else model), tokenizer
+
+    engine._loader = slow_loader
+    engine.unload()
+    summaries: List[str] = []
+    worker = threading.Thread(
+        target=lambda: summaries.extend(engine.summarize(text, 10, 5, assisted=True) for text in texts * 2),
+        daemon=True,
+    )
+    worker.start()
+    unloads: int = 0
+    while worker.is_alive() and unloads < 50:
+        engine.unload()
+        unloads += 1
+        time.sleep(0.01)
+    worker.join(timeout=30.0)
+    ok4: bool = not worker.is_alive() and len(summaries) == 4
+    status4: str = "✅ PASSED" if ok4 else "❌ FAILED"
+    print(f"\n[Тест 4] summarize(assisted) и {unloads} вызовов unload() без взаимной блокировки: {status4}")
+
+    passed: int = sum([status1 == "✅ PASSED", status2 == "✅ PASSED", status3 == "✅ PASSED", status4 == "✅ PASSED"])
+    print(f"\n📊 Результаты: {passed}/4 тестов пройдено\n")
+    assert passed == 4
+
+
+def test_decoding_policy() -> None:
+    """
+    Что я делаю?
+        Тестирую выбор стратегии декодирования под бюджет задержки.
+    Что я принимаю на вход?
+        Ничего.
+    Что я возвращаю?
+        Ничего.
+    """
+    from cost_model import CostModel
+    from decoding_policy import plan_decoding
+    from extractive import summarize_extractive
+    from text_summarizer import FallbackSummary, summarize_text_advanced
+
+    print("=" * 80)
+    print("ТЕСТИРОВАНИЕ ПОЛИТИКИ ДЕКОДИРОВАНИЯ")
+    print("=" * 80)
+
+    model = CostModel(coefficients=(0.05, 0.0004, 0.03), output_ratio=0.7)
+
+    # Тест 1: Свободный движок и большой бюджет - запрошенные параметры
+    plan = plan_decoding(400, 150, 50, 4, budget_seconds=60.0, model=model)
+    ok1: bool = plan["strategy"] == "beam" and (plan["num_beams"], plan["max_length"]) == (4, 150) and not plan["degraded"]
+    status1: str = "✅ PASSED" if ok1 else "❌ FAILED"
+    print(f"\n[Тест 1] Без нагрузки план как запрошен: {status1}")
+
+    # Тест 2: С ростом очереди сначала уменьшаются лучи, потом длина, в конце - экстрактивный ответ
+    plans = [
+        plan_decoding(400, 150, 50, 4, budget_seconds=30.0, queue_depth=depth, queue_seconds=depth * 4.0, model=model)
+        for depth in range(9)
+    ]
+    shapes = [(plan["num_beams"], plan["max_length"]) for plan in plans if plan["strategy"] != "extractive"]
+    ok2: bool = (
+        shapes == sorted(shapes, reverse=True)
+        and (2, 150) in shapes and any(beams == 1 and length < 150 for beams, length in shapes)
+        and plans[-1]["strategy"] == "extractive"
+        and all(plan["min_length"] <= plan["max_length"] for plan in plans)
+    )
+    status2: str = "✅ PASSED" if ok2 else "❌ FAILED"
+    print(f"\n[Тест 2] Планы по глубине очереди: {shapes} -> {plans[-1]['strategy']}: {status2}")
+
+    # Тест 3: Бюджет, в который не укладывается даже жадный поиск - экстрактивно, без загрузки модели
+    text: str = (
+        "Правительство утвердило новые правила субсидирования малого бизнеса. "
+        "Изменения вступят в силу с начала следующего года. "
+        "Эксперты ожидают роста числа заявок на поддержку."
+    )
+    summary = summarize_text_advanced(text, 60, 20, num_beams=4, latency_budget=0.001)
+    ok3: bool = summary == summarize_extractive(text, max_length=60) and isinstance(summary, FallbackSummary)
+    status3: str = "✅ PASSED" if ok3 else "❌ FAILED"
+    print(f"\n[Тест 3] Перегрузка дает экстрактивный ответ с пометкой FallbackSummary: {status3}")
+
+    # Тест 4: Политика включается явно, а выбранный план виден в трассе запроса summarize_text_advanced
+    import json
+    import os
+    import tempfile
+    from pathlib import Path
+
+    import decoding_policy
+    from tracing import tracer
+
+    with tempfile.TemporaryDirectory() as tmp:
+        trace_path: Path = Path(tmp) / "trace.jsonl"
+        default_path = tracer.path
+        tracer.path = str(trace_path)
+        try:
+            summarize_text_advanced(text, 60, 20, num_beams=4, latency_budget=0.001)
+        finally:
+            tracer.path = default_path
+        record: dict = json.loads(trace_path.read_text(encoding="utf-8").splitlines()[0])
+    attributes: dict = record["attributes"]
+    ok4: bool = (
+        (decoding_policy.LATENCY_BUDGET == 0 or "SUMMARIZER_LATENCY_BUDGET" in os.environ)
+        and not plans[-1]["calibrated"]
+        and record["name"] == "summarize_local"
+        and attributes.get("decoding_strategy") == "extractive" and attributes.get("decoding_degraded") is True
+    )
+    status4: str = "✅ PASSED" if ok4 else "❌ FAILED"
+    print(f"\n[Тест 4] Бюджет по умолчанию выключен, план в трассе: {status4}")
+
+    passed: int = sum([
+        status1 == "✅ PASSED", status2 == "✅ PASSED", status3 == "✅ PASSED", status4 == "✅ PASSED",
+    ])
+    print(f"\n📊 Результаты: {passed}/4 тестов пройдено\n")
+    assert passed == 4
+
+
+def test_server() -> None:
+    """
+    Что я делаю?
+        Тестирую HTTP-сервис: порт открыт и /healthz отвечает, пока модель
+        загружается, /readyz переходит из 503 в 200 после прогрева,
+        а перегрузка (в том числе истекший в очереди дедлайн) - ответ 503 с Retry-After.
+    Что я принимаю на вход?
+        Ничего.
+    Что я возвращаю?
+        Ничего.
+    """
+    import json
+    import threading
+    import time
+    import urllib.error
+    import urllib.request
+    from typing import Any, Dict, Optional, Tuple
+
+    from metrics import metrics
+    from server import serve
+
+    print("=" * 80)
+    print("ТЕСТИРОВАНИЕ HTTP-СЕРВИСА")
+    print("=" * 80)
+
+    engine = _tiny_engine()
+    # Загрузка модели ждет сигнала - так видно состояние сервиса во время загрузки
+    loading = threading.Event()
+    load_model = engine._loader
+    engine._loader = lambda name, **kwargs: (loading.wait(10.0), load_model(name))[1]
+    metrics_enabled: bool = metrics.enabled
+    server = serve(port=0, max_wait_ms=1.0, engine=engine)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base: str = f"http://127.0.0.1:{server.server_address[1]}"
+
+    def call(path: str, payload: Optional[Dict[str, Any]] = None) -> Tuple[int, Dict[str, Any], Any]:
+        data: Optional[bytes] = json.dumps(payload).encode("utf-8") if payload is not None else None
+        request = urllib.request.Request(base + path, data=data, headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request, timeout=10) as response:
+                return response.status, json.loads(response.read()), response.headers
+        except urllib.error.HTTPError as error:
+            return error.code, json.loads(error.read()), error.headers
+
+    try:
+        # Тест 1: Сервис отвечает во время загрузки и становится готов после прогрева
+        health: int = call("/healthz")[0]
+        before: Tuple[int, Dict[str, Any], Any] = call("/readyz")
+        loading.set()
+        deadline: float = time.monotonic() + 10.0
+        after: int = before[0]
+        while after != 200 and time.monotonic() < deadline:
+            time.sleep(0.05)
+            after = call("/readyz")[0]
+        ok1: bool = health == 200 and before[0] == 503 and not before[1]["model_loaded"] and after == 200
+        status1: str = "✅ PASSED" if ok1 else "❌ FAILED"
+        print(f"\n[Тест 1] /readyz во время загрузки {before[0]}, после прогрева {after}: {status1}")
+
+        # Тест 2: Ожидание в очереди больше дедлайна - сразу 503 с Retry-After
+        server.service.batcher.batch_seconds = 30.0
+        code, body, headers = call("/summarize", {
+            "text": "Центробанк сохранил ключевую ставку на прежнем уровне по итогам заседания.",
+            "deadline_ms": 100, "stream": False,
+        })
+        ok2: bool = code == 503 and int(headers.get("Retry-After", "0")) >= 30 and "error" in body
+        status2: str = "✅ PASSED" if ok2 else "❌ FAILED"
+        print(f"\n[Тест 2] Отказ по дедлайну: {code}, Retry-After {headers.get('Retry-After')}: {status2}")
+
+        # Тест 3: Дедлайн истек в очереди - это тоже перегрузка (503), а не ошибка сервиса (500)
+        def slow_batch(texts: list, *args: Any, **kwargs: Any) -> list:
+            time.sleep(0.3)
+            return [text[:40] for text in texts]
+
+        engine.summarize_batch = slow_batch
+        server.service.batcher.batch_seconds = 0.0
+        server.service.batcher.max_batch_size = 1
+        code, body, headers = call("/summarize", {
+            "texts": ["Сборная выиграла финал чемпионата мира по хоккею в овертайме."] * 2,
+            "deadline_ms": 150, "stream": False,
+        })
+        events = [result["event"] for result in body.get("results", [])]
+        ok3: bool = code == 503 and "Retry-After" in headers and events == ["result", "error"]
+        status3: str = "✅ PASSED" if ok3 else "❌ FAILED"
+        print(f"\n[Тест 3] Истекший в очереди дедлайн: {code} {events}: {status3}")
+    finally:
+        loading.set()
+        server.shutdown()
+        server.server_close()
+        server.service.batcher.stop()
+        metrics.enabled = metrics_enabled
+
+    passed: int = sum([status1 == "✅ PASSED", status2 == "✅ PASSED", status3 == "✅ PASSED"])
+    print(f"\n📊 Результаты: {passed}/3 тестов пройдено\n")
+    assert passed == 3
+
+
 def main() -> None:
     """
     Что я делаю?
@@ -144,6 +1703,29 @@ def main() -> None:
     test_validate_text()
     test_load_api_token()
     test_type_annotations()
+    test_verify_checksums()
+    test_model_registry_lru()
+    test_engine_single_flight()
+    test_summarize_extractive()
+    test_near_duplicate_index()
+    test_metrics()
+    test_tracing()
+    test_micro_batcher()
+    test_priority_scheduling()
+    test_preflight()
+    test_sentence_boundary_stop()
+    test_batch_decode()
+    test_engine_sweep()
+    test_generation_cancel()
+    test_batch_queue()
+    test_large_file()
+    test_result_store()
+    test_start_preflight()
+    test_autotune()
+    test_static_decode_mode()
+    test_assisted_generation()
+    test_decoding_policy()
+    test_server()
     
     print("=" * 80)
     print("✅ ТЕСТИРОВАНИЕ ЗАВЕРШЕНО")
@@ -3,11 +3,59 @@
 
 Использует модель 'IlyaGusev/rugpt3medium_sum_gazeta' через библиотеку transformers.
 Работает локально (без запросов к API).
+Для запуска без сети задайте SUMMARIZER_MODEL_DIR или SUMMARIZER_OFFLINE=1 (см. model_store.py).
 """
 
-from typing import Optional
-import torch
-from transformers import AutoTokenizer, AutoModelForCausalLM
+import os
+import threading
+from typing import Any, List, Optional, Tuple
+
+# model_store импортируется раньше transformers: он включает офлайн-режим Hub
+from model_store import DEFAULT_MODEL_NAME
+from autotune import tuned_batch_size
+from decoding_policy import LATENCY_BUDGET, plan_decoding
+from engine import MAX_INPUT_TOKENS, GenerationCancelled, get_default_engine
+from extractive import estimate_tokens, summarize_extractive
+from near_duplicates import NearDuplicateIndex
+from metrics import metrics, start_metrics_server_from_env
+from model_registry import get_default_registry
+from tracing import traced
+
+# Отвечать экстрактивным саммари, если движок занят дольше BUSY_WAIT секунд
+EXTRACTIVE_FALLBACK: bool = os.getenv("SUMMARIZER_EXTRACTIVE_FALLBACK", "1").strip() not in ("0", "false", "no")
+BUSY_WAIT: float = float(os.getenv("SUMMARIZER_BUSY_WAIT", "30"))
+# Адаптивная длина: заканчивать саммари на границе предложения после min_length
+ADAPTIVE_LENGTH: bool = os.getenv("SUMMARIZER_ADAPTIVE_LENGTH", "0").strip() in ("1", "true", "yes")
+# Бюджет входных токенов для экстрактивного предсжатия (0 - выключено)
+INPUT_TOKEN_BUDGET: int = int(os.getenv("SUMMARIZER_INPUT_TOKEN_BUDGET", "0"))
+# Ассистированная генерация с черновой моделью для жадного поиска (см. engine.py)
+ASSISTED: bool = os.getenv("SUMMARIZER_ASSISTED", "0").strip() in ("1", "true", "yes")
+# Сколько текстов отдавать движку за один generate (профиль autotune.py, иначе 8)
+BATCH_SIZE: int = tuned_batch_size(8)
+# Порог сходства Жаккара для повторного использования саммари перепечаток (0 - выключено)
+DEDUP_THRESHOLD: float = float(os.getenv("SUMMARIZER_DEDUP_THRESHOLD", "0.9"))
+DEDUP_MAX_ENTRIES: int = int(os.getenv("SUMMARIZER_DEDUP_MAX_ENTRIES", "10000"))
+
+_dedup_index: Optional[NearDuplicateIndex] = (
+    NearDuplicateIndex(threshold=DEDUP_THRESHOLD, max_entries=DEDUP_MAX_ENTRIES)
+    if DEDUP_THRESHOLD > 0 else None
+)
+
+# Эндпоинт /metrics поднимается, только если задан SUMMARIZER_METRICS_PORT
+start_metrics_server_from_env()
+
+
+class FallbackSummary(str):
+    """
+    Что я делаю?
+        Помечаю экстрактивное саммари, выданное вместо результата модели
+        (движок перегружен или не укладывается в бюджет задержки). Это обычная
+        строка, но в историю ее не сохраняют: повторный запрос должен дойти до модели.
+    Что я принимаю на вход?
+        Текст саммари (как str).
+    Что я возвращаю?
+        Ничего - класс строки-маркера.
+    """
 
 
 def load_api_token() -> str:
@@ -35,90 +83,130 @@ def validate_text(text_input: str) -> bool:
     return len(text_input.strip()) >= minimum_length
 
 
-# Глобальные переменные для кеширования модели (чтобы не грузить каждый раз)
-_model = None
-_tokenizer = None
-_model_name = "IlyaGusev/rugpt3medium_sum_gazeta"
+# Модель по умолчанию (загруженные движки хранит реестр model_registry)
+_model_name = DEFAULT_MODEL_NAME
 
 
-def _get_model_and_tokenizer():
+def _get_model_and_tokenizer(model_name: str = DEFAULT_MODEL_NAME, dtype: str = "float32"):
     """
     Что я делаю?
-        Загружаю модель и токенизатор в память (Singleton).
+        Получаю модель и токенизатор движка по умолчанию (загружаю при первом обращении).
     Что я принимаю на вход?
-        Ничего.
+        model_name (str): Идентификатор модели.
+        dtype (str): Тип весов (float32, float16, bfloat16, int8).
     Что я возвращаю?
         tuple: (model, tokenizer)
     """
-    global _model, _tokenizer
-    if _model is None or _tokenizer is None:
-        print(f"⏳ Загрузка модели {_model_name}...")
-        _tokenizer = AutoTokenizer.from_pretrained(_model_name)
-        _model = AutoModelForCausalLM.from_pretrained(_model_name)
-        
-        # Перенос на GPU если доступно
-        device = "cuda" if torch.cuda.is_available() else "cpu"
-        _model.to(device)
-        print(f"✅ Модель загружена на {device}")
-        
-    return _model, _tokenizer
+    return get_default_engine(model_name, dtype).load()
 
 
+def _params_key(
+    model_name: str,
+    dtype: str,
+    max_length: int,
+    min_length: int,
+    num_beams: int,
+    input_token_budget: Optional[int],
+    adaptive_length: Optional[bool],
+) -> Tuple[Any, ...]:
+    """
+    Что я делаю?
+        Составляю ключ параметров генерации для кеша перепечаток
+        (значения None заменяю настройками из окружения).
+    Что я принимаю на вход?
+        model_name, dtype, max_length, min_length, num_beams, input_token_budget,
+        adaptive_length: Параметры генерации, как у _summarize_local.
+    Что я возвращаю?
+        tuple: Ключ параметров.
+    """
+    return (
+        model_name, dtype, max_length, min_length, num_beams,
+        INPUT_TOKEN_BUDGET if input_token_budget is None else input_token_budget,
+        ADAPTIVE_LENGTH if adaptive_length is None else adaptive_length,
+    )
+
+
+@traced("summarize_local")
 def _summarize_local(
     text_input: str,
     max_length: int,
     min_length: int,
-    num_beams: int = 1
-) -> str:
+    num_beams: int = 1,
+    model_name: str = DEFAULT_MODEL_NAME,
+    dtype: str = "float32",
+    input_token_budget: Optional[int] = None,
+    priority: str = "interactive",
+    adaptive_length: Optional[bool] = None,
+    cancel_event: Optional[threading.Event] = None,
+    assisted: Optional[bool] = None,
+) -> Optional[str]:
     """
     Что я делаю?
-        Генерирую саммари локально через transformers.
+        Генерирую саммари локально через движок SummarizerEngine.
     Что я принимаю на вход?
         text_input (str): Текст статьи.
         max_length (int): Максимальное число токенов (не новых, а всего).
         min_length (int): Минимальное.
         num_beams (int): Число лучей.
+        model_name (str): Идентификатор модели суммаризации.
+        dtype (str): Тип весов модели.
+        input_token_budget (int | None): Бюджет входа для предсжатия;
+            None - значение SUMMARIZER_INPUT_TOKEN_BUDGET.
+        priority (str): Класс приоритета: interactive (GUI) или bulk (пакетная обработка).
+        adaptive_length (bool | None): Остановить генерацию на границе предложения;
+            None - значение SUMMARIZER_ADAPTIVE_LENGTH.
+        cancel_event (threading.Event | None): Событие отмены устаревшего запроса.
+        assisted (bool | None): Ассистированная генерация (только жадный поиск);
+            None - значение SUMMARIZER_ASSISTED.
     Что я возвращаю?
-        str: Результат суммаризации.
+        Optional[str]: Результат суммаризации (FallbackSummary, если движок перегружен)
+            или None, если запрос отменен.
     """
-    try:
-        model, tokenizer = _get_model_and_tokenizer()
-        device = model.device
+    if input_token_budget is None:
+        input_token_budget = INPUT_TOKEN_BUDGET
+    if adaptive_length is None:
+        adaptive_length = ADAPTIVE_LENGTH
+    if assisted is None:
+        assisted = ASSISTED
+    metrics.inc("requests_total", backend="local")
+    params_key = _params_key(model_name, dtype, max_length, min_length, num_beams, input_token_budget, adaptive_length)
+    if _dedup_index is not None:
+        # Перепечатка уже обработанной заметки - отдаем сохраненное саммари
+        with metrics.stage("dedup_lookup"):
+            cached: Optional[str] = _dedup_index.lookup(text_input, params_key)
+        if cached is not None:
+            metrics.inc("cache_hits_total", cache="near_duplicate")
+            return cached
+        metrics.inc("cache_misses_total", cache="near_duplicate")
 
-        # Подготовка входных данных
-        tokens = tokenizer(
+    try:
+        engine = get_default_engine(model_name, dtype)
+        summary: str = engine.summarize(
             text_input,
-            max_length=600,  # Ограничиваем вход, чтобы не ломалась память
-            add_special_tokens=False,
-            truncation=True
-        )["input_ids"]
-        
-        input_ids = torch.tensor([tokens + [tokenizer.sep_token_id]]).to(device)
-
-        # Генерация
-        output_ids = model.generate(
-            input_ids=input_ids,
-            max_length=max_length + input_ids.shape[1], # max_length тут - это общая длина
-            min_length=min_length + input_ids.shape[1],
+            max_length=max_length,
+            min_length=min_length,
             num_beams=num_beams,
-            no_repeat_ngram_size=4,
-            early_stopping=(num_beams > 1)
+            wait_timeout=BUSY_WAIT if EXTRACTIVE_FALLBACK else None,
+            input_token_budget=input_token_budget,
+            priority=priority,
+            adaptive_length=adaptive_length,
+            cancel_event=cancel_event,
+            assisted=assisted,
         )
-        
-        summary = tokenizer.decode(output_ids[0], skip_special_tokens=False)
-        
-        # Очистка от входного текста (модель decoder-only, она продолжает текст)
-        # rugpt3medium_sum_gazeta обычно генерирует после sep_token
-        if tokenizer.sep_token in summary:
-            parts = summary.split(tokenizer.sep_token)
-            if len(parts) > 1:
-                summary = parts[1]
-            else:
-                summary = summary  # fallback
-        
-        return summary.strip()
+        if _dedup_index is not None and summary:
+            _dedup_index.add(text_input, params_key, summary)
+        return summary
 
+    except GenerationCancelled:
+        # Текст уже изменился - результат никому не нужен
+        return None
+    except TimeoutError as e:
+        # Движок перегружен - отдаем мгновенное экстрактивное саммари
+        metrics.record_error(e)
+        metrics.inc("extractive_fallbacks_total")
+        return FallbackSummary(summarize_extractive(text_input, max_length=max_length))
     except Exception as e:
+        metrics.record_error(e)
         return f"❌ Ошибка локальной генерации: {str(e)}"
 
 
@@ -126,6 +214,7 @@ def summarize_text(
     text_input: str,
     max_length: int = 150,
     min_length: int = 50,
+    priority: str = "interactive",
 ) -> Optional[str]:
     """
     Что я делаю?
@@ -134,6 +223,7 @@ def summarize_text(
         text_input (str): Исходный текст.
         max_length (int): Максимальная длина результата.
         min_length (int): Минимальная длина результата.
+        priority (str): interactive (по умолчанию, GUI) или bulk (пакетная обработка).
     Что я возвращаю?
         Optional[str]: Суммаризированный текст или сообщение об ошибке.
     """
@@ -144,33 +234,232 @@ def summarize_text(
         text_input=text_input,
         max_length=max_length,
         min_length=min_length,
-        num_beams=1  # Базовый режим - жадный поиск
+        num_beams=1,  # Базовый режим - жадный поиск
+        priority=priority,
     )
 
 
+def summarize_text_extractive(
+    text_input: str,
+    max_length: int = 150,
+    min_length: int = 50,
+) -> Optional[str]:
+    """
+    Что я делаю?
+        Выполняю быструю экстрактивную суммаризацию без модели (предпросмотр).
+    Что я принимаю на вход?
+        text_input (str): Исходный текст.
+        max_length (int): Бюджет длины результата в токенах.
+        min_length (int): Не используется, оставлен для единообразия с summarize_text.
+    Что я возвращаю?
+        Optional[str]: Саммари из ключевых предложений текста или сообщение об ошибке.
+    """
+    if not validate_text(text_input):
+        return "⚠️ Текст слишком короткий! Минимум 50 символов."
+
+    return summarize_extractive(text_input, max_length=max_length)
+
+
+# Тот же корневой запрос, что и у _summarize_local (вложенный вызов не открывает новый):
+# план декодирования попадает в трассу вместе с генерацией
+@traced("summarize_local")
 def summarize_text_advanced(
     text_input: str,
     max_length: int = 150,
     min_length: int = 50,
     num_beams: int = 4,
+    model_name: str = DEFAULT_MODEL_NAME,
+    dtype: str = "float32",
+    input_token_budget: Optional[int] = None,
+    priority: str = "interactive",
+    adaptive_length: Optional[bool] = None,
+    cancel_event: Optional[threading.Event] = None,
+    assisted: Optional[bool] = None,
+    latency_budget: Optional[float] = None,
 ) -> Optional[str]:
     """
     Что я делаю?
-        Выполняю расширенную суммаризацию (beam search).
+        Выполняю расширенную суммаризацию (beam search). Если задан бюджет
+        задержки, число лучей и длина подбираются под него (decoding_policy.py):
+        при длинной очереди саммари становится проще, а не приходит по таймауту.
     Что я принимаю на вход?
         text_input (str): Исходный текст.
         max_length (int): Максимальная длина.
         min_length (int): Минимальная длина.
         num_beams (int): Количество лучей.
+        model_name (str): Идентификатор модели суммаризации.
+        dtype (str): Тип весов: float32, float16, bfloat16 или int8.
+        input_token_budget (int | None): Сжать вход до стольких токенов
+            экстрактивно перед генерацией (0 - не сжимать).
+        priority (str): interactive (по умолчанию, GUI) или bulk (пакетная обработка).
+        adaptive_length (bool | None): Закончить саммари на границе предложения
+            после min_length токенов; None - значение SUMMARIZER_ADAPTIVE_LENGTH.
+        cancel_event (threading.Event | None): Выставленное событие прерывает генерацию
+            (живой режим GUI отменяет так запросы по устаревшему тексту).
+        assisted (bool | None): Ассистированная генерация с черновой моделью при
+            num_beams=1 (тот же результат быстрее); None - значение SUMMARIZER_ASSISTED.
+        latency_budget (float | None): Бюджет задержки в секундах (0 - всегда
+            запрошенные параметры); None - значение SUMMARIZER_LATENCY_BUDGET
+            (по умолчанию 0).
     Что я возвращаю?
-        Optional[str]: Суммаризированный текст или сообщение об ошибке.
+        Optional[str]: Суммаризированный текст (FallbackSummary при экстрактивном плане
+            или перегрузке), сообщение об ошибке или None при отмене.
     """
     if not validate_text(text_input):
         return "⚠️ Текст слишком короткий! Минимум 50 символов."
 
+    if latency_budget is None:
+        latency_budget = LATENCY_BUDGET
+    if latency_budget > 0:
+        # Оценка входа без токенизатора: движок обрезает вход до MAX_INPUT_TOKENS
+        budget: int = INPUT_TOKEN_BUDGET if input_token_budget is None else input_token_budget
+        input_tokens: int = min(estimate_tokens(text_input), budget or MAX_INPUT_TOKENS, MAX_INPUT_TOKENS)
+        # Оценка очереди не должна загружать модель: движка еще нет - очереди тоже нет
+        engine = get_default_registry().peek_engine(model_name, dtype)
+        plan = plan_decoding(
+            input_tokens, max_length, min_length, num_beams, latency_budget,
+            queue_depth=engine.queue_depth(priority) if engine else 0,
+            queue_seconds=engine.expected_wait(priority) if engine else None,
+        )
+        if plan["strategy"] == "extractive":
+            metrics.inc("extractive_fallbacks_total")
+            return FallbackSummary(summarize_extractive(text_input, max_length=max_length))
+        num_beams, max_length, min_length = plan["num_beams"], plan["max_length"], plan["min_length"]
+
     return _summarize_local(
         text_input=text_input,
         max_length=max_length,
         min_length=min_length,
-        num_beams=num_beams
+        num_beams=num_beams,
+        model_name=model_name,
+        dtype=dtype,
+        input_token_budget=input_token_budget,
+        priority=priority,
+        adaptive_length=adaptive_length,
+        cancel_event=cancel_event,
+        assisted=assisted,
     )
+
+
+def summarize_text_preview(
+    text_input: str,
+    max_length: int = 150,
+    min_length: int = 50,
+    num_beams: int = 4,
+) -> Optional[str]:
+    """
+    Что я делаю?
+        Мгновенно даю предварительное саммари без генерации: сохраненное саммари
+        этого текста (или его перепечатки) с теми же параметрами, иначе экстрактивное.
+    Что я принимаю на вход?
+        text_input (str): Исходный текст.
+        max_length (int): Максимальная длина.
+        min_length (int): Минимальная длина.
+        num_beams (int): Число лучей будущей генерации (часть ключа кеша).
+    Что я возвращаю?
+        Optional[str]: Предварительное саммари или сообщение об ошибке.
+    """
+    if not validate_text(text_input):
+        return "⚠️ Текст слишком короткий! Минимум 50 символов."
+
+    if _dedup_index is not None:
+        params_key = _params_key(DEFAULT_MODEL_NAME, "float32", max_length, min_length, num_beams, None, None)
+        cached: Optional[str] = _dedup_index.lookup(text_input, params_key)
+        if cached is not None:
+            return cached
+    return summarize_extractive(text_input, max_length=max_length)
+
+
+def summarize_text_sweep(
+    text_input: str,
+    configs: List[Tuple[int, int, int]],
+    model_name: str = DEFAULT_MODEL_NAME,
+    dtype: str = "float32",
+    input_token_budget: Optional[int] = None,
+    priority: str = "interactive",
+) -> List[str]:
+    """
+    Что я делаю?
+        Суммаризирую один текст с несколькими наборами параметров для сравнения.
+        Вход обрабатывается моделью один раз, наборы ветвятся от его KV-кеша.
+    Что я принимаю на вход?
+        text_input (str): Исходный текст.
+        configs (List[tuple]): Наборы (max_length, min_length, num_beams).
+        model_name (str): Идентификатор модели суммаризации.
+        dtype (str): Тип весов модели.
+        input_token_budget (int | None): Бюджет предсжатия; None - SUMMARIZER_INPUT_TOKEN_BUDGET.
+        priority (str): interactive (по умолчанию, GUI) или bulk.
+    Что я возвращаю?
+        List[str]: Саммари (или сообщения об ошибке) в порядке наборов.
+    """
+    if not validate_text(text_input):
+        return ["⚠️ Текст слишком короткий! Минимум 50 символов."] * len(configs)
+
+    metrics.inc("requests_total", len(configs), backend="local")
+    try:
+        engine = get_default_engine(model_name, dtype)
+        return engine.sweep(
+            text_input,
+            configs,
+            input_token_budget=INPUT_TOKEN_BUDGET if input_token_budget is None else input_token_budget,
+            priority=priority,
+            adaptive_length=ADAPTIVE_LENGTH,
+        )
+    except Exception as e:
+        metrics.record_error(e)
+        return [f"❌ Ошибка локальной генерации: {str(e)}"] * len(configs)
+
+
+def summarize_text_batch(
+    texts: List[str],
+    max_length: int = 150,
+    min_length: int = 50,
+    num_beams: int = 1,
+    priority: str = "bulk",
+) -> List[str]:
+    """
+    Что я делаю?
+        Суммаризирую несколько текстов батчами движка по BATCH_SIZE (пакетная обработка).
+        Перепечатки берутся из кеша, слишком короткие тексты в батч не попадают.
+    Что я принимаю на вход?
+        texts (List[str]): Тексты.
+        max_length (int): Максимальная длина.
+        min_length (int): Минимальная длина.
+        num_beams (int): Число лучей.
+        priority (str): bulk (по умолчанию) - интерактивные запросы GUI идут вперед.
+    Что я возвращаю?
+        List[str]: Саммари или сообщения об ошибке в порядке текстов.
+    """
+    results: List[Optional[str]] = [None] * len(texts)
+    params_key = _params_key(DEFAULT_MODEL_NAME, "float32", max_length, min_length, num_beams, None, None)
+    for index, text_input in enumerate(texts):
+        if not validate_text(text_input):
+            results[index] = "⚠️ Текст слишком короткий! Минимум 50 символов."
+        elif _dedup_index is not None:
+            results[index] = _dedup_index.lookup(text_input, params_key)
+    pending: List[int] = [index for index, result in enumerate(results) if result is None]
+
+    metrics.inc("requests_total", len(texts), backend="local")
+    for start in range(0, len(pending), BATCH_SIZE):
+        chunk: List[int] = pending[start:start + BATCH_SIZE]
+        try:
+            summaries: List[str] = get_default_engine().summarize_batch(
+                [texts[index] for index in chunk],
+                max_length,
+                min_length,
+                num_beams,
+                input_token_budget=INPUT_TOKEN_BUDGET,
+                priority=priority,
+                adaptive_length=ADAPTIVE_LENGTH,
+            )
+        except Exception as e:
+            metrics.record_error(e)
+            summaries = [f"❌ Ошибка локальной генерации: {str(e)}"] * len(chunk)
+        else:
+            if _dedup_index is not None:
+                for index, summary in zip(chunk, summaries):
+                    if summary:
+                        _dedup_index.add(texts[index], params_key, summary)
+        for index, summary in zip(chunk, summaries):
+            results[index] = summary
+    return [result or "" for result in results]
@@ -0,0 +1,440 @@
+"""
+Модуль трассировки запросов и профилирования медленных запросов.
+
+Трассировка включается переменной SUMMARIZER_TRACE_FILE: для каждого запроса
+в этот файл дописывается одна строка JSON с деревом интервалов (spans):
+ожидание движка, токенизация, шаги генерации, декодирование, фазы HTTP.
+Этапы metrics.stage() автоматически становятся интервалами текущего запроса.
+
+Профилировщик включается переменной SUMMARIZER_PROFILE_SLOWEST=N: во время
+каждого запроса его поток периодически опрашивается (stack sampling), и для
+N самых медленных запросов сохраняются свернутые стеки (*.folded) в каталог
+SUMMARIZER_PROFILE_DIR - готовый вход для flamegraph.pl или speedscope.
+"""
+
+import functools
+import heapq
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Текущий интервал запроса (у каждого потока и задачи asyncio свой)
+_current_span: ContextVar[Optional["Span"]] = ContextVar("summarizer_current_span", default=None)
+
+
+class Span:
+    """
+    Что я делаю?
+        Храню один интервал трассы: имя, атрибуты, время начала, длительность и детей.
+    Что я принимаю на вход?
+        name (str): Название интервала.
+        attributes (dict): Атрибуты.
+        parent (Span | None): Родительский интервал.
+    Что я возвращаю?
+        Ничего - узел дерева трассы.
+    """
+
+    def __init__(self, name: str, attributes: Dict[str, Any], parent: Optional["Span"] = None) -> None:
+        self.name: str = name
+        self.attributes: Dict[str, Any] = attributes
+        self.parent: Optional[Span] = parent
+        self.children: List[Span] = []
+        self.started: float = time.perf_counter()
+        self.seconds: float = 0.0
+        self._lock: threading.Lock = parent._lock if parent is not None else threading.Lock()
+
+    def child(self, name: str, seconds: Optional[float] = None, **attributes: Any) -> "Span":
+        """
+        Что я делаю?
+            Добавляю дочерний интервал. Если длительность известна заранее
+            (например, ожидание в очереди), интервал сразу считается завершенным.
+        Что я принимаю на вход?
+            name (str): Название.
+            seconds (float | None): Длительность уже завершенного интервала.
+            **attributes: Атрибуты.
+        Что я возвращаю?
+            Span: Дочерний интервал.
+        """
+        span: Span = Span(name, attributes, self)
+        if seconds is not None:
+            span.seconds = seconds
+            span.started -= seconds
+        # Дочерние интервалы могут добавлять разные потоки (например, поток батчера)
+        with self._lock:
+            self.children.append(span)
+        return span
+
+    def to_dict(self, origin: float) -> Dict[str, Any]:
+        """
+        Что я делаю?
+            Превращаю поддерево в словарь для JSON.
+        Что я принимаю на вход?
+            origin (float): Время начала запроса (отсчет start_ms).
+        Что я возвращаю?
+            dict: name, start_ms, duration_ms, attributes, children.
+        """
+        with self._lock:
+            children: List[Span] = list(self.children)
+        node: Dict[str, Any] = {
+            "name": self.name,
+            "start_ms": round((self.started - origin) * 1000.0, 3),
+            "duration_ms": round(self.seconds * 1000.0, 3),
+        }
+        if self.attributes:
+            node["attributes"] = self.attributes
+        if children:
+            node["children"] = [child.to_dict(origin) for child in children]
+        return node
+
+
+class _SpanScope:
+    """
+    Что я делаю?
+        Открываю интервал на время блока with и делаю его текущим.
+    Что я принимаю на вход?
+        span (Span): Интервал.
+    Что я возвращаю?
+        Ничего - контекстный менеджер с атрибутом seconds.
+    """
+
+    def __init__(self, span: Span) -> None:
+        self.span: Span = span
+        self.seconds: float = 0.0
+        self._token: Any = None
+
+    def __enter__(self) -> "_SpanScope":
+        self.span.started = time.perf_counter()
+        self._token = _current_span.set(self.span)
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, traceback: Any) -> None:
+        self.span.seconds = self.seconds = time.perf_counter() - self.span.started
+        if exc_type is not None:
+            self.span.attributes["error"] = exc_type.__name__
+        _current_span.reset(self._token)
+
+
+class StackSampler:
+    """
+    Что я делаю?
+        Периодически снимаю стеки потоков, выполняющих запросы, и храню
+        свернутые стеки N самых медленных запросов.
+    Что я принимаю на вход?
+        slowest (int): Сколько самых медленных запросов хранить.
+        output_dir (str): Каталог для файлов *.folded.
+        interval (float): Период опроса стеков в секундах.
+    Что я возвращаю?
+        Ничего - объект профилировщика.
+    """
+
+    def __init__(self, slowest: int, output_dir: str = "profiles", interval: float = 0.005) -> None:
+        self.slowest: int = slowest
+        self.output_dir: Path = Path(output_dir)
+        self.interval: float = interval
+        self._active: Dict[int, Counter] = {}
+        # Мин-куча (длительность, порядковый номер, trace_id): сверху самый быстрый из сохраненных
+        self._kept: List[Tuple[float, int, str]] = []
+        self._order = itertools.count()
+        self._lock: threading.Lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def attach(self, thread_id: int) -> Counter:
+        """
+        Что я делаю?
+            Начинаю снимать стеки потока (запускаю фоновый поток опроса при первом вызове).
+        Что я принимаю на вход?
+            thread_id (int): threading.get_ident() потока запроса.
+        Что я возвращаю?
+            Counter: Сюда копятся свернутые стеки потока.
+        """
+        samples: Counter = Counter()
+        with self._lock:
+            self._active[thread_id] = samples
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+                self._thread.start()
+        return samples
+
+    def detach(self, thread_id: int) -> None:
+        """
+        Что я делаю?
+            Перестаю снимать стеки потока.
+        Что я принимаю на вход?
+            thread_id (int): Идентификатор потока.
+        Что я возвращаю?
+            Ничего.
+        """
+        with self._lock:
+            self._active.pop(thread_id, None)
+
+    def _run(self) -> None:
+        """
+        Что я делаю?
+            В цикле снимаю стеки всех отслеживаемых потоков.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            Ничего.
+        """
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                active: Dict[int, Counter] = dict(self._active)
+            if not active:
+                continue
+            frames: Dict[int, Any] = sys._current_frames()
+            for thread_id, samples in active.items():
+                frame: Any = frames.get(thread_id)
+                if frame is not None:
+                    samples[_collapse(frame)] += 1
+
+    def offer(self, trace_id: str, seconds: float, samples: Counter) -> bool:
+        """
+        Что я делаю?
+            Сохраняю стеки запроса, если он входит в N самых медленных,
+            и удаляю файл вытесненного запроса.
+        Что я принимаю на вход?
+            trace_id (str): Идентификатор запроса (имя файла).
+            seconds (float): Длительность запроса.
+            samples (Counter): Свернутые стеки и число попаданий.
+        Что я возвращаю?
+            bool: True если стеки сохранены.
+        """
+        if not samples:
+            return False
+        with self._lock:
+            entry: Tuple[float, int, str] = (seconds, next(self._order), trace_id)
+            if len(self._kept) < self.slowest:
+                heapq.heappush(self._kept, entry)
+                evicted: Optional[Tuple[float, int, str]] = None
+            elif seconds > self._kept[0][0]:
+                evicted = heapq.heapreplace(self._kept, entry)
+            else:
+                return False
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        lines: List[str] = [f"{stack} {count}" for stack, count in samples.most_common()]
+        (self.output_dir / f"{trace_id}.folded").write_text("\n".join(lines) + "\n", encoding="utf-8")
+        if evicted is not None:
+            (self.output_dir / f"{evicted[2]}.folded").unlink(missing_ok=True)
+        return True
+
+
+def _collapse(frame: Any) -> str:
+    """
+    Что я делаю?
+        Сворачиваю стек в строку "модуль:функция;модуль:функция" от корня к листу.
+    Что я принимаю на вход?
+        frame: Верхний кадр стека потока.
+    Что я возвращаю?
+        str: Свернутый стек.
+    """
+    names: List[str] = []
+    while frame is not None:
+        code: Any = frame.f_code
+        names.append(f"{Path(code.co_filename).stem}:{code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class Tracer:
+    """
+    Что я делаю?
+        Строю дерево интервалов для каждого запроса, пишу его в JSONL
+        и передаю стеки медленных запросов профилировщику.
+    Что я принимаю на вход?
+        path (str | None): Файл JSONL для трасс (None - трассы не пишутся).
+        sampler (StackSampler | None): Профилировщик (None - выключен).
+    Что я возвращаю?
+        Ничего - объект трассировщика.
+    """
+
+    def __init__(self, path: Optional[str] = None, sampler: Optional[StackSampler] = None) -> None:
+        self.path: Optional[str] = path
+        self.sampler: Optional[StackSampler] = sampler
+        self._write_lock: threading.Lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """
+        Что я делаю?
+            Сообщаю, нужно ли вообще строить трассы.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            bool: True если включена запись трасс или профилирование.
+        """
+        return bool(self.path) or self.sampler is not None
+
+    @staticmethod
+    def current() -> Optional[Span]:
+        """
+        Что я делаю?
+            Возвращаю текущий интервал (чтобы передать его в другой поток).
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            Span | None: Текущий интервал или None вне запроса.
+        """
+        return _current_span.get()
+
+    def span(self, name: str, **attributes: Any) -> Optional[_SpanScope]:
+        """
+        Что я делаю?
+            Открываю дочерний интервал текущего запроса.
+        Что я принимаю на вход?
+            name (str): Название.
+            **attributes: Атрибуты.
+        Что я возвращаю?
+            _SpanScope | None: Контекстный менеджер или None вне запроса.
+        """
+        parent: Optional[Span] = _current_span.get()
+        if parent is None:
+            return None
+        return _SpanScope(parent.child(name, **attributes))
+
+    def annotate(self, **attributes: Any) -> None:
+        """
+        Что я делаю?
+            Добавляю атрибуты текущему интервалу (ничего не делаю вне запроса).
+        Что я принимаю на вход?
+            **attributes: Атрибуты.
+        Что я возвращаю?
+            Ничего.
+        """
+        span: Optional[Span] = _current_span.get()
+        if span is not None:
+            span.attributes.update(attributes)
+
+    def request(self, name: str, **attributes: Any) -> "_RequestScope":
+        """
+        Что я делаю?
+            Открываю корневой интервал запроса.
+        Что я принимаю на вход?
+            name (str): Название запроса.
+            **attributes: Атрибуты.
+        Что я возвращаю?
+            _RequestScope: Контекстный менеджер запроса.
+        """
+        return _RequestScope(self, Span(name, attributes))
+
+    def _finish(self, root: Span, trace_id: str, wall_started: float) -> None:
+        """
+        Что я делаю?
+            Записываю трассу завершенного запроса в JSONL.
+        Что я принимаю на вход?
+            root (Span): Корневой интервал.
+            trace_id (str): Идентификатор трассы.
+            wall_started (float): Время начала по часам (time.time()).
+        Что я возвращаю?
+            Ничего.
+        """
+        if not self.path:
+            return
+        record: Dict[str, Any] = {
+            "trace_id": trace_id,
+            "timestamp": wall_started,
+            **root.to_dict(root.started),
+        }
+        line: str = json.dumps(record, ensure_ascii=False, default=str)
+        with self._write_lock:
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.write(line + "\n")
+
+
+class _RequestScope(_SpanScope):
+    """
+    Что я делаю?
+        Веду корневой интервал запроса: включаю снятие стеков и пишу трассу при выходе.
+    Что я принимаю на вход?
+        tracer (Tracer): Трассировщик.
+        span (Span): Корневой интервал.
+    Что я возвращаю?
+        Ничего - контекстный менеджер.
+    """
+
+    def __init__(self, tracer: Tracer, span: Span) -> None:
+        super().__init__(span)
+        self._tracer: Tracer = tracer
+        self.trace_id: str = uuid.uuid4().hex[:16]
+        self._wall_started: float = 0.0
+        self._samples: Optional[Counter] = None
+
+    def __enter__(self) -> "_RequestScope":
+        self._wall_started = time.time()
+        if self._tracer.sampler is not None:
+            self._samples = self._tracer.sampler.attach(threading.get_ident())
+        super().__enter__()
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, traceback: Any) -> None:
+        super().__exit__(exc_type, exc, traceback)
+        sampler: Optional[StackSampler] = self._tracer.sampler
+        if sampler is not None and self._samples is not None:
+            sampler.detach(threading.get_ident())
+            if sampler.offer(self.trace_id, self.seconds, self._samples):
+                self.span.attributes["profile"] = f"{self.trace_id}.folded"
+        self._tracer._finish(self.span, self.trace_id, self._wall_started)
+
+
+def traced(name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    Что я делаю?
+        Делаю из функции корневой запрос трассы (декоратор). Если трассировка
+        выключена, функция вызывается напрямую.
+    Что я принимаю на вход?
+        name (str): Название запроса в трассе.
+    Что я возвращаю?
+        Callable: Декоратор.
+    """
+    def decorator(function: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(function)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not tracer.enabled or _current_span.get() is not None:
+                return function(*args, **kwargs)
+            text_input: Any = args[0] if args else kwargs.get("text_input")
+            attributes: Dict[str, Any] = {
+                key: value for key, value in kwargs.items() if isinstance(value, (int, float, str)) and key != "text_input"
+            }
+            if isinstance(text_input, str):
+                attributes["input_chars"] = len(text_input)
+            with tracer.request(name, **attributes):
+                result: Any = function(*args, **kwargs)
+                if isinstance(result, str):
+                    tracer.annotate(output_chars=len(result))
+                return result
+
+        return wrapper
+
+    return decorator
+
+
+def _tracer_from_env() -> Tracer:
+    """
+    Что я делаю?
+        Создаю трассировщик по переменным окружения.
+    Что я принимаю на вход?
+        Ничего (SUMMARIZER_TRACE_FILE, SUMMARIZER_PROFILE_SLOWEST,
+        SUMMARIZER_PROFILE_DIR, SUMMARIZER_PROFILE_INTERVAL_MS).
+    Что я возвращаю?
+        Tracer: Трассировщик (выключенный, если переменные не заданы).
+    """
+    slowest: int = int(os.getenv("SUMMARIZER_PROFILE_SLOWEST", "0") or 0)
+    sampler: Optional[StackSampler] = StackSampler(
+        slowest,
+        output_dir=os.getenv("SUMMARIZER_PROFILE_DIR", "profiles"),
+        interval=float(os.getenv("SUMMARIZER_PROFILE_INTERVAL_MS", "5")) / 1000.0,
+    ) if slowest > 0 else None
+    return Tracer(os.getenv("SUMMARIZER_TRACE_FILE", "").strip() or None, sampler)
+
+
+# Общий трассировщик процесса
+tracer: Tracer = _tracer_from_env()
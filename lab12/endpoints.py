@@ -0,0 +1,397 @@
+"""
+Модуль нескольких эндпоинтов удаленного бэкенда с отслеживанием здоровья
+и хеджированными запросами.
+
+Клиент получает список эндпоинтов (router Hugging Face, выделенный Inference
+Endpoint, локальная заглушка) из переменной SUMMARIZER_ENDPOINTS (через
+запятую; по умолчанию - один HF_ROUTER_URL). Для каждого эндпоинта хранятся
+последние задержки и подряд идущие ошибки:
+    - запрос идет на первый здоровый эндпоинт списка;
+    - если ответа нет дольше p95 его задержки, дубликат запроса уходит на
+      следующий эндпоинт (хеджирование), берется первый успешный ответ,
+      а проигравшая попытка бросается (см. ниже);
+    - ошибка соединения, 429 или 5xx сразу переключает на следующий эндпоинт;
+    - после FAILURE_THRESHOLD ошибок подряд эндпоинт выключается на
+      COOLDOWN_SECONDS, затем снова пробуется.
+Так один медленный экземпляр не определяет p99 всего клиента.
+
+requests не умеет прерывать уже идущее блокирующее чтение, поэтому отмена
+проигравшей попытки только закрывает ее сессию и отбрасывает результат:
+ее поток живет до ответа или таймаута попытки. Каждая попытка идет в своем
+потоке, а не в общем пуле, чтобы брошенные попытки не занимали места новых
+запросов; их число видно в метрике hedge_abandoned_in_flight.
+Пробы keep_warm идут на каждый здоровый эндпоинт (probe), а не только на первый.
+"""
+
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Any, Deque, Dict, List, Optional, Set
+
+import requests
+
+from metrics import metrics
+
+# Задержка хеджирования, пока у эндпоинта мало замеров для p95
+HEDGE_DELAY: float = float(os.getenv("SUMMARIZER_HEDGE_DELAY", "10"))
+# Сколько успешных замеров нужно для собственного p95 и сколько хранить
+MIN_SAMPLES: int = 20
+HISTORY: int = 200
+# Ошибок подряд до выключения эндпоинта и время выключения
+FAILURE_THRESHOLD: int = 3
+COOLDOWN_SECONDS: float = 30.0
+# Статусы, при которых имеет смысл спросить другой эндпоинт
+RETRY_STATUS_CODES: Set[int] = {429, 500, 502, 503, 504}
+
+
+class Endpoint:
+    """
+    Что я делаю?
+        Храню адрес эндпоинта и статистику его задержек и ошибок.
+    Что я принимаю на вход?
+        url (str): Адрес.
+        name (str | None): Короткое имя для метрик (None - адрес).
+    Что я возвращаю?
+        Ничего - объект эндпоинта.
+    """
+
+    def __init__(self, url: str, name: Optional[str] = None) -> None:
+        self.url: str = url
+        self.name: str = name or url
+        self._latencies: Deque[float] = deque(maxlen=HISTORY)
+        self._lock: threading.Lock = threading.Lock()
+        self.consecutive_failures: int = 0
+        self.down_until: float = 0.0
+
+    @property
+    def healthy(self) -> bool:
+        """
+        Что я делаю?
+            Сообщаю, можно ли сейчас отправлять запросы на эндпоинт.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            bool: True если эндпоинт не выключен после серии ошибок.
+        """
+        return time.monotonic() >= self.down_until
+
+    def p95(self) -> Optional[float]:
+        """
+        Что я делаю?
+            Считаю 95-й перцентиль задержки успешных ответов.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            Optional[float]: Секунды или None, если замеров меньше MIN_SAMPLES.
+        """
+        with self._lock:
+            if len(self._latencies) < MIN_SAMPLES:
+                return None
+            return statistics.quantiles(self._latencies, n=20)[-1]
+
+    def record_success(self, seconds: Optional[float]) -> None:
+        """
+        Что я делаю?
+            Учитываю успешный ответ: задержку и сброс серии ошибок.
+        Что я принимаю на вход?
+            seconds (float | None): Задержка ответа (None - не учитывать, например
+                у коротких проб, которые исказили бы p95).
+        Что я возвращаю?
+            Ничего.
+        """
+        with self._lock:
+            if seconds is not None:
+                self._latencies.append(seconds)
+            self.consecutive_failures = 0
+            self.down_until = 0.0
+        if seconds is not None:
+            metrics.observe("endpoint_latency_seconds", seconds, endpoint=self.name)
+        metrics.set_gauge("endpoint_up", 1.0, endpoint=self.name)
+
+    def record_failure(self) -> None:
+        """
+        Что я делаю?
+            Учитываю ошибку; после FAILURE_THRESHOLD ошибок подряд выключаю эндпоинт.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            Ничего.
+        """
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.consecutive_failures >= FAILURE_THRESHOLD:
+                self.down_until = time.monotonic() + COOLDOWN_SECONDS
+        metrics.inc("endpoint_failures_total", endpoint=self.name)
+        metrics.set_gauge("endpoint_up", float(self.healthy), endpoint=self.name)
+
+    def describe(self) -> Dict[str, Any]:
+        """
+        Что я делаю?
+            Описываю состояние эндпоинта (для журнала и тестов).
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            dict: name, url, healthy, p95, consecutive_failures, samples.
+        """
+        return {
+            "name": self.name,
+            "url": self.url,
+            "healthy": self.healthy,
+            "p95": self.p95(),
+            "consecutive_failures": self.consecutive_failures,
+            "samples": len(self._latencies),
+        }
+
+
+# Брошенные попытки, чьи потоки еще ждут ответа
+_abandoned: int = 0
+_abandoned_lock: threading.Lock = threading.Lock()
+
+
+class _Attempt:
+    """
+    Что я делаю?
+        Выполняю одну попытку запроса к эндпоинту в своем потоке и своей сессии,
+        чтобы проигравшую попытку можно было бросить, не задерживая остальные.
+    Что я принимаю на вход?
+        endpoint (Endpoint): Эндпоинт.
+        record_latency (bool): Учитывать ли задержку в p95 эндпоинта.
+    Что я возвращаю?
+        Ничего - объект попытки.
+    """
+
+    def __init__(self, endpoint: Endpoint, record_latency: bool = True) -> None:
+        self.endpoint: Endpoint = endpoint
+        self.record_latency: bool = record_latency
+        self.session: requests.Session = requests.Session()
+        self.cancelled: bool = False
+        self.finished: bool = False
+
+    def start(self, body: bytes, headers: Dict[str, str], timeout: float) -> Future:
+        """
+        Что я делаю?
+            Запускаю попытку в отдельном потоке-демоне.
+        Что я принимаю на вход?
+            body (bytes): Тело запроса.
+            headers (dict): Заголовки.
+            timeout (float): Таймаут попытки.
+        Что я возвращаю?
+            Future: Результат run().
+        """
+        future: Future = Future()
+
+        def target() -> None:
+            try:
+                future.set_result(self.run(body, headers, timeout))
+            except BaseException as err:
+                future.set_exception(err)
+
+        threading.Thread(target=target, name=f"endpoint-{self.endpoint.name}", daemon=True).start()
+        return future
+
+    def run(self, body: bytes, headers: Dict[str, str], timeout: float) -> requests.Response:
+        """
+        Что я делаю?
+            Отправляю запрос и учитываю результат в статистике эндпоинта.
+            Ошибка отмененной попытки не учитывается (ее вызвала отмена), а ее
+            успешный ответ учитывается: это честный замер медленного эндпоинта.
+        Что я принимаю на вход?
+            body (bytes): Тело запроса.
+            headers (dict): Заголовки.
+            timeout (float): Таймаут попытки.
+        Что я возвращаю?
+            requests.Response: Ответ (любой статус).
+        """
+        global _abandoned
+        started: float = time.monotonic()
+        try:
+            response: requests.Response = self.session.post(self.endpoint.url, headers=headers, data=body, timeout=timeout)
+        except requests.exceptions.RequestException:
+            if not self.cancelled:
+                self.endpoint.record_failure()
+            raise
+        finally:
+            self.session.close()
+            with _abandoned_lock:
+                self.finished = True
+                if self.cancelled:
+                    _abandoned -= 1
+                    metrics.set_gauge("hedge_abandoned_in_flight", _abandoned)
+        if response.status_code not in RETRY_STATUS_CODES:
+            self.endpoint.record_success(time.monotonic() - started if self.record_latency else None)
+        elif not self.cancelled:
+            self.endpoint.record_failure()
+        return response
+
+    def cancel(self) -> None:
+        """
+        Что я делаю?
+            Бросаю попытку: закрываю сессию и отбрасываю результат. Идущее чтение
+            requests не прерывает - поток попытки живет до ответа или таймаута.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            Ничего.
+        """
+        global _abandoned
+        with _abandoned_lock:
+            # Попытка успела закончиться - бросать нечего
+            if self.finished:
+                return
+            self.cancelled = True
+            _abandoned += 1
+            metrics.set_gauge("hedge_abandoned_in_flight", _abandoned)
+        self.session.close()
+        metrics.inc("hedge_cancelled_total", endpoint=self.endpoint.name)
+
+
+class EndpointPool:
+    """
+    Что я делаю?
+        Отправляю запросы на несколько эндпоинтов с переключением при ошибках
+        и хеджированием медленных ответов.
+    Что я принимаю на вход?
+        endpoints (List[Endpoint]): Эндпоинты в порядке предпочтения.
+        hedge (bool): Отправлять ли дубликат после p95 задержки.
+    Что я возвращаю?
+        Ничего - объект пула.
+    """
+
+    def __init__(self, endpoints: List[Endpoint], hedge: bool = True) -> None:
+        if not endpoints:
+            raise ValueError("❌ Нужен хотя бы один эндпоинт")
+        self.endpoints: List[Endpoint] = endpoints
+        self.hedge: bool = hedge
+
+    def ordered(self) -> List[Endpoint]:
+        """
+        Что я делаю?
+            Упорядочиваю эндпоинты: здоровые в порядке предпочтения, затем выключенные
+            (если выключены все, запрос все равно уходит по списку).
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            List[Endpoint]: Эндпоинты в порядке попыток.
+        """
+        return [endpoint for endpoint in self.endpoints if endpoint.healthy] + [
+            endpoint for endpoint in self.endpoints if not endpoint.healthy
+        ]
+
+    def post(self, body: bytes, headers: Dict[str, str], timeout: float = 60.0) -> requests.Response:
+        """
+        Что я делаю?
+            Отправляю запрос: на первый эндпоинт, дубликат на следующий после
+            p95 задержки первого (или сразу после его ошибки), беру первый
+            успешный ответ и бросаю остальные попытки (их потоки дожидаются
+            ответа или таймаута в фоне, результат отбрасывается).
+        Что я принимаю на вход?
+            body (bytes): Тело запроса.
+            headers (dict): Заголовки.
+            timeout (float): Таймаут одной попытки.
+        Что я возвращаю?
+            requests.Response: Первый успешный ответ; если успешных нет - последний
+                ответ с ошибкой (его разберет raise_for_status вызывающего кода).
+
+        Raises:
+            requests.exceptions.RequestException: Если ни один эндпоинт не ответил.
+        """
+        queue: List[Endpoint] = self.ordered()
+        running: Dict[Future, _Attempt] = {}
+        last_response: Optional[requests.Response] = None
+        last_error: Optional[BaseException] = None
+
+        def launch() -> Optional[float]:
+            # Следующая попытка; возвращаю, сколько ждать до хеджирования
+            endpoint: Endpoint = queue.pop(0)
+            attempt: _Attempt = _Attempt(endpoint)
+            running[attempt.start(body, headers, timeout)] = attempt
+            return (endpoint.p95() or HEDGE_DELAY) if self.hedge and queue else None
+
+        hedge_after: Optional[float] = launch()
+        try:
+            while running:
+                done, _ = wait(list(running), timeout=hedge_after, return_when=FIRST_COMPLETED)
+                if not done:
+                    # Ответа нет дольше p95 - дублирую запрос на следующий эндпоинт
+                    metrics.inc("hedges_total", endpoint=running[next(iter(running))].endpoint.name)
+                    hedge_after = launch()
+                    continue
+                for future in done:
+                    attempt: _Attempt = running.pop(future)
+                    try:
+                        response: requests.Response = future.result()
+                    except requests.exceptions.RequestException as err:
+                        last_error = err
+                    else:
+                        if response.status_code not in RETRY_STATUS_CODES:
+                            if len(self.endpoints) > 1:
+                                metrics.inc("endpoint_wins_total", endpoint=attempt.endpoint.name)
+                            return response
+                        last_response = response
+                # Попытка провалилась - сразу пробую следующий эндпоинт
+                if queue and not running:
+                    hedge_after = launch()
+        finally:
+            for attempt in running.values():
+                attempt.cancel()
+
+        if last_response is not None:
+            return last_response
+        if last_error is None:
+            raise requests.exceptions.ConnectionError("Ни один эндпоинт не ответил")
+        raise last_error
+
+
+    def probe(self, body: bytes, headers: Dict[str, str], timeout: float = 60.0) -> Dict[str, int]:
+        """
+        Что я делаю?
+            Отправляю пробный запрос на каждый здоровый эндпоинт одновременно, чтобы
+            прогретым был не только первый. Задержки проб не входят в p95.
+        Что я принимаю на вход?
+            body (bytes): Тело пробы.
+            headers (dict): Заголовки.
+            timeout (float): Таймаут пробы.
+        Что я возвращаю?
+            dict: Имя эндпоинта -> HTTP-статус (эндпоинты без ответа пропущены).
+
+        Raises:
+            requests.exceptions.RequestException: Если не ответил ни один эндпоинт.
+        """
+        targets: List[Endpoint] = [endpoint for endpoint in self.endpoints if endpoint.healthy] or self.endpoints[:1]
+        futures: Dict[str, Future] = {
+            endpoint.name: _Attempt(endpoint, record_latency=False).start(body, headers, timeout)
+            for endpoint in targets
+        }
+        statuses: Dict[str, int] = {}
+        last_error: Optional[BaseException] = None
+        for name, future in futures.items():
+            try:
+                statuses[name] = future.result().status_code
+            except requests.exceptions.RequestException as err:
+                last_error = err
+        if not statuses and last_error is not None:
+            raise last_error
+        return statuses
+
+
+def endpoints_from_env(default_url: str) -> List[Endpoint]:
+    """
+    Что я делаю?
+        Читаю список эндпоинтов из SUMMARIZER_ENDPOINTS (адреса через запятую,
+        можно с именем: "router=https://...").
+    Что я принимаю на вход?
+        default_url (str): Адрес, если переменная не задана.
+    Что я возвращаю?
+        List[Endpoint]: Эндпоинты в порядке предпочтения.
+    """
+    endpoints: List[Endpoint] = []
+    for item in os.getenv("SUMMARIZER_ENDPOINTS", "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, separator, url = item.partition("=")
+        endpoints.append(Endpoint(url.strip(), name.strip()) if separator and "://" not in name else Endpoint(item))
+    return endpoints or [Endpoint(default_url, "router")]
@@ -0,0 +1,246 @@
+"""
+Модуль поддержания удаленной модели в "теплом" состоянии.
+
+Бесплатный Inference API выгружает модель после простоя, и первый запрос
+после паузы ждет ее загрузки много секунд или получает 503. Фоновый поток
+отправляет дешевые пробные запросы (1 новый токен) по адаптивному расписанию:
+    - проба нужна, только если с последней активности (настоящего запроса
+      или пробы) прошло больше текущего интервала - живой трафик сам держит
+      модель загруженной;
+    - холодная проба (503 или задержка много больше теплой) означает, что
+      интервал слишком длинный - он сокращается вдвое; теплая - интервал
+      медленно растет до максимума;
+    - если настоящих запросов нет дольше idle_after, пробы прекращаются до
+      следующего запроса.
+Задержки проб записываются в метрики: по разнице холодных и теплых проб
+видно, сколько стоил бы холодный старт для запросов, которые застали модель
+прогретой благодаря пробам.
+Включается переменной SUMMARIZER_KEEP_WARM=1.
+"""
+
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional
+
+from metrics import metrics
+
+KEEP_WARM: bool = os.getenv("SUMMARIZER_KEEP_WARM", "0").strip() in ("1", "true", "yes")
+# Начальный, минимальный и максимальный интервал между пробами в секундах
+PROBE_INTERVAL: float = float(os.getenv("SUMMARIZER_KEEP_WARM_INTERVAL", "240"))
+MIN_INTERVAL: float = 30.0
+MAX_INTERVAL: float = 900.0
+# Через сколько секунд без настоящих запросов пробы прекращаются
+IDLE_AFTER: float = float(os.getenv("SUMMARIZER_KEEP_WARM_IDLE", "1800"))
+# Проба холодная, если дольше стольких теплых медиан, но не быстрее MIN_COLD_SECONDS
+# (без истории теплых проб - дольше COLD_SECONDS)
+COLD_FACTOR: float = 3.0
+MIN_COLD_SECONDS: float = 1.0
+COLD_SECONDS: float = 5.0
+# Сколько последних задержек каждого вида хранить
+HISTORY: int = 50
+
+
+class KeepWarm:
+    """
+    Что я делаю?
+        Планирую и выполняю пробные запросы, пока процесс получает трафик.
+    Что я принимаю на вход?
+        probe (Callable): Отправляет пробу и возвращает HTTP-статус
+            (исключение - проба не удалась).
+        interval (float): Начальный интервал между пробами.
+        min_interval (float), max_interval (float): Границы интервала.
+        idle_after (float): Простой, после которого пробы прекращаются.
+        min_cold_seconds (float): Быстрее этого проба всегда теплая.
+        clock (Callable): Источник времени (для тестов).
+    Что я возвращаю?
+        Ничего - объект планировщика (поток запускается через start()).
+    """
+
+    def __init__(
+        self,
+        probe: Callable[[], int],
+        interval: float = PROBE_INTERVAL,
+        min_interval: float = MIN_INTERVAL,
+        max_interval: float = MAX_INTERVAL,
+        idle_after: float = IDLE_AFTER,
+        min_cold_seconds: float = MIN_COLD_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._probe: Callable[[], int] = probe
+        self.min_interval: float = min_interval
+        self.max_interval: float = max_interval
+        self.interval: float = min(max(interval, min_interval), max_interval)
+        self.idle_after: float = idle_after
+        self.min_cold_seconds: float = min_cold_seconds
+        self._clock: Callable[[], float] = clock
+        self._cond: threading.Condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping: bool = False
+        self._last_request: Optional[float] = None
+        self._last_probe: Optional[float] = None
+        self._warm: Deque[float] = deque(maxlen=HISTORY)
+        self._cold: Deque[float] = deque(maxlen=HISTORY)
+        self.counts: Dict[str, int] = {"warm": 0, "cold": 0, "error": 0, "kept_warm": 0}
+
+    def touch(self) -> None:
+        """
+        Что я делаю?
+            Отмечаю настоящий запрос к API. Если до него был долгий простой,
+            а модель держали пробы, запрос засчитывается как избежавший холодного старта.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            Ничего.
+        """
+        with self._cond:
+            now: float = self._clock()
+            previous: Optional[float] = self._last_request
+            if (
+                previous is not None and self._last_probe is not None and self._last_probe > previous
+                and now - previous > self.interval
+            ):
+                self.counts["kept_warm"] += 1
+                metrics.inc("keep_warm_requests_total")
+            self._last_request = now
+            # Будим поток, если он спал из-за простоя
+            self._cond.notify_all()
+
+    def due_in(self) -> Optional[float]:
+        """
+        Что я делаю?
+            Считаю, через сколько секунд нужна следующая проба.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            Optional[float]: Секунды (0 - пора) или None, если трафика нет и пробы не нужны.
+        """
+        with self._cond:
+            now: float = self._clock()
+            if self._last_request is None or now - self._last_request > self.idle_after:
+                return None
+            last_activity: float = max(self._last_request, self._last_probe or self._last_request)
+            return max(0.0, last_activity + self.interval - now)
+
+    def probe_now(self) -> str:
+        """
+        Что я делаю?
+            Отправляю пробу, определяю, была ли модель холодной, и подстраиваю интервал.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            str: warm, cold или error.
+        """
+        started: float = time.perf_counter()
+        try:
+            status: Optional[int] = self._probe()
+        except Exception as err:
+            metrics.record_error(err)
+            status = None
+        seconds: float = time.perf_counter() - started
+
+        with self._cond:
+            self._last_probe = self._clock()
+            threshold: float = (
+                max(self.min_cold_seconds, COLD_FACTOR * statistics.median(self._warm)) if self._warm else COLD_SECONDS
+            )
+            if status == 503 or (status is not None and 200 <= status < 300 and seconds > threshold):
+                outcome: str = "cold"
+                # 503 приходит сразу, цену холодного старта показывает только дождавшийся ответ
+                if status != 503:
+                    self._cold.append(seconds)
+                # Модель успела остыть - пробуем чаще
+                self.interval = max(self.min_interval, self.interval * 0.5)
+            elif status is not None and 200 <= status < 300:
+                outcome = "warm"
+                self._warm.append(seconds)
+                self.interval = min(self.max_interval, self.interval * 1.1)
+            else:
+                outcome = "error"
+            self.counts[outcome] += 1
+
+        metrics.inc("keep_warm_probes_total", outcome=outcome)
+        metrics.observe("keep_warm_probe_seconds", seconds, outcome=outcome)
+        metrics.set_gauge("keep_warm_interval_seconds", self.interval)
+        return outcome
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Что я делаю?
+            Сообщаю статистику проб и оценку сэкономленного времени.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            dict: Счетчики, интервал, медианы теплых и холодных проб,
+                cold_start_seconds (цена холодного старта) и saved_seconds
+                (цена холодного старта * запросов, заставших модель прогретой).
+        """
+        with self._cond:
+            warm: Optional[float] = statistics.median(self._warm) if self._warm else None
+            cold: Optional[float] = statistics.median(self._cold) if self._cold else None
+            cold_start: Optional[float] = cold - warm if warm is not None and cold is not None else None
+            return {
+                **self.counts,
+                "interval": self.interval,
+                "warm_median_seconds": warm,
+                "cold_median_seconds": cold,
+                "cold_start_seconds": cold_start,
+                "saved_seconds": cold_start * self.counts["kept_warm"] if cold_start is not None else None,
+            }
+
+    def _run(self) -> None:
+        """
+        Что я делаю?
+            Цикл фонового потока: жду срока пробы (или запроса после простоя) и пробую.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            Ничего.
+        """
+        while True:
+            # Условие на RLock: срок считается под той же блокировкой, что и ожидание,
+            # поэтому touch() между ними не теряется
+            with self._cond:
+                if self._stopping:
+                    return
+                delay: Optional[float] = self.due_in()
+                if delay is None or delay > 0:
+                    # Без трафика спим до touch(), иначе - до срока пробы
+                    self._cond.wait(timeout=delay)
+                    continue
+            self.probe_now()
+
+    def start(self) -> None:
+        """
+        Что я делаю?
+            Запускаю фоновый поток проб (повторный вызов ничего не делает).
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            Ничего.
+        """
+        with self._cond:
+            if self._thread is not None:
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="keep-warm", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Что я делаю?
+            Останавливаю фоновый поток.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            Ничего.
+        """
+        with self._cond:
+            thread: Optional[threading.Thread] = self._thread
+            self._stopping = True
+            self._thread = None
+            self._cond.notify_all()
+        if thread is not None:
+            thread.join(timeout=5.0)
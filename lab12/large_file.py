@@ -0,0 +1,263 @@
+"""
+Модуль работы с очень большими текстовыми файлами.
+
+Файл отображается в память (mmap) и читается кусками, поэтому открытие
+50-мегабайтного документа не копирует его целиком в строку. Предпросмотр
+показывает одну страницу, а суммаризатор получает только то, что ему нужно:
+начало документа (локальный движок все равно отбрасывает вход после
+MAX_INPUT_TOKENS) или, в режиме map-reduce, поток фрагментов: каждый
+фрагмент сжимается экстрактивно, выжимки сжимаются повторно, пока не
+уложатся в бюджет, и итоговое саммари строится по выжимке всего документа.
+"""
+
+import hashlib
+import mmap
+import re
+from typing import Callable, Iterator, List, Optional
+
+from extractive import estimate_tokens, summarize_extractive
+
+# Файлы больше порога GUI открывает в режиме большого документа
+LARGE_FILE_BYTES: int = 1024 * 1024
+# Размер страницы предпросмотра
+PAGE_BYTES: int = 64 * 1024
+# Сколько символов начала документа отдавать суммаризатору (с запасом больше 600 токенов)
+HEAD_CHARS: int = 8000
+# Размер фрагмента map-этапа в символах и бюджет его выжимки в токенах
+CHUNK_CHARS: int = 20000
+CHUNK_SUMMARY_TOKENS: int = 60
+# Бюджет итоговой выжимки, которая уходит в суммаризатор
+DIGEST_TOKENS: int = 450
+# Сколько выжимок сжимается вместе на каждом уровне reduce
+REDUCE_GROUP: int = 16
+
+# Граница, на которой удобно резать текст: абзац или конец предложения
+_BREAK_RE = re.compile(r"\n\s*\n|[.!?…][»\"')\]]*\s+")
+
+
+def _align(data: "mmap.mmap | bytes", position: int) -> int:
+    """
+    Что я делаю?
+        Сдвигаю позицию вперед на начало символа UTF-8 (пропускаю байты продолжения).
+    Что я принимаю на вход?
+        data: Байты файла.
+        position (int): Позиция в байтах.
+    Что я возвращаю?
+        int: Позиция начала символа.
+    """
+    end: int = len(data)
+    while position < end and (data[position] & 0xC0) == 0x80:
+        position += 1
+    return min(position, end)
+
+
+class LargeTextFile:
+    """
+    Что я делаю?
+        Даю постраничный и потоковый доступ к большому текстовому файлу через mmap.
+    Что я принимаю на вход?
+        path (str): Путь к файлу в UTF-8.
+    Что я возвращаю?
+        Ничего - объект документа (закрывается через close() или with).
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        self._file = open(path, "rb")
+        try:
+            self._data: "mmap.mmap | bytes" = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Пустой файл отобразить в память нельзя
+            self._data = b""
+        self.size: int = len(self._data)
+
+    @property
+    def page_count(self) -> int:
+        """
+        Что я делаю?
+            Считаю число страниц предпросмотра.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            int: Число страниц (не меньше 1).
+        """
+        return max(1, -(-self.size // PAGE_BYTES))
+
+    def _decode(self, start: int, end: int) -> str:
+        """
+        Что я делаю?
+            Декодирую диапазон байтов, выровненный по границам символов.
+        Что я принимаю на вход?
+            start (int), end (int): Границы диапазона в байтах.
+        Что я возвращаю?
+            str: Текст диапазона.
+        """
+        start, end = _align(self._data, start), _align(self._data, end)
+        return self._data[start:end].decode("utf-8", errors="replace")
+
+    def page(self, index: int) -> str:
+        """
+        Что я делаю?
+            Читаю одну страницу предпросмотра (страницы без пропусков и повторов
+            составляют весь файл).
+        Что я принимаю на вход?
+            index (int): Номер страницы с нуля.
+        Что я возвращаю?
+            str: Текст страницы.
+        """
+        index = max(0, min(index, self.page_count - 1))
+        return self._decode(index * PAGE_BYTES, (index + 1) * PAGE_BYTES)
+
+    def head(self, max_chars: int = HEAD_CHARS) -> str:
+        """
+        Что я делаю?
+            Читаю начало документа, обрезанное по последней границе предложения.
+        Что я принимаю на вход?
+            max_chars (int): Предел длины в символах.
+        Что я возвращаю?
+            str: Начало документа.
+        """
+        # В UTF-8 символ занимает до 4 байт
+        text: str = self._decode(0, max_chars * 4)[:max_chars]
+        if len(text) < max_chars:
+            return text
+        breaks: List[re.Match] = list(_BREAK_RE.finditer(text))
+        return text[:breaks[-1].end()].rstrip() if breaks else text
+
+    def iter_chunks(self, chunk_chars: int = CHUNK_CHARS) -> Iterator[str]:
+        """
+        Что я делаю?
+            Читаю документ последовательными фрагментами, разрезая по абзацам
+            или предложениям; в памяти одновременно только один фрагмент.
+        Что я принимаю на вход?
+            chunk_chars (int): Желаемый размер фрагмента в символах.
+        Что я возвращаю?
+            Iterator[str]: Фрагменты (вместе составляют весь документ).
+        """
+        # Кириллица занимает 2 байта на символ
+        block_bytes: int = chunk_chars * 2
+        position: int = 0
+        carry: str = ""
+        while position < self.size:
+            end: int = _align(self._data, position + block_bytes)
+            text: str = carry + self._data[position:end].decode("utf-8", errors="replace")
+            position = end
+            if position >= self.size:
+                carry = text
+                break
+            # Режу по последней границе во второй половине блока, остаток переносится дальше
+            cut: Optional[int] = None
+            for match in _BREAK_RE.finditer(text, len(text) // 2):
+                cut = match.end()
+            if cut is None:
+                cut = len(text)
+            carry = text[cut:]
+            yield text[:cut]
+        if carry:
+            yield carry
+
+    def chunk_estimate(self, chunk_chars: int = CHUNK_CHARS) -> int:
+        """
+        Что я делаю?
+            Оцениваю число фрагментов iter_chunks (для индикатора прогресса).
+        Что я принимаю на вход?
+            chunk_chars (int): Размер фрагмента в символах.
+        Что я возвращаю?
+            int: Примерное число фрагментов.
+        """
+        return max(1, -(-self.size // (chunk_chars * 2)))
+
+    def fingerprint(self) -> str:
+        """
+        Что я делаю?
+            Считаю хеш содержимого файла (для поиска сохраненного саммари документа).
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            str: SHA-256 в шестнадцатеричном виде.
+        """
+        return hashlib.sha256(self._data).hexdigest()
+
+    def close(self) -> None:
+        """
+        Что я делаю?
+            Освобождаю отображение в память и файл.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            Ничего.
+        """
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._file.close()
+
+    def __enter__(self) -> "LargeTextFile":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def build_digest(
+    chunks: Iterator[str],
+    digest_tokens: int = DIGEST_TOKENS,
+    chunk_summary_tokens: int = CHUNK_SUMMARY_TOKENS,
+    on_progress: Optional[Callable[[int], None]] = None,
+) -> str:
+    """
+    Что я делаю?
+        Сжимаю документ экстрактивно по схеме map-reduce: выжимка каждого
+        фрагмента, затем выжимки группами сжимаются снова, пока не уложатся в бюджет.
+    Что я принимаю на вход?
+        chunks (Iterator[str]): Фрагменты документа.
+        digest_tokens (int): Бюджет итоговой выжимки.
+        chunk_summary_tokens (int): Бюджет выжимки одного фрагмента.
+        on_progress (Callable | None): Вызывается с числом обработанных фрагментов.
+    Что я возвращаю?
+        str: Выжимка документа в порядке следования текста.
+    """
+    summaries: List[str] = []
+    for index, chunk in enumerate(chunks, start=1):
+        summary: str = summarize_extractive(chunk, max_length=chunk_summary_tokens)
+        if summary:
+            summaries.append(summary)
+        if on_progress is not None:
+            on_progress(index)
+
+    digest: str = " ".join(summaries)
+    while len(summaries) > 1 and estimate_tokens(digest) > digest_tokens:
+        # Группы сохраняют порядок, поэтому выжимка идет по ходу документа
+        groups: int = -(-len(summaries) // REDUCE_GROUP)
+        group_budget: int = max(chunk_summary_tokens, digest_tokens // groups)
+        summaries = [
+            summarize_extractive(" ".join(summaries[start:start + REDUCE_GROUP]), max_length=group_budget)
+            for start in range(0, len(summaries), REDUCE_GROUP)
+        ]
+        digest = " ".join(summaries)
+    if estimate_tokens(digest) > digest_tokens:
+        digest = summarize_extractive(digest, max_length=digest_tokens)
+    return digest
+
+
+def summarize_long(
+    document: LargeTextFile,
+    summarize: Callable[[str], Optional[str]],
+    on_progress: Optional[Callable[[int, int], None]] = None,
+) -> Optional[str]:
+    """
+    Что я делаю?
+        Суммаризирую весь большой документ: строю экстрактивную выжимку
+        потоком фрагментов и отдаю ее суммаризатору.
+    Что я принимаю на вход?
+        document (LargeTextFile): Документ.
+        summarize (Callable): Текст -> саммари (например, summarize_text_advanced).
+        on_progress (Callable | None): Вызывается с (обработано фрагментов, всего примерно).
+    Что я возвращаю?
+        Optional[str]: Саммари документа.
+    """
+    total: int = document.chunk_estimate()
+    digest: str = build_digest(
+        document.iter_chunks(),
+        on_progress=(lambda done: on_progress(done, max(total, done))) if on_progress else None,
+    )
+    return summarize(digest)
@@ -0,0 +1,419 @@
+"""
+Модуль встроенных метрик суммаризатора.
+
+Записывает длительность этапов обработки запроса, число входных и выходных
+токенов, скорость генерации, попадания в кеш и ошибки по классам.
+Метрики доступны как словарь (snapshot) и в текстовом формате Prometheus,
+в том числе по HTTP (/metrics).
+
+Включается переменной SUMMARIZER_METRICS=1. В выключенном состоянии
+stage() возвращает общий пустой контекстный менеджер, а остальные методы
+сразу выходят, так что накладные расходы близки к нулю.
+"""
+
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from tracing import tracer
+
+# Границы корзин гистограммы длительностей (секунды)
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0,
+)
+_PREFIX: str = "summarizer_"
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class _NullTimer:
+    """
+    Что я делаю?
+        Заменяю таймер этапа, когда метрики выключены (ничего не измеряю).
+    Что я принимаю на вход?
+        Ничего.
+    Что я возвращаю?
+        Ничего - пустой контекстный менеджер с seconds = 0.
+    """
+
+    seconds: float = 0.0
+
+    def __enter__(self) -> "_NullTimer":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        return None
+
+
+_NULL_TIMER: _NullTimer = _NullTimer()
+
+
+class _StageTimer:
+    """
+    Что я делаю?
+        Измеряю длительность этапа и записываю ее в гистограмму при выходе.
+    Что я принимаю на вход?
+        metrics (Metrics): Хранилище метрик.
+        stage (str): Название этапа.
+        labels (dict): Дополнительные метки.
+        span: Интервал трассы этапа (None - запрос не трассируется).
+    Что я возвращаю?
+        Ничего - контекстный менеджер; после выхода seconds содержит длительность.
+    """
+
+    def __init__(self, metrics: "Metrics", stage: str, labels: Dict[str, str], span: Any = None) -> None:
+        self._metrics: "Metrics" = metrics
+        self._labels: Dict[str, str] = {"stage": stage, **labels}
+        self._span: Any = span
+        self._started: float = 0.0
+        self.seconds: float = 0.0
+
+    def __enter__(self) -> "_StageTimer":
+        if self._span is not None:
+            self._span.__enter__()
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, traceback: Any) -> None:
+        self.seconds = time.perf_counter() - self._started
+        if self._span is not None:
+            self._span.__exit__(exc_type, exc, traceback)
+        self._metrics.observe("stage_seconds", self.seconds, **self._labels)
+
+
+class _Histogram:
+    """
+    Что я делаю?
+        Храню счетчик, сумму и накопленные корзины одной гистограммы.
+    Что я принимаю на вход?
+        Ничего.
+    Что я возвращаю?
+        Ничего - контейнер данных.
+    """
+
+    def __init__(self) -> None:
+        self.count: int = 0
+        self.total: float = 0.0
+        self.buckets: List[int] = [0] * len(LATENCY_BUCKETS)
+
+    def observe(self, value: float) -> None:
+        """
+        Что я делаю?
+            Добавляю значение в гистограмму.
+        Что я принимаю на вход?
+            value (float): Наблюдение.
+        Что я возвращаю?
+            Ничего.
+        """
+        self.count += 1
+        self.total += value
+        for index, bound in enumerate(LATENCY_BUCKETS):
+            if value <= bound:
+                self.buckets[index] += 1
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    """
+    Что я делаю?
+        Превращаю метки в хешируемый отсортированный ключ.
+    Что я принимаю на вход?
+        labels (dict): Метки.
+    Что я возвращаю?
+        LabelKey: Кортеж пар (имя, значение).
+    """
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    """
+    Что я делаю?
+        Форматирую метки в синтаксисе Prometheus: {a="1",b="2"}.
+    Что я принимаю на вход?
+        key (LabelKey): Метки.
+        extra (tuple | None): Дополнительная метка (например, le для корзины).
+    Что я возвращаю?
+        str: Строка меток (пустая, если меток нет).
+    """
+    pairs: List[Tuple[str, str]] = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped: List[str] = [
+        name + '="' + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for name, value in pairs
+    ]
+    return "{" + ",".join(escaped) + "}"
+
+
+class Metrics:
+    """
+    Что я делаю?
+        Собираю счетчики, гистограммы и показатели (gauge) с метками.
+    Что я принимаю на вход?
+        enabled (bool): Включен ли сбор метрик.
+    Что я возвращаю?
+        Ничего - объект хранилища метрик.
+    """
+
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled: bool = enabled
+        self._lock: threading.Lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._gauges: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, _Histogram]] = {}
+
+    def stage(self, name: str, **labels: str) -> Any:
+        """
+        Что я делаю?
+            Возвращаю таймер этапа для использования в with.
+        Что я принимаю на вход?
+            name (str): Название этапа (tokenize, generate, http, ...).
+            **labels: Дополнительные метки.
+        Что я возвращаю?
+            Контекстный менеджер с атрибутом seconds. Внутри трассируемого
+            запроса этап также становится интервалом трассы (см. tracing.py).
+        """
+        span: Any = tracer.span(name, **labels) if tracer.enabled else None
+        if not self.enabled:
+            return span or _NULL_TIMER
+        return _StageTimer(self, name, labels, span)
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """
+        Что я делаю?
+            Добавляю наблюдение в гистограмму.
+        Что я принимаю на вход?
+            name (str): Имя гистограммы.
+            value (float): Значение (секунды).
+            **labels: Метки.
+        Что я возвращаю?
+            Ничего.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            series: Dict[LabelKey, _Histogram] = self._histograms.setdefault(name, {})
+            series.setdefault(_label_key(labels), _Histogram()).observe(value)
+
+    def inc(self, name: str, value: float = 1.0, **labels: Any) -> None:
+        """
+        Что я делаю?
+            Увеличиваю счетчик.
+        Что я принимаю на вход?
+            name (str): Имя счетчика.
+            value (float): Приращение.
+            **labels: Метки.
+        Что я возвращаю?
+            Ничего.
+        """
+        if not self.enabled:
+            return
+        key: LabelKey = _label_key(labels)
+        with self._lock:
+            series: Dict[LabelKey, float] = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def set_gauge(self, name: str, value: float, **labels: Any) -> None:
+        """
+        Что я делаю?
+            Устанавливаю текущее значение показателя.
+        Что я принимаю на вход?
+            name (str): Имя показателя.
+            value (float): Значение.
+            **labels: Метки.
+        Что я возвращаю?
+            Ничего.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._gauges.setdefault(name, {})[_label_key(labels)] = value
+
+    def record_tokens(self, input_tokens: int, output_tokens: int, generate_seconds: float, **labels: Any) -> None:
+        """
+        Что я делаю?
+            Записываю число входных/выходных токенов и скорость генерации.
+        Что я принимаю на вход?
+            input_tokens (int): Токенов во входе модели.
+            output_tokens (int): Сгенерированных токенов.
+            generate_seconds (float): Время генерации.
+            **labels: Метки.
+        Что я возвращаю?
+            Ничего.
+        """
+        if not self.enabled:
+            return
+        self.inc("input_tokens_total", input_tokens, **labels)
+        self.inc("output_tokens_total", output_tokens, **labels)
+        if generate_seconds > 0:
+            self.set_gauge("tokens_per_second", output_tokens / generate_seconds, **labels)
+
+    def record_error(self, error: Any, **labels: Any) -> None:
+        """
+        Что я делаю?
+            Увеличиваю счетчик ошибок по классу исключения.
+        Что я принимаю на вход?
+            error: Исключение или строковое имя класса ошибки.
+            **labels: Метки.
+        Что я возвращаю?
+            Ничего.
+        """
+        error_class: str = error if isinstance(error, str) else type(error).__name__
+        tracer.annotate(error=error_class, **labels)
+        if not self.enabled:
+            return
+        self.inc("errors_total", error_class=error_class, **labels)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Что я делаю?
+            Возвращаю копию всех метрик в виде словаря.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            dict: counters, gauges, histograms; метки записаны строкой "a=1,b=2".
+        """
+        def label_text(key: LabelKey) -> str:
+            return ",".join(f"{name}={value}" for name, value in key)
+
+        with self._lock:
+            return {
+                "counters": {
+                    name: {label_text(key): value for key, value in series.items()}
+                    for name, series in self._counters.items()
+                },
+                "gauges": {
+                    name: {label_text(key): value for key, value in series.items()}
+                    for name, series in self._gauges.items()
+                },
+                "histograms": {
+                    name: {
+                        label_text(key): {
+                            "count": histogram.count,
+                            "sum": histogram.total,
+                            "mean": histogram.total / histogram.count if histogram.count else 0.0,
+                        }
+                        for key, histogram in series.items()
+                    }
+                    for name, series in self._histograms.items()
+                },
+            }
+
+    def render_prometheus(self) -> str:
+        """
+        Что я делаю?
+            Форматирую метрики в текстовом формате Prometheus.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            str: Текст для эндпоинта /metrics.
+        """
+        lines: List[str] = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                lines.append(f"# TYPE {_PREFIX}{name} counter")
+                for key, value in series.items():
+                    lines.append(f"{_PREFIX}{name}{_format_labels(key)} {value}")
+            for name, series in sorted(self._gauges.items()):
+                lines.append(f"# TYPE {_PREFIX}{name} gauge")
+                for key, value in series.items():
+                    lines.append(f"{_PREFIX}{name}{_format_labels(key)} {value}")
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f"# TYPE {_PREFIX}{name} histogram")
+                for key, histogram in series.items():
+                    for bound, count in zip(LATENCY_BUCKETS, histogram.buckets):
+                        lines.append(f"{_PREFIX}{name}_bucket{_format_labels(key, ('le', str(bound)))} {count}")
+                    lines.append(f"{_PREFIX}{name}_bucket{_format_labels(key, ('le', '+Inf'))} {histogram.count}")
+                    lines.append(f"{_PREFIX}{name}_sum{_format_labels(key)} {histogram.total}")
+                    lines.append(f"{_PREFIX}{name}_count{_format_labels(key)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """
+        Что я делаю?
+            Очищаю все накопленные метрики.
+        Что я принимаю на вход?
+            Ничего.
+        Что я возвращаю?
+            Ничего.
+        """
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+
+# Общее хранилище метрик процесса
+metrics: Metrics = Metrics(
+    enabled=os.getenv("SUMMARIZER_METRICS", "").strip().lower() in ("1", "true", "yes")
+)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """
+    Что я делаю?
+        Отдаю метрики по HTTP: /metrics (Prometheus) и /metrics.json (snapshot).
+    Что я принимаю на вход?
+        Стандартные аргументы BaseHTTPRequestHandler.
+    Что я возвращаю?
+        Ничего.
+    """
+
+    def do_GET(self) -> None:
+        if self.path == "/metrics":
+            body: bytes = metrics.render_prometheus().encode("utf-8")
+            content_type: str = "text/plain; version=0.0.4; charset=utf-8"
+        elif self.path == "/metrics.json":
+            body = json.dumps(metrics.snapshot(), ensure_ascii=False).encode("utf-8")
+            content_type = "application/json"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # Не засоряем консоль запросами мониторинга
+        return
+
+
+_server: Optional[ThreadingHTTPServer] = None
+
+
+def start_metrics_server(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """
+    Что я делаю?
+        Запускаю HTTP-сервер метрик в фоновом потоке и включаю сбор метрик.
+    Что я принимаю на вход?
+        port (int): Порт.
+        host (str): Адрес для прослушивания.
+    Что я возвращаю?
+        ThreadingHTTPServer: Запущенный сервер (повторный вызов вернет тот же).
+    """
+    global _server
+    if _server is None:
+        metrics.enabled = True
+        _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+        print(f"📈 Метрики доступны на http://{host}:{port}/metrics")
+    return _server
+
+
+def start_metrics_server_from_env() -> Optional[ThreadingHTTPServer]:
+    """
+    Что я делаю?
+        Запускаю сервер метрик, если задана переменная SUMMARIZER_METRICS_PORT.
+    Что я принимаю на вход?
+        Ничего.
+    Что я возвращаю?
+        ThreadingHTTPServer | None: Сервер или None, если порт не задан.
+    """
+    port: str = os.getenv("SUMMARIZER_METRICS_PORT", "").strip()
+    if not port:
+        return None
+    return start_metrics_server(int(port))
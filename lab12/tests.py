@@ -102,6 +102,7 @@ def test_type_annotations() -> None:
         validate_text,
         summarize_text,
         summarize_text_advanced,
+        summarize_text_extractive,
         load_api_token
     )
     
@@ -110,6 +111,7 @@ def test_type_annotations() -> None:
         "validate_text": validate_text,
         "summarize_text": summarize_text,
         "summarize_text_advanced": summarize_text_advanced,
+        "summarize_text_extractive": summarize_text_extractive,
         "load_api_token": load_api_token
     }
     
@@ -128,6 +130,729 @@ def test_type_annotations() -> None:
         print()
 
 
+def test_summarize_extractive() -> None:
+    """
+    Что я делаю?
+        Тестирую разбиение на предложения и экстрактивную суммаризацию.
+    Что я принимаю на вход?
+        Ничего.
+    Что я возвращаю?
+        Ничего.
+    """
+    from extractive import split_sentences, summarize_extractive, estimate_tokens, compress_to_budget
+
+    print("=" * 80)
+    print("ТЕСТИРОВАНИЕ ФУНКЦИИ summarize_extractive()")
+    print("=" * 80)
+
+    # Тест 1: Сокращения и инициалы не разрывают предложение
+    text1: str = "Профессор А. С. Петров, т.е. автор книги, выступил в 2020 г. в Москве. Зал был полон!"
+    sentences: list = split_sentences(text1)
+    status1: str = "✅ PASSED" if len(sentences) == 2 else "❌ FAILED"
+    print(f"\n[Тест 1] Разбиение на предложения: {status1}")
+    print(f"  Предложений: {len(sentences)} (ожидается 2)")
+
+    # Тест 2: Результат укладывается в бюджет и сохраняет порядок предложений
+    article: str = (
+        "Центральный банк повысил ключевую ставку до шестнадцати процентов. "
+        "Решение совета директоров банка объясняется ростом инфляции. "
+        "Погода в Москве в выходные будет солнечной. "
+        "Аналитики ожидали, что банк повысит ставку меньше. "
+        "Повышение ставки банк связал с ускорением инфляции и кредитования."
+    )
+    summary: str = summarize_extractive(article, max_length=40)
+    chosen: list = split_sentences(summary)
+    in_order: bool = [article.index(item) for item in chosen] == sorted(article.index(item) for item in chosen)
+    fits: bool = estimate_tokens(summary) <= 40 and bool(summary)
+    status2: str = "✅ PASSED" if fits and in_order and "Погода" not in summary else "❌ FAILED"
+    print(f"\n[Тест 2] Бюджет, порядок и отбор предложений: {status2}")
+    print(f"  Саммари: {summary}")
+
+    # Тест 3: Предсжатие укладывает вход в бюджет, короткий текст не трогает
+    compressed: str = compress_to_budget(article, token_budget=60)
+    short_kept: bool = compress_to_budget(text1, token_budget=1000) == text1
+    status3: str = "✅ PASSED" if estimate_tokens(compressed) <= 60 and short_kept else "❌ FAILED"
+    print(f"\n[Тест 3] Предсжатие до бюджета: {status3}")
+    print(f"  Токенов после сжатия: {estimate_tokens(compressed)} (бюджет 60)")
+
+    passed: int = sum([status1 == "✅ PASSED", status2 == "✅ PASSED", status3 == "✅ PASSED"])
+    print(f"\n📊 Результаты: {passed}/3 тестов пройдено\n")
+    assert passed == 3
+
+
+def test_near_duplicate_index() -> None:
+    """
+    Что я делаю?
+        Тестирую поиск саммари для перепечатки уже обработанного текста.
+    Что я принимаю на вход?
+        Ничего.
+    Что я возвращаю?
+        Ничего.
+    """
+    from near_duplicates import NearDuplicateIndex
+
+    print("=" * 80)
+    print("ТЕСТИРОВАНИЕ КЛАССА NearDuplicateIndex")
+    print("=" * 80)
+
+    original: str = (
+        "Центральный банк России повысил ключевую ставку на два процентных пункта, "
+        "до шестнадцати процентов годовых. Решение объясняется ускорением инфляции, "
+        "которая по итогам прошлого месяца превысила прогноз регулятора. Аналитики "
+        "в среднем ожидали повышения на один пункт. Рубль после решения укрепился."
+    )
+    reprint: str = "МОСКВА, 15 сентября. " + original + " Об этом сообщает ТАСС."
+    unrelated: str = (
+        "В Санкт-Петербурге открылась новая станция метро. Строительство заняло почти "
+        "семь лет и несколько раз откладывалось. Станция рассчитана на сорок тысяч человек."
+    )
+
+    index: NearDuplicateIndex = NearDuplicateIndex(threshold=0.8, max_entries=2)
+    index.add(original, ("params", 150), "Ставка повышена до 16%.")
+
+    # Тест 1: Перепечатка находит сохраненное саммари
+    status1: str = "✅ PASSED" if index.lookup(reprint, ("params", 150)) else "❌ FAILED"
+    print(f"\n[Тест 1] Перепечатка найдена: {status1}")
+
+    # Тест 2: Другие параметры генерации и другой текст не совпадают
+    other_params: bool = index.lookup(reprint, ("params", 60)) is None
+    other_text: bool = index.lookup(unrelated, ("params", 150)) is None
+    status2: str = "✅ PASSED" if other_params and other_text else "❌ FAILED"
+    print(f"\n[Тест 2] Нет ложных совпадений: {status2}")
+
+    # Тест 3: Размер индекса ограничен
+    index.add(unrelated, ("params", 150), "Открыта станция метро.")
+    index.add(reprint, ("params", 60), "Ставка 16%.")
+    status3: str = "✅ PASSED" if len(index) == 2 else "❌ FAILED"
+    print(f"\n[Тест 3] Ограничение размера индекса: {status3}")
+
+    passed: int = sum([status1 == "✅ PASSED", status2 == "✅ PASSED", status3 == "✅ PASSED"])
+    print(f"\n📊 Результаты: {passed}/3 тестов пройдено\n")
+    assert passed == 3
+
+
+def test_metrics() -> None:
+    """
+    Что я делаю?
+        Тестирую сбор метрик этапов и их вывод в формате Prometheus.
+    Что я принимаю на вход?
+        Ничего.
+    Что я возвращаю?
+        Ничего.
+    """
+    from metrics import Metrics
+
+    print("=" * 80)
+    print("ТЕСТИРОВАНИЕ КЛАССА Metrics")
+    print("=" * 80)
+
+    # Тест 1: Выключенные метрики ничего не записывают
+    disabled: Metrics = Metrics(enabled=False)
+    with disabled.stage("generate"):
+        pass
+    disabled.inc("requests_total")
+    status1: str = "✅ PASSED" if not disabled.snapshot()["counters"] else "❌ FAILED"
+    print(f"\n[Тест 1] Выключенные метрики: {status1}")
+
+    # Тест 2: Этапы, токены и ошибки попадают в снимок и в текст Prometheus
+    enabled: Metrics = Metrics(enabled=True)
+    with enabled.stage("generate") as timer:
+        pass
+    enabled.record_tokens(100, 20, 0.5)
+    enabled.record_error(TimeoutError())
+    snapshot: dict = enabled.snapshot()
+    text: str = enabled.render_prometheus()
+    recorded: bool = (
+        snapshot["histograms"]["stage_seconds"]["stage=generate"]["count"] == 1
+        and snapshot["gauges"]["tokens_per_second"][""] == 40.0
+        and 'summarizer_errors_total{error_class="TimeoutError"} 1.0' in text
+        and timer.seconds >= 0.0
+    )
+    status2: str = "✅ PASSED" if recorded else "❌ FAILED"
+    print(f"\n[Тест 2] Запись этапов, токенов и ошибок: {status2}")
+
+    passed: int = sum([status1 == "✅ PASSED", status2 == "✅ PASSED"])
+    print(f"\n📊 Результаты: {passed}/2 тестов пройдено\n")
+    assert passed == 2
+
+
+def test_tracing() -> None:
+    """
+    Что я делаю?
+        Тестирую запись дерева интервалов запроса и отбор самых медленных профилей.
+    Что я принимаю на вход?
+        Ничего.
+    Что я возвращаю?
+        Ничего.
+    """
+    import json
+    import tempfile
+    from collections import Counter
+    from pathlib import Path
+
+    from tracing import StackSampler, Tracer
+
+    print("=" * 80)
+    print("ТЕСТИРОВАНИЕ ТРАССИРОВКИ ЗАПРОСОВ")
+    print("=" * 80)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Тест 1: Одна строка JSONL с вложенными интервалами и атрибутами
+        trace_path: Path = Path(tmp) / "trace.jsonl"
+        local_tracer: Tracer = Tracer(str(trace_path))
+        with local_tracer.request("summarize", input_chars=120):
+            with local_tracer.span("tokenize"):
+                pass
+            with local_tracer.span("generate"):
+                local_tracer.annotate(steps=3)
+        outside = local_tracer.span("decode")
+        lines = trace_path.read_text(encoding="utf-8").splitlines()
+        record: dict = json.loads(lines[0]) if lines else {}
+        children = record.get("children", [])
+        ok1: bool = (
+            len(lines) == 1
+            and [child["name"] for child in children] == ["tokenize", "generate"]
+            and children[1].get("attributes") == {"steps": 3}
+            and outside is None
+        )
+        status1: str = "✅ PASSED" if ok1 else "❌ FAILED"
+        print(f"\n[Тест 1] Дерево интервалов в JSONL: {status1}")
+
+        # Тест 2: Профилировщик хранит стеки только N самых медленных запросов
+        sampler: StackSampler = StackSampler(slowest=2, output_dir=tmp)
+        for trace_id, seconds in (("a", 1.0), ("b", 3.0), ("c", 2.0), ("d", 0.5)):
+            sampler.offer(trace_id, seconds, Counter({"main;summarize;generate": 5}))
+        kept = sorted(path.stem for path in Path(tmp).glob("*.folded"))
+        status2: str = "✅ PASSED" if kept == ["b", "c"] else "❌ FAILED"
+        print(f"\n[Тест 2] Хранятся только самые медленные профили {kept}: {status2}")
+
+    # Тест 3: Корневой интервал удаленного запроса - вызов API, а не вспомогательные функции
+    import text_summarizer
+
+    ok3: bool = (
+        getattr(text_summarizer._call_hf_api, "__wrapped__", None) is not None
+        and not hasattr(text_summarizer._params_key, "__wrapped__")
+    )
+    status3: str = "✅ PASSED" if ok3 else "❌ FAILED"
+    print(f"\n[Тест 3] _call_hf_api обернут @traced: {status3}")
+
+    passed: int = sum([status1 == "✅ PASSED", status2 == "✅ PASSED", status3 == "✅ PASSED"])
+    print(f"\n📊 Результаты: {passed}/3 тестов пройдено\n")
+    assert passed == 3
+
+
+def test_batch_queue() -> None:
+    """
+    Что я делаю?
+        Тестирую пакетную очередь: порции, экспорт в JSONL, паузу и продолжение.
+    Что я принимаю на вход?
+        Ничего.
+    Что я возвращаю?
+        Ничего.
+    """
+    import json
+    import tempfile
+    import threading
+    import time
+    from pathlib import Path
+    from typing import List
+
+    from batch_queue import BatchQueue
+
+    print("=" * 80)
+    print("ТЕСТИРОВАНИЕ ПАКЕТНОЙ ОЧЕРЕДИ")
+    print("=" * 80)
+
+    with tempfile.TemporaryDirectory() as folder:
+        root: Path = Path(folder)
+        (root / "nested").mkdir()
+        for index in range(5):
+            (root / f"article{index}.txt").write_text(f"Статья номер {index}", encoding="utf-8")
+        (root / "nested" / "broken.md").write_text("сломать", encoding="utf-8")
+        (root / "image.png").write_bytes(b"not a text")
+
+        chunks: List[int] = []
+        release: threading.Event = threading.Event()
+
+        def summarize_many(texts: List[str]) -> List[str]:
+            chunks.append(len(texts))
+            release.wait(5)
+            return ["❌ сбой" if text == "сломать" else text.upper() for text in texts]
+
+        output: Path = root / "out" / "summaries.jsonl"
+        queue: BatchQueue = BatchQueue(summarize_many, str(output), chunk_size=2)
+        added: int = queue.add_files([folder])
+
+        # Тест 1: Пауза останавливает очередь на границе порции, продолжение доводит до конца
+        queue.start()
+        while not chunks:
+            time.sleep(0.001)
+        queue.pause()
+        release.set()
+        time.sleep(0.1)
+        paused_chunks: int = len(chunks)
+        paused_pending: int = queue.stats()["pending"]
+        queue.resume()
+        finished: bool = queue.wait(5)
+        ok1: bool = added == 6 and paused_chunks == 1 and paused_pending == 4 and finished and chunks == [2, 2, 2]
+        status1: str = "✅ PASSED" if ok1 else "❌ FAILED"
+        print(f"\n[Тест 1] Порции {chunks}, пауза после {paused_chunks}-й: {status1}")
+
+        # Тест 2: Каждый результат - строка JSONL, ошибки помечены
+        records = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+        stats = queue.stats()
+        ok2: bool = (
+            len(records) == 6
+            and sum("summary" in record for record in records) == 5
+            and any(record.get("error") == "❌ сбой" for record in records)
+            and stats["done"] == 5 and stats["errors"] == 1 and stats["items_per_second"] > 0
+        )
+        status2: str = "✅ PASSED" if ok2 else "❌ FAILED"
+        print(f"\n[Тест 2] Экспорт в JSONL по мере готовности: {status2}")
+
+    passed: int = sum([status1 == "✅ PASSED", status2 == "✅ PASSED"])
+    print(f"\n📊 Результаты: {passed}/2 тестов пройдено\n")
+    assert passed == 2
+
+
+def test_large_file() -> None:
+    """
+    Что я делаю?
+        Тестирую большой файл: страницы и фрагменты без потерь, начало документа и map-reduce.
+    Что я принимаю на вход?
+        Ничего.
+    Что я возвращаю?
+        Ничего.
+    """
+    import tempfile
+    from pathlib import Path
+    from typing import List, Tuple
+
+    import large_file
+    from extractive import estimate_tokens
+    from large_file import LargeTextFile, summarize_long
+
+    print("=" * 80)
+    print("ТЕСТИРОВАНИЕ БОЛЬШИХ ФАЙЛОВ")
+    print("=" * 80)
+
+    paragraph: str = (
+        "Регулятор сохранил ключевую ставку на прежнем уровне. Аналитики ожидали такого решения. "
+        "Инфляция замедлилась третий месяц подряд, сообщила пресс-служба.\n\n"
+    )
+    text_input: str = "".join(f"Раздел {index}. {paragraph}" for index in range(1500))
+
+    with tempfile.TemporaryDirectory() as folder:
+        path: Path = Path(folder) / "big.txt"
+        path.write_text(text_input, encoding="utf-8")
+
+        with LargeTextFile(str(path)) as document:
+            # Тест 1: Страницы и фрагменты вместе дают исходный текст (UTF-8 не рвется)
+            pages: List[str] = [document.page(index) for index in range(document.page_count)]
+            chunks: List[str] = list(document.iter_chunks(chunk_chars=5000))
+            ok1: bool = (
+                document.page_count > 1 and "".join(pages) == text_input
+                and len(chunks) > 1 and "".join(chunks) == text_input
+                and all(chunk.endswith((". ", "\n\n")) for chunk in chunks[:-1])
+            )
+            status1: str = "✅ PASSED" if ok1 else "❌ FAILED"
+            print(f"\n[Тест 1] {document.page_count} стр., {len(chunks)} фрагментов без потерь: {status1}")
+
+            # Тест 2: Начало документа ограничено и обрезано по предложению
+            head: str = document.head(max_chars=1000)
+            ok2: bool = 0 < len(head) <= 1000 and text_input.startswith(head) and head.endswith(".")
+            status2: str = "✅ PASSED" if ok2 else "❌ FAILED"
+            print(f"\n[Тест 2] Начало документа: {len(head)} символов: {status2}")
+
+            # Тест 3: Map-reduce отдает суммаризатору выжимку в пределах бюджета
+            received: List[str] = []
+            progress: List[Tuple[int, int]] = []
+            summary = summarize_long(
+                document,
+                lambda digest: received.append(digest) or "итог",
+                lambda done, total: progress.append((done, total)),
+            )
+            ok3: bool = (
+                summary == "итог" and len(received) == 1
+                and 0 < estimate_tokens(received[0]) <= large_file.DIGEST_TOKENS
+                and len(progress) > 1 and progress[-1][0] == progress[-1][1]
+            )
+            status3: str = "✅ PASSED" if ok3 else "❌ FAILED"
+            print(f"\n[Тест 3] Выжимка {estimate_tokens(received[0]) if received else 0} токенов "
+                  f"после {len(progress)} фрагментов: {status3}")
+
+        # Тест 4: Пустой файл открывается без ошибок
+        empty: Path = Path(folder) / "empty.txt"
+        empty.write_bytes(b"")
+        with LargeTextFile(str(empty)) as document:
+            ok4: bool = document.page(0) == "" and list(document.iter_chunks()) == [] and document.head() == ""
+        status4: str = "✅ PASSED" if ok4 else "❌ FAILED"
+        print(f"\n[Тест 4] Пустой файл: {status4}")
+
+    passed: int = sum([status1 == "✅ PASSED", status2 == "✅ PASSED",
+                       status3 == "✅ PASSED", status4 == "✅ PASSED"])
+    print(f"\n📊 Результаты: {passed}/4 тестов пройдено\n")
+    assert passed == 4
+
+
+def test_result_store() -> None:
+    """
+    Что я делаю?
+        Тестирую хранилище результатов: восстановление после перезапуска, ключ параметров и поиск.
+    Что я принимаю на вход?
+        Ничего.
+    Что я возвращаю?
+        Ничего.
+    """
+    import tempfile
+    from pathlib import Path
+
+    from result_store import ResultStore, hash_text
+
+    print("=" * 80)
+    print("ТЕСТИРОВАНИЕ ХРАНИЛИЩА РЕЗУЛЬТАТОВ")
+    print("=" * 80)
+
+    article: str = "Центробанк сохранил ключевую ставку.\nАналитики ожидали такого решения."
+    params = {"max_length": 150, "min_length": 50, "num_beams": 4}
+
+    with tempfile.TemporaryDirectory() as folder:
+        path: Path = Path(folder) / "history" / "results.sqlite3"
+        store: ResultStore = ResultStore(path)
+        store.put(article, params, "Ставка сохранена.", 2.5)
+        store.put("Сборная выиграла финал чемпионата мира по хоккею.", params, "Сборная победила.", 1.0)
+        skipped = store.put("Текст с ошибкой сервиса при суммаризации.", params, "❌ Ошибка API: 500", 0.1)
+        store.close()
+
+        # Тест 1: После перезапуска тот же текст (с другими пробелами) находится мгновенно
+        store = ResultStore(path)
+        record = store.get(hash_text("  Центробанк сохранил ключевую ставку. Аналитики ожидали такого решения. "), params)
+        ok1: bool = (
+            record is not None and record["summary"] == "Ставка сохранена." and record["seconds"] == 2.5
+            and store.text(record["id"]) == article and skipped is None
+        )
+        status1: str = "✅ PASSED" if ok1 else "❌ FAILED"
+        print(f"\n[Тест 1] Восстановление после перезапуска: {status1}")
+
+        # Тест 2: Другие параметры - другой результат, повторное сохранение заменяет запись
+        other = store.get(hash_text(article), {**params, "max_length": 60})
+        store.put(article, params, "Ставка не изменилась.", 2.0)
+        ok2: bool = (
+            other is None
+            and store.get(hash_text(article), params)["summary"] == "Ставка не изменилась."
+            and len(store.search()) == 2
+        )
+        status2: str = "✅ PASSED" if ok2 else "❌ FAILED"
+        print(f"\n[Тест 2] Ключ параметров и замена записи: {status2}")
+
+        # Тест 3: Поиск по заголовку и саммари, новые сверху, удаление
+        newest_first: bool = [entry["summary"] for entry in store.search()][0] == "Ставка не изменилась."
+        found = store.search("победила")
+        literal = store.search("100%")
+        store.delete(found[0]["id"])
+        ok3: bool = newest_first and len(found) == 1 and literal == [] and len(store.search()) == 1
+        status3: str = "✅ PASSED" if ok3 else "❌ FAILED"
+        print(f"\n[Тест 3] Поиск и удаление: {status3}")
+        store.close()
+
+    passed: int = sum([status1 == "✅ PASSED", status2 == "✅ PASSED", status3 == "✅ PASSED"])
+    print(f"\n📊 Результаты: {passed}/3 тестов пройдено\n")
+    assert passed == 3
+
+
+def test_start_preflight() -> None:
+    """
+    Что я делаю?
+        Тестирую проверки стартера: без импорта тяжелых пакетов и с кешем по отпечатку окружения.
+    Что я принимаю на вход?
+        Ничего.
+    Что я возвращаю?
+        Ничего.
+    """
+    import os
+    import subprocess
+    import sys
+    import tempfile
+    from pathlib import Path
+
+    import start
+
+    print("=" * 80)
+    print("ТЕСТИРОВАНИЕ ПРОВЕРОК СТАРТЕРА")
+    print("=" * 80)
+
+    # Тест 1: Все проверки в отдельном процессе не импортируют проверяемые пакеты
+    code: str = (
+        "import sys, start; start.run_checks(); "
+        "print('IMPORTED', sorted(name for name in start.REQUIRED_PACKAGES if name in sys.modules))"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", code], cwd=str(start.PROJECT_DIR), capture_output=True, text=True, timeout=120
+    )
+    ok1: bool = "IMPORTED []" in completed.stdout
+    status1: str = "✅ PASSED" if ok1 else "❌ FAILED"
+    print(f"\n[Тест 1] Проверки без импорта зависимостей: {status1}")
+
+    # Тест 2: Отпечаток стабилен, меняется вместе с окружением, кеш хранит прошедший отпечаток
+    fingerprint: str = start.environment_fingerprint()
+    variable: str = start.FINGERPRINT_ENV[0]
+    previous = os.environ.get(variable)
+    os.environ[variable] = "changed-for-test"
+    try:
+        changed: str = start.environment_fingerprint()
+    finally:
+        if previous is None:
+            del os.environ[variable]
+        else:
+            os.environ[variable] = previous
+    with tempfile.TemporaryDirectory() as folder:
+        cache: Path = Path(folder) / "start.json"
+        missing = start.load_passed_fingerprint(cache)
+        start.save_passed_fingerprint(fingerprint, cache)
+        ok2: bool = (
+            fingerprint == start.environment_fingerprint() and changed != fingerprint
+            and missing is None and start.load_passed_fingerprint(cache) == fingerprint
+        )
+    status2: str = "✅ PASSED" if ok2 else "❌ FAILED"
+    print(f"\n[Тест 2] Отпечаток окружения и кеш: {status2}")
+
+    passed: int = sum([status1 == "✅ PASSED", status2 == "✅ PASSED"])
+    print(f"\n📊 Результаты: {passed}/2 тестов пройдено\n")
+    assert passed == 2
+
+
+def test_keep_warm() -> None:
+    """
+    Что я делаю?
+        Тестирую расписание проб: пробы только при трафике, адаптация
+        интервала по холодным пробам и остановку после простоя.
+    Что я принимаю на вход?
+        Ничего.
+    Что я возвращаю?
+        Ничего.
+    """
+    import time
+    from typing import List
+
+    from keep_warm import KeepWarm
+
+    print("=" * 80)
+    print("ТЕСТИРОВАНИЕ ПОДДЕРЖАНИЯ МОДЕЛИ В ТЕПЛОМ СОСТОЯНИИ")
+    print("=" * 80)
+
+    now: List[float] = [1000.0]
+    responses: List[int] = []
+
+    def probe() -> int:
+        status: int = responses.pop(0)
+        if status == 201:
+            # Медленный успешный ответ - модель загружалась
+            time.sleep(0.05)
+        return 200 if status == 201 else status
+
+    keeper = KeepWarm(
+        probe, interval=100.0, min_interval=10.0, max_interval=400.0, idle_after=600.0,
+        min_cold_seconds=0.02, clock=lambda: now[0],
+    )
+
+    # Тест 1: Без трафика проб нет; после запроса проба через интервал, живой трафик ее откладывает
+    idle_before: bool = keeper.due_in() is None
+    keeper.touch()
+    first_due = keeper.due_in()
+    now[0] += 60.0
+    keeper.touch()
+    ok1: bool = idle_before and first_due == 100.0 and keeper.due_in() == 100.0
+    status1: str = "✅ PASSED" if ok1 else "❌ FAILED"
+    print(f"\n[Тест 1] Пробы только при трафике и без живых запросов: {status1}")
+
+    # Тест 2: 503 и медленный ответ - холодные (интервал сокращается), быстрый - теплый (растет)
+    now[0] += 50.0
+    responses.extend([200, 200, 503, 201, 200])
+    outcomes: List[str] = [keeper.probe_now() for _ in range(5)]
+    ok2: bool = outcomes == ["warm", "warm", "cold", "cold", "warm"] and abs(keeper.interval - 100.0 * 1.1 ** 3 / 4) < 1e-6
+    status2: str = "✅ PASSED" if ok2 else "❌ FAILED"
+    print(f"\n[Тест 2] Пробы {outcomes}, интервал {keeper.interval:.1f} с: {status2}")
+
+    # Тест 3: Запрос после долгой паузы, пережитой благодаря пробам, учтен; после простоя пробы прекращаются
+    now[0] += 200.0
+    keeper.touch()
+    stats = keeper.stats()
+    now[0] += 700.0
+    ok3: bool = (
+        stats["kept_warm"] == 1 and stats["cold_start_seconds"] > 0.04
+        and abs(stats["saved_seconds"] - stats["cold_start_seconds"]) < 1e-9
+        and keeper.due_in() is None
+    )
+    status3: str = "✅ PASSED" if ok3 else "❌ FAILED"
+    print(f"\n[Тест 3] Холодный старт {stats['cold_start_seconds']:.3f} с избежан 1 раз: {status3}")
+
+    # Тест 4: Фоновый поток пробует по расписанию и останавливается
+    probes: List[float] = []
+    runner = KeepWarm(lambda: probes.append(time.monotonic()) or 200, interval=0.05, min_interval=0.05, idle_after=5.0)
+    runner.start()
+    runner.touch()
+    time.sleep(0.3)
+    runner.stop()
+    count: int = len(probes)
+    time.sleep(0.1)
+    ok4: bool = 2 <= count and len(probes) == count
+    status4: str = "✅ PASSED" if ok4 else "❌ FAILED"
+    print(f"\n[Тест 4] Фоновый поток сделал {count} проб и остановился: {status4}")
+
+    passed: int = sum([
+        status1 == "✅ PASSED", status2 == "✅ PASSED", status3 == "✅ PASSED", status4 == "✅ PASSED",
+    ])
+    print(f"\n📊 Результаты: {passed}/4 тестов пройдено\n")
+    assert passed == 4
+
+
+def test_endpoint_pool() -> None:
+    """
+    Что я делаю?
+        Тестирую несколько эндпоинтов: переключение при ошибке, выключение
+        неисправного эндпоинта, хеджирование медленного ответа без накопления
+        брошенных попыток и пробы всех эндпоинтов.
+    Что я принимаю на вход?
+        Ничего.
+    Что я возвращаю?
+        Ничего.
+    """
+    import socket
+    import threading
+    import time
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from typing import Any, List
+
+    from endpoints import Endpoint, EndpointPool
+
+    print("=" * 80)
+    print("ТЕСТИРОВАНИЕ ЭНДПОИНТОВ И ХЕДЖИРОВАНИЯ")
+    print("=" * 80)
+
+    def start_server(delay: float, status: int) -> ThreadingHTTPServer:
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:
+                self.rfile.read(int(self.headers.get("Content-Length", "0")))
+                time.sleep(delay)
+                body: bytes = b'[{"generated_text": "ok"}]'
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    def url(server: ThreadingHTTPServer) -> str:
+        return f"http://127.0.0.1:{server.server_address[1]}/"
+
+    # Свободный порт, на котором никто не слушает
+    probe = socket.socket()
+    probe.bind(("127.0.0.1", 0))
+    dead_url: str = f"http://127.0.0.1:{probe.getsockname()[1]}/"
+    probe.close()
+
+    fast = start_server(0.0, 200)
+    slow = start_server(1.0, 200)
+    overloaded = start_server(0.0, 503)
+
+    # Тест 1: Мертвый эндпоинт - переключение; после 3 ошибок подряд он уходит в конец списка
+    dead = Endpoint(dead_url, "dead")
+    pool = EndpointPool([dead, Endpoint(url(fast), "fast")], hedge=False)
+    statuses: List[int] = [pool.post(b"{}", {}, timeout=5).status_code for _ in range(3)]
+    ok1: bool = statuses == [200, 200, 200] and not dead.healthy and pool.ordered()[0].name == "fast"
+    status1: str = "✅ PASSED" if ok1 else "❌ FAILED"
+    print(f"\n[Тест 1] Переключение с неработающего эндпоинта: {status1}")
+
+    # Тест 2: 503 сразу переключает на следующий эндпоинт
+    pool = EndpointPool([Endpoint(url(overloaded), "overloaded"), Endpoint(url(fast), "fast")])
+    response = pool.post(b"{}", {}, timeout=5)
+    status2: str = "✅ PASSED" if response.status_code == 200 and response.url == url(fast) else "❌ FAILED"
+    print(f"\n[Тест 2] Перегруженный эндпоинт (503) пропущен: {status2}")
+
+    # Тест 3: Ответа медленного эндпоинта нет дольше его p95 - дубликат на быстрый побеждает
+    slow_endpoint = Endpoint(url(slow), "slow")
+    for _ in range(20):
+        slow_endpoint.record_success(0.05)
+    pool = EndpointPool([slow_endpoint, Endpoint(url(fast), "fast")])
+    started: float = time.perf_counter()
+    response = pool.post(b"{}", {}, timeout=5)
+    seconds: float = time.perf_counter() - started
+    ok3: bool = response.url == url(fast) and seconds < 0.5
+    status3: str = "✅ PASSED" if ok3 else "❌ FAILED"
+    print(f"\n[Тест 3] Хеджированный запрос ответил за {seconds * 1000:.0f} мс: {status3}")
+
+    # Тест 4: При постоянном хеджировании брошенные попытки (ждут медленный ответ 2 с)
+    # не задерживают новые запросы - каждая попытка в своем потоке.
+    # Медленный эндпоинт отвечает 503: брошенные попытки не меняют его p95, хеджируется каждый запрос
+    import endpoints
+
+    stalled = start_server(2.0, 503)
+    stalled_endpoint = Endpoint(url(stalled), "stalled")
+    for _ in range(20):
+        stalled_endpoint.record_success(0.05)
+    pool = EndpointPool([stalled_endpoint, Endpoint(url(fast), "fast")])
+    latencies: List[float] = []
+    for _ in range(40):
+        started = time.perf_counter()
+        pool.post(b"{}", {}, timeout=5)
+        latencies.append(time.perf_counter() - started)
+    abandoned: int = endpoints._abandoned
+    time.sleep(2.2)
+    ok4: bool = max(latencies) < 0.5 and abandoned > 16 and endpoints._abandoned == 0
+    status4: str = "✅ PASSED" if ok4 else "❌ FAILED"
+    print(
+        f"\n[Тест 4] 40 хеджированных запросов, максимум {max(latencies) * 1000:.0f} мс, "
+        f"брошенных попыток одновременно {abandoned}: {status4}"
+    )
+
+    # Тест 5: Проба keep_warm доходит до каждого эндпоинта и не искажает их p95
+    fast_endpoint = Endpoint(url(fast), "fast")
+    pool = EndpointPool([fast_endpoint, Endpoint(url(overloaded), "overloaded")])
+    statuses = pool.probe(b"{}", {}, timeout=5)
+    ok5: bool = statuses == {"fast": 200, "overloaded": 503} and fast_endpoint.describe()["samples"] == 0
+    status5: str = "✅ PASSED" if ok5 else "❌ FAILED"
+    print(f"\n[Тест 5] Пробы всех эндпоинтов {statuses}: {status5}")
+
+    # Тест 6: Ответ 503 дает экстрактивное саммари с пометкой FallbackSummary (в историю не попадает)
+    import os
+
+    import text_summarizer
+
+    default_pool = text_summarizer.endpoint_pool
+    default_token: Optional[str] = os.environ.get("HUGGINGFACE_API_TOKEN")
+    text_summarizer.endpoint_pool = EndpointPool([Endpoint(url(overloaded), "overloaded")])
+    os.environ["HUGGINGFACE_API_TOKEN"] = "test"
+    try:
+        summary: str = text_summarizer._call_hf_api(
+            "Сервис суммаризации перегружен. Ответ собирается из ключевых предложений статьи.", 40, 10
+        )
+    finally:
+        text_summarizer.endpoint_pool = default_pool
+        if default_token is None:
+            del os.environ["HUGGINGFACE_API_TOKEN"]
+        else:
+            os.environ["HUGGINGFACE_API_TOKEN"] = default_token
+    ok6: bool = isinstance(summary, text_summarizer.FallbackSummary) and bool(summary.strip())
+    status6: str = "✅ PASSED" if ok6 else "❌ FAILED"
+    print(f"\n[Тест 6] Экстрактивная замена при 503 помечена: {status6}")
+
+    for server in (fast, slow, overloaded, stalled):
+        server.shutdown()
+
+    passed: int = sum([
+        status1 == "✅ PASSED", status2 == "✅ PASSED", status3 == "✅ PASSED",
+        status4 == "✅ PASSED", status5 == "✅ PASSED", status6 == "✅ PASSED",
+    ])
+    print(f"\n📊 Результаты: {passed}/6 тестов пройдено\n")
+    assert passed == 6
+
+
 def main() -> None:
     """
     Что я делаю?
@@ -144,6 +869,16 @@ def main() -> None:
     test_validate_text()
     test_load_api_token()
     test_type_annotations()
+    test_summarize_extractive()
+    test_near_duplicate_index()
+    test_metrics()
+    test_tracing()
+    test_batch_queue()
+    test_large_file()
+    test_result_store()
+    test_start_preflight()
+    test_keep_warm()
+    test_endpoint_pool()
     
     print("=" * 80)
     print("✅ ТЕСТИРОВАНИЕ ЗАВЕРШЕНО")
@@ -5,15 +5,57 @@
 кратких резюме текстов на русском языке.
 """
 
+import json
 import os
-from typing import Optional, Any, Dict
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Any, Dict, List, Tuple
 
 import requests
 from dotenv import load_dotenv
 
+from endpoints import EndpointPool, endpoints_from_env
+from extractive import summarize_extractive
+from keep_warm import KEEP_WARM, KeepWarm
+from near_duplicates import NearDuplicateIndex
+from metrics import metrics, start_metrics_server_from_env
+from tracing import traced, tracer
+
 # Загружаем переменные окружения из файла .env
 load_dotenv()
 
+# Отвечать экстрактивным саммари, если сервис перегружен (429/503 или таймаут)
+EXTRACTIVE_FALLBACK: bool = os.getenv("SUMMARIZER_EXTRACTIVE_FALLBACK", "1").strip() not in ("0", "false", "no")
+OVERLOAD_STATUS_CODES: Tuple[int, ...] = (429, 503)
+
+# Сколько запросов к API выполнять одновременно при пакетной обработке
+BATCH_CONCURRENCY: int = int(os.getenv("SUMMARIZER_BATCH_CONCURRENCY", "4"))
+
+# Порог сходства Жаккара для повторного использования саммари перепечаток (0 - выключено)
+DEDUP_THRESHOLD: float = float(os.getenv("SUMMARIZER_DEDUP_THRESHOLD", "0.9"))
+DEDUP_MAX_ENTRIES: int = int(os.getenv("SUMMARIZER_DEDUP_MAX_ENTRIES", "10000"))
+
+_dedup_index: Optional[NearDuplicateIndex] = (
+    NearDuplicateIndex(threshold=DEDUP_THRESHOLD, max_entries=DEDUP_MAX_ENTRIES)
+    if DEDUP_THRESHOLD > 0 else None
+)
+
+# Эндпоинт /metrics поднимается, только если задан SUMMARIZER_METRICS_PORT
+start_metrics_server_from_env()
+
+
+class FallbackSummary(str):
+    """
+    Что я делаю?
+        Помечаю экстрактивное саммари, выданное вместо результата модели
+        (сервис перегружен или не ответил вовремя). Это обычная строка,
+        но в историю ее не сохраняют: повторный запрос должен дойти до модели.
+    Что я принимаю на вход?
+        Текст саммари (как str).
+    Что я возвращаю?
+        Ничего - класс строки-маркера.
+    """
+
 
 def load_api_token() -> str:
     """
@@ -51,9 +93,56 @@ def validate_text(text_input: str) -> bool:
 
 # одна русская модель суммаризации
 HF_MODEL_NAME: str = "IlyaGusev/rugpt3medium_sum_gazeta"
-HF_ROUTER_URL: str = "https://router.huggingface.co/hf-inference"
+# Адрес можно переопределить, например для локальной заглушки в бенчмарках
+HF_ROUTER_URL: str = os.getenv("HF_ROUTER_URL", "https://router.huggingface.co/hf-inference")
+# Эндпоинты с переключением и хеджированием (SUMMARIZER_ENDPOINTS, по умолчанию - HF_ROUTER_URL)
+endpoint_pool: EndpointPool = EndpointPool(endpoints_from_env(HF_ROUTER_URL))
+
+
+def probe_remote() -> int:
+    """
+    Что я делаю?
+        Отправляю дешевый пробный запрос (1 новый токен) на каждый здоровый
+        эндпоинт, чтобы модель ни на одном из них не выгружалась.
+    Что я принимаю на вход?
+        Ничего.
+    Что я возвращаю?
+        int: 503, если хотя бы один эндпоинт холодный, иначе статус первого ответившего.
+    """
+    payload: Dict[str, Any] = {
+        "model": HF_MODEL_NAME,
+        "inputs": "Правительство утвердило новые правила.",
+        "parameters": {"max_new_tokens": 1},
+    }
+    statuses: Dict[str, int] = endpoint_pool.probe(
+        json.dumps(payload).encode("utf-8"),
+        {"Authorization": f"Bearer {load_api_token()}", "Content-Type": "application/json"},
+        timeout=60,
+    )
+    # Холодный эндпоинт - повод пробовать чаще, даже если остальные прогреты
+    return 503 if 503 in statuses.values() else next(iter(statuses.values()))
+
 
+# Фоновые пробы держат модель загруженной, пока процесс получает запросы (keep_warm.py)
+keep_warm: Optional[KeepWarm] = KeepWarm(probe_remote) if KEEP_WARM else None
+if keep_warm is not None:
+    keep_warm.start()
 
+
+def _params_key(max_length: int, min_length: int, extra_params: Optional[Dict[str, Any]]) -> Tuple[Any, ...]:
+    """
+    Что я делаю?
+        Составляю ключ параметров генерации для кеша перепечаток.
+    Что я принимаю на вход?
+        max_length (int), min_length (int): Длина вывода.
+        extra_params (dict | None): Дополнительные параметры генерации.
+    Что я возвращаю?
+        tuple: Ключ параметров.
+    """
+    return (HF_MODEL_NAME, max_length, min_length, tuple(sorted((extra_params or {}).items())))
+
+
+@traced("summarize_remote")
 def _call_hf_api(
     text_input: str,
     max_length: int,
@@ -69,9 +158,23 @@ def _call_hf_api(
         min_length (int): Минимальная длина вывода (в новых токенах).
         extra_params (dict | None): Дополнительные параметры генерации.
     Что я возвращаю?
-        str: Суммаризированный текст или сообщение об ошибке.
+        str: Суммаризированный текст (FallbackSummary, если сервис перегружен)
+            или сообщение об ошибке.
     """
+    params_key = _params_key(max_length, min_length, extra_params)
+    metrics.inc("requests_total", backend="remote")
+    if _dedup_index is not None:
+        # Перепечатка уже обработанной заметки - отдаем сохраненное саммари без запроса
+        with metrics.stage("dedup_lookup"):
+            cached: Optional[str] = _dedup_index.lookup(text_input, params_key)
+        if cached is not None:
+            metrics.inc("cache_hits_total", cache="near_duplicate")
+            return cached
+        metrics.inc("cache_misses_total", cache="near_duplicate")
+
     api_token: str = load_api_token()
+    if keep_warm is not None:
+        keep_warm.touch()
 
     headers: Dict[str, str] = {
         "Authorization": f"Bearer {api_token}",
@@ -92,34 +195,61 @@ def _call_hf_api(
     }
 
     try:
-        response: requests.Response = requests.post(
-            HF_ROUTER_URL,
-            headers=headers,
-            json=payload,
-            timeout=60,
-        )
-        response.raise_for_status()
-        result: Any = response.json()
+        with metrics.stage("encode"):
+            body: bytes = json.dumps(payload).encode("utf-8")
+            tracer.annotate(request_bytes=len(body))
+
+        with metrics.stage("http"):
+            # Первый успешный ответ среди эндпоинтов (медленный дублируется на следующий)
+            response: requests.Response = endpoint_pool.post(body, headers, timeout=60)
+            # elapsed - время до получения заголовков ответа, остальное - чтение тела
+            tracer.annotate(
+                endpoint=response.url,
+                status=response.status_code,
+                headers_ms=round(response.elapsed.total_seconds() * 1000.0, 3),
+                response_bytes=len(response.content),
+            )
+            response.raise_for_status()
+
+        with metrics.stage("parse"):
+            result: Any = response.json()
 
-        # router API обычно возвращает список словарей с полем generated_text
-        if isinstance(result, list) and result:
-            item: Any = result[0]
-            if isinstance(item, dict) and "generated_text" in item:
-                summary: str = str(item["generated_text"]).strip()
-                if summary:
-                    return summary
+            # router API обычно возвращает список словарей с полем generated_text
+            summary: str = ""
+            if isinstance(result, list) and result:
+                item: Any = result[0]
+                if isinstance(item, dict) and "generated_text" in item:
+                    summary = str(item["generated_text"]).strip()
 
+        if summary:
+            if _dedup_index is not None:
+                _dedup_index.add(text_input, params_key, summary)
+            return summary
+
+        metrics.record_error("BadResponse")
         return f"❌ Ошибка обработки ответа: {result}"
 
-    except requests.exceptions.Timeout:
+    except requests.exceptions.Timeout as err:
+        metrics.record_error(err)
+        if EXTRACTIVE_FALLBACK:
+            metrics.inc("extractive_fallbacks_total")
+            return FallbackSummary(summarize_extractive(text_input, max_length=max_length))
         return "⏱️ Ошибка: запрос истек по времени. Попробуйте позже."
-    except requests.exceptions.ConnectionError:
+    except requests.exceptions.ConnectionError as err:
+        metrics.record_error(err)
         return "🌐 Ошибка: проблема с подключением к интернету."
-    except requests.exceptions.HTTPError:
+    except requests.exceptions.HTTPError as err:
+        metrics.record_error(err, status=str(response.status_code))
+        if EXTRACTIVE_FALLBACK and response.status_code in OVERLOAD_STATUS_CODES:
+            # Модель перегружена или еще загружается - отдаем экстрактивное саммари
+            metrics.inc("extractive_fallbacks_total")
+            return FallbackSummary(summarize_extractive(text_input, max_length=max_length))
         return f"❌ HTTP ошибка {response.status_code}: {response.text}"
     except requests.exceptions.RequestException as req_err:
+        metrics.record_error(req_err)
         return f"❌ Ошибка запроса: {str(req_err)}"
-    except ValueError:
+    except ValueError as err:
+        metrics.record_error(err)
         return "❌ Ошибка: некорректный ответ от сервера (не JSON)."
 
 
@@ -148,11 +278,33 @@ def summarize_text(
     )
 
 
+def summarize_text_extractive(
+    text_input: str,
+    max_length: int = 150,
+    min_length: int = 50,
+) -> Optional[str]:
+    """
+    Что я делаю?
+        Выполняю быструю экстрактивную суммаризацию локально, без запроса к API.
+    Что я принимаю на вход?
+        text_input (str): Исходный текст.
+        max_length (int): Бюджет длины результата в токенах.
+        min_length (int): Не используется, оставлен для единообразия с summarize_text.
+    Что я возвращаю?
+        Optional[str]: Саммари из ключевых предложений текста или сообщение об ошибке.
+    """
+    if not validate_text(text_input):
+        return "⚠️ Текст слишком короткий! Минимум 50 символов."
+
+    return summarize_extractive(text_input, max_length=max_length)
+
+
 def summarize_text_advanced(
     text_input: str,
     max_length: int = 150,
     min_length: int = 50,
     num_beams: int = 4,
+    cancel_event: Optional[threading.Event] = None,
 ) -> Optional[str]:
     """
     Что я делаю?
@@ -162,18 +314,117 @@ def summarize_text_advanced(
         max_length (int): Максимальная длина результата.
         min_length (int): Минимальная длина результата.
         num_beams (int): Количество лучей для beam search.
+        cancel_event (threading.Event | None): Событие отмены устаревшего запроса.
+            Отправленный HTTP-запрос прервать нельзя, поэтому отмена проверяется
+            до отправки и после ответа.
     Что я возвращаю?
-        Optional[str]: Суммаризированный текст или сообщение об ошибке.
+        Optional[str]: Суммаризированный текст, сообщение об ошибке или None при отмене.
     """
     if not validate_text(text_input):
         return "⚠️ Текст слишком короткий! Минимум 50 символов."
+    if cancel_event is not None and cancel_event.is_set():
+        return None
 
-    return _call_hf_api(
+    summary: str = _call_hf_api(
         text_input=text_input,
         max_length=max_length,
         min_length=min_length,
-        extra_params={
-            "num_beams": num_beams,
-            "early_stopping": True,
-        },
+        extra_params=_advanced_params(num_beams),
     )
+    if cancel_event is not None and cancel_event.is_set():
+        return None
+    return summary
+
+
+def _advanced_params(num_beams: int) -> Dict[str, Any]:
+    """
+    Что я делаю?
+        Составляю дополнительные параметры генерации расширенного режима.
+    Что я принимаю на вход?
+        num_beams (int): Количество лучей.
+    Что я возвращаю?
+        dict: Параметры beam search.
+    """
+    return {
+        "num_beams": num_beams,
+        "early_stopping": True,
+    }
+
+
+def summarize_text_preview(
+    text_input: str,
+    max_length: int = 150,
+    min_length: int = 50,
+    num_beams: int = 4,
+) -> Optional[str]:
+    """
+    Что я делаю?
+        Мгновенно даю предварительное саммари без запроса к API: сохраненное
+        саммари этого текста (или его перепечатки) с теми же параметрами,
+        иначе экстрактивное.
+    Что я принимаю на вход?
+        text_input (str): Исходный текст.
+        max_length (int): Максимальная длина.
+        min_length (int): Минимальная длина.
+        num_beams (int): Число лучей будущего запроса (часть ключа кеша).
+    Что я возвращаю?
+        Optional[str]: Предварительное саммари или сообщение об ошибке.
+    """
+    if not validate_text(text_input):
+        return "⚠️ Текст слишком короткий! Минимум 50 символов."
+
+    if _dedup_index is not None:
+        params_key = _params_key(max_length, min_length, _advanced_params(num_beams))
+        cached: Optional[str] = _dedup_index.lookup(text_input, params_key)
+        if cached is not None:
+            return cached
+    return summarize_extractive(text_input, max_length=max_length)
+
+
+def summarize_text_sweep(
+    text_input: str,
+    configs: List[Tuple[int, int, int]],
+) -> List[str]:
+    """
+    Что я делаю?
+        Суммаризирую один текст с несколькими наборами параметров для сравнения.
+        KV-кеш входа хранится на стороне сервиса, поэтому каждый набор - отдельный запрос.
+    Что я принимаю на вход?
+        text_input (str): Исходный текст.
+        configs (List[tuple]): Наборы (max_length, min_length, num_beams).
+    Что я возвращаю?
+        List[str]: Саммари (или сообщения об ошибке) в порядке наборов.
+    """
+    return [
+        summarize_text_advanced(text_input, max_length, min_length, num_beams) or ""
+        for max_length, min_length, num_beams in configs
+    ]
+
+
+def summarize_text_batch(
+    texts: List[str],
+    max_length: int = 150,
+    min_length: int = 50,
+    num_beams: int = 1,
+    priority: str = "bulk",
+) -> List[str]:
+    """
+    Что я делаю?
+        Суммаризирую несколько текстов параллельными запросами к API
+        (не больше SUMMARIZER_BATCH_CONCURRENCY одновременно).
+    Что я принимаю на вход?
+        texts (List[str]): Тексты.
+        max_length (int): Максимальная длина.
+        min_length (int): Минимальная длина.
+        num_beams (int): Число лучей.
+        priority (str): Не используется - приоритеты есть только у локального движка.
+    Что я возвращаю?
+        List[str]: Саммари или сообщения об ошибке в порядке текстов.
+    """
+    def summarize_one(text_input: str) -> str:
+        if num_beams > 1:
+            return summarize_text_advanced(text_input, max_length, min_length, num_beams) or ""
+        return summarize_text(text_input, max_length, min_length) or ""
+
+    with ThreadPoolExecutor(max_workers=max(1, BATCH_CONCURRENCY)) as pool:
+        return list(pool.map(summarize_one, texts))